@@ -0,0 +1,83 @@
+"""
+Cấu hình các service gọi chain (mint Victory NFT, CCIP)
+"""
+
+# Cache phí / gas theo chain (services/fee_oracle.py)
+FEE_ORACLE_CONFIG = {
+    "gas_price_ttl": 15,  # Gas price (giây)
+    "ccip_fee_ttl": 60,  # Phí CCIP theo destination + kích thước message (giây)
+    "gas_estimate_ttl": 300,  # estimate_gas theo loại call (giây)
+    "balance_ttl": 30,  # Số dư ví server, trừ dần theo chi phí đã gửi (giây)
+    "refresh_ahead": 0.5,  # Đã qua tỉ lệ này của TTL thì làm mới nền, caller vẫn nhận giá trị cũ
+}
+
+# Theo dõi receipt của transaction do ví server gửi (utils/receipt_tracker.py)
+RECEIPT_TRACKER_CONFIG = {
+    "poll_interval": 2,  # Chu kỳ đọc receipt của mọi transaction đang chờ (giây)
+    "stuck_after": 60,  # Chưa có receipt sau khoảng này thì gửi lại cùng nonce với gas cao hơn (giây)
+    "gas_bump": 1.125,  # Hệ số tăng gas price khi thay thế (node yêu cầu tăng tối thiểu 10%)
+    "max_bumps": 3,  # Số lần thay thế tối đa cho một transaction
+    "receipt_timeout": 600,  # Bỏ theo dõi transaction sau khoảng này (giây)
+}
+
+# Hàng đợi mint Victory NFT lưu trong MongoDB (services/mint_queue.py)
+MINT_QUEUE_CONFIG = {
+    "workers": 4,  # Số job mint chạy đồng thời trong mỗi process
+    "max_attempts": 5,  # Quá số lần này thì job vào dead letter (status "dead")
+    "retry_backoff": 15,  # Backoff sau lần lỗi đầu tiên (giây), tăng gấp đôi mỗi lần lỗi
+    "max_retry_backoff": 900,  # Backoff tối đa (giây)
+    "lease_seconds": 600,  # Worker bị crash thì job "running" được chạy lại sau khoảng này (giây)
+    "poll_interval": 2,  # Chu kỳ tìm job mới / job tới hạn retry (giây)
+    "drain_timeout": 30,  # Khi shutdown, chờ job đang chạy tối đa khoảng này (giây)
+    # Gom job mint trực tiếp thành một batchMintVictoryNFT (env MINT_BATCH_SIZE), 1 = tắt
+    # vì contract đã deploy phải có batchMintVictoryNFT
+    "max_batch_size": 1,
+    "batch_window": 5,  # Chu kỳ gom job mint trực tiếp mới vào một batch (giây)
+}
+
+# Backend mint giả lập (MINT_BACKEND=simulated), dùng cho dev / benchmark không cần chain
+MINT_SIMULATION_CONFIG = {
+    "latency": 2.0,  # Thời gian gửi + chờ receipt trung bình (giây)
+    "latency_jitter": 0.5,
+    "failure_rate": 0.0,  # Tỉ lệ mint lỗi (để thử retry / dead letter)
+}
+
+# Index event của Victory NFT contract vào MongoDB (services/victory_nft_indexer.py)
+VICTORY_NFT_INDEXER_CONFIG = {
+    "confirmations": 6,  # Chỉ index block cách head ít nhất số block này (tránh reorg)
+    "poll_interval": 5,  # Chu kỳ đọc log khi đã theo kịp head (giây)
+    "max_log_range": 2048,  # Số block tối đa mỗi lần get_logs (giới hạn của RPC public)
+}
+
+# Gom view call đồng thời vào Multicall3 / JSON-RPC batch (services/read_aggregator.py)
+READ_AGGREGATOR_CONFIG = {
+    "window": 0.005,  # Chờ thêm call khác tối đa khoảng này trước khi gửi (giây)
+    "max_calls": 100,  # Đủ số call này thì gửi ngay
+    # Multicall3 có cùng địa chỉ trên hầu hết EVM chain (Fuji, Base Sepolia...)
+    "multicall_address": "0xcA11bde05977b3631167028862bE2a173976CA11",
+}
+
+# Nhiều RPC endpoint mỗi chain: health score, circuit breaker, hedge read (services/rpc_failover.py)
+RPC_FAILOVER_CONFIG = {
+    "primary_weight": 3,  # Weight của RPC URL chính, URL dự phòng không ghi weight thì là fallback_weight
+    "fallback_weight": 1,
+    "ewma_alpha": 0.2,  # Hệ số EWMA của latency và tỉ lệ lỗi
+    "initial_latency": 0.3,  # Latency giả định của endpoint chưa có mẫu (giây)
+    "breaker_failures": 5,  # Số lỗi liên tiếp thì ngắt endpoint
+    "breaker_cooldown": 30,  # Thời gian ngắt trước khi thử lại một request (giây)
+    "hedging": True,
+    "hedge_quantile": 0.95,  # Gửi bản sao read sau latency ở phân vị này của endpoint đầu tiên
+    "hedge_min_samples": 20,  # Chưa đủ mẫu latency thì chờ hedge_default_delay
+    "hedge_default_delay": 0.5,
+    "hedge_min_delay": 0.05,
+    "hedge_max_delay": 2.0,
+    "latency_samples": 200,  # Số mẫu latency gần nhất giữ lại để tính phân vị
+}
+
+# Thống kê / leaderboard Victory NFT tính sẵn sau mỗi mint (services/victory_nft_stats.py)
+VICTORY_NFT_STATS_CONFIG = {
+    "max_age": 300,  # Document cũ hơn (giây) thì tính lại nền khi có người đọc
+    "recent_window": 86400,  # Khoảng thời gian của recent_mints_24h (giây)
+    "leaderboard_size": 20,
+    "top_milestones": 10,
+}
@@ -31,7 +31,22 @@ class Settings(BaseSettings):
     BASE_SEPOLIA_RPC_URL: str = os.getenv("BASE_SEPOLIA_RPC_URL", "https://sepolia.base.org")
     CCIP_PRIVATE_KEY: str = os.getenv("CCIP_PRIVATE_KEY", "")
     PRIVATE_KEY: str = os.getenv("PRIVATE_KEY", "")
-    
+    VRF_RPC_URL: str = os.getenv("VRF_RPC_URL", os.getenv("AVALANCHE_FUJI_RPC_URL", "https://avalanche-fuji-c-chain-rpc.publicnode.com"))
+
+    # RPC dự phòng mỗi chain: "url" hoặc "url|weight", cách nhau bởi dấu phẩy
+    AVALANCHE_FUJI_RPC_FALLBACK_URLS: str = os.getenv("AVALANCHE_FUJI_RPC_FALLBACK_URLS", "https://avalanche-fuji-c-chain-rpc.publicnode.com")
+    BASE_SEPOLIA_RPC_FALLBACK_URLS: str = os.getenv("BASE_SEPOLIA_RPC_FALLBACK_URLS", "https://base-sepolia-rpc.publicnode.com")
+    VRF_RPC_FALLBACK_URLS: str = os.getenv("VRF_RPC_FALLBACK_URLS", "")
+
+    # Chain RPC provider pool (mỗi chain một pool)
+    CHAIN_RPC_MAX_CONCURRENCY: int = int(os.getenv("CHAIN_RPC_MAX_CONCURRENCY", "16"))
+    CHAIN_RPC_TIMEOUT_SECONDS: int = int(os.getenv("CHAIN_RPC_TIMEOUT_SECONDS", "30"))
+    CHAIN_RPC_KEEPALIVE_SECONDS: int = int(os.getenv("CHAIN_RPC_KEEPALIVE_SECONDS", "60"))
+
+    # Index event Victory NFT vào MongoDB, 0 = tự tìm block deploy contract
+    VICTORY_NFT_INDEXER_ENABLED: bool = os.getenv("VICTORY_NFT_INDEXER_ENABLED", "True").lower() == "true"
+    VICTORY_NFT_INDEXER_START_BLOCK: int = int(os.getenv("VICTORY_NFT_INDEXER_START_BLOCK", "0"))
+
     # Database settings
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb+srv://localhost:27017")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "repai_kickin")
@@ -48,7 +63,20 @@ class Settings(BaseSettings):
     WS_PING_INTERVAL: int = 20
     WS_PING_TIMEOUT: int = 20
     WS_CLOSE_TIMEOUT: int = 20
-    
+
+    # Challenge settings
+    CHALLENGE_TTL_SECONDS: int = int(os.getenv("CHALLENGE_TTL_SECONDS", "60"))
+    MAX_PENDING_CHALLENGES_PER_USER: int = int(os.getenv("MAX_PENDING_CHALLENGES_PER_USER", "5"))
+
+    # Match result commit pipeline
+    MATCH_COMMIT_MAX_PENDING: int = int(os.getenv("MATCH_COMMIT_MAX_PENDING", "1000"))
+    MATCH_COMMIT_WORKERS: int = int(os.getenv("MATCH_COMMIT_WORKERS", "4"))
+    MATCH_COMMIT_MAX_RETRIES: int = int(os.getenv("MATCH_COMMIT_MAX_RETRIES", "3"))
+    LEADERBOARD_REFRESH_DEBOUNCE_SECONDS: float = float(os.getenv("LEADERBOARD_REFRESH_DEBOUNCE_SECONDS", "1.0"))
+
+    # Bot roster cache
+    BOT_ROSTER_REFRESH_MINUTES: int = int(os.getenv("BOT_ROSTER_REFRESH_MINUTES", "10"))
+
     # Cache settings
     CACHE_ENABLED: bool = True
     CACHE_MAX_SIZE: int = 1000
@@ -56,7 +84,9 @@ class Settings(BaseSettings):
     CACHE_EXCLUDED_PATHS: List[str] = [
         "/api/ws/waitingroom/{user_id}",
         "/api/me",
-        "/api/matches/active"
+        "/api/matches/active",
+        "/health/live",
+        "/health/ready"
     ]
     
     # Monitoring settings
@@ -2,13 +2,50 @@
 Cấu hình VRF cho hệ thống
 """
 
-# Cấu hình Batch VRF Manager
+# Cấu hình Batch VRF Manager (refill engine của VRFWordPool)
 VRF_BATCH_CONFIG = {
-    "batch_size": 50,  # Số lượng requests tối thiểu để trigger batch
-    "cache_size": 200,  # Số lượng số ngẫu nhiên cache
-    "min_interval": 2,  # Thời gian tối thiểu giữa các batch requests (giây)
-    "max_batch_requests": 10,  # Số lượng VRF requests tối đa mỗi batch
-    "timeout": 30,  # Timeout cho VRF requests (giây)
+    "cache_size": 200,  # Số lượng số ngẫu nhiên cache tối đa
+    "low_watermark": 60,  # Pool (kể cả request đang về) xuống dưới mức này thì bắt đầu refill
+    "high_watermark": 160,  # Refill tới mức này thì dừng
+    "max_in_flight": 3,  # Số VRF requests tối đa đang chờ fulfillment cùng lúc
+    "refill_backoff": 5,  # Backoff sau request lỗi đầu tiên (giây), tăng gấp đôi mỗi lần lỗi
+    "max_refill_backoff": 60,  # Backoff tối đa (giây)
+    "timeout": 30,  # Thời gian chờ tối đa khi pre-warm (giây)
+    "persistent": True,  # Lưu pool vào MongoDB (vrf_words), dùng chung giữa các worker
+    "slot_lease_seconds": 420,  # Lease của một slot refill trên toàn cụm (giây)
+    "sync_interval": 1.0,  # Chu kỳ đồng bộ level pool chung (giây)
+}
+
+# Pipeline gửi requestRandomWords (utils/vrf_pipeline.py)
+VRF_PIPELINE_CONFIG = {
+    "poll_interval": 2,  # Chu kỳ quét log RequestFulfilled (giây)
+    "receipt_timeout": 120,  # Thời gian chờ receipt của requestRandomWords (giây)
+    "fulfillment_timeout": 300,  # Thời gian chờ fulfillment (giây)
+    "max_log_range": 2000,  # Số block tối đa mỗi lần get_logs
+}
+
+# VRF backend giả lập (utils/vrf_backends.py), dùng cho benchmark / dev offline
+VRF_SIMULATION_CONFIG = {
+    "submit_latency": 0.05,  # Gửi tx + chờ receipt (giây)
+    "fulfillment_latency": 2.0,  # Thời gian trung bình tới khi fulfill (giây)
+    "latency_jitter": 0.5,  # ± jitter của fulfillment (giây)
+    "failure_rate": 0.0,  # Tỉ lệ gửi request lỗi
+    "fulfillment_failure_rate": 0.0,  # Tỉ lệ request không bao giờ được fulfill
+    "fulfillment_timeout": 30,  # Request không được fulfill thì lỗi sau (giây)
+    "num_words": 10,  # Số word mỗi request
+    "gas_per_request": 120000,  # Gas của requestRandomWords
+    "gas_per_word": 20000,  # Gas callback cho mỗi word
+    "callback_gas_limit": 2500000,  # Vượt quá thì fulfill bị revert
+    "gas_price_gwei": 25,
+}
+
+# Latency budget (giây) cho mỗi call site cần random.
+# Quá hạn thì dùng CSPRNG local và đánh dấu source = "local_fallback"
+VRF_DEADLINE_CONFIG = {
+    "match": 0.2,              # Gán vai trò / chọn skill trong trận PvP
+    "code_generation": 30,     # Admin tạo code, không có người chơi đang chờ
+    "tournament": 30,          # Một word cho cả vòng tournament
+    "default": 5,
 }
 
 # Cấu hình cho các loại user khác nhau
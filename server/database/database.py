@@ -69,38 +69,62 @@ async def get_database():
         _db_instance = await Database.get_instance()
     return await _db_instance.get_database()
 
+async def connect_db():
+    """Kết nối + ping MongoDB (critical path của startup)"""
+    return await get_database()
+
+async def _create_index(collection, keys, **kwargs):
+    try:
+        await collection.create_index(keys, **kwargs)
+    except Exception as e:
+        # Index đã tồn tại với option khác: giữ index cũ, không drop trên production
+        api_logger.warning(f"Skipping index {collection.name}.{keys}: {str(e)}")
+
+async def ensure_indexes():
+    """
+    Tạo index nếu chưa có (create_index là idempotent nên không cần drop trước).
+    Chạy nền sau khi app đã nhận request.
+    """
+    db = await get_database()
+    await _create_index(
+        db.users,
+        "email",
+        unique=True,
+        partialFilterExpression={"email": {"$type": "string"}}
+    )
+    await _create_index(
+        db.users,
+        "username",
+        unique=True,
+        partialFilterExpression={"username": {"$type": "string"}}
+    )
+    # Tra user theo ví (leaderboard Victory NFT)
+    await _create_index(db.users, "wallet", partialFilterExpression={"wallet": {"$type": "string"}})
+    await _create_index(db.users, "evm_address", partialFilterExpression={"evm_address": {"$type": "string"}})
+    await _create_index(db.matches, "status")
+    await _create_index(db.matches, "created_at")
+    await _create_index(db.matches, [("players", 1)])
+    await _create_index(db.skills, "name", unique=True)
+    await _create_index(db.vip_codes, "code", unique=True)
+    await _create_index(db.vip_codes, "expires_at")
+    await _create_index(db.vip_codes, "is_used")
+
+    from utils.vrf_persistent_pool import ensure_vrf_pool_indexes
+    await ensure_vrf_pool_indexes(db)
+    from services.mint_queue import ensure_mint_queue_indexes
+    await ensure_mint_queue_indexes(db)
+    from services.victory_nft_indexer import ensure_victory_nft_indexes
+    await ensure_victory_nft_indexes(db)
+    from services.mint_ledger import ensure_mint_ledger_indexes
+    await ensure_mint_ledger_indexes(db)
+    from services.victory_nft_stats import ensure_victory_nft_stats_indexes
+    await ensure_victory_nft_stats_indexes(db)
+
 async def init_db():
     """Initialize database connection and create indexes"""
     try:
-        db = await get_database()
-        
-        # Drop existing indexes first
-        await db.users.drop_indexes()
-        await db.matches.drop_indexes()
-        await db.skills.drop_indexes()
-        await db.vip_codes.drop_indexes()
-
-        
-        # Create indexes with partialFilterExpression
-        await db.users.create_index(
-            "email",
-            unique=True,
-            partialFilterExpression={"email": {"$type": "string"}}
-        )
-        await db.users.create_index(
-            "username",
-            unique=True,
-            partialFilterExpression={"username": {"$type": "string"}}
-        )
-        await db.matches.create_index("status")
-        await db.matches.create_index("created_at")
-        await db.matches.create_index([("players", 1)])
-        await db.skills.create_index("name", unique=True)
-        await db.vip_codes.create_index("code", unique=True)
-        await db.vip_codes.create_index("expires_at")
-        await db.vip_codes.create_index("is_used")
-
-
+        await connect_db()
+        await ensure_indexes()
     except Exception as e:
         api_logger.error(f"Failed to initialize database: {str(e)}")
         raise
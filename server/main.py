@@ -16,12 +16,13 @@ from contextlib import asynccontextmanager
 # Import routers using absolute imports
 from routes import users, skills, ws_handlers, mystery_box, bot, chat, cache, leaderboard, GoogleAuthenticate, nft, x, invite_codes_vip, admin
 from routes.victory_nft import router as victory_nft_router
+from routes.tournament import router as tournament_router
 from middleware.database import database_middleware, DatabaseMiddleware
 from middleware.rate_limit import RateLimitMiddleware
 from middleware.cache import InMemoryCacheMiddleware
 from middleware.jwt_auth import JWTAuthMiddleware
 from utils.logger import api_logger, setup_logger
-from database.database import init_db, close_db, Database, get_database
+from database.database import connect_db, ensure_indexes, close_db, Database, get_database
 from config.settings import settings
 from routes.task_claim_matches import router as task_claim_matches_router
 from routes.daily_tasks import router as daily_tasks_router
@@ -32,7 +33,13 @@ from routes.invite_codes_vip import setup_vip_codes
 
 # Import VRF startup
 from startup_vrf import startup_vrf, check_vrf_health
+from utils.vrf_initializer import vrf_initializer
 from routes.vrf_status import router as vrf_status_router
+from services.bot_roster import bot_roster
+from services.chain_providers import chain_providers
+from services.mint_queue import mint_queue
+from services.victory_nft_indexer import victory_nft_indexer
+from utils.readiness import readiness
 
 import time
 import asyncio
@@ -57,30 +64,40 @@ app = FastAPI()
 async def startup_event():
     await setup_vip_codes()
 
+async def warm_up_vrf():
+    if await startup_vrf() is None:
+        raise RuntimeError("VRF initialization failed, matches use local fallback")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: critical path chỉ gồm kết nối DB, các warm-up chạy nền
     try:
         api_logger.info("Initializing database connection...")
-        await init_db()
+        readiness.register("database", critical=True)
+        await readiness.run("database", connect_db, critical=True)
         api_logger.info("Database connection successful")
         
-        # Initialize VRF system
-        api_logger.info("Starting VRF system initialization...")
-        vrf_instance = await startup_vrf()
-        if vrf_instance:
-            api_logger.info("VRF system initialized successfully")
-        else:
-            api_logger.warning("VRF system initialization failed, will use fallback")
-        
         init_metrics()
         setup_scheduler()
-        api_logger.info("Application startup completed")
+        
+        readiness.run_in_background("db_indexes", ensure_indexes)
+        readiness.run_in_background("vrf", warm_up_vrf)
+        readiness.run_in_background("bot_roster", bot_roster.reload)
+        mint_queue.start()
+        if settings.VICTORY_NFT_INDEXER_ENABLED:
+            victory_nft_indexer.start()
+        api_logger.info("Application startup completed, warm-ups running in background")
     except Exception as e:
         api_logger.error(f"Failed to initialize: {str(e)}")
         raise
     yield
     # Shutdown
+    await readiness.cancel()
+    await mint_queue.stop()
+    await victory_nft_indexer.stop()
+    if vrf_initializer.vrf_instance:
+        await vrf_initializer.vrf_instance.batch_manager.stop()
+    await chain_providers.close()
     try:
         api_logger.info("Closing database connection...")
         await close_db()
@@ -157,6 +174,7 @@ app.include_router(victory_nft_router, prefix="/api", tags=["victory_nft"])
 
 # Include VRF status routes
 app.include_router(vrf_status_router, prefix="/api", tags=["vrf"])
+app.include_router(tournament_router, prefix="/api", tags=["tournament"])
 
 @app.middleware("http")
 async def metrics_middleware(request: Request, call_next):
@@ -216,13 +234,16 @@ async def health_check():
         "vrf_system": vrf_health
     }
 
-@app.on_event("startup")
-async def startup_event():
-    await init_db()
+@app.get("/health/live")
+async def health_live():
+    """Process còn sống (không kiểm tra dependency)"""
+    return {"status": "alive"}
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    await close_db()
+@app.get("/health/ready")
+async def health_ready():
+    """Ready khi critical path (DB) đã xong, kèm tiến độ các warm-up"""
+    status = readiness.get_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
 
 if __name__ == "__main__":
     import uvicorn
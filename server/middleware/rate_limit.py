@@ -20,6 +20,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             "/openapi.json",
             "/metrics",
             "/health",
+            "/health/live",
+            "/health/ready",
             "/api/ws",
             "/api/chat/history",
             "/api/skills/type/kicker",
@@ -28,7 +28,8 @@ class VIPInviteCode:
         expires_at: datetime = None,
         is_used: bool = False,
         used_at: Optional[datetime] = None,
-        _id: ObjectId = None
+        _id: ObjectId = None,
+        entropy: Optional[dict] = None
     ):
         self._id = _id or ObjectId()
         self.code = code
@@ -36,6 +37,8 @@ class VIPInviteCode:
         self.expires_at = expires_at or (self.created_at + timedelta(days=30))
         self.is_used = is_used
         self.used_at = used_at
+        # Provenance của random word sinh ra code (seed, source, derivation index)
+        self.entropy = entropy
 
     def to_dict(self):
         return {
@@ -44,7 +47,8 @@ class VIPInviteCode:
             "created_at": self.created_at,
             "expires_at": self.expires_at,
             "is_used": self.is_used,
-            "used_at": self.used_at
+            "used_at": self.used_at,
+            "entropy": self.entropy
         }
 
     @staticmethod
@@ -55,7 +59,8 @@ class VIPInviteCode:
             created_at=data["created_at"],
             expires_at=data["expires_at"],
             is_used=data["is_used"],
-            used_at=data.get("used_at")
+            used_at=data.get("used_at"),
+            entropy=data.get("entropy")
         )
 
     def is_valid(self) -> bool:
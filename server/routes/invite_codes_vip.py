@@ -246,13 +246,14 @@ async def generate_codes(request: Request, req: GenerateCodesRequest):
         
         # Sử dụng Chainlink VRF để tạo mã ngẫu nhiên
         prefix = "VIP-" if req.code_type.upper() == "VIP" else "PRO-"
-        random_codes = await chainlink_vrf.generate_random_code(prefix, req.count)
+        random_codes = await chainlink_vrf.generate_random_code_records(prefix, req.count)
         
         generated_codes = []
-        for code in random_codes:
+        for code, entropy in random_codes:
             invite_code = VIPInviteCode(
                 code=code,
-                expires_at=req.expires_at
+                expires_at=req.expires_at,
+                entropy=entropy
             )
             
             await codes_collection.insert_one(invite_code.to_dict())
@@ -1,7 +1,7 @@
 import os
-import time
+import asyncio
 import logging
-import requests
+import httpx
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
@@ -36,8 +36,12 @@ class NFTResponse(BaseModel):
     nfts: List[NFT]
 
 
+# Client keep-alive dùng chung, không chặn event loop
+_client = httpx.AsyncClient(timeout=30.0)
+
+
 # --- Fetch function ---
-def fetch_nfts(address: str, max_nfts: int = 300) -> dict:
+async def fetch_nfts(address: str, max_nfts: int = 300) -> dict:
     url = f"https://deep-index.moralis.io/api/v2/{address}/nft?chain=eth&format=decimal&limit=100"
     headers = {"X-API-Key": MORALIS_API_KEY}
     all_nfts = []
@@ -48,7 +52,7 @@ def fetch_nfts(address: str, max_nfts: int = 300) -> dict:
         full_url = url + (f"&cursor={cursor}" if cursor else "")
         logger.info(f"🔄 Fetching page {page} for address {address}...")
 
-        response = requests.get(full_url, headers=headers)
+        response = await _client.get(full_url, headers=headers)
         if response.status_code != 200:
             logger.error(f"❌ API Error {response.status_code}: {response.text}")
             raise HTTPException(status_code=response.status_code, detail=response.text)
@@ -64,7 +68,7 @@ def fetch_nfts(address: str, max_nfts: int = 300) -> dict:
         if data.get("cursor"):
             cursor = data["cursor"]
             page += 1
-            time.sleep(0.2)  # avoid rate limit
+            await asyncio.sleep(0.2)  # avoid rate limit
         else:
             break
 
@@ -81,4 +85,4 @@ async def get_nfts(
     address: str = Query(..., description="Wallet address to fetch NFTs for"),
     max_nfts: int = Query(300, gt=0, le=1000, description="Maximum number of NFTs to fetch (1–1000)")
 ):
-    return fetch_nfts(address, max_nfts)
+    return await fetch_nfts(address, max_nfts)
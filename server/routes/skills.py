@@ -4,6 +4,7 @@ from models.skill import Skill, SkillCreate, SkillUpdate, SkillType
 from database.database import get_skills_collection, get_database
 from bson import ObjectId
 from utils.logger import api_logger
+from services.bot_roster import bot_roster
 import traceback
 import random
 from datetime import datetime
@@ -16,6 +17,7 @@ async def create_skill(skill: SkillCreate):
         skills_collection = await get_skills_collection()
         skill_dict = skill.model_dump(by_alias=True)
         result = await skills_collection.insert_one(skill_dict)
+        bot_roster.invalidate()
         created_skill = await skills_collection.find_one({"_id": result.inserted_id})
         return Skill(**created_skill)
     except Exception as e:
@@ -121,6 +123,7 @@ async def update_skill(skill_id: str, skill: SkillUpdate):
         
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Skill not found")
+        bot_roster.invalidate()
         
         updated_skill = await skills_collection.find_one({"_id": ObjectId(skill_id)})
         return Skill(**updated_skill)
@@ -135,6 +138,7 @@ async def delete_skill(skill_id: str):
         result = await skills_collection.delete_one({"_id": ObjectId(skill_id)})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Skill not found")
+        bot_roster.invalidate()
         return {"message": "Skill deleted successfully"}
     except Exception as e:
         api_logger.error(f"Error deleting skill {skill_id}: {str(e)}")
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from typing import List
+from bson import ObjectId
+from database.database import get_database
+from routes.admin import require_admin
+from services.tournament import create_tournament, resolve_next_round
+from utils.logger import api_logger
+
+router = APIRouter()
+
+class TournamentCreate(BaseModel):
+    name: str
+    player_ids: List[str]
+
+def serialize_tournament(tournament: dict) -> dict:
+    tournament = dict(tournament)
+    tournament["id"] = str(tournament.pop("_id"))
+    return tournament
+
+@router.post("/tournaments", dependencies=[Depends(require_admin)])
+async def create_tournament_endpoint(data: TournamentCreate):
+    """Tạo tournament với bracket theo thứ tự player_ids"""
+    try:
+        tournament = await create_tournament(data.name, data.player_ids)
+        return {"success": True, "data": serialize_tournament(tournament)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        api_logger.error(f"Error creating tournament: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/tournaments/{tournament_id}/rounds", dependencies=[Depends(require_admin)])
+async def resolve_round_endpoint(tournament_id: str):
+    """Giải quyết vòng tiếp theo của tournament"""
+    try:
+        summary = await resolve_next_round(tournament_id)
+        return {"success": True, "data": summary}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        api_logger.error(f"Error resolving tournament round {tournament_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/tournaments/{tournament_id}")
+async def get_tournament(tournament_id: str):
+    """Thông tin tournament và các vòng đã đấu"""
+    if not ObjectId.is_valid(tournament_id):
+        raise HTTPException(status_code=400, detail="Invalid tournament ID")
+    db = await get_database()
+    tournament = await db.tournaments.find_one({"_id": ObjectId(tournament_id)})
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    return {"success": True, "data": serialize_tournament(tournament)}
+
+@router.get("/tournaments/{tournament_id}/matches")
+async def get_tournament_matches(tournament_id: str, round: int = None):
+    """Danh sách trận của tournament (lọc theo vòng nếu có)"""
+    db = await get_database()
+    query = {"tournament_id": tournament_id}
+    if round is not None:
+        query["round"] = round
+    matches = await db.tournament_matches.find(query).sort([("round", 1), ("_id", 1)]).to_list(length=None)
+    return {"success": True, "data": matches}
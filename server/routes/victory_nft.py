@@ -9,9 +9,12 @@ from routes.users import get_current_user
 from models.user import User
 import logging
 from utils.time_utils import get_vietnam_time
-import asyncio
-from services.ccip_service import ccip_service
-from config import settings
+from services.ccip_service import CCIP_CONFIG, ccip_service
+from services.chain_providers import AVALANCHE_FUJI_CHAIN_ID
+from services.mint_ledger import LEDGER_CONFIRMED, mint_ledger
+from services.mint_queue import MINT_KIND_DIRECT, JOB_STATUSES, mint_queue, serialize_job
+from services.victory_nft_indexer import victory_nft_indexer
+from services.victory_nft_stats import build_victory_mint, victory_nft_stats
 
 logger = logging.getLogger(__name__)
 
@@ -135,44 +138,15 @@ async def get_victory_nft_history(current_user: User = Depends(get_current_user)
 
 @router.get("/stats")
 async def get_victory_nft_stats():
-    """Get global Victory NFT statistics"""
+    """Get global Victory NFT statistics (tính sẵn sau mỗi mint)"""
     try:
-        db = await get_database()
-        
-        # Get total Victory NFTs minted
-        total_minted = await db.victory_nfts.count_documents({})
-        
-        # Get unique players who have minted
-        unique_players = await db.victory_nfts.distinct("player_address")
-        
-        # Get recent mints (last 24 hours)
-        from datetime import datetime, timedelta
-        from utils.time_utils import get_vietnam_time
-        
-        yesterday = get_vietnam_time() - timedelta(days=1)
-        recent_mints = await db.victory_nfts.count_documents({
-            "minted_at": {"$gte": yesterday.isoformat()}
-        })
-        
-        # Get top milestones
-        pipeline = [
-            {"$group": {"_id": "$milestone", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 10}
-        ]
-        top_milestones = await db.victory_nfts.aggregate(pipeline).to_list(length=10)
-        
+        stats = await victory_nft_stats.get()
         return {
-            "total_minted": total_minted,
-            "unique_players": len(unique_players),
-            "recent_mints_24h": recent_mints,
-            "top_milestones": [
-                {
-                    "milestone": item["_id"],
-                    "count": item["count"]
-                }
-                for item in top_milestones
-            ]
+            "total_minted": stats["total_minted"],
+            "unique_players": stats["unique_players"],
+            "recent_mints_24h": stats["recent_mints_24h"],
+            "top_milestones": stats["top_milestones"],
+            "refreshed_at": stats["refreshed_at"].isoformat()
         }
         
     except Exception as e:
@@ -181,46 +155,10 @@ async def get_victory_nft_stats():
 
 @router.get("/leaderboard")
 async def get_victory_nft_leaderboard():
-    """Get Victory NFT leaderboard (players with most NFTs)"""
+    """Get Victory NFT leaderboard (players with most NFTs, tính sẵn sau mỗi mint)"""
     try:
-        db = await get_database()
-        
-        # Aggregate players by number of Victory NFTs
-        pipeline = [
-            {"$group": {
-                "_id": "$player_address", 
-                "nft_count": {"$sum": 1},
-                "total_wins": {"$max": "$total_wins"},
-                "last_mint": {"$max": "$minted_at"}
-            }},
-            {"$sort": {"nft_count": -1, "total_wins": -1}},
-            {"$limit": 20}
-        ]
-        
-        leaderboard = await db.victory_nfts.aggregate(pipeline).to_list(length=20)
-        
-        # Get user details for each player
-        result = []
-        for item in leaderboard:
-            player_address = item["_id"]
-            
-            # Find user by wallet address
-            user = await db.users.find_one({
-                "$or": [
-                    {"wallet": player_address},
-                    {"evm_address": player_address}
-                ]
-            })
-            
-            result.append({
-                "player_address": player_address,
-                "player_name": user.get("name", "Anonymous") if user else "Unknown",
-                "nft_count": item["nft_count"],
-                "total_wins": item["total_wins"],
-                "last_mint": item["last_mint"]
-            })
-        
-        return {"leaderboard": result}
+        stats = await victory_nft_stats.get()
+        return {"leaderboard": stats["leaderboard"]}
         
     except Exception as e:
         api_logger.error(f"Error getting Victory NFT leaderboard: {str(e)}")
@@ -249,14 +187,25 @@ async def mint_victory_nft(
                 destination_chain="Avalanche Fuji"
             )
         else:
-            # Use real CCIP minting
-            result = await ccip_service.mint_victory_nft(
-                player_address=request.player_address,
-                total_wins=request.total_wins,
-                player_name=current_user.username,
+            # Mint thật chạy trong mint queue (retry, idempotent theo player + milestone + chain đích)
+            if request.total_wins % 10 != 0 or request.total_wins == 0:
+                return {
+                    "success": False,
+                    "error": f"Victory NFT can only be minted every 10 wins. Current wins: {request.total_wins}"
+                }
+            job, created = await mint_queue.enqueue(
+                request.player_address,
+                request.total_wins,
+                current_user.get("name", "Anonymous Player"),
+                str(current_user["_id"]),
                 source_chain_id=request.source_chain_id,
                 destination_chain_id=request.destination_chain_id
             )
+            return {
+                "success": True,
+                "message": "Victory NFT mint queued" if created else "Victory NFT mint already queued for this milestone",
+                "data": serialize_job(job)
+            }
         
         if result["success"]:
             return {
@@ -289,6 +238,24 @@ async def get_player_tokens(player_address: str):
         logger.error(f"Error getting player tokens: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/player/{player_address}/owned", response_model=List[int])
+async def get_player_owned_tokens(player_address: str):
+    """
+    Get token IDs currently owned by a player (from the event index)
+    """
+    if not victory_nft_indexer.serving:
+        raise HTTPException(status_code=503, detail="Victory NFT index is still syncing")
+    try:
+        return await victory_nft_indexer.get_owned_tokens(player_address)
+    except Exception as e:
+        logger.error(f"Error getting owned tokens: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/indexer/status")
+async def get_indexer_status():
+    """Trạng thái index event Victory NFT"""
+    return {"success": True, "data": victory_nft_indexer.get_status()}
+
 @router.get("/token/{token_id}", response_model=NFTInfo)
 async def get_token_info(token_id: int):
     """
@@ -380,13 +347,14 @@ async def get_players_with_milestone(milestone: int):
     """
     Get all players who have NFT for a specific milestone
     """
+    if not victory_nft_indexer.serving:
+        raise HTTPException(status_code=503, detail="Victory NFT index is still syncing")
     try:
-        # This would require additional contract function or database query
-        # For now, return empty list
+        players = await victory_nft_indexer.get_milestone_players(milestone)
         return {
             "milestone": milestone,
-            "players": [],
-            "count": 0
+            "players": players,
+            "count": len(players)
         }
     except Exception as e:
         logger.error(f"Error getting players with milestone: {str(e)}")
@@ -415,17 +383,11 @@ async def auto_mint_victory_nft(player_address: str, total_wins: int):
                 ]
             }
             
-            # Mint NFT
-            result = await victory_nft_service.mint_victory_nft(
-                player_address,
-                total_wins,
-                metadata
+            # Mint NFT qua mint queue
+            job, _ = await mint_queue.enqueue(
+                player_address, total_wins, kind=MINT_KIND_DIRECT, metadata=metadata
             )
-            
-            if result["success"]:
-                logger.info(f"Auto-minted Victory NFT: Token ID {result['token_id']} for player {player_address}")
-            else:
-                logger.error(f"Auto-mint failed: {result['error']}")
+            logger.info(f"Auto-mint queued: job {job['_id']} for player {player_address}")
                 
     except Exception as e:
         logger.error(f"Error in auto_mint_victory_nft: {str(e)}")
@@ -472,13 +434,11 @@ async def trigger_victory_nft_mint(user_id: str, current_user: User = Depends(ge
                 "eligible_milestones": []
             }
         
-        # Mint NFTs for all eligible milestones
-        minted_nfts = []
+        # Đưa mọi milestone đủ điều kiện vào mint queue (idempotent theo player + milestone + chain đích)
+        queued_jobs = []
         for milestone in eligible_milestones:
             milestone_wins = milestone * 10
             
-            logger.info(f"Attempting to mint NFT for milestone {milestone} ({milestone_wins} wins) for player {player_address}")
-            
             # Create metadata
             metadata = {
                 "name": f"Victory NFT #{milestone}",
@@ -493,48 +453,29 @@ async def trigger_victory_nft_mint(user_id: str, current_user: User = Depends(ge
                 ]
             }
             
-            # Mint NFT
-            result = await victory_nft_service.mint_victory_nft(player_address, milestone_wins, metadata)
-            
-            logger.info(f"Mint result for milestone {milestone}: {result}")
-            
-            if result["success"]:
-                minted_nfts.append({
-                    "milestone": milestone,
-                    "wins": milestone_wins,
-                    "token_id": result["token_id"],
-                    "transaction_hash": result["transaction_hash"]
-                })
-                
-                # Log to database
-                victory_mint = {
-                    "player_address": player_address,
-                    "total_wins": milestone_wins,
-                    "milestone": milestone,
-                    "message_id": result["transaction_hash"],
-                    "destination_chain": "Avalanche Fuji",
-                    "contract_address": victory_nft_service.contract_address,
-                    "minted_at": get_vietnam_time().isoformat(),
-                    "status": "minted"
-                }
-                await db.victory_nfts.insert_one(victory_mint)
-                
-                logger.info(f"Manually minted Victory NFT: Token ID {result['token_id']} for player {player_address} at milestone {milestone}")
-            else:
-                logger.error(f"Failed to mint Victory NFT for milestone {milestone}: {result.get('error', 'Unknown error')}")
-                # Add error to response
-                minted_nfts.append({
-                    "milestone": milestone,
-                    "wins": milestone_wins,
-                    "error": result.get('error', 'Unknown error')
-                })
+            job, created = await mint_queue.enqueue(
+                player_address,
+                milestone_wins,
+                user.get('name', 'Anonymous'),
+                user_id,
+                kind=MINT_KIND_DIRECT,
+                metadata=metadata
+            )
+            logger.info(f"Mint job {job['_id']} for milestone {milestone} of player {player_address} ({'queued' if created else 'existing'})")
+            queued_jobs.append({
+                "milestone": milestone,
+                "wins": milestone_wins,
+                "job_id": str(job["_id"]),
+                "status": job["status"],
+                "created": created
+            })
         
         return {
             "success": True,
-            "message": f"Minted {len(minted_nfts)} Victory NFTs",
+            "message": f"Queued {len(queued_jobs)} Victory NFT mints",
             "total_wins": total_wins,
             "eligible_milestones": eligible_milestones,
-            "minted_nfts": minted_nfts
+            "queued_jobs": queued_jobs
         }
         
     except Exception as e:
@@ -593,9 +534,8 @@ async def test_auto_mint(user_id: str, current_user: User = Depends(get_current_
                 "next_milestone": next_milestone_wins
             }
         
-        # Trigger automatic minting
-        from ws_handlers.challenge_handler import challenge_manager
-        await challenge_manager._mint_victory_nft_async(
+        # Trigger automatic minting (qua mint queue)
+        job, _ = await mint_queue.enqueue(
             player_address, 
             next_milestone_wins, 
             user.get('name', 'Anonymous'), 
@@ -605,6 +545,7 @@ async def test_auto_mint(user_id: str, current_user: User = Depends(get_current_
         return {
             "success": True,
             "message": f"Triggered automatic minting for milestone {next_milestone}",
+            "job_id": str(job["_id"]),
             "current_wins": current_wins,
             "next_milestone": next_milestone_wins,
             "player_address": player_address
@@ -624,8 +565,8 @@ async def test_victory_nft_service():
             "rpc_url": victory_nft_service.w3.provider.endpoint_uri,
             "deployer_address": victory_nft_service.deployer_address,
             "has_private_key": bool(victory_nft_service.private_key),
-            "network_id": victory_nft_service.w3.eth.chain_id,
-            "latest_block": victory_nft_service.w3.eth.block_number
+            "network_id": await victory_nft_service.w3.eth.chain_id,
+            "latest_block": await victory_nft_service.w3.eth.block_number
         }
         
         # Test contract connection
@@ -658,16 +599,15 @@ async def add_minted_nft_to_db(current_user: User = Depends(get_current_user)):
             raise HTTPException(status_code=400, detail="User has no wallet address")
         
         # Add the already minted NFT (Token ID 9, milestone 4, 40 wins)
-        victory_mint = {
-            "player_address": player_address,
-            "total_wins": 40,
-            "milestone": 4,
-            "message_id": "0x59750241d21753ce04ffc1af4057dedbb448f36a887c94270a3a72172f6e8633",
-            "destination_chain": "Avalanche Fuji",
-            "contract_address": victory_nft_service.contract_address,
-            "minted_at": get_vietnam_time().isoformat(),
-            "status": "minted"
-        }
+        victory_mint = build_victory_mint(
+            player_address,
+            40,
+            "0x59750241d21753ce04ffc1af4057dedbb448f36a887c94270a3a72172f6e8633",
+            "Avalanche Fuji",
+            victory_nft_service.contract_address,
+            player_name,
+            user_id
+        )
         
         # Check if already exists
         existing = await db.victory_nfts.find_one({
@@ -681,7 +621,7 @@ async def add_minted_nft_to_db(current_user: User = Depends(get_current_user)):
                 "message": "NFT for milestone 4 already exists in database"
             }
         
-        await db.victory_nfts.insert_one(victory_mint)
+        await victory_nft_stats.log_mint(victory_mint)
         
         return {
             "success": True,
@@ -750,16 +690,9 @@ async def simulate_win_match(user_id: str, current_user: User = Depends(get_curr
                 result["milestone_wins"] = milestone_wins
                 result["message"] += f" - Reached milestone {new_milestone} ({milestone_wins} wins)"
                 
-                # Trigger automatic minting
-                from ws_handlers.challenge_handler import challenge_manager
-                asyncio.create_task(
-                    challenge_manager._mint_victory_nft_async(
-                        player_address, 
-                        milestone_wins, 
-                        player_name, 
-                        user_id
-                    )
-                )
+                # Trigger automatic minting (qua mint queue)
+                job, _ = await mint_queue.enqueue(player_address, milestone_wins, player_name, user_id)
+                result["job_id"] = str(job["_id"])
             else:
                 result["error"] = "No wallet address found"
         
@@ -803,37 +736,35 @@ async def test_cross_chain_mint(
         
         player_name = user.get("name", "Anonymous Player")
         
-        # Mint Victory NFT cross-chain
-        result = await ccip_service.mint_victory_nft(
+        # Mint Victory NFT cross-chain (qua mint queue)
+        job, created = await mint_queue.enqueue(
             player_address,
             total_wins,
             player_name,
-            source_chain_id,
-            destination_chain_id
+            user_id,
+            source_chain_id=source_chain_id,
+            destination_chain_id=destination_chain_id
         )
         
-        if result["success"]:
-            # Update user's wins to milestone for testing
-            if total_wins > (user.get("kicked_win", 0) + user.get("keep_win", 0)):
-                await db.users.update_one(
-                    {"_id": ObjectId(user_id)},
-                    {"$set": {"kicked_win": total_wins}}
-                )
-            
-            return {
-                "success": True,
-                "message": f"Cross-chain Victory NFT minted successfully!",
-                "user_id": user_id,
-                "player_name": player_name,
-                "total_wins": total_wins,
-                "milestone": result["milestone"],
-                "source_chain": result["source_chain"],
-                "destination_chain": result["destination_chain"],
-                "message_id": result["message_id"],
-                "destination_contract": result["destination_contract"]
-            }
-        else:
-            raise HTTPException(status_code=500, detail=f"Minting failed: {result.get('error', 'Unknown error')}")
+        # Update user's wins to milestone for testing
+        if total_wins > (user.get("kicked_win", 0) + user.get("keep_win", 0)):
+            await db.users.update_one(
+                {"_id": ObjectId(user_id)},
+                {"$set": {"kicked_win": total_wins}}
+            )
+        
+        return {
+            "success": True,
+            "message": "Cross-chain Victory NFT mint queued" if created else "Cross-chain Victory NFT mint already queued",
+            "user_id": user_id,
+            "player_name": player_name,
+            "total_wins": total_wins,
+            "milestone": job["milestone"],
+            "source_chain": CCIP_CONFIG[job["source_chain_id"]]["name"] if job["source_chain_id"] in CCIP_CONFIG else None,
+            "destination_chain": CCIP_CONFIG[job["destination_chain_id"]]["name"] if job["destination_chain_id"] in CCIP_CONFIG else None,
+            "job_id": str(job["_id"]),
+            "status": job["status"]
+        }
             
     except Exception as e:
         api_logger.error(f"Error in test cross-chain mint: {str(e)}")
@@ -888,40 +819,39 @@ async def mint_cross_chain_nft(
         
         # Check if already minted for this milestone
         milestone = total_wins // 10
-        existing_nft = await db.victory_nfts.find_one({
-            "player_address": player_address,
-            "milestone": milestone
-        })
+        ledger_entry = await mint_ledger.get_entry(player_address, milestone, destination_chain_id)
         
-        if existing_nft:
+        if ledger_entry and ledger_entry["status"] == LEDGER_CONFIRMED:
             raise HTTPException(status_code=400, detail=f"Victory NFT for milestone {milestone} already minted")
         
         player_name = user.get("name", "Anonymous Player")
         
-        # Mint Victory NFT cross-chain
-        result = await ccip_service.mint_victory_nft(
+        if source_chain_id not in CCIP_CONFIG or destination_chain_id not in CCIP_CONFIG:
+            raise HTTPException(status_code=400, detail=f"Invalid chain ID. Supported: {list(CCIP_CONFIG.keys())}")
+        
+        # Mint Victory NFT cross-chain (qua mint queue, theo dõi bằng /victory_nft/jobs/{job_id})
+        job, created = await mint_queue.enqueue(
             player_address,
             total_wins,
             player_name,
-            source_chain_id,
-            destination_chain_id
+            str(user["_id"]),
+            source_chain_id=source_chain_id,
+            destination_chain_id=destination_chain_id
         )
         
-        if result["success"]:
-            return {
-                "success": True,
-                "message": f"Cross-chain Victory NFT minted successfully!",
-                "user_id": str(user["_id"]),
-                "player_name": player_name,
-                "total_wins": total_wins,
-                "milestone": result["milestone"],
-                "source_chain": result["source_chain"],
-                "destination_chain": result["destination_chain"],
-                "message_id": result["message_id"],
-                "destination_contract": result["destination_contract"]
-            }
-        else:
-            raise HTTPException(status_code=500, detail=f"Minting failed: {result.get('error', 'Unknown error')}")
+        return {
+            "success": True,
+            "message": "Cross-chain Victory NFT mint queued" if created else "Cross-chain Victory NFT mint already queued",
+            "user_id": str(user["_id"]),
+            "player_name": player_name,
+            "total_wins": total_wins,
+            "milestone": milestone,
+            "source_chain": CCIP_CONFIG[job["source_chain_id"]]["name"],
+            "destination_chain": CCIP_CONFIG[job["destination_chain_id"]]["name"],
+            "destination_contract": CCIP_CONFIG[job["destination_chain_id"]]["nft_contract"],
+            "job_id": str(job["_id"]),
+            "status": job["status"]
+        }
             
     except Exception as e:
         api_logger.error(f"Error in mint cross-chain: {str(e)}")
@@ -1007,12 +937,9 @@ async def mint_direct_nft(
         
         # Check if already minted for this milestone
         milestone = total_wins // 10
-        existing_nft = await db.victory_nfts.find_one({
-            "player_address": player_address,
-            "milestone": milestone
-        })
+        ledger_entry = await mint_ledger.get_entry(player_address, milestone, AVALANCHE_FUJI_CHAIN_ID)
         
-        if existing_nft:
+        if ledger_entry and ledger_entry["status"] == LEDGER_CONFIRMED:
             raise HTTPException(status_code=400, detail=f"Victory NFT for milestone {milestone} already minted")
         
         player_name = user.get("name", "Anonymous Player")
@@ -1031,42 +958,90 @@ async def mint_direct_nft(
             ]
         }
         
-        # Use VictoryNFTService for direct minting
-        from services.victory_nft_service import victory_nft_service
-        
-        result = await victory_nft_service.mint_victory_nft(
+        # Mint trực tiếp qua VictoryNFTService, chạy trong mint queue
+        job, created = await mint_queue.enqueue(
             player_address,
             total_wins,
-            metadata
+            player_name,
+            str(user["_id"]),
+            kind=MINT_KIND_DIRECT,
+            metadata=metadata
         )
         
-        if result["success"]:
-            # Log the mint
-            await db.victory_nfts.insert_one({
-                "player_address": player_address,
-                "total_wins": total_wins,
-                "milestone": milestone,
-                "transaction_hash": result["transaction_hash"],
-                "destination_chain": "Base Sepolia",
-                "contract_address": settings.BASE_SEPOLIA_NFT_CONTRACT,
-                "minted_at": get_vietnam_time().isoformat(),
-                "status": "minted"
-            })
-            
-            return {
-                "success": True,
-                "message": f"Victory NFT minted successfully on Base Sepolia!",
-                "user_id": str(user["_id"]),
-                "player_name": player_name,
-                "total_wins": total_wins,
-                "milestone": milestone,
-                "transaction_hash": result["transaction_hash"],
-                "destination_chain": "Base Sepolia",
-                "destination_contract": settings.BASE_SEPOLIA_NFT_CONTRACT
-            }
-        else:
-            raise HTTPException(status_code=500, detail=f"Minting failed: {result.get('error', 'Unknown error')}")
+        return {
+            "success": True,
+            "message": "Victory NFT mint queued" if created else "Victory NFT mint already queued for this milestone",
+            "user_id": str(user["_id"]),
+            "player_name": player_name,
+            "total_wins": total_wins,
+            "milestone": milestone,
+            "job_id": str(job["_id"]),
+            "status": job["status"]
+        }
             
     except Exception as e:
         api_logger.error(f"Error in direct mint: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}") 
+
+
+# --- Mint queue ---
+
+@router.get("/jobs/stats")
+async def get_mint_queue_stats():
+    """Số job mint theo trạng thái"""
+    try:
+        return {"success": True, "data": await mint_queue.get_stats()}
+    except Exception as e:
+        api_logger.error(f"Error getting mint queue stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/jobs")
+async def list_mint_jobs(
+    status: str = None,
+    player_address: str = None,
+    limit: int = 50,
+    current_user: User = Depends(get_current_user)
+):
+    """Danh sách job mint (user thường chỉ thấy job của ví mình)"""
+    if status and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Supported: {list(JOB_STATUSES)}")
+    if current_user.get("role") != "admin":
+        player_address = current_user.get("wallet") or current_user.get("evm_address")
+        if not player_address:
+            return {"success": True, "jobs": []}
+    jobs = await mint_queue.list_jobs(player_address, status, min(max(limit, 1), 200))
+    return {"success": True, "jobs": [serialize_job(job) for job in jobs]}
+
+@router.get("/jobs/{job_id}")
+async def get_mint_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Trạng thái một job mint"""
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+    job = await mint_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Mint job not found")
+    if current_user.get("role") != "admin" and job.get("user_id") != str(current_user["_id"]):
+        raise HTTPException(status_code=403, detail="Not allowed to view this job")
+    return {"success": True, "job": serialize_job(job)}
+
+@router.post("/jobs/{job_id}/retry")
+async def retry_mint_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Đưa job trong dead letter trở lại hàng đợi (admin)"""
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+    job = await mint_queue.retry_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Dead mint job not found")
+    return {"success": True, "job": serialize_job(job)}
+
+@router.get("/ledger/{player_address}")
+async def get_player_mint_ledger(player_address: str):
+    """Các milestone của player trong sổ mint (pending / submitted / confirmed theo chain)"""
+    try:
+        entries = await mint_ledger.get_player_entries(player_address)
+        return {"success": True, "entries": [serialize_job(entry) for entry in entries]}
+    except Exception as e:
+        api_logger.error(f"Error getting mint ledger for {player_address}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
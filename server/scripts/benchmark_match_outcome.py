@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark cân bằng game và hiệu suất cho mô hình kết quả trận đấu
+
+Chạy offline (không cần MongoDB / VRF):
+- Kiểm tra bản vector (match_simulator) cho kết quả giống hệt bản scalar (match_outcome)
+- Đo throughput mô phỏng (trận/giây)
+- Xuất ma trận tỉ lệ thắng theo level / số skill đã mua
+- So sánh với baseline đã lưu để phát hiện thay đổi cân bằng
+
+Ví dụ:
+    python scripts/benchmark_match_outcome.py --matches-per-pair 50000
+    python scripts/benchmark_match_outcome.py --skills skills.json --save-baseline baseline.json
+    python scripts/benchmark_match_outcome.py --baseline baseline.json --tolerance 0.01
+"""
+
+import argparse
+import json
+import random
+import sys
+import os
+import time
+
+# Thêm đường dẫn để import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.match_outcome import pick_skill, resolve_kick, resolve_save, KICKER
+from services.match_simulator import (
+    SkillCatalog, pad_pools, simulate_kicks, simulate_win_rate_matrix,
+    simulate_bot_saves, build_level_profile
+)
+
+
+def synthetic_skills(n_kicker: int, n_goalkeeper: int, seed: int):
+    """Bộ skill giả lập: mỗi skill kicker có counter là một skill goalkeeper ngẫu nhiên"""
+    rng = random.Random(seed)
+    goalkeepers = [f"gk_{i}" for i in range(n_goalkeeper)]
+    skills = [{"name": name, "type": "goalkeeper"} for name in goalkeepers]
+    skills += [
+        {"name": f"kick_{i}", "type": "kicker", "counter": rng.choice(goalkeepers)}
+        for i in range(n_kicker)
+    ]
+    return skills
+
+
+def check_parity(catalog: SkillCatalog, profiles, n: int, seed: int) -> int:
+    """So khớp bản vector với bản scalar trên cùng các giá trị random"""
+    rng = np.random.default_rng(seed)
+    kicker_pools, kicker_lengths = pad_pools(
+        [[catalog.kicker_index(s) for s in p["kicker_skills"]] for p in profiles]
+    )
+    goalkeeper_pools, goalkeeper_lengths = pad_pools(
+        [[catalog.goalkeeper_index(s) for s in p["goalkeeper_skills"]] for p in profiles]
+    )
+    counter_of = catalog.counter_table()
+    counters = {
+        name: (catalog.goalkeeper_names[c] if c >= 0 else None)
+        for name, c in zip(catalog.kicker_names, counter_of)
+    }
+
+    kicker_ids = rng.integers(0, len(profiles), n)
+    goalkeeper_ids = rng.integers(0, len(profiles), n)
+    kicker_rolls = rng.integers(0, 2**32, n)
+    goalkeeper_rolls = rng.integers(0, 2**32, n)
+
+    vector = simulate_kicks(
+        kicker_pools, kicker_lengths, goalkeeper_pools, goalkeeper_lengths,
+        kicker_ids, goalkeeper_ids, counter_of,
+        kicker_rolls=kicker_rolls, goalkeeper_rolls=goalkeeper_rolls
+    )
+
+    mismatches = 0
+    for i in range(n):
+        kicker_skill = pick_skill(profiles[kicker_ids[i]]["kicker_skills"], int(kicker_rolls[i]))
+        goalkeeper_skill = pick_skill(profiles[goalkeeper_ids[i]]["goalkeeper_skills"], int(goalkeeper_rolls[i]))
+        scalar = resolve_kick(counters.get(kicker_skill), goalkeeper_skill) == KICKER
+        if scalar != bool(vector[i]):
+            mismatches += 1
+
+    quotas = rng.random(n) * 6
+    rolls = rng.random(n)
+    vector_saves = simulate_bot_saves(quotas, rolls=rolls)
+    for i in range(n):
+        if resolve_save(float(quotas[i]), float(rolls[i])) != bool(vector_saves[i]):
+            mismatches += 1
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match outcome balance & performance benchmark")
+    parser.add_argument("--skills", help="File JSON export của collection skills (mặc định: bộ skill giả lập)")
+    parser.add_argument("--levels", default="1,5,10,25,50,100", help="Danh sách level, cách nhau bởi dấu phẩy")
+    parser.add_argument("--bought", default="0,3,9", help="Số skill đã mua thêm mỗi loại")
+    parser.add_argument("--matches-per-pair", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--parity-samples", type=int, default=20000)
+    parser.add_argument("--output", help="Ghi kết quả (ma trận + thống kê) ra file JSON")
+    parser.add_argument("--save-baseline", help="Lưu ma trận làm baseline")
+    parser.add_argument("--baseline", help="So sánh với baseline đã lưu")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Sai lệch tối đa cho phép so với baseline")
+    args = parser.parse_args()
+
+    if args.skills:
+        with open(args.skills) as f:
+            skills = json.load(f)
+    else:
+        skills = synthetic_skills(20, 20, args.seed)
+
+    catalog = SkillCatalog(skills)
+    rng = np.random.default_rng(args.seed)
+    levels = [int(x) for x in args.levels.split(",")]
+    bought = [int(x) for x in args.bought.split(",")]
+    profiles = [build_level_profile(catalog, lvl, b, rng) for lvl in levels for b in bought]
+    labels = [f"L{p['level']}/+{p['bought_skills']}" for p in profiles]
+
+    print("🔬 Match Outcome Benchmark")
+    print("=" * 50)
+
+    mismatches = check_parity(catalog, profiles, args.parity_samples, args.seed)
+    print(f"Parity scalar vs vector: {args.parity_samples * 2} samples, {mismatches} mismatches")
+    if mismatches:
+        print("❌ Vectorized model diverged from match_outcome")
+        sys.exit(1)
+
+    start_time = time.time()
+    matrix = simulate_win_rate_matrix(catalog, profiles, args.matches_per_pair, rng)
+    elapsed = time.time() - start_time
+    total_matches = len(profiles) ** 2 * args.matches_per_pair
+    print(f"Simulated {total_matches:,} matches in {elapsed:.2f}s ({total_matches / elapsed:,.0f} matches/s)")
+
+    save_start = time.time()
+    quotas = rng.random(5_000_000) * 6
+    save_rate = simulate_bot_saves(quotas, rng).mean()
+    save_elapsed = time.time() - save_start
+    print(f"Simulated 5,000,000 bot saves in {save_elapsed:.2f}s (save rate {save_rate:.3f})")
+    print()
+
+    print("📊 Win rate (row vs column):")
+    print(" " * 10 + "".join(f"{label:>10}" for label in labels))
+    for label, row in zip(labels, matrix):
+        print(f"{label:>10}" + "".join(f"{v:>10.3f}" for v in row))
+
+    result = {
+        "labels": labels,
+        "matrix": matrix.round(6).tolist(),
+        "matches_per_pair": args.matches_per_pair,
+        "matches_per_second": total_matches / elapsed,
+        "seed": args.seed
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"labels": labels, "matrix": result["matrix"]}, f, indent=2)
+        print(f"💾 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["labels"] != labels:
+            print("❌ Baseline was recorded with different profiles")
+            sys.exit(1)
+        drift = np.abs(np.array(baseline["matrix"]) - matrix).max()
+        print(f"\nMax drift vs baseline: {drift:.4f} (tolerance {args.tolerance})")
+        if drift > args.tolerance:
+            print("❌ Balance changed beyond tolerance")
+            sys.exit(1)
+        print("✅ Balance within tolerance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Benchmark throughput mint Victory NFT của backend trên hardhat node / anvil
+
+N milestone event đồng thời (player ngẫu nhiên, wins là bội số của 10) được đưa
+thẳng vào VictoryNFTService (mint trực tiếp, --batch-size > 1 để dùng
+batchMintVictoryNFT) và CCIPService (ccipSend qua MockCCIPRouter, cả hai chain
+CCIP đều là node local). Một relayer trong process đọc event MessageSent của
+router và gọi deliver() như DON của CCIP, NFT được mint ở VictoryNFTCCIP.
+
+In cho từng đường mint:
+- mints/s (wall time từ event đầu tiên tới mint cuối cùng)
+- p50 / p99 latency từ lúc gọi service tới khi có receipt (CCIP: thêm latency tới
+  khi message được deliver ở đích)
+- số RPC round trip mỗi mint (provider của chain_providers, không tính relayer)
+- thời gian event loop bị chặn (độ trễ của một task ngủ định kỳ)
+
+Chuẩn bị (victory-nft-deployment/):
+    anvil --block-time 2 --block-base-fee-per-gas 0
+    npm run deploy:mint-benchmark
+rồi export các MINT_BENCH_* mà script deploy in ra. Ví server và relayer mặc định
+là account #0 / #1 của hardhat node / anvil (MINT_BENCH_SERVER_KEY,
+MINT_BENCH_RELAYER_KEY để đổi). Bookkeeping MongoDB của CCIPService bị bỏ qua trừ
+khi có --with-db.
+
+Ví dụ:
+    python scripts/benchmark_mint_throughput.py
+    python scripts/benchmark_mint_throughput.py --path direct --mints 500 --batch-size 20
+    python scripts/benchmark_mint_throughput.py --path ccip --mints 200 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Thêm đường dẫn để import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Account #0 / #1 của mnemonic mặc định (hardhat node, anvil)
+HARDHAT_ACCOUNT_KEYS = [
+    "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80",
+    "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d",
+]
+
+RPC_URL = os.getenv("MINT_BENCH_RPC_URL", "http://127.0.0.1:8545")
+VICTORY_NFT = os.getenv("MINT_BENCH_VICTORY_NFT", "")
+CCIP_ROUTER = os.getenv("MINT_BENCH_CCIP_ROUTER", "")
+VICTORY_NFT_CCIP = os.getenv("MINT_BENCH_VICTORY_NFT_CCIP", "")
+SERVER_KEY = os.getenv("MINT_BENCH_SERVER_KEY", HARDHAT_ACCOUNT_KEYS[0])
+RELAYER_KEY = os.getenv("MINT_BENCH_RELAYER_KEY", HARDHAT_ACCOUNT_KEYS[1])
+
+# Settings được đọc lúc import: trỏ cả hai chain CCIP về node local trước khi import services
+os.environ.update({
+    "BASE_SEPOLIA_RPC_URL": RPC_URL,
+    "AVALANCHE_FUJI_RPC_URL": RPC_URL,
+    "BASE_SEPOLIA_RPC_FALLBACK_URLS": "",
+    "AVALANCHE_FUJI_RPC_FALLBACK_URLS": "",
+    "CCIP_PRIVATE_KEY": SERVER_KEY,
+    "PRIVATE_KEY": SERVER_KEY,
+    "AVALANCHE_FUJI_NFT_CONTRACT": VICTORY_NFT,
+    "VICTORY_NFT_INDEXER_ENABLED": "False",
+})
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import numpy as np
+from eth_account import Account
+from web3 import AsyncWeb3, Web3
+from web3.logs import DISCARD
+
+from services.ccip_service import CCIP_CONFIG, ccip_service
+from services.chain_providers import BASE_SEPOLIA_CHAIN_ID, AVALANCHE_FUJI_CHAIN_ID, PooledAsyncHTTPProvider, chain_providers
+from services.victory_nft_service import victory_nft_service
+from utils.receipt_tracker import get_receipt_tracker
+
+# Phần ABI của MockCCIPRouter mà relayer dùng (getFee / ccipSend nằm trong CCIP_ROUTER_ABI)
+MOCK_CCIP_ROUTER_ABI = [
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "internalType": "bytes32", "name": "messageId", "type": "bytes32"},
+            {"indexed": True, "internalType": "uint64", "name": "destinationChainSelector", "type": "uint64"},
+            {"indexed": False, "internalType": "uint256", "name": "index", "type": "uint256"},
+            {"indexed": False, "internalType": "address", "name": "sender", "type": "address"},
+            {"indexed": False, "internalType": "address", "name": "receiver", "type": "address"},
+            {"indexed": False, "internalType": "bytes", "name": "data", "type": "bytes"}
+        ],
+        "name": "MessageSent",
+        "type": "event"
+    },
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "internalType": "bytes32", "name": "messageId", "type": "bytes32"},
+            {"indexed": False, "internalType": "uint256", "name": "index", "type": "uint256"},
+            {"indexed": False, "internalType": "bool", "name": "success", "type": "bool"},
+            {"indexed": False, "internalType": "bytes", "name": "reason", "type": "bytes"}
+        ],
+        "name": "MessageDelivered",
+        "type": "event"
+    },
+    {
+        "inputs": [
+            {"internalType": "bytes32", "name": "messageId", "type": "bytes32"},
+            {"internalType": "uint256", "name": "index", "type": "uint256"},
+            {"internalType": "address", "name": "sender", "type": "address"},
+            {"internalType": "address", "name": "receiver", "type": "address"},
+            {"internalType": "bytes", "name": "data", "type": "bytes"}
+        ],
+        "name": "deliver",
+        "outputs": [{"internalType": "bool", "name": "success", "type": "bool"}],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    }
+]
+
+
+def _tx_key(tx_hash) -> str:
+    """Hash transaction dạng hex thường không có 0x (HexBytes.hex() và chuỗi đều so được)"""
+    value = tx_hash.hex() if isinstance(tx_hash, (bytes, bytearray)) else str(tx_hash)
+    return value.lower().removeprefix("0x")
+
+
+class LoopLagMonitor:
+    """Task ngủ `interval` giây liên tục, thức dậy trễ bao nhiêu là event loop bị chặn bấy nhiêu"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - started - self.interval, 0.0))
+
+    def start(self):
+        self.lags = []
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def summary(self) -> dict:
+        lags = np.array(self.lags or [0.0]) * 1000
+        return {"max_ms": lags.max(), "p99_ms": np.percentile(lags, 99), "blocked_ms": lags.sum()}
+
+
+class MockCCIPRelayer:
+    """Đọc MessageSent của MockCCIPRouter và gọi deliver() bằng ví riêng (provider riêng, không tính RPC)"""
+
+    def __init__(self, router_address: str, private_key: str, poll_interval: float):
+        self.w3 = AsyncWeb3(PooledAsyncHTTPProvider(RPC_URL))
+        self.router = self.w3.eth.contract(address=Web3.to_checksum_address(router_address), abi=MOCK_CCIP_ROUTER_ABI)
+        self.account = Account.from_key(private_key)
+        self.poll_interval = poll_interval
+        # hash transaction ccipSend -> (thời điểm deliver xong, NFT có được mint không)
+        self.delivered = {}
+        self._deliveries = set()
+        self._task = None
+
+    async def start(self):
+        self._from_block = await self.w3.eth.block_number
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                latest = await self.w3.eth.block_number
+                if latest >= self._from_block:
+                    logs = await self.router.events.MessageSent().get_logs(from_block=self._from_block, to_block=latest)
+                    self._from_block = latest + 1
+                    for log in logs:
+                        task = asyncio.ensure_future(self._deliver(log))
+                        self._deliveries.add(task)
+                        task.add_done_callback(self._deliveries.discard)
+            except Exception as e:
+                print(f"⚠️  Relayer poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _deliver(self, log):
+        args = log["args"]
+        key = _tx_key(log["transactionHash"])
+        try:
+            deliver_call = self.router.functions.deliver(
+                args["messageId"], args["index"], args["sender"], args["receiver"], args["data"]
+            )
+            gas = await deliver_call.estimate_gas({"from": self.account.address})
+            tracker = await get_receipt_tracker(self.w3, self.account)
+            tracked = await tracker.send(deliver_call, {"gas": int(gas * 1.2), "gasPrice": await self.w3.eth.gas_price})
+            receipt = await tracker.wait(tracked, timeout=300)
+            events = self.router.events.MessageDelivered().process_receipt(receipt, errors=DISCARD)
+            success = receipt["status"] == 1 and bool(events) and events[0]["args"]["success"]
+        except Exception as e:
+            print(f"⚠️  Deliver failed for {key}: {e}")
+            success = False
+        self.delivered[key] = (time.perf_counter(), success)
+
+    async def wait_for(self, tx_keys, timeout: float):
+        deadline = time.perf_counter() + timeout
+        while any(key not in self.delivered for key in tx_keys) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.1)
+
+    async def stop(self):
+        self._task.cancel()
+        for task in list(self._deliveries):
+            task.cancel()
+        await asyncio.gather(self._task, *self._deliveries, return_exceptions=True)
+        await self.w3.provider.disconnect()
+
+
+def rpc_requests() -> int:
+    """Tổng request của các provider trong chain_providers (pooled hoặc failover)"""
+    total = 0
+    for status in chain_providers.get_status().values():
+        if "endpoints" in status:
+            total += sum(endpoint["pool"]["requests"] for endpoint in status["endpoints"])
+        else:
+            total += status["requests"]
+    return total
+
+
+def milestone_events(count: int, rng: random.Random):
+    """(player_address, wins) ngẫu nhiên, mỗi player một milestone"""
+    return [
+        (Web3.to_checksum_address("0x" + rng.randbytes(20).hex()), 10 * rng.randint(1, 5))
+        for _ in range(count)
+    ]
+
+
+def mint_metadata(wins: int) -> dict:
+    return {
+        "name": f"Victory NFT - {wins} Wins",
+        "description": f"Player achieved {wins} victories in Kickin!",
+        "image": f"https://api.kickin.com/nft/victory/{wins}.png",
+        "attributes": [
+            {"trait_type": "Total Wins", "value": wins},
+            {"trait_type": "Milestone", "value": wins // 10},
+            {"trait_type": "Game", "value": "Kickin"}
+        ]
+    }
+
+
+async def run_direct(events, args):
+    """Latency (giây) của từng mint thành công, các mint lỗi và wall time"""
+    started_all = time.perf_counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], []
+
+    async def one(player, wins):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await victory_nft_service.mint_victory_nft(player, wins, mint_metadata(wins))
+            if result["success"]:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(result["error"])
+
+    async def batch(chunk):
+        async with semaphore:
+            started = time.perf_counter()
+            results = await victory_nft_service.batch_mint_victory_nft(
+                [(player, wins, mint_metadata(wins)) for player, wins in chunk]
+            )
+            elapsed = time.perf_counter() - started
+            for result in results:
+                if result["success"]:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(result["error"])
+
+    if args.batch_size > 1:
+        chunks = [events[i:i + args.batch_size] for i in range(0, len(events), args.batch_size)]
+        await asyncio.gather(*(batch(chunk) for chunk in chunks))
+    else:
+        await asyncio.gather(*(one(player, wins) for player, wins in events))
+    return latencies, [], errors, time.perf_counter() - started_all
+
+
+async def run_ccip(events, args, relayer: MockCCIPRelayer):
+    """
+    Latency tới receipt của ccipSend, latency tới khi deliver xong ở đích, các mint lỗi
+    và wall time tới receipt ccipSend cuối cùng (không tính thời gian chờ relayer)
+    """
+    started_all = time.perf_counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors, sent = [], [], []
+
+    async def one(index, player, wins):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await ccip_service.mint_victory_nft(
+                player, wins, f"Bench Player {index}", BASE_SEPOLIA_CHAIN_ID, AVALANCHE_FUJI_CHAIN_ID
+            )
+            if result["success"]:
+                latencies.append(time.perf_counter() - started)
+                sent.append((_tx_key(result["message_id"]), started))
+            else:
+                errors.append(result["error"])
+
+    await asyncio.gather(*(one(index, player, wins) for index, (player, wins) in enumerate(events)))
+    wall = time.perf_counter() - started_all
+
+    await relayer.wait_for([key for key, _ in sent], args.delivery_timeout)
+    delivery_latencies = []
+    for key, started in sent:
+        delivered_at, success = relayer.delivered.get(key, (None, False))
+        if success:
+            delivery_latencies.append(delivered_at - started)
+        else:
+            errors.append("not delivered" if delivered_at is None else "ccipReceive failed")
+    return latencies, delivery_latencies, errors, wall
+
+
+def print_result(name, mints, wall, latencies, delivery_latencies, errors, rpc, lag):
+    def ms(values, q):
+        return f"{np.percentile(values, q) * 1000:.0f}" if values else "-"
+
+    print(f"{name:<14}{mints:>7}{mints - len(errors):>6}{len(errors):>8}{wall:>9.1f}"
+          f"{(mints - len(errors)) / wall if wall else 0:>9.2f}{ms(latencies, 50):>9}{ms(latencies, 99):>9}"
+          f"{ms(delivery_latencies, 50):>10}{ms(delivery_latencies, 99):>10}{rpc / mints:>10.1f}"
+          f"{lag['max_ms']:>9.1f}{lag['p99_ms']:>9.1f}{lag['blocked_ms']:>11.0f}")
+    for error in sorted(set(errors))[:3]:
+        print(f"   ❌ {errors.count(error)}x {error}")
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    print("⛏️  Victory NFT Mint Throughput Benchmark")
+    print("=" * 120)
+    print(f"Node: {RPC_URL}, mints: {args.mints}, concurrency: {args.concurrency}, batch size: {args.batch_size}")
+
+    paths = ["direct", "ccip"] if args.path == "both" else [args.path]
+    if "direct" in paths and not VICTORY_NFT:
+        sys.exit("MINT_BENCH_VICTORY_NFT chưa được set (npm run deploy:mint-benchmark)")
+    if "ccip" in paths and not (CCIP_ROUTER and VICTORY_NFT_CCIP):
+        sys.exit("MINT_BENCH_CCIP_ROUTER / MINT_BENCH_VICTORY_NFT_CCIP chưa được set (npm run deploy:mint-benchmark)")
+
+    relayer = None
+    if "ccip" in paths:
+        CCIP_CONFIG[BASE_SEPOLIA_CHAIN_ID]["router"] = CCIP_ROUTER
+        CCIP_CONFIG[AVALANCHE_FUJI_CHAIN_ID]["nft_contract"] = VICTORY_NFT_CCIP
+        if not args.with_db:
+            async def skip_log(*_args, **_kwargs):
+                return None
+            ccip_service._log_victory_mint = skip_log
+        relayer = MockCCIPRelayer(CCIP_ROUTER, RELAYER_KEY, args.relay_interval)
+        await relayer.start()
+
+    print(f"\n{'path':<14}{'mints':>7}{'ok':>6}{'failed':>8}{'wall s':>9}{'mints/s':>9}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'e2e p50':>10}{'e2e p99':>10}{'rpc/mint':>10}{'lag max':>9}{'lag p99':>9}{'blocked ms':>11}")
+    print("-" * 120)
+    monitor = LoopLagMonitor(args.lag_interval)
+    try:
+        for path in paths:
+            events = milestone_events(args.mints, rng)
+            rpc_before = rpc_requests()
+            monitor.start()
+            if path == "direct":
+                latencies, delivery_latencies, errors, wall = await run_direct(events, args)
+                name = "direct" if args.batch_size <= 1 else f"direct x{args.batch_size}"
+            else:
+                latencies, delivery_latencies, errors, wall = await run_ccip(events, args, relayer)
+                name = "ccip"
+            await monitor.stop()
+            print_result(name, args.mints, wall, latencies, delivery_latencies, errors,
+                         rpc_requests() - rpc_before, monitor.summary())
+    finally:
+        if relayer is not None:
+            await relayer.stop()
+        await chain_providers.close()
+
+    print("\np50 / p99: gọi service -> có receipt; e2e: gọi service -> NFT được mint ở đích (qua relayer)")
+    print("lag: event loop bị chặn, đo bằng task ngủ mỗi "
+          f"{args.lag_interval * 1000:.0f} ms (blocked = tổng thời gian trễ)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Victory NFT mint throughput against a local hardhat node / anvil")
+    parser.add_argument("--path", choices=["direct", "ccip", "both"], default="both")
+    parser.add_argument("--mints", type=int, default=100, help="Số milestone event mỗi đường mint")
+    parser.add_argument("--concurrency", type=int, default=50, help="Số mint (hoặc batch) chạy đồng thời")
+    parser.add_argument("--batch-size", type=int, default=1, help="> 1: mint trực tiếp bằng batchMintVictoryNFT")
+    parser.add_argument("--relay-interval", type=float, default=0.5, help="Chu kỳ relayer đọc MessageSent (giây)")
+    parser.add_argument("--delivery-timeout", type=float, default=300, help="Thời gian chờ relayer deliver hết (giây)")
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="Chu kỳ đo độ trễ event loop (giây)")
+    parser.add_argument("--with-db", action="store_true", help="Ghi victory_nfts / thống kê vào MongoDB như server")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark số RPC round trip của các view call Victory NFT: từng call riêng lẻ
+so với gom qua services.read_aggregator (Multicall3 / JSON-RPC batch)
+
+Không cần chain: mặc định chạy một JSON-RPC node tối giản trong process (có
+Multicall3 ở địa chỉ chuẩn, --no-multicall để thử đường JSON-RPC batch), mỗi HTTP
+request chậm --rpc-latency giây. Hoặc --rpc-url tới hardhat node / anvil đã deploy
+VictoryNFT (victory-nft-deployment), --contract là địa chỉ contract.
+
+Mỗi "request" giống route eligibility / history: hasMilestoneNFT + getMintInfo +
+totalSupply, token và player được chọn từ tập nhỏ nên có call trùng nhau.
+
+Ví dụ:
+    python scripts/benchmark_multicall.py
+    python scripts/benchmark_multicall.py --requests 500 --rpc-latency 0.05 --no-multicall
+    python scripts/benchmark_multicall.py --rpc-url http://127.0.0.1:8545 --contract 0x...
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Thêm đường dẫn để import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from eth_abi import decode, encode
+from web3 import Web3
+
+from config.chain_config import READ_AGGREGATOR_CONFIG
+from services.chain_providers import chain_providers
+from services.read_aggregator import ReadAggregator
+from services.victory_nft_service import victory_nft_service
+
+BENCHMARK_CHAIN = "benchmark"
+FAKE_CONTRACT = "0x0200B2469eEF9713F7Ae8226D1BDee838B42676e"
+
+
+def _selector(signature: str) -> bytes:
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+class FakeVictoryNFTNode:
+    """JSON-RPC node chỉ đủ cho VictoryNFT view functions + Multicall3, đếm HTTP round trip"""
+
+    def __init__(self, latency: float, multicall: bool, tokens: int):
+        self.latency = latency
+        self.multicall = multicall
+        self.tokens = tokens
+        self.multicall_address = READ_AGGREGATOR_CONFIG["multicall_address"].lower()
+        self.http_requests = 0
+        self.eth_calls = 0
+        self._handlers = {
+            _selector("totalSupply()"): lambda args: encode(["uint256"], [self.tokens]),
+            _selector("getMintInfo(uint256)"): self._mint_info,
+            _selector("hasMilestoneNFT(address,uint256)"): self._has_milestone,
+        }
+
+    def _mint_info(self, data: bytes) -> bytes:
+        (token_id,) = decode(["uint256"], data)
+        wins = (token_id % 5 + 1) * 10
+        return encode(["address", "uint256", "uint256", "uint256"], ["0x" + "11" * 20, wins, wins // 10, 1700000000 + token_id])
+
+    def _has_milestone(self, data: bytes) -> bytes:
+        player, milestone = decode(["address", "uint256"], data)
+        return encode(["bool"], [int(player[-1], 16) % 2 == milestone % 2])
+
+    def _call(self, to: str, data: bytes) -> bytes:
+        self.eth_calls += 1
+        if to.lower() == self.multicall_address and self.multicall:
+            (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+            results = [(True, self._handlers[call_data[:4]](call_data[4:])) for _, _, call_data in calls]
+            return encode(["(bool,bytes)[]"], [results])
+        return self._handlers[data[:4]](data[4:])
+
+    def _dispatch(self, request: dict) -> dict:
+        method, params = request["method"], request.get("params", [])
+        if method == "eth_chainId":
+            result = "0xa869"
+        elif method == "eth_getCode":
+            result = "0x6080" if params[0].lower() != self.multicall_address or self.multicall else "0x"
+        elif method == "eth_call":
+            result = "0x" + self._call(params[0]["to"], bytes.fromhex(params[0]["data"][2:])).hex()
+        else:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": f"{method} not supported"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    async def handle(self, http_request):
+        self.http_requests += 1
+        body = await http_request.json()
+        await asyncio.sleep(self.latency)
+        if isinstance(body, list):
+            return web.json_response([self._dispatch(item) for item in body])
+        return web.json_response(self._dispatch(body))
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+def build_workload(requests: int, tokens: int, players: int, seed: int):
+    rng = random.Random(seed)
+    player_addresses = [Web3.to_checksum_address(f"0x{index + 1:040x}") for index in range(players)]
+    return [
+        (rng.choice(player_addresses), rng.randint(1, 5), rng.randrange(tokens))
+        for _ in range(requests)
+    ]
+
+
+async def run_requests(workload, read) -> float:
+    """read(kind, *args) thực hiện một view call; trả về thời gian chạy (giây)"""
+
+    async def one_request(player, milestone, token_id):
+        await asyncio.gather(
+            read("hasMilestoneNFT", player, milestone),
+            read("getMintInfo", token_id),
+            read("totalSupply")
+        )
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(one_request(*item) for item in workload))
+    return time.perf_counter() - start_time
+
+
+async def run(args):
+    node = None
+    if args.rpc_url:
+        rpc_url, contract_address = args.rpc_url, args.contract
+    else:
+        node = FakeVictoryNFTNode(args.rpc_latency, not args.no_multicall, args.tokens)
+        rpc_url, contract_address = await node.start(), FAKE_CONTRACT
+
+    chain_providers.register(BENCHMARK_CHAIN, rpc_url)
+    w3 = chain_providers.get_w3(BENCHMARK_CHAIN)
+    contract = w3.eth.contract(address=contract_address, abi=victory_nft_service.contract_abi)
+    workload = build_workload(args.requests, args.tokens, args.players, args.seed)
+    calls = len(workload) * 3
+
+    print("📦 Multicall Read Aggregator Benchmark")
+    print("=" * 50)
+    print(f"Node: {'in-process' if node else rpc_url}, requests: {args.requests} ({calls} view calls)")
+
+    # eth_chainId được provider cache sau lần đầu, không tính vào benchmark
+    await w3.eth.chain_id
+    counter = {"roundtrips": 0}
+
+    async def direct_read(name, *call_args):
+        counter["roundtrips"] += 1
+        return await contract.functions[name](*call_args).call()
+
+    before = node.http_requests if node else 0
+    direct_time = await run_requests(workload, direct_read)
+    direct_roundtrips = node.http_requests - before if node else counter["roundtrips"]
+
+    aggregator = ReadAggregator(BENCHMARK_CHAIN, {"window": args.window, "max_calls": args.max_calls})
+
+    async def aggregated_read(name, *call_args):
+        return await aggregator.call(contract.functions[name](*call_args))
+
+    # Lần kiểm tra Multicall3 (eth_getCode) không tính vào benchmark
+    await aggregator._use_multicall()
+    before = node.http_requests if node else 0
+    aggregated_time = await run_requests(workload, aggregated_read)
+    aggregated_roundtrips = node.http_requests - before if node else aggregator.roundtrips
+    status = aggregator.get_status()
+
+    print("\n📊 Results")
+    print("-" * 50)
+    print(f"{'':<14}{'round trips':>12}{'calls/trip':>12}{'wall time':>12}")
+    print(f"{'direct':<14}{direct_roundtrips:>12}{calls / max(direct_roundtrips, 1):>12.1f}{direct_time:>11.2f}s")
+    # Call trùng được gom vào một read nên không tính là call đã gửi
+    sent_calls = status["calls"] - status["deduplicated"]
+    print(f"{'aggregated':<14}{aggregated_roundtrips:>12}{sent_calls / max(aggregated_roundtrips, 1):>12.1f}{aggregated_time:>11.2f}s")
+    print(f"Round trip reduction: {direct_roundtrips / max(aggregated_roundtrips, 1):.1f}x")
+    print(f"Mode: {'Multicall3' if status['multicall'] else 'JSON-RPC batch'}, "
+          f"deduplicated calls: {status['deduplicated']} of {status['calls']}")
+
+    await chain_providers.close()
+    if node:
+        await node.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round trips of Victory NFT view calls, direct vs read aggregator")
+    parser.add_argument("--requests", type=int, default=200, help="Số request đồng thời (3 view call mỗi request)")
+    parser.add_argument("--tokens", type=int, default=50, help="Số token khác nhau được đọc")
+    parser.add_argument("--players", type=int, default=40, help="Số player khác nhau được đọc")
+    parser.add_argument("--window", type=float, default=READ_AGGREGATOR_CONFIG["window"])
+    parser.add_argument("--max-calls", type=int, default=READ_AGGREGATOR_CONFIG["max_calls"])
+    parser.add_argument("--rpc-latency", type=float, default=0.02, help="Độ trễ mỗi HTTP request của node giả lập (giây)")
+    parser.add_argument("--no-multicall", action="store_true", help="Node giả lập không có Multicall3")
+    parser.add_argument("--rpc-url", help="hardhat node / anvil thay cho node giả lập")
+    parser.add_argument("--contract", help="Địa chỉ VictoryNFT trên --rpc-url")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.rpc_url and not args.contract:
+        parser.error("--contract is required with --rpc-url")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
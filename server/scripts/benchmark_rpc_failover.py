@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark chọn RPC endpoint / circuit breaker / hedge read / failover write của
+services.rpc_failover với các JSON-RPC endpoint giả lập chạy trong process
+
+1. Scoring: endpoint nhanh nhưng thỉnh thoảng lỗi, endpoint có latency đuôi dài và
+   endpoint chết (không mở port). In health score, trạng thái breaker, số request
+2. Hedging: hai endpoint cùng có --tail-rate request chậm --tail-latency giây,
+   so sánh p50 / p99 khi tắt và bật hedge
+3. Write: eth_sendRawTransaction khi endpoint chính chết (chuyển endpoint ngay) và
+   khi endpoint chính nhận transaction rồi timeout (endpoint sau trả "already known",
+   provider trả về hash của transaction)
+
+Ví dụ:
+    python scripts/benchmark_rpc_failover.py
+    python scripts/benchmark_rpc_failover.py --requests 1000 --tail-rate 0.05 --tail-latency 2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import sys
+import time
+
+# Thêm đường dẫn để import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from eth_utils import keccak
+
+from services.chain_providers import PooledAsyncHTTPProvider
+from services.rpc_failover import FailoverAsyncProvider
+
+BENCHMARK_CHAIN = "benchmark"
+
+
+class FakeRPCEndpoint:
+    """JSON-RPC endpoint giả lập: latency, tỉ lệ request chậm, tỉ lệ HTTP 503"""
+
+    def __init__(self, name: str, latency: float, rng: random.Random, mempool: set,
+                 tail_rate: float = 0.0, tail_latency: float = 0.0, error_rate: float = 0.0,
+                 send_hangs: bool = False):
+        self.name = name
+        self.latency = latency
+        self.rng = rng
+        self.mempool = mempool
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.send_hangs = send_hangs
+        self.http_requests = 0
+
+    def _send_raw_transaction(self, raw_tx: str):
+        if raw_tx in self.mempool:
+            return None, {"code": -32000, "message": "already known"}
+        self.mempool.add(raw_tx)
+        return "0x" + keccak(bytes.fromhex(raw_tx[2:])).hex(), None
+
+    async def handle(self, http_request):
+        self.http_requests += 1
+        body = await http_request.json()
+        if self.rng.random() < self.error_rate:
+            raise web.HTTPServiceUnavailable()
+        slow = self.rng.random() < self.tail_rate
+        await asyncio.sleep(self.tail_latency if slow else self.latency)
+        result, error = "0x%x" % (1000 + self.http_requests), None
+        if body["method"] == "eth_sendRawTransaction":
+            result, error = self._send_raw_transaction(body["params"][0])
+            if self.send_hangs:
+                # Node đã nhận transaction nhưng phản hồi không về kịp
+                await asyncio.sleep(3600)
+        response = {"jsonrpc": "2.0", "id": body["id"]}
+        response.update({"error": error} if error else {"result": result})
+        return web.json_response(response)
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/{name}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/{self.name}"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+def dead_endpoint_url() -> str:
+    """URL tới port không có gì lắng nghe (kết nối bị từ chối ngay)"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}/dead"
+
+
+def build_provider(endpoints, config=None, request_timeout: float = 10):
+    pooled = []
+    for url, weight in endpoints:
+        provider = PooledAsyncHTTPProvider(url, request_timeout=request_timeout)
+        provider.exception_retry_configuration = None
+        pooled.append((provider, weight))
+    return FailoverAsyncProvider(BENCHMARK_CHAIN, pooled, config)
+
+
+async def run_reads(provider, requests: int, concurrency: int):
+    """Latency (giây) của từng eth_blockNumber và số request lỗi"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await provider.make_request("eth_blockNumber", [])
+                if "error" in response:
+                    errors += 1
+                    return
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, errors
+
+
+def quantile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)] if ordered else 0.0
+
+
+def print_endpoints(provider):
+    print(f"{'endpoint':<12}{'weight':>7}{'state':>11}{'score':>9}{'ewma ms':>9}{'p95 ms':>9}{'err rate':>10}{'requests':>10}")
+    for status in provider.get_status()["endpoints"]:
+        name = status["pool"]["endpoint"].rsplit("/", 1)[-1]
+        print(f"{name:<12}{status['weight']:>7}{status['state']:>11}{status['score']:>9}"
+              f"{str(status['latency_ewma_ms']):>9}{str(status['latency_p95_ms']):>9}"
+              f"{status['error_rate']:>10}{status['requests']:>10}")
+
+
+async def scoring_scenario(args, rng):
+    print("\n1️⃣  Health scoring + circuit breaker")
+    print("-" * 77)
+    mempool = set()
+    fast = FakeRPCEndpoint("fast-flaky", args.latency, rng, mempool, error_rate=0.05)
+    tail = FakeRPCEndpoint("slow-tail", args.latency * 2, rng, mempool, tail_rate=args.tail_rate, tail_latency=args.tail_latency)
+    urls = [await fast.start(), await tail.start()]
+    provider = build_provider([(urls[0], 1), (urls[1], 1), (dead_endpoint_url(), 3)])
+
+    latencies, errors = await run_reads(provider, args.requests, args.concurrency)
+    print_endpoints(provider)
+    status = provider.get_status()
+    print(f"reads: {len(latencies)} ok / {errors} failed, p50 {quantile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p99 {quantile(latencies, 0.99) * 1000:.1f} ms, failovers {status['failovers']}, hedges {status['hedges']}")
+
+    await provider.disconnect()
+    await fast.stop()
+    await tail.stop()
+
+
+async def hedging_scenario(args, rng):
+    print("\n2️⃣  Hedged reads (tail latency on every endpoint)")
+    print("-" * 77)
+    print(f"{'':<12}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'hedges':>9}{'won':>7}{'extra load':>12}")
+    for hedging in (False, True):
+        mempool = set()
+        endpoints = [
+            FakeRPCEndpoint(f"tail-{index}", args.latency, rng, mempool, tail_rate=args.tail_rate, tail_latency=args.tail_latency)
+            for index in range(2)
+        ]
+        urls = [await endpoint.start() for endpoint in endpoints]
+        provider = build_provider([(url, 1) for url in urls], {"hedging": hedging})
+
+        # Warm up: đủ mẫu latency để tính p95
+        await run_reads(provider, 50, args.concurrency)
+        before = sum(endpoint.http_requests for endpoint in endpoints)
+        latencies, _ = await run_reads(provider, args.requests, args.concurrency)
+        http_requests = sum(endpoint.http_requests for endpoint in endpoints) - before
+        status = provider.get_status()
+        print(f"{'hedging ' + ('on' if hedging else 'off'):<12}"
+              f"{quantile(latencies, 0.5) * 1000:>9.1f}{quantile(latencies, 0.95) * 1000:>9.1f}"
+              f"{quantile(latencies, 0.99) * 1000:>9.1f}{max(latencies) * 1000:>9.1f}"
+              f"{status['hedges']:>9}{status['hedge_wins']:>7}{(http_requests / args.requests - 1) * 100:>11.1f}%")
+
+        await provider.disconnect()
+        for endpoint in endpoints:
+            await endpoint.stop()
+
+
+async def write_scenario(args, rng):
+    print("\n3️⃣  eth_sendRawTransaction failover")
+    print("-" * 77)
+    raw_tx = "0x" + os.urandom(110).hex()
+    expected = "0x" + keccak(bytes.fromhex(raw_tx[2:])).hex()
+
+    mempool = set()
+    backup = FakeRPCEndpoint("backup", args.latency, rng, mempool)
+    provider = build_provider([(dead_endpoint_url(), 3), (await backup.start(), 1)])
+    response = await provider.make_request("eth_sendRawTransaction", [raw_tx])
+    print(f"primary dead:          {response.get('result') or response.get('error')} "
+          f"(backup received {backup.http_requests} request)")
+    await provider.disconnect()
+    await backup.stop()
+
+    mempool = set()
+    hanging = FakeRPCEndpoint("hanging", args.latency, rng, mempool, send_hangs=True)
+    backup = FakeRPCEndpoint("backup", args.latency, rng, mempool)
+    urls = [await hanging.start(), await backup.start()]
+    provider = build_provider([(urls[0], 3), (urls[1], 1)], request_timeout=args.write_timeout)
+    response = await provider.make_request("eth_sendRawTransaction", [raw_tx])
+    result = response.get("result")
+    print(f"primary timed out:     {result or response.get('error')} "
+          f"({'matches' if result == expected else 'does not match'} the transaction hash, "
+          f"mempool holds {len(mempool)} transaction)")
+    await provider.disconnect()
+    await hanging.stop()
+    await backup.stop()
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    print("🔀 RPC Failover Benchmark")
+    print("=" * 77)
+    print(f"Requests: {args.requests}, concurrency: {args.concurrency}, latency: {args.latency * 1000:.0f} ms, "
+          f"tail: {args.tail_rate * 100:.0f}% at {args.tail_latency * 1000:.0f} ms")
+    await scoring_scenario(args, rng)
+    await hedging_scenario(args, rng)
+    await write_scenario(args, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint scoring, circuit breaking, hedged reads and write failover")
+    parser.add_argument("--requests", type=int, default=500, help="Số read mỗi kịch bản")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="Latency bình thường của endpoint (giây)")
+    parser.add_argument("--tail-rate", type=float, default=0.03, help="Tỉ lệ request chậm")
+    parser.add_argument("--tail-latency", type=float, default=1.0, help="Latency của request chậm (giây)")
+    parser.add_argument("--write-timeout", type=float, default=1.0, help="Timeout gửi transaction ở kịch bản 3 (giây)")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark thời gian khởi động server
+
+Mỗi lần chạy dùng một process mới (import lạnh) và đo:
+- import: import main (routes, services, models)
+- critical path: lifespan startup tới khi app nhận request (/health/ready = 200)
+- warm-up: thời gian của từng warm-up nền (db_indexes, vrf, bot_roster)
+
+Cần cùng env với server (MONGODB_URL, VRF...). Ví dụ:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 5 --warmup-timeout 120
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SERVER_DIR)
+
+
+async def measure_once(warmup_timeout: float) -> dict:
+    start_time = time.perf_counter()
+    import main
+    from utils.readiness import readiness
+    import_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        critical_time = time.perf_counter() - start_time
+        ready = readiness.ready
+        await readiness.wait(timeout=warmup_timeout)
+        warmup_time = time.perf_counter() - start_time
+        components = readiness.get_status()["components"]
+
+    return {
+        "import": import_time,
+        "critical_path": critical_time,
+        "ready_after_critical_path": ready,
+        "all_warmups": warmup_time,
+        "components": components
+    }
+
+
+def run_child(args):
+    result = asyncio.run(measure_once(args.warmup_timeout))
+    print("BENCH_RESULT " + json.dumps(result))
+
+
+def run_parent(args):
+    results = []
+    for i in range(args.runs):
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--warmup-timeout", str(args.warmup_timeout)],
+            cwd=SERVER_DIR, capture_output=True, text=True
+        )
+        line = next((l for l in proc.stdout.splitlines() if l.startswith("BENCH_RESULT ")), None)
+        if line is None:
+            print(f"Run {i + 1} failed:\n{proc.stderr[-2000:]}")
+            sys.exit(1)
+        result = json.loads(line[len("BENCH_RESULT "):])
+        results.append(result)
+        print(f"Run {i + 1}: import {result['import']:.2f}s, critical path {result['critical_path']:.2f}s, "
+              f"all warm-ups {result['all_warmups']:.2f}s")
+
+    print("\n🚀 Startup Benchmark")
+    print("=" * 50)
+    for key in ("import", "critical_path", "all_warmups"):
+        values = sorted(r[key] for r in results)
+        print(f"{key:<15} min {values[0]:.2f}s  median {values[len(values) // 2]:.2f}s  max {values[-1]:.2f}s")
+    print(f"Ready right after critical path: {all(r['ready_after_critical_path'] for r in results)}")
+    print("\nWarm-ups (last run):")
+    for name, component in results[-1]["components"].items():
+        duration = f"{component['duration']:.2f}s" if component["duration"] is not None else "-"
+        error = f" ({component['error']})" if component["error"] else ""
+        print(f"  {name:<12} {component['status']:<8} {duration}{error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server startup time benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--warmup-timeout", type=float, default=60)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args)
+    else:
+        run_parent(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark giải quyết tournament theo vòng (services/tournament.py)
+
+Chạy với mongod local, dùng database riêng (mặc định kickin_tournament_bench)
+và tự xóa sau khi chạy xong:
+- Tạo N người chơi giả lập với skill theo level
+- Đấu hết bracket: mỗi vòng 1 lần đọc, tính trong memory, 1 bulk_write
+- (Tùy chọn) so sánh với đường xử lý từng trận như handle_challenge_response cũ
+
+Ví dụ:
+    python scripts/benchmark_tournament.py
+    python scripts/benchmark_tournament.py --players 1024 --compare-per-match
+    python scripts/benchmark_tournament.py --mongo-url mongodb://localhost:27017 --keep
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import time
+
+# Thêm đường dẫn để import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from services.match_outcome import assign_roles, pick_skill, resolve_match
+from services.match_simulator import SkillCatalog, build_level_profile
+from services.tournament import create_tournament, resolve_next_round, pair_bracket
+from utils.level_utils import update_user_levels
+from utils.entropy import MatchEntropy
+
+
+def synthetic_skills(n: int, rng: np.random.Generator):
+    goalkeepers = [f"gk_{i}" for i in range(n)]
+    skills = [{"name": name, "type": "goalkeeper"} for name in goalkeepers]
+    skills += [
+        {"name": f"kick_{i}", "type": "kicker", "counter": str(rng.choice(goalkeepers))}
+        for i in range(n)
+    ]
+    return skills
+
+
+async def seed_players(db, n_players: int, catalog: SkillCatalog, rng: np.random.Generator):
+    users = []
+    for i in range(n_players):
+        level = int(rng.integers(1, 60))
+        profile = build_level_profile(catalog, level, int(rng.integers(0, 5)), rng)
+        users.append({
+            "_id": ObjectId(),
+            "name": f"bench_player_{i}",
+            "level": level,
+            "is_vip": bool(rng.random() < 0.1),
+            "total_point": int(rng.integers(0, 2000)),
+            "kicked_win": int(rng.integers(0, 500)),
+            "keep_win": int(rng.integers(0, 500)),
+            "total_kicked": 0,
+            "total_keep": 0,
+            "available_skill_points": 0,
+            "remaining_matches": 5,
+            "kicker_skills": profile["kicker_skills"],
+            "goalkeeper_skills": profile["goalkeeper_skills"],
+            "match_history": []
+        })
+    await db.users.insert_many(users)
+    return [str(u["_id"]) for u in users]
+
+
+async def run_bracket(db, player_ids, counters):
+    tournament = await create_tournament("bench", player_ids, db=db)
+    rounds = []
+    start_time = time.perf_counter()
+    while True:
+        round_start = time.perf_counter()
+        summary = await resolve_next_round(
+            str(tournament["_id"]),
+            db=db,
+            round_seed=(secrets.randbits(256), "local"),
+            mint_milestones=False,
+            kicker_counters=counters
+        )
+        rounds.append((summary["round"], summary["matches"], time.perf_counter() - round_start))
+        if summary["finished"]:
+            break
+    return rounds, time.perf_counter() - start_time, summary["winner_id"]
+
+
+async def run_per_match(db, player_ids, counters):
+    """Mô phỏng đường cũ: mỗi trận đọc/ghi từng user như handle_challenge_response"""
+    remaining = list(player_ids)
+    matches = 0
+    start_time = time.perf_counter()
+    while len(remaining) > 1:
+        pairs, bye = pair_bracket(remaining)
+        advancing = []
+        for a_id, b_id in pairs:
+            entropy = MatchEntropy.local()
+            kicker_id, goalkeeper_id = assign_roles(a_id, b_id, entropy.randbelow("role", 2))
+            kicker = await db.users.find_one({"_id": ObjectId(kicker_id)})
+            goalkeeper = await db.users.find_one({"_id": ObjectId(goalkeeper_id)})
+            kicker_skill = pick_skill(kicker["kicker_skills"], entropy.randbelow("kicker_skill", len(kicker["kicker_skills"])))
+            goalkeeper_skill = pick_skill(goalkeeper["goalkeeper_skills"], entropy.randbelow("goalkeeper_skill", len(goalkeeper["goalkeeper_skills"])))
+            await db.skills.find_one({"name": kicker_skill})
+            outcome = resolve_match(kicker_id, goalkeeper_id, kicker_skill, goalkeeper_skill, counters.get(kicker_skill))
+            history = {"match_id": str(ObjectId()), **outcome}
+            await db.users.update_one(
+                {"_id": ObjectId(outcome["winner_id"])},
+                {"$push": {"match_history": history}, "$inc": {"total_point": 1, "available_skill_points": 1}}
+            )
+            await db.users.find_one({"_id": ObjectId(outcome["winner_id"])})
+            await db.users.find_one({"_id": ObjectId(outcome["loser_id"])})
+            await db.users.update_one({"_id": ObjectId(outcome["loser_id"])}, {"$push": {"match_history": history}})
+            await update_user_levels(ObjectId(outcome["winner_id"]), db)
+            await db.users.find_one({"_id": ObjectId(outcome["winner_id"])})
+            await db.users.find_one({"_id": ObjectId(outcome["loser_id"])})
+            advancing.append(outcome["winner_id"])
+            matches += 1
+        if bye is not None:
+            advancing.append(bye)
+        remaining = advancing
+    return matches, time.perf_counter() - start_time
+
+
+async def main_async(args):
+    rng = np.random.default_rng(args.seed)
+    skills = synthetic_skills(20, rng)
+    catalog = SkillCatalog(skills)
+    counters = {s["name"]: s.get("counter") for s in skills if s["type"] == "kicker"}
+
+    client = AsyncIOMotorClient(args.mongo_url, serverSelectionTimeoutMS=5000)
+    db = client[args.db]
+    await client.drop_database(args.db)
+    await db.skills.insert_many([dict(s) for s in skills])
+
+    print("🏆 Tournament Benchmark")
+    print("=" * 50)
+    try:
+        player_ids = await seed_players(db, args.players, catalog, rng)
+        rounds, elapsed, winner_id = await run_bracket(db, player_ids, counters)
+        total_matches = sum(m for _, m, _ in rounds)
+        for round_no, matches, round_elapsed in rounds:
+            print(f"Round {round_no:>2}: {matches:>4} matches in {round_elapsed * 1000:8.1f} ms")
+        print(f"Bracket of {args.players}: {total_matches} matches in {elapsed:.3f}s ({total_matches / elapsed:,.0f} matches/s)")
+        print(f"Winner: {winner_id}")
+
+        if args.compare_per_match:
+            await db.users.delete_many({})
+            player_ids = await seed_players(db, args.players, catalog, rng)
+            matches, per_match_elapsed = await run_per_match(db, player_ids, counters)
+            print(f"Per-match path: {matches} matches in {per_match_elapsed:.3f}s ({matches / per_match_elapsed:,.0f} matches/s)")
+            print(f"Speedup: {per_match_elapsed / elapsed:.1f}x")
+    finally:
+        if not args.keep:
+            await client.drop_database(args.db)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tournament round resolution benchmark")
+    parser.add_argument("--mongo-url", default=os.getenv("BENCH_MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="kickin_tournament_bench")
+    parser.add_argument("--players", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compare-per-match", action="store_true", help="Chạy thêm đường xử lý từng trận để so sánh")
+    parser.add_argument("--keep", action="store_true", help="Không xóa database benchmark sau khi chạy")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark VRF pool (VRFBatchManager) ở tốc độ trận đấu giả lập
+
+Không cần testnet: mặc định dùng SimulatedVRFCoordinator trong process,
+hoặc --backend local để chạy với MockVRFConsumer trên hardhat node / anvil
+(xem victory-nft-deployment/scripts/deploy-mock-vrf.js).
+
+Mỗi trận rút 1 word (như challenge_handler). Báo cáo:
+- pool exhaustion: số trận tới khi pool trống và phải chờ refill
+- phân vị thời gian chờ word, số trận vượt deadline "match"
+- số chain request mỗi trận
+
+Ví dụ:
+    python scripts/benchmark_vrf.py
+    python scripts/benchmark_vrf.py --match-rate 50 --duration 60 --latency 5 --num-words 5
+    python scripts/benchmark_vrf.py --failure-rate 0.1 --in-flight 1
+    VRF_LOCAL_CONSUMER_ADDRESS=0x... VRF_LOCAL_PRIVATE_KEY=0x... python scripts/benchmark_vrf.py --backend local
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Thêm đường dẫn để import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config.vrf_config import VRF_BATCH_CONFIG, VRF_DEADLINE_CONFIG
+from utils.chainlink_vrf import ChainlinkVRF, VRFBatchManager
+from utils.vrf_backends import BACKEND_LOCAL, BACKEND_SIMULATED, SimulatedVRFCoordinator, create_vrf_backend
+
+
+class MatchLoad:
+    def __init__(self, batch_manager, deadline: float):
+        self.batch_manager = batch_manager
+        self.deadline = deadline
+        self.waits = []
+        self.exhaustions = 0
+        self.deadline_misses = 0
+        self.pool_levels = []
+
+    async def play_match(self):
+        pool = self.batch_manager.pool
+        if pool.level == 0:
+            self.exhaustions += 1
+        start_time = time.perf_counter()
+        await self.batch_manager.get_random_word()
+        wait = time.perf_counter() - start_time
+        self.waits.append(wait)
+        if wait > self.deadline:
+            self.deadline_misses += 1
+
+    async def sample_pool(self, interval: float = 0.5):
+        while True:
+            self.pool_levels.append(self.batch_manager.pool.level)
+            await asyncio.sleep(interval)
+
+
+async def run(args):
+    if args.backend == BACKEND_SIMULATED:
+        backend = SimulatedVRFCoordinator({
+            "fulfillment_latency": args.latency,
+            "latency_jitter": args.jitter,
+            "failure_rate": args.failure_rate,
+            "fulfillment_failure_rate": args.fulfillment_failure_rate,
+            "fulfillment_timeout": args.fulfillment_timeout,
+            "num_words": args.num_words
+        }, seed=args.seed)
+    else:
+        backend = create_vrf_backend(BACKEND_LOCAL, {"fulfillment_latency": args.latency})
+
+    vrf = ChainlinkVRF(backend=backend)
+    vrf.batch_manager = VRFBatchManager(vrf, {
+        "cache_size": args.cache_size,
+        "low_watermark": args.low_watermark,
+        "high_watermark": args.high_watermark,
+        "max_in_flight": args.in_flight,
+        "refill_backoff": args.backoff,
+        "persistent": False
+    })
+    load = MatchLoad(vrf.batch_manager, VRF_DEADLINE_CONFIG["match"])
+
+    print("🎲 VRF Pool Benchmark")
+    print("=" * 50)
+    print(f"Backend: {args.backend}, match rate: {args.match_rate}/s, duration: {args.duration}s")
+    print(f"Pool: capacity {args.cache_size}, watermarks {args.low_watermark}/{args.high_watermark}, in-flight {args.in_flight}")
+
+    if args.prewarm:
+        start_time = time.perf_counter()
+        await vrf.batch_manager.prewarm_cache(args.prewarm)
+        print(f"Pre-warm {args.prewarm} words: {time.perf_counter() - start_time:.2f}s")
+
+    rng = random.Random(args.seed)
+    sampler = asyncio.create_task(load.sample_pool())
+    matches = []
+    start_time = time.perf_counter()
+    while time.perf_counter() - start_time < args.duration:
+        matches.append(asyncio.create_task(load.play_match()))
+        # Trận tới theo phân phối Poisson
+        await asyncio.sleep(rng.expovariate(args.match_rate))
+    await asyncio.gather(*matches)
+    elapsed = time.perf_counter() - start_time
+    sampler.cancel()
+    backend_status = backend.get_status()
+    await vrf.batch_manager.stop()
+
+    waits = np.array(load.waits) * 1000
+    n = len(waits)
+    print("\n📊 Results")
+    print("-" * 50)
+    print(f"Matches:             {n} in {elapsed:.1f}s ({n / elapsed:.1f}/s)")
+    print(f"Pool exhaustions:    {load.exhaustions} ({load.exhaustions / n:.1%} of matches)")
+    print(f"Deadline misses:     {load.deadline_misses} (> {VRF_DEADLINE_CONFIG['match'] * 1000:.0f} ms)")
+    print(f"Wait p50/p95/p99/max: {np.percentile(waits, 50):.2f} / {np.percentile(waits, 95):.2f} / "
+          f"{np.percentile(waits, 99):.2f} / {waits.max():.2f} ms")
+    if load.pool_levels:
+        print(f"Pool level min/mean: {min(load.pool_levels)} / {np.mean(load.pool_levels):.0f}")
+    requests = backend_status["requests"]
+    print(f"Chain requests:      {requests} ({requests / n:.3f} per match)")
+    for key, value in backend_status.items():
+        print(f"  {key}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VRF pool benchmark with simulated or local coordinator")
+    parser.add_argument("--backend", choices=[BACKEND_SIMULATED, BACKEND_LOCAL], default=BACKEND_SIMULATED)
+    parser.add_argument("--match-rate", type=float, default=20, help="Trận mỗi giây")
+    parser.add_argument("--duration", type=float, default=30, help="Thời gian chạy (giây)")
+    parser.add_argument("--latency", type=float, default=2.0, help="Fulfillment latency trung bình (giây)")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--fulfillment-failure-rate", type=float, default=0.0)
+    parser.add_argument("--fulfillment-timeout", type=float, default=30)
+    parser.add_argument("--num-words", type=int, default=10)
+    parser.add_argument("--cache-size", type=int, default=VRF_BATCH_CONFIG["cache_size"])
+    parser.add_argument("--low-watermark", type=int, default=VRF_BATCH_CONFIG["low_watermark"])
+    parser.add_argument("--high-watermark", type=int, default=VRF_BATCH_CONFIG["high_watermark"])
+    parser.add_argument("--in-flight", type=int, default=VRF_BATCH_CONFIG["max_in_flight"])
+    parser.add_argument("--backoff", type=float, default=1.0)
+    parser.add_argument("--prewarm", type=int, default=100, help="Số word pre-warm trước khi chạy (0 = không)")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
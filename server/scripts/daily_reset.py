@@ -6,7 +6,7 @@ import asyncio
 from utils.time_utils import get_vietnam_time, to_vietnam_time
 from database.database import get_database, get_skills_collection
 from utils.logger import api_logger
-import random
+from services.bot_roster import bot_roster, pick_bot_skills, DEFAULT_BOT_USERNAME
 
 # Create logs directory if it doesn't exist
 os.makedirs('logs', exist_ok=True)
@@ -26,23 +26,28 @@ async def reset_bot_skills():
         goalkeeper_skills = await skills_collection.find({"type": "goalkeeper"}).to_list(length=None)
         
         # Random 10 skills for each type
-        selected_kicker_skills = random.sample([s["name"] for s in kicker_skills], min(10, len(kicker_skills)))
-        selected_goalkeeper_skills = random.sample([s["name"] for s in goalkeeper_skills], min(10, len(goalkeeper_skills)))
+        selected_skills = pick_bot_skills(
+            [s["name"] for s in kicker_skills],
+            [s["name"] for s in goalkeeper_skills]
+        )
         
         # Update bot skills
         bot_collection = db.bots
         await bot_collection.update_one(
-            {"username": "bot"},
+            {"username": DEFAULT_BOT_USERNAME},
             {
                 "$set": {
-                    "kicker_skills": selected_kicker_skills,
-                    "goalkeeper_skills": selected_goalkeeper_skills,
+                    **selected_skills,
                     "last_skill_update": get_vietnam_time()
-                }
+                },
+                "$setOnInsert": {"is_bot": True}
             },
             upsert=True
         )
         
+        # Reload bot roster cache cho process hiện tại
+        await bot_roster.reload()
+        
         return True
         
     except Exception as e:
@@ -5,6 +5,7 @@ from models.bot_goalkeeper import BotGoalkeeperModel
 from database.database import get_database, get_skills_collection,get_users_collection
 from bson import ObjectId
 from typing import Any, Dict, List, Optional
+from services.match_outcome import resolve_save
 
 MAX_HOURS = 5  # tối đa 5 giờ energy
 
@@ -257,10 +258,4 @@ async def reset_bot_for_user(user_id: str) -> BotGoalkeeperModel:
 
 async def attempt_save(user_id: str) -> bool:
     bot = await update_bot_energy_and_skills(user_id)
-    remaining = bot.feed_quota
-    if remaining <= 0:
-        return False
-    percent = remaining / MAX_HOURS
-    if percent > 0.5:
-        return True
-    return random.random() < percent
\ No newline at end of file
+    return resolve_save(bot.feed_quota, random.random(), MAX_HOURS)
\ No newline at end of file
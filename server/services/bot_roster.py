@@ -0,0 +1,115 @@
+"""
+Cache in-process cho bot roster và bảng counter của skill
+
+Bot và skill chỉ thay đổi khi daily reset (reset_bot_skills) hoặc admin sửa skill,
+nên trận đấu với bot không cần đọc DB trước khi tính kết quả:
+- bots: username -> bot doc
+- kicker_counters: tên skill kicker -> tên skill goalkeeper counter (hoặc None)
+
+Cache được reload khi reset_bot_skills chạy, khi skill bị sửa qua API,
+và định kỳ bởi scheduler (daily_reset có thể chạy ở process khác).
+"""
+
+import asyncio
+import random
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from database.database import get_database, get_skills_collection
+from utils.logger import api_logger
+
+DEFAULT_BOT_USERNAME = "bot"
+BOT_SKILLS_PER_TYPE = 10
+
+
+def pick_bot_skills(kicker_names: List[str], goalkeeper_names: List[str]) -> Dict[str, List[str]]:
+    """Random 10 skills for each type"""
+    return {
+        "kicker_skills": random.sample(kicker_names, min(BOT_SKILLS_PER_TYPE, len(kicker_names))),
+        "goalkeeper_skills": random.sample(goalkeeper_names, min(BOT_SKILLS_PER_TYPE, len(goalkeeper_names)))
+    }
+
+
+class BotRoster:
+    def __init__(self):
+        self.bots: Dict[str, dict] = {}
+        self.kicker_counters: Dict[str, Optional[str]] = {}
+        self.kicker_names: List[str] = []
+        self.goalkeeper_names: List[str] = []
+        self.loaded_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    async def reload(self):
+        """Đọc lại toàn bộ bots và skills từ DB"""
+        async with self._lock:
+            db = await get_database()
+            skills_collection = await get_skills_collection()
+
+            skills = await skills_collection.find(
+                {}, {"name": 1, "type": 1, "counter": 1}
+            ).to_list(length=None)
+            bots = await db.bots.find({}).to_list(length=None)
+
+            self.kicker_counters = {
+                s["name"]: s.get("counter") for s in skills if s.get("type") == "kicker"
+            }
+            self.kicker_names = [s["name"] for s in skills if s.get("type") == "kicker"]
+            self.goalkeeper_names = [s["name"] for s in skills if s.get("type") == "goalkeeper"]
+            self.bots = {b.get("username", DEFAULT_BOT_USERNAME): b for b in bots}
+            self.loaded_at = datetime.utcnow()
+            api_logger.info(f"[BotRoster] Loaded {len(self.bots)} bots and {len(skills)} skills")
+
+    async def ensure_loaded(self):
+        if not self.is_loaded:
+            await self.reload()
+
+    def invalidate(self):
+        """Đánh dấu cache cần reload ở lần dùng tiếp theo"""
+        self.loaded_at = None
+
+    async def get_bot(self, username: str = DEFAULT_BOT_USERNAME) -> Optional[dict]:
+        await self.ensure_loaded()
+        return self.bots.get(username)
+
+    async def get_kicker_counter(self, skill_name: str) -> Optional[str]:
+        """Counter của skill kicker; skill không có trong collection (vd: kicker_skill_level_N) trả về None"""
+        await self.ensure_loaded()
+        return self.kicker_counters.get(skill_name)
+
+    async def get_or_create_bot(self, username: str = DEFAULT_BOT_USERNAME) -> dict:
+        """
+        Lấy bot từ cache, tạo mới nếu chưa có.
+        Tạo bằng upsert $setOnInsert nên gọi nhiều lần (kể cả đồng thời) cũng chỉ có một bot.
+        """
+        bot = await self.get_bot(username)
+        if bot:
+            return bot
+
+        now = datetime.utcnow()
+        bot_data = {
+            "is_bot": True,
+            **pick_bot_skills(self.kicker_names, self.goalkeeper_names),
+            "remaining_matches": 5,
+            "daily_tasks": {},
+            "created_at": now,
+            "last_skill_update": now
+        }
+        db = await get_database()
+        bot = await db.bots.find_one_and_update(
+            {"username": username},
+            {"$setOnInsert": bot_data},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.bots[username] = bot
+        return bot
+
+
+# Singleton instance
+bot_roster = BotRoster()
@@ -3,10 +3,13 @@ import json
 import asyncio
 from web3 import Web3
 from eth_account import Account
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Awaitable
 from utils.logger import api_logger
 from utils.time_utils import get_vietnam_time
 from config.settings import settings
+from services.chain_providers import chain_providers
+from services.fee_oracle import get_fee_oracle
+from utils.receipt_tracker import get_receipt_tracker
 
 # CCIP Configuration
 CCIP_CONFIG = {
@@ -116,11 +119,13 @@ class CCIPService:
         total_wins: int, 
         player_name: str,
         source_chain_id: int = 84532,  # Default: Base Sepolia
-        destination_chain_id: int = 43113  # Default: Avalanche Fuji
+        destination_chain_id: int = 43113,  # Default: Avalanche Fuji
+        on_submitted: Optional[Callable[[str, int], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
         """
         Mint Victory NFT for player milestone
         SERVER pays all gas fees - player gets NFT for FREE
+        on_submitted(tx_hash, nonce) được gọi ngay sau khi transaction ccipSend được gửi
         """
         if not self.account:
             return {
@@ -151,99 +156,86 @@ class CCIPService:
             api_logger.info(f"  Source Chain Selector: {CCIP_CONFIG[source_chain_id]['chain_selector']}")
             api_logger.info(f"  Destination Chain Selector: {CCIP_CONFIG[destination_chain_id]['chain_selector']}")
 
-            # Initialize Web3 connections for source and destination chains
+            # AsyncWeb3 dùng chung của chain nguồn (keep-alive, giới hạn RPC đồng thời)
             source_config = CCIP_CONFIG[source_chain_id]
             destination_config = CCIP_CONFIG[destination_chain_id]
             
-            source_w3 = Web3(Web3.HTTPProvider(source_config["rpc_url"]))
-            destination_w3 = Web3(Web3.HTTPProvider(destination_config["rpc_url"]))
+            source_w3 = chain_providers.get_w3_for_chain_id(source_chain_id)
+            # Gas price, phí CCIP, estimate gas và số dư được cache theo chain
+            fee_oracle = get_fee_oracle(source_chain_id)
             
-            # Check SERVER wallet balance (not player wallet)
-            server_balance = source_w3.eth.get_balance(self.account.address)
+            source_router = source_w3.eth.contract(
+                address=Web3.to_checksum_address(source_config["router"]),
+                abi=CCIP_ROUTER_ABI
+            )
+
+            # Create metadata
+            metadata = self._create_nft_metadata(player_name, total_wins, destination_config["name"])
+            
+            # Encode data for CCIP message (not function call)
+            # The CCIP receiver will decode this data and call mintVictoryNFT
+            mint_data = self._encode_ccip_message_data(source_w3, player_address, total_wins, metadata)
+            
+            receivers = [{
+                "receiver": Web3.to_checksum_address(destination_config["nft_contract"]),
+                "data": mint_data
+            }]
+            extra_args = {
+                "feeToken": Web3.to_checksum_address(source_config["link_token"]),
+                "feeAmount": 0
+            }
+            
+            # Get CCIP fee
+            fee = await self._get_ccip_fee(fee_oracle, source_router, destination_config["chain_selector"],
+                                         receivers, extra_args)
             
             # Optimize gas settings for cost reduction
-            current_gas_price = source_w3.eth.gas_price
+            current_gas_price = await fee_oracle.get_gas_price()
             # Try to use a lower gas price if possible (within 10% of current)
             optimized_gas_price = int(current_gas_price * 0.9)  # 10% reduction
             
-            # Estimate gas usage for CCIP transaction
+            # Estimate gas usage for CCIP transaction (cache theo router, destination và độ dài data)
             try:
-                # Create a temporary router contract for estimation
-                temp_router = source_w3.eth.contract(
-                    address=Web3.to_checksum_address(source_config["router"]),
-                    abi=CCIP_ROUTER_ABI
+                estimated_gas = await fee_oracle.estimate_gas(
+                    ("ccipSend", source_router.address, destination_config["chain_selector"], len(mint_data)),
+                    source_router.functions.ccipSend(destination_config["chain_selector"], receivers, "0x", extra_args),
+                    {'from': self.account.address, 'value': fee}
                 )
-                
-                # Prepare temporary data for estimation
-                temp_receivers = [{
-                    "receiver": Web3.to_checksum_address(destination_config["nft_contract"]),
-                    "data": "0x"  # Minimal data for estimation
-                }]
-                temp_extra_args = {
-                    "feeToken": Web3.to_checksum_address(source_config["link_token"]),
-                    "feeAmount": 0
-                }
-                
-                estimated_gas = temp_router.functions.ccipSend(
-                    destination_config["chain_selector"],
-                    temp_receivers,
-                    "0x",
-                    temp_extra_args
-                ).estimate_gas({
-                    'from': self.account.address,
-                    'value': Web3.to_wei(0.001, 'ether')  # Estimated fee
-                })
                 estimated_gas = int(estimated_gas * 1.2)  # Add 20% buffer
                 api_logger.info(f"Estimated gas for CCIP: {estimated_gas}")
             except Exception as e:
                 api_logger.warning(f"Gas estimation failed, using fallback: {e}")
                 estimated_gas = 300000  # Fallback gas limit
             
-            required_gas = estimated_gas * optimized_gas_price
+            # Use the lower of estimated gas or our hardcoded limit
+            final_gas = min(estimated_gas, 300000)
+            required_gas = final_gas * optimized_gas_price
             
             api_logger.info(f"Current gas price: {Web3.from_wei(current_gas_price, 'gwei')} gwei")
             api_logger.info(f"Optimized gas price: {Web3.from_wei(optimized_gas_price, 'gwei')} gwei")
-            api_logger.info(f"Estimated gas: {estimated_gas}")
+            api_logger.info(f"Estimated gas: {final_gas}")
             api_logger.info(f"Required gas cost: {Web3.from_wei(required_gas, 'ether')} ETH")
             
-            if server_balance < required_gas:
+            # Check SERVER wallet balance (not player wallet), SERVER trả cả gas và phí CCIP
+            server_balance = await fee_oracle.get_balance(self.account.address)
+            if server_balance < required_gas + fee:
                 return {
                     "success": False,
-                    "error": f"Server wallet insufficient funds. Need {Web3.from_wei(required_gas, 'ether')} ETH, have {Web3.from_wei(server_balance, 'ether')} ETH"
+                    "error": f"Server wallet insufficient funds. Need {Web3.from_wei(required_gas + fee, 'ether')} ETH, have {Web3.from_wei(server_balance, 'ether')} ETH"
                 }
             
             api_logger.info(f"Server wallet balance: {Web3.from_wei(server_balance, 'ether')} ETH")
             
-            # Initialize contracts
-            source_router = source_w3.eth.contract(
-                address=Web3.to_checksum_address(source_config["router"]),
-                abi=CCIP_ROUTER_ABI
-            )
-            
-            destination_nft_contract = destination_w3.eth.contract(
-                address=Web3.to_checksum_address(destination_config["nft_contract"]),
-                abi=CROSS_CHAIN_NFT_ABI
-            )
-
-            # Create metadata
-            metadata = self._create_nft_metadata(player_name, total_wins, destination_config["name"])
-            
-            # Encode data for CCIP message (not function call)
-            # The CCIP receiver will decode this data and call mintVictoryNFT
-            mint_data = self._encode_ccip_message_data(source_w3, player_address, total_wins, metadata)
-            
-            # Get CCIP fee
-            fee = await self._get_ccip_fee(source_router, destination_config["chain_selector"], 
-                                         destination_config["nft_contract"], mint_data, source_config["link_token"])
-            
             # Send cross-chain message (SERVER pays all fees)
             message_id = await self._send_ccip_message(
-                source_w3, source_router, source_config, destination_config, mint_data, fee
+                source_w3, source_router, receivers, extra_args, destination_config, fee, final_gas, optimized_gas_price,
+                on_submitted
             )
+            fee_oracle.record_spend(self.account.address, required_gas + fee)
             
             # Log the mint
             await self._log_victory_mint(player_address, total_wins, message_id, destination_config["name"], 
-                                       destination_config["nft_contract"])
+                                       destination_config["nft_contract"], player_name)
             
             api_logger.info(f"Victory NFT cross-chain minted: {source_config['name']} → {destination_config['name']} for {player_name} ({player_address}) with {total_wins} wins - SERVER PAID ALL FEES")
             
@@ -287,28 +279,10 @@ class CCIPService:
         from eth_abi import encode
         return '0x' + encode(['address', 'uint256', 'string'], [player_address, total_wins, metadata]).hex()
 
-    async def _get_ccip_fee(self, source_router, destination_selector: int, receiver: str, data: str, fee_token: str) -> int:
+    async def _get_ccip_fee(self, fee_oracle, source_router, destination_selector: int, receivers: list, extra_args: dict) -> int:
         """Get CCIP fee for cross-chain message"""
         try:
-            # Prepare receivers array
-            receivers = [{
-                "receiver": Web3.to_checksum_address(receiver),
-                "data": data
-            }]
-            
-            # Prepare extraArgs
-            extra_args = {
-                "feeToken": Web3.to_checksum_address(fee_token),
-                "feeAmount": 0
-            }
-            
-            # Get fee
-            fee = source_router.functions.getFee(
-                destination_selector,
-                receivers,
-                "0x",  # No additional data
-                extra_args
-            ).call()
+            fee = await fee_oracle.get_ccip_fee(source_router, destination_selector, receivers, extra_args)
             
             api_logger.info(f"CCIP fee: {Web3.from_wei(fee, 'ether')} ETH")
             return fee
@@ -318,70 +292,36 @@ class CCIPService:
             # Fallback to estimated fee
             return Web3.to_wei(0.001, 'ether')  # 0.001 ETH as fallback
 
-    async def _send_ccip_message(self, source_w3, source_router, source_config: dict, destination_config: dict, data: str, fee: int) -> str:
-        """Send CCIP message to destination chain"""
+    async def _send_ccip_message(self, source_w3, source_router, receivers: list, extra_args: dict, destination_config: dict,
+                                 fee: int, gas_limit: int, gas_price: int,
+                                 on_submitted: Optional[Callable[[str, int], Awaitable[None]]] = None) -> str:
+        """Send CCIP message to destination chain (gas đã được tính từ fee oracle)"""
         try:
-            # Prepare receivers array
-            receivers = [{
-                "receiver": Web3.to_checksum_address(destination_config["nft_contract"]),
-                "data": data
-            }]
-            
-            # Prepare extraArgs
-            extra_args = {
-                "feeToken": Web3.to_checksum_address(source_config["link_token"]),
-                "feeAmount": 0
-            }
-            
-            # Optimize gas settings for cost reduction
-            current_gas_price = source_w3.eth.gas_price
-            optimized_gas_price = int(current_gas_price * 0.9)  # 10% reduction
+            api_logger.info(f"Sending CCIP message with optimized gas price: {Web3.from_wei(gas_price, 'gwei')} gwei")
+            api_logger.info(f"Final gas limit: {gas_limit}")
             
-            # Try to estimate actual gas usage
-            try:
-                estimated_gas = source_router.functions.ccipSend(
+            # Sign and send transaction: nonce cấp local, nhiều mint có thể cùng chờ receipt
+            tracker = await get_receipt_tracker(source_w3, self.account)
+            tracked = await tracker.send(
+                source_router.functions.ccipSend(
                     destination_config["chain_selector"],
                     receivers,
                     "0x",  # No additional data
                     extra_args
-                ).estimate_gas({
-                    'from': self.account.address,
-                    'value': fee
-                })
-                # Add 20% buffer to estimated gas
-                estimated_gas = int(estimated_gas * 1.2)
-                api_logger.info(f"Actual gas estimation: {estimated_gas}")
-            except Exception as e:
-                api_logger.warning(f"Gas estimation failed, using fallback: {e}")
-                estimated_gas = 300000  # Fallback gas limit
-            
-            # Use the lower of estimated gas or our hardcoded limit
-            final_gas = min(estimated_gas, 300000)
-            
-            api_logger.info(f"Sending CCIP message with optimized gas price: {Web3.from_wei(optimized_gas_price, 'gwei')} gwei")
-            api_logger.info(f"Final gas limit: {final_gas}")
-            
-            # Build transaction
-            transaction = source_router.functions.ccipSend(
-                destination_config["chain_selector"],
-                receivers,
-                "0x",  # No additional data
-                extra_args
-            ).build_transaction({
-                'from': self.account.address,
-                'value': fee,
-                'gas': final_gas,  # Use optimized gas limit
-                'gasPrice': optimized_gas_price,  # Use optimized gas price
-                'nonce': source_w3.eth.get_transaction_count(self.account.address)
-            })
-            
-            # Sign and send transaction
-            signed_txn = source_w3.eth.account.sign_transaction(transaction, self.private_key)
-            api_logger.info(f"DEBUG signed_txn type: {type(signed_txn)}, dir: {dir(signed_txn)}")
-            tx_hash = source_w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+                ),
+                {
+                    'value': fee,
+                    'gas': gas_limit,  # Use optimized gas limit
+                    'gasPrice': gas_price  # Use optimized gas price
+                }
+            )
+            if on_submitted is not None:
+                await on_submitted(tracked.tx_hash, tracked.nonce)
             
-            # Wait for transaction receipt
-            receipt = source_w3.eth.wait_for_transaction_receipt(tx_hash)
+            # Wait for transaction receipt (poller chung của ví, tự thay thế nếu bị kẹt)
+            receipt = await tracker.wait(tracked, timeout=300)
+            if receipt["status"] != 1:
+                raise RuntimeError(f"CCIP transaction reverted: {receipt['transactionHash'].hex()}")
             
             api_logger.info(f"CCIP message sent: {receipt['transactionHash'].hex()}")
             return receipt['transactionHash'].hex()
@@ -390,24 +330,14 @@ class CCIPService:
             api_logger.error(f"Error sending CCIP message: {e}")
             raise e
 
-    async def _log_victory_mint(self, player_address: str, total_wins: int, message_id: str, destination_chain: str, contract_address: str):
-        """Log Victory NFT mint to database"""
+    async def _log_victory_mint(self, player_address: str, total_wins: int, message_id: str, destination_chain: str,
+                                contract_address: str, player_name: Optional[str] = None):
+        """Log Victory NFT mint to database (thống kê / leaderboard được tính lại)"""
         try:
-            from database.database import get_database
-            db = await get_database()
-            
-            victory_mint = {
-                "player_address": player_address,
-                "total_wins": total_wins,
-                "milestone": total_wins // 10,
-                "message_id": message_id,
-                "destination_chain": destination_chain,
-                "contract_address": contract_address,
-                "minted_at": get_vietnam_time().isoformat(),
-                "status": "minted"
-            }
-            
-            await db.victory_nfts.insert_one(victory_mint)
+            from services.victory_nft_stats import build_victory_mint, victory_nft_stats
+            await victory_nft_stats.log_mint(build_victory_mint(
+                player_address, total_wins, message_id, destination_chain, contract_address, player_name
+            ))
             
         except Exception as e:
             api_logger.error(f"Failed to log Victory NFT mint: {str(e)}")
@@ -0,0 +1,180 @@
+"""
+Pool AsyncWeb3 provider dùng chung cho mọi service gọi chain
+
+Mỗi chain (Base Sepolia, Avalanche Fuji, chain của VRF) có đúng một provider, gồm
+một hoặc nhiều RPC endpoint (services/rpc_failover.py chọn endpoint theo health score,
+hedge read và chuyển endpoint khi lỗi). Mỗi endpoint:
+- HTTP session keep-alive (provider mặc định của web3 dùng force_close nên mỗi
+  RPC phải mở lại kết nối TCP/TLS)
+- Giới hạn số RPC đồng thời bằng semaphore, request vượt giới hạn xếp hàng trên
+  event loop thay vì mở thêm kết nối
+- Mọi call đều là coroutine, không còn RPC đồng bộ nào chặn event loop
+
+Session được tạo lại khi event loop thay đổi (test / script chạy asyncio.run nhiều lần).
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+from config.chain_config import RPC_FAILOVER_CONFIG
+from config.settings import settings
+from services.rpc_failover import FailoverAsyncProvider
+from utils.logger import api_logger
+
+BASE_SEPOLIA = "base_sepolia"
+AVALANCHE_FUJI = "avalanche_fuji"
+VRF_CHAIN = "vrf"
+
+BASE_SEPOLIA_CHAIN_ID = 84532
+AVALANCHE_FUJI_CHAIN_ID = 43113
+
+CHAIN_IDS = {
+    BASE_SEPOLIA_CHAIN_ID: BASE_SEPOLIA,
+    AVALANCHE_FUJI_CHAIN_ID: AVALANCHE_FUJI
+}
+
+
+class PooledAsyncHTTPProvider(AsyncHTTPProvider):
+    def __init__(
+        self,
+        endpoint_uri: str,
+        max_concurrency: int = settings.CHAIN_RPC_MAX_CONCURRENCY,
+        request_timeout: float = settings.CHAIN_RPC_TIMEOUT_SECONDS,
+        keepalive_timeout: float = settings.CHAIN_RPC_KEEPALIVE_SECONDS
+    ):
+        super().__init__(
+            endpoint_uri,
+            request_kwargs={"timeout": ClientTimeout(total=request_timeout)},
+            # Validation middleware của web3 gọi eth_chainId 2 lần trước mỗi eth_call /
+            # gửi transaction: cache lại, chain ID của endpoint không đổi
+            cache_allowed_requests=True,
+            cacheable_requests={"eth_chainId", "net_version"}
+        )
+        self.max_concurrency = max_concurrency
+        self.keepalive_timeout = keepalive_timeout
+        self.active = 0
+        self.queued = 0
+        self.requests = 0
+        self._loop = None
+        self._session: Optional[ClientSession] = None
+        self._session_ready = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _ensure_session(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._session.closed:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._session = ClientSession(
+                raise_for_status=True,
+                connector=TCPConnector(limit=self.max_concurrency, keepalive_timeout=self.keepalive_timeout)
+            )
+            # Các request đồng thời đầu tiên cùng chờ session được cache
+            self._session_ready = asyncio.ensure_future(self.cache_async_session(self._session))
+        await self._session_ready
+
+    async def _bounded(self, call):
+        await self._ensure_session()
+        semaphore = self._semaphore
+        self.queued += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.active += 1
+        self.requests += 1
+        try:
+            return await call()
+        finally:
+            self.active -= 1
+            semaphore.release()
+
+    async def _make_request(self, method, request_data: bytes) -> bytes:
+        return await self._bounded(lambda: super(PooledAsyncHTTPProvider, self)._make_request(method, request_data))
+
+    async def make_batch_request(self, batch_requests):
+        return await self._bounded(lambda: super(PooledAsyncHTTPProvider, self).make_batch_request(batch_requests))
+
+    async def disconnect(self):
+        await super().disconnect()
+        self._loop = None
+        self._session = None
+
+    def get_status(self) -> dict:
+        return {
+            "endpoint": str(self.endpoint_uri),
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queued": self.queued,
+            "requests": self.requests
+        }
+
+
+def parse_rpc_urls(value: str) -> List[Tuple[str, float]]:
+    """ "url1,url2|2" -> [(url1, fallback_weight), (url2, 2.0)]"""
+    endpoints = []
+    for item in (value or "").split(","):
+        url, _, weight = item.strip().partition("|")
+        if url:
+            endpoints.append((url, float(weight) if weight else RPC_FAILOVER_CONFIG["fallback_weight"]))
+    return endpoints
+
+
+class ChainProviderRegistry:
+    def __init__(self):
+        self._rpc_urls: Dict[str, List[Tuple[str, float]]] = {}
+        self._w3: Dict[str, AsyncWeb3] = {}
+
+    def register(self, chain: str, rpc_url: str, fallback_urls: str = ""):
+        """rpc_url là endpoint chính, fallback_urls dạng "url|weight,url" (xem parse_rpc_urls)"""
+        endpoints = [(rpc_url, RPC_FAILOVER_CONFIG["primary_weight"])]
+        for url, weight in parse_rpc_urls(fallback_urls):
+            if url not in (known for known, _ in endpoints):
+                endpoints.append((url, weight))
+        self._rpc_urls[chain] = endpoints
+
+    def _build_provider(self, chain: str):
+        endpoints = self._rpc_urls[chain]
+        if len(endpoints) == 1:
+            return PooledAsyncHTTPProvider(endpoints[0][0])
+        pooled = []
+        for url, weight in endpoints:
+            provider = PooledAsyncHTTPProvider(url)
+            # Retry nằm ở FailoverAsyncProvider (sang endpoint khác), không retry trên endpoint đang lỗi
+            provider.exception_retry_configuration = None
+            pooled.append((provider, weight))
+        return FailoverAsyncProvider(chain, pooled)
+
+    def get_w3(self, chain: str) -> AsyncWeb3:
+        """AsyncWeb3 dùng chung của chain, kết nối được mở ở RPC đầu tiên"""
+        if chain not in self._w3:
+            if chain not in self._rpc_urls:
+                raise ValueError(f"Unknown chain: {chain}. Supported: {list(self._rpc_urls.keys())}")
+            self._w3[chain] = AsyncWeb3(self._build_provider(chain))
+        return self._w3[chain]
+
+    def get_w3_for_chain_id(self, chain_id: int) -> AsyncWeb3:
+        if chain_id not in CHAIN_IDS:
+            raise ValueError(f"Unknown chain ID: {chain_id}. Supported: {list(CHAIN_IDS.keys())}")
+        return self.get_w3(CHAIN_IDS[chain_id])
+
+    async def close(self):
+        for chain, w3 in self._w3.items():
+            try:
+                await w3.provider.disconnect()
+            except Exception as e:
+                api_logger.error(f"Error closing {chain} provider: {str(e)}")
+        self._w3.clear()
+
+    def get_status(self) -> dict:
+        return {chain: w3.provider.get_status() for chain, w3 in self._w3.items()}
+
+
+# Singleton instance
+chain_providers = ChainProviderRegistry()
+chain_providers.register(BASE_SEPOLIA, settings.BASE_SEPOLIA_RPC_URL, settings.BASE_SEPOLIA_RPC_FALLBACK_URLS)
+chain_providers.register(AVALANCHE_FUJI, settings.AVALANCHE_FUJI_RPC_URL, settings.AVALANCHE_FUJI_RPC_FALLBACK_URLS)
+chain_providers.register(VRF_CHAIN, settings.VRF_RPC_URL, settings.VRF_RPC_FALLBACK_URLS)
@@ -0,0 +1,142 @@
+"""
+Cache gas price, phí CCIP, estimate_gas và số dư ví server theo từng chain
+
+Các giá trị này gần như không đổi trong vài giây, nên đường mint chỉ còn các RPC
+ký + gửi transaction:
+- Mỗi loại giá trị có TTL riêng (config.chain_config.FEE_ORACLE_CONFIG)
+- Qua refresh_ahead * TTL thì làm mới nền, caller vẫn nhận ngay giá trị đang cache
+- Nhiều caller cùng miss một key chỉ gây ra một RPC
+- Lỗi RPC không được cache, caller tự quyết định fallback
+- Hit / miss được đếm trong utils.chain_metrics
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from config.chain_config import FEE_ORACLE_CONFIG
+from services.chain_providers import CHAIN_IDS, chain_providers
+from services.read_aggregator import get_read_aggregator
+from utils.chain_metrics import FEE_ORACLE_LOOKUPS, FEE_ORACLE_REFRESHES
+from utils.logger import api_logger
+
+GAS_PRICE = "gas_price"
+CCIP_FEE = "ccip_fee"
+GAS_ESTIMATE = "gas_estimate"
+BALANCE = "balance"
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    expires_at: float
+    refresh_at: float
+
+
+class FeeOracle:
+    def __init__(self, chain: str, config: Optional[Dict] = None):
+        self.chain = chain
+        self.config = {**FEE_ORACLE_CONFIG, **(config or {})}
+        self._entries: Dict[Tuple[str, Hashable], _CacheEntry] = {}
+        self._loading: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+
+    @property
+    def w3(self):
+        return chain_providers.get_w3(self.chain)
+
+    async def _get(self, kind: str, key: Hashable, loader: Callable[[], Awaitable]):
+        cache_key = (kind, key)
+        entry = self._entries.get(cache_key)
+        now = time.monotonic()
+        if entry is not None and now < entry.expires_at:
+            FEE_ORACLE_LOOKUPS.labels(self.chain, kind, "hit").inc()
+            if now >= entry.refresh_at and cache_key not in self._loading:
+                self._start_load(cache_key, loader, background=True)
+            return entry.value
+
+        FEE_ORACLE_LOOKUPS.labels(self.chain, kind, "miss").inc()
+        future = self._loading.get(cache_key) or self._start_load(cache_key, loader, background=False)
+        # shield: caller bị hủy không làm hủy RPC mà caller khác đang chờ
+        return await asyncio.shield(future)
+
+    def _start_load(self, cache_key, loader, background: bool) -> asyncio.Future:
+        future = asyncio.ensure_future(self._load(cache_key, loader, background))
+        self._loading[cache_key] = future
+        # Lấy exception ra để refresh nền lỗi không bị log "never retrieved"
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+
+    async def _load(self, cache_key, loader, background: bool):
+        kind, _ = cache_key
+        mode = "background" if background else "miss"
+        try:
+            value = await loader()
+        except Exception as e:
+            FEE_ORACLE_REFRESHES.labels(self.chain, kind, mode, "error").inc()
+            if background:
+                api_logger.warning(f"[FeeOracle] Background refresh of {self.chain} {kind} failed: {str(e)}")
+            raise
+        finally:
+            self._loading.pop(cache_key, None)
+
+        FEE_ORACLE_REFRESHES.labels(self.chain, kind, mode, "ok").inc()
+        ttl = self.config[f"{kind}_ttl"]
+        now = time.monotonic()
+        self._entries[cache_key] = _CacheEntry(value, now + ttl, now + ttl * self.config["refresh_ahead"])
+        return value
+
+    async def get_gas_price(self) -> int:
+        return await self._get(GAS_PRICE, None, lambda: self.w3.eth.gas_price)
+
+    async def get_balance(self, address: str) -> int:
+        return await self._get(BALANCE, address, lambda: get_read_aggregator(self.chain).get_balance(address))
+
+    def record_spend(self, address: str, amount: int):
+        """Trừ chi phí transaction vừa gửi khỏi số dư đang cache (tới lần làm mới tiếp theo)"""
+        entry = self._entries.get((BALANCE, address))
+        if entry is not None:
+            entry.value = max(0, entry.value - amount)
+
+    async def get_ccip_fee(self, router, destination_selector: int, receivers: list, extra_args: dict) -> int:
+        """Phí CCIP theo router, destination, receiver và kích thước data (data ABI encode theo bội 32 byte)"""
+        key = (
+            router.address,
+            destination_selector,
+            tuple((r["receiver"], len(r["data"])) for r in receivers),
+            extra_args["feeToken"]
+        )
+        return await self._get(
+            CCIP_FEE, key,
+            lambda: get_read_aggregator(self.chain).call(router.functions.getFee(destination_selector, receivers, "0x", extra_args))
+        )
+
+    async def estimate_gas(self, shape: Hashable, contract_call, tx_params: dict) -> int:
+        """
+        estimate_gas theo "loại call" do caller định nghĩa (vd: hàm + độ dài data),
+        không theo tham số cụ thể. Caller vẫn cộng buffer như khi estimate trực tiếp.
+        """
+        return await self._get(GAS_ESTIMATE, shape, lambda: contract_call.estimate_gas(tx_params))
+
+    def invalidate(self, kind: Optional[str] = None):
+        for cache_key in [k for k in self._entries if kind is None or k[0] == kind]:
+            del self._entries[cache_key]
+
+    def get_status(self) -> dict:
+        now = time.monotonic()
+        kinds: Dict[str, int] = {}
+        for (kind, _), entry in self._entries.items():
+            if now < entry.expires_at:
+                kinds[kind] = kinds.get(kind, 0) + 1
+        return {"chain": self.chain, "entries": kinds, "loading": len(self._loading)}
+
+
+_oracles: Dict[str, FeeOracle] = {}
+
+
+def get_fee_oracle(chain) -> FeeOracle:
+    """FeeOracle dùng chung của chain (tên chain trong services.chain_providers hoặc chain ID)"""
+    chain = CHAIN_IDS.get(chain, chain)
+    if chain not in _oracles:
+        _oracles[chain] = FeeOracle(chain)
+    return _oracles[chain]
@@ -0,0 +1,97 @@
+"""
+Mô hình kết quả trận đấu (pure, không I/O)
+
+Toàn bộ logic quyết định thắng/thua được tách khỏi challenge_handler và
+bot_goalkeeper_service để có thể dùng lại cho simulator/benchmark offline.
+Các hàm ở đây chỉ nhận giá trị random đã được rút sẵn (VRF hoặc local),
+không tự gọi random và không chạm tới database.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+KICKER = "kicker"
+GOALKEEPER = "goalkeeper"
+
+# Số giờ năng lượng tối đa của bot goalkeeper (xem bot_goalkeeper_service.MAX_HOURS)
+BOT_MAX_HOURS = 5
+
+
+def assign_roles(from_id: str, to_id: str, role_roll: int) -> Tuple[str, str]:
+    """
+    Gán vai trò cho 2 người chơi. role_roll == 0 nghĩa là from_id là kicker.
+
+    Returns:
+        (kicker_id, goalkeeper_id)
+    """
+    if role_roll == 0:
+        return from_id, to_id
+    return to_id, from_id
+
+
+def pick_skill(skills: List[str], roll: int) -> str:
+    """Chọn skill theo giá trị random đã rút (roll trong khoảng [0, len(skills)))"""
+    return skills[roll % len(skills)]
+
+
+def resolve_kick(kicker_skill_counter: Optional[str], goalkeeper_skill: str) -> str:
+    """
+    Quyết định vai trò thắng của một lượt sút.
+    Goalkeeper thắng nếu skill của goalkeeper là counter của skill kicker, ngược lại kicker thắng.
+
+    Args:
+        kicker_skill_counter: Trường "counter" của skill kicker (None nếu skill không có counter)
+        goalkeeper_skill: Tên skill goalkeeper đã chọn
+
+    Returns:
+        KICKER hoặc GOALKEEPER
+    """
+    if kicker_skill_counter is not None and kicker_skill_counter == goalkeeper_skill:
+        return GOALKEEPER
+    return KICKER
+
+
+def resolve_match(
+    kicker_id: str,
+    goalkeeper_id: str,
+    kicker_skill: str,
+    goalkeeper_skill: str,
+    kicker_skill_counter: Optional[str]
+) -> Dict[str, str]:
+    """
+    Kết quả một trận đấu khi đã biết vai trò và skill của mỗi bên.
+
+    Returns:
+        dict gồm winner_id, loser_id, winner_role, loser_role, kicker_skill, goalkeeper_skill
+    """
+    winner_role = resolve_kick(kicker_skill_counter, goalkeeper_skill)
+    if winner_role == KICKER:
+        winner_id, loser_id, loser_role = kicker_id, goalkeeper_id, GOALKEEPER
+    else:
+        winner_id, loser_id, loser_role = goalkeeper_id, kicker_id, KICKER
+    return {
+        "winner_id": winner_id,
+        "loser_id": loser_id,
+        "winner_role": winner_role,
+        "loser_role": loser_role,
+        "kicker_skill": kicker_skill,
+        "goalkeeper_skill": goalkeeper_skill
+    }
+
+
+def resolve_save(feed_quota: float, roll: float, max_hours: float = BOT_MAX_HOURS) -> bool:
+    """
+    Bot goalkeeper có cản phá thành công không.
+    - Hết năng lượng: luôn thua
+    - Năng lượng > 50%: luôn cản được
+    - Còn lại: cản được với xác suất bằng % năng lượng
+
+    Args:
+        feed_quota: Số giờ năng lượng còn lại của bot
+        roll: Số random trong khoảng [0, 1)
+    """
+    if feed_quota <= 0:
+        return False
+    percent = feed_quota / max_hours
+    if percent > 0.5:
+        return True
+    return roll < percent
@@ -0,0 +1,435 @@
+"""
+Write-behind pipeline cho kết quả trận đấu PvP
+
+Luồng xử lý:
+1. challenge_handler tính kết quả trận, submit job vào pipeline rồi gửi ngay
+   challenge_result (commit_status = "pending") với chỉ số dự kiến cho 2 người chơi
+2. Worker ghi DB (match_history + stats), tính lại level, phát hiện milestone NFT
+   rồi gửi match_committed với dữ liệu thực tế. Hết số lần retry thì job được lưu
+   vào match_commit_failures và cả 2 người chơi nhận match_commit_failed
+3. Leaderboard được refresh có debounce thay vì query lại sau mỗi trận
+
+Đảm bảo:
+- Thứ tự theo từng user: job của một user được commit đúng thứ tự submit
+  (một job chỉ chạy khi đứng đầu hàng đợi của CẢ HAI người chơi)
+- Bounded: submit phải chờ khi số job chưa commit đạt giới hạn (backpressure)
+- Idempotent theo match_id: retry không cộng điểm 2 lần
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from prometheus_client import Counter, Gauge, Histogram
+
+from config.settings import settings
+from database.database import get_database
+from utils.logger import api_logger
+from utils.level_utils import get_total_point_for_level, get_basic_level, get_legend_level, update_user_levels
+
+MATCH_COMMIT_QUEUE_DEPTH = Gauge(
+    'match_commit_queue_depth',
+    'Match results acknowledged but not yet committed'
+)
+MATCH_COMMIT_LATENCY = Histogram(
+    'match_commit_latency_seconds',
+    'Time from match resolution to committed result',
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+MATCH_COMMIT_RETRIES = Counter(
+    'match_commit_retries_total',
+    'Match commit attempts that failed and were retried'
+)
+MATCH_COMMIT_FAILURES = Counter(
+    'match_commit_failures_total',
+    'Match commits that exhausted all retries'
+)
+
+WIN_INC_BY_ROLE = {
+    "kicker": {"kicked_win": 1, "total_kicked": 1},
+    "goalkeeper": {"keep_win": 1, "total_keep": 1},
+}
+LOSS_INC_BY_ROLE = {
+    "kicker": {"total_kicked": 1},
+    "goalkeeper": {"total_keep": 1},
+}
+
+
+def project_level(user: dict) -> Dict:
+    """Level dự kiến từ user doc (không ghi DB), cùng công thức với update_user_levels"""
+    total_point_for_level = get_total_point_for_level(user)
+    new_level = get_basic_level(total_point_for_level)
+    can_level_up = new_level > user.get("level", 1)
+    is_pro = new_level >= 100
+    if is_pro:
+        new_level = 100
+        legend_level = get_legend_level(total_point_for_level)
+    else:
+        legend_level = 0
+    return {
+        "level": new_level,
+        "is_pro": is_pro,
+        "legend_level": legend_level,
+        "total_point_for_level": total_point_for_level,
+        "can_level_up": can_level_up
+    }
+
+
+def match_stat_inc(user: dict, won: bool, role: str, consume_match: bool = True) -> Dict[str, int]:
+    """Các trường $inc của user sau một trận"""
+    inc = dict(WIN_INC_BY_ROLE[role] if won else LOSS_INC_BY_ROLE[role])
+    if won:
+        inc["total_point"] = 1
+        inc["available_skill_points"] = 1
+    if consume_match and not user.get("is_vip", False):
+        inc["remaining_matches"] = -1
+    return inc
+
+
+def apply_match_to_user(user: dict, won: bool, role: str, consume_match: bool = True) -> dict:
+    """Bản sao user doc sau khi áp dụng kết quả trận (tính trong memory)"""
+    projected = dict(user)
+    inc = match_stat_inc(user, won, role, consume_match)
+    for field, value in inc.items():
+        projected[field] = projected.get(field, 0) + value
+    return projected
+
+
+def project_match_stats(winner: dict, loser: dict, winner_role: str, loser_role: str) -> Dict:
+    """
+    match_stats dự kiến cho challenge_result, tính từ user doc trước trận.
+    Cấu trúc giống với match_stats đã commit để client hiển thị ngay.
+    """
+    projected_winner = apply_match_to_user(winner, True, winner_role)
+    projected_loser = apply_match_to_user(loser, False, loser_role)
+    levels = project_level(projected_winner)
+    level_up = levels["level"] > winner.get("level", 1)
+    return {
+        "winner": _user_stats(projected_winner, winner_role, {
+            "level": levels["level"],
+            "is_pro": levels["is_pro"],
+            "legend_level": levels["legend_level"],
+            "level_up": level_up,
+            "new_skills": [f"{winner_role}_skill_level_{levels['level']}"] if level_up and not levels["is_pro"] else [],
+            "can_level_up": levels["can_level_up"],
+            "total_point_for_level": levels["total_point_for_level"]
+        }),
+        "loser": _user_stats(projected_loser, loser_role)
+    }
+
+
+def _user_stats(user: dict, role: str, extra: Optional[Dict] = None) -> Dict:
+    stats = {
+        "id": str(user["_id"]),
+        "name": user.get("name", "Anonymous"),
+        "role": role,
+        "total_point": user.get("total_point", 0),
+        "remaining_matches": user.get("remaining_matches", 0),
+        "is_pro": user.get("is_pro", False),
+        "legend_level": user.get("legend_level", 0),
+        "level": user.get("level", 1),
+        "available_skill_points": user.get("available_skill_points", 0)
+    }
+    if extra:
+        stats.update(extra)
+    return stats
+
+
+class MatchCommitJob:
+    def __init__(self, match_history: Dict, winner: dict, loser: dict):
+        self.match_history = match_history
+        self.match_id = match_history["match_id"]
+        self.winner_id = str(winner["_id"])
+        self.loser_id = str(loser["_id"])
+        self.winner_role = match_history["winner_role"]
+        self.loser_role = match_history["loser_role"]
+        self.winner_is_vip = winner.get("is_vip", False)
+        self.loser_is_vip = loser.get("is_vip", False)
+        # Level trước trận, dùng để phát hiện level up khi commit
+        self.winner_level = winner.get("level", 1)
+        self.user_ids = (self.winner_id, self.loser_id)
+        self.created_at = time.monotonic()
+        self.attempts = 0
+        # Các bước side effect đã xong, để retry không làm lại (vd: mint NFT 2 lần)
+        self.completed_steps = set()
+        self.result: Dict = {}
+
+
+class MatchCommitPipeline:
+    def __init__(
+        self,
+        max_pending: int = 1000,
+        workers: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        leaderboard_debounce: float = 1.0
+    ):
+        self.max_pending = max_pending
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.leaderboard_debounce = leaderboard_debounce
+        # Hàng đợi theo user: job chỉ chạy khi đứng đầu hàng đợi của mọi người chơi trong trận
+        self._user_queues: Dict[str, deque] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._pending = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._leaderboard_task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self):
+        if self._ready is None:
+            self._ready = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._idle = asyncio.Event()
+            self._idle.set()
+        if not self._worker_tasks or all(t.done() for t in self._worker_tasks):
+            self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def pending_for(self, user_id: str) -> int:
+        """Số trận của user đã có kết quả nhưng chưa commit"""
+        queue = self._user_queues.get(user_id)
+        return len(queue) if queue else 0
+
+    @property
+    def depth(self) -> int:
+        return self._pending
+
+    async def submit(self, job: MatchCommitJob):
+        """Đưa job vào pipeline; chờ nếu số job chưa commit đã đạt max_pending"""
+        self._ensure_started()
+        await self._slots.acquire()
+        self._pending += 1
+        self._idle.clear()
+        MATCH_COMMIT_QUEUE_DEPTH.set(self._pending)
+        for user_id in job.user_ids:
+            self._user_queues.setdefault(user_id, deque()).append(job)
+        if self._is_ready(job):
+            self._ready.put_nowait(job)
+
+    def _is_ready(self, job: MatchCommitJob) -> bool:
+        return all(self._user_queues[user_id][0] is job for user_id in job.user_ids)
+
+    def _release(self, job: MatchCommitJob):
+        """Gỡ job khỏi hàng đợi các user và đẩy các job kế tiếp đã sẵn sàng"""
+        next_jobs = []
+        for user_id in job.user_ids:
+            queue = self._user_queues[user_id]
+            queue.popleft()
+            if not queue:
+                del self._user_queues[user_id]
+            elif not any(queue[0] is j for j in next_jobs):
+                next_jobs.append(queue[0])
+        for next_job in next_jobs:
+            if self._is_ready(next_job):
+                self._ready.put_nowait(next_job)
+
+        self._pending -= 1
+        MATCH_COMMIT_QUEUE_DEPTH.set(self._pending)
+        self._slots.release()
+        if self._pending == 0:
+            self._idle.set()
+
+    async def _worker(self):
+        while True:
+            job = await self._ready.get()
+            try:
+                await self._run_with_retry(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                api_logger.error(f"[MatchPipeline] Unexpected error for match {job.match_id}: {str(e)}")
+            finally:
+                self._release(job)
+
+    async def _run_with_retry(self, job: MatchCommitJob):
+        while True:
+            job.attempts += 1
+            try:
+                await self._commit(job)
+                MATCH_COMMIT_LATENCY.observe(time.monotonic() - job.created_at)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if job.attempts > self.max_retries:
+                    MATCH_COMMIT_FAILURES.inc()
+                    api_logger.error(f"[MatchPipeline] Giving up on match {job.match_id} after {job.attempts} attempts: {str(e)}")
+                    await self._record_failure(job, e)
+                    await self._notify_failed(job)
+                    return
+                MATCH_COMMIT_RETRIES.inc()
+                api_logger.warning(f"[MatchPipeline] Commit failed for match {job.match_id} (attempt {job.attempts}): {str(e)}")
+                await asyncio.sleep(self.retry_backoff * (2 ** (job.attempts - 1)))
+
+    async def _commit(self, job: MatchCommitJob):
+        db = await get_database()
+        winner_oid = ObjectId(job.winner_id)
+        loser_oid = ObjectId(job.loser_id)
+
+        # Ghi kết quả - filter theo match_id để retry không cộng 2 lần
+        if "winner_stats" not in job.completed_steps:
+            inc = dict(WIN_INC_BY_ROLE[job.winner_role], total_point=1, available_skill_points=1)
+            if not job.winner_is_vip:
+                inc["remaining_matches"] = -1
+            await db.users.update_one(
+                {"_id": winner_oid, "match_history.match_id": {"$ne": job.match_id}},
+                {"$push": {"match_history": job.match_history}, "$inc": inc}
+            )
+            job.completed_steps.add("winner_stats")
+
+        if "loser_stats" not in job.completed_steps:
+            inc = dict(LOSS_INC_BY_ROLE[job.loser_role])
+            if not job.loser_is_vip:
+                inc["remaining_matches"] = -1
+            await db.users.update_one(
+                {"_id": loser_oid, "match_history.match_id": {"$ne": job.match_id}},
+                {"$push": {"match_history": job.match_history}, "$inc": inc}
+            )
+            job.completed_steps.add("loser_stats")
+
+        # Level recompute cho winner
+        if "levels" not in job.completed_steps:
+            new_levels = await update_user_levels(winner_oid, db)
+            new_skills = []
+            if new_levels:
+                level_up = new_levels["level"] > job.winner_level
+                if level_up and not new_levels["is_pro"]:
+                    new_skills = [f"{job.winner_role}_skill_level_{new_levels['level']}"]
+                    await db.users.update_one(
+                        {"_id": winner_oid},
+                        {"$addToSet": {f"{job.winner_role}_skills": {"$each": new_skills}}}
+                    )
+            job.result["new_levels"] = new_levels or {}
+            job.result["new_skills"] = new_skills
+            job.completed_steps.add("levels")
+
+        updated_winner = await db.users.find_one({"_id": winner_oid})
+        updated_loser = await db.users.find_one({"_id": loser_oid})
+        if not updated_winner or not updated_loser:
+            raise RuntimeError(f"User not found after commit: winner_id={job.winner_id}, loser_id={job.loser_id}")
+
+        # Milestone NFT: mỗi 10 trận thắng. Job của user được commit theo thứ tự
+        # nên trận này chính là trận thắng cuối cùng của winner.
+        if "milestone" not in job.completed_steps:
+            total_win = updated_winner.get("kicked_win", 0) + updated_winner.get("keep_win", 0)
+            if total_win > 0 and total_win % 10 == 0:
+                await self.enqueue_milestone_mint(updated_winner, job.winner_id, total_win)
+            job.completed_steps.add("milestone")
+
+        if "notify" not in job.completed_steps:
+            await self._notify_committed(job, updated_winner, updated_loser)
+            job.completed_steps.add("notify")
+
+        self._schedule_leaderboard_refresh()
+
+    async def enqueue_milestone_mint(self, winner: dict, winner_id: str, total_win: int):
+        player_address = winner.get("wallet") or winner.get("evm_address")
+        player_name = winner.get("name", "Anonymous Player")
+        if not player_address:
+            api_logger.warning(f"Player {winner_id} has no wallet address for Victory NFT minting")
+            return
+        from services.mint_queue import mint_queue
+        api_logger.info(f"Player {player_name} reached milestone {total_win // 10} ({total_win} wins), queueing Victory NFT mint")
+        # Job được lưu trước khi đánh dấu bước milestone xong, retry commit không tạo job trùng
+        await mint_queue.enqueue(player_address, total_win, player_name, winner_id)
+
+    async def _notify_committed(self, job: MatchCommitJob, updated_winner: dict, updated_loser: dict):
+        from ws_handlers.waiting_room import manager
+        new_levels = job.result.get("new_levels", {})
+        new_skills = job.result.get("new_skills", [])
+        message = {
+            "type": "match_committed",
+            "match_id": job.match_id,
+            "winner_id": job.winner_id,
+            "match_stats": {
+                "winner": _user_stats(updated_winner, job.winner_role, {
+                    "level_up": new_levels.get("level", job.winner_level) > job.winner_level,
+                    "new_skills": new_skills,
+                    "can_level_up": new_levels.get("can_level_up", False),
+                    "total_point_for_level": new_levels.get("total_point_for_level", 0)
+                }),
+                "loser": _user_stats(updated_loser, job.loser_role)
+            }
+        }
+        await manager.send_personal_message(message, job.winner_id)
+        await manager.send_personal_message(message, job.loser_id)
+
+    async def _notify_failed(self, job: MatchCommitJob):
+        """Kết quả đã báo (commit_status = "pending") không được lưu: client bỏ chỉ số dự kiến"""
+        try:
+            from ws_handlers.waiting_room import manager
+            message = {
+                "type": "match_commit_failed",
+                "match_id": job.match_id,
+                "winner_id": job.winner_id,
+                "message": "Match result could not be saved"
+            }
+            await manager.send_personal_message(message, job.winner_id)
+            await manager.send_personal_message(message, job.loser_id)
+        except Exception as e:
+            api_logger.error(f"[MatchPipeline] Failed to notify failed match {job.match_id}: {str(e)}")
+
+    async def _record_failure(self, job: MatchCommitJob, error: Exception):
+        """Lưu job commit thất bại để xử lý thủ công"""
+        try:
+            db = await get_database()
+            await db.match_commit_failures.update_one(
+                {"match_id": job.match_id},
+                {"$set": {
+                    "match_id": job.match_id,
+                    "match_history": job.match_history,
+                    "completed_steps": sorted(job.completed_steps),
+                    "attempts": job.attempts,
+                    "error": str(error)
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            api_logger.error(f"[MatchPipeline] Failed to record failed match {job.match_id}: {str(e)}")
+
+    def _schedule_leaderboard_refresh(self):
+        """Gộp nhiều trận commit gần nhau thành một lần refresh leaderboard"""
+        if self._leaderboard_task is None or self._leaderboard_task.done():
+            self._leaderboard_task = asyncio.create_task(self._refresh_leaderboard())
+
+    async def _refresh_leaderboard(self):
+        await asyncio.sleep(self.leaderboard_debounce)
+        try:
+            from ws_handlers.waiting_room import manager
+            await manager._broadcast_leaderboard()
+            await manager.broadcast_user_list()
+        except Exception as e:
+            api_logger.error(f"[MatchPipeline] Error refreshing leaderboard: {str(e)}")
+
+    async def drain(self, timeout: float = 10):
+        """Chờ các job đang chờ commit xong (dùng khi shutdown)"""
+        if self._idle is None:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            api_logger.warning(f"[MatchPipeline] Shutdown with {self._pending} uncommitted matches")
+
+    async def cleanup(self):
+        await self.drain()
+        for task in self._worker_tasks + ([self._leaderboard_task] if self._leaderboard_task else []):
+            task.cancel()
+        for task in self._worker_tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._worker_tasks = []
+
+
+# Singleton instance
+match_pipeline = MatchCommitPipeline(
+    max_pending=settings.MATCH_COMMIT_MAX_PENDING,
+    workers=settings.MATCH_COMMIT_WORKERS,
+    max_retries=settings.MATCH_COMMIT_MAX_RETRIES,
+    leaderboard_debounce=settings.LEADERBOARD_REFRESH_DEBOUNCE_SECONDS
+)
@@ -0,0 +1,205 @@
+"""
+Simulator kết quả trận đấu dạng vector (NumPy)
+
+Dùng cùng mô hình với services/match_outcome.py nhưng xử lý hàng triệu trận
+trong một lần gọi, không cần MongoDB hay VRF. Dùng cho benchmark cân bằng game
+(scripts/benchmark_match_outcome.py).
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.match_outcome import BOT_MAX_HOURS
+
+NO_COUNTER = -1
+
+
+class SkillCatalog:
+    """
+    Ánh xạ tên skill sang chỉ số nguyên và bảng counter tương ứng.
+    counter_of[kicker_idx] = goalkeeper_idx của skill counter, hoặc NO_COUNTER.
+    """
+
+    def __init__(self, skills: Sequence[Dict]):
+        self.kicker_names: List[str] = []
+        self.goalkeeper_names: List[str] = []
+        self._kicker_index: Dict[str, int] = {}
+        self._goalkeeper_index: Dict[str, int] = {}
+        self._counters: Dict[str, Optional[str]] = {}
+
+        for skill in skills:
+            if skill.get("type") == "kicker":
+                self.kicker_index(skill["name"])
+                self._counters[skill["name"]] = skill.get("counter")
+            elif skill.get("type") == "goalkeeper":
+                self.goalkeeper_index(skill["name"])
+
+    def kicker_index(self, name: str) -> int:
+        """Chỉ số của skill kicker; skill chưa biết (vd: kicker_skill_level_N) được thêm mới, không có counter"""
+        if name not in self._kicker_index:
+            self._kicker_index[name] = len(self.kicker_names)
+            self.kicker_names.append(name)
+        return self._kicker_index[name]
+
+    def goalkeeper_index(self, name: str) -> int:
+        if name not in self._goalkeeper_index:
+            self._goalkeeper_index[name] = len(self.goalkeeper_names)
+            self.goalkeeper_names.append(name)
+        return self._goalkeeper_index[name]
+
+    def counter_table(self) -> np.ndarray:
+        table = np.full(len(self.kicker_names), NO_COUNTER, dtype=np.int64)
+        for name, idx in self._kicker_index.items():
+            counter = self._counters.get(name)
+            if counter is not None and counter in self._goalkeeper_index:
+                table[idx] = self._goalkeeper_index[counter]
+        return table
+
+
+def pad_pools(pools: Sequence[Sequence[int]]):
+    """
+    Gom danh sách skill pool (độ dài khác nhau) thành ma trận có padding.
+
+    Returns:
+        (matrix[n_pools, max_len], lengths[n_pools])
+    """
+    lengths = np.array([len(p) for p in pools], dtype=np.int64)
+    if (lengths == 0).any():
+        raise ValueError("Every skill pool needs at least one skill")
+    matrix = np.zeros((len(pools), int(lengths.max())), dtype=np.int64)
+    for i, pool in enumerate(pools):
+        matrix[i, :len(pool)] = pool
+    return matrix, lengths
+
+
+def simulate_kicks(
+    kicker_pools: np.ndarray,
+    kicker_lengths: np.ndarray,
+    goalkeeper_pools: np.ndarray,
+    goalkeeper_lengths: np.ndarray,
+    kicker_pool_ids: np.ndarray,
+    goalkeeper_pool_ids: np.ndarray,
+    counter_of: np.ndarray,
+    rng: Optional[np.random.Generator] = None,
+    kicker_rolls: Optional[np.ndarray] = None,
+    goalkeeper_rolls: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Phiên bản vector của match_outcome.pick_skill + resolve_kick.
+
+    Mỗi phần tử i là một lượt sút giữa pool kicker_pool_ids[i] và goalkeeper_pool_ids[i].
+    Có thể truyền sẵn kicker_rolls/goalkeeper_rolls (số nguyên bất kỳ >= 0, lấy modulo
+    độ dài pool như pick_skill) để so khớp với bản scalar.
+
+    Returns:
+        Mảng bool, True nếu kicker thắng
+    """
+    k_len = kicker_lengths[kicker_pool_ids]
+    g_len = goalkeeper_lengths[goalkeeper_pool_ids]
+    if kicker_rolls is None:
+        kicker_rolls = (rng.random(len(kicker_pool_ids)) * k_len).astype(np.int64)
+    if goalkeeper_rolls is None:
+        goalkeeper_rolls = (rng.random(len(goalkeeper_pool_ids)) * g_len).astype(np.int64)
+
+    kicker_skill = kicker_pools[kicker_pool_ids, kicker_rolls % k_len]
+    goalkeeper_skill = goalkeeper_pools[goalkeeper_pool_ids, goalkeeper_rolls % g_len]
+    return counter_of[kicker_skill] != goalkeeper_skill
+
+
+def simulate_win_rate_matrix(
+    catalog: SkillCatalog,
+    profiles: Sequence[Dict],
+    matches_per_pair: int,
+    rng: np.random.Generator,
+    chunk_size: int = 2_000_000
+) -> np.ndarray:
+    """
+    Ma trận tỉ lệ thắng giữa các profile người chơi (PvP, vai trò random 50/50).
+
+    Args:
+        profiles: Danh sách dict có "kicker_skills" và "goalkeeper_skills"
+        matches_per_pair: Số trận mô phỏng cho mỗi cặp (i, j)
+
+    Returns:
+        matrix[i, j] = tỉ lệ thắng của profile i khi đấu với profile j
+    """
+    kicker_pools, kicker_lengths = pad_pools(
+        [[catalog.kicker_index(s) for s in p["kicker_skills"]] for p in profiles]
+    )
+    goalkeeper_pools, goalkeeper_lengths = pad_pools(
+        [[catalog.goalkeeper_index(s) for s in p["goalkeeper_skills"]] for p in profiles]
+    )
+    counter_of = catalog.counter_table()
+
+    n_profiles = len(profiles)
+    total = n_profiles * n_profiles * matches_per_pair
+    wins = np.zeros(n_profiles * n_profiles, dtype=np.int64)
+
+    # Chia chunk để giới hạn bộ nhớ khi mô phỏng hàng chục triệu trận
+    for start in range(0, total, chunk_size):
+        match_ids = np.arange(start, min(start + chunk_size, total), dtype=np.int64)
+        pair_ids = match_ids // matches_per_pair
+        a_ids = pair_ids // n_profiles
+        b_ids = pair_ids % n_profiles
+
+        a_is_kicker = rng.random(len(match_ids)) < 0.5
+        kicker_ids = np.where(a_is_kicker, a_ids, b_ids)
+        goalkeeper_ids = np.where(a_is_kicker, b_ids, a_ids)
+
+        kicker_wins = simulate_kicks(
+            kicker_pools, kicker_lengths, goalkeeper_pools, goalkeeper_lengths,
+            kicker_ids, goalkeeper_ids, counter_of, rng
+        )
+        a_wins = kicker_wins == a_is_kicker
+        wins += np.bincount(pair_ids[a_wins], minlength=n_profiles * n_profiles)
+
+    return (wins / matches_per_pair).reshape(n_profiles, n_profiles)
+
+
+def simulate_bot_saves(
+    feed_quota: np.ndarray,
+    rng: Optional[np.random.Generator] = None,
+    rolls: Optional[np.ndarray] = None,
+    max_hours: float = BOT_MAX_HOURS
+) -> np.ndarray:
+    """Phiên bản vector của match_outcome.resolve_save"""
+    feed_quota = np.asarray(feed_quota, dtype=np.float64)
+    if rolls is None:
+        rolls = rng.random(feed_quota.shape)
+    percent = feed_quota / max_hours
+    return (feed_quota > 0) & ((percent > 0.5) | (rolls < percent))
+
+
+def build_level_profile(
+    catalog: SkillCatalog,
+    level: int,
+    bought_skills: int,
+    rng: np.random.Generator
+) -> Dict:
+    """
+    Tạo skill set điển hình cho một người chơi ở level cho trước.
+    - 1 skill khởi tạo + bought_skills skill mua thêm (skill thật, khác nhau) mỗi loại
+    - Mỗi lần lên level (2..level, tối đa 99) nhận thêm skill "<role>_skill_level_N",
+      luân phiên giữa kicker và goalkeeper
+    """
+    real_kickers = [n for n in catalog.kicker_names if not n.startswith("kicker_skill_level_")]
+    real_goalkeepers = [n for n in catalog.goalkeeper_names if not n.startswith("goalkeeper_skill_level_")]
+
+    n_kick = min(1 + bought_skills, len(real_kickers))
+    n_keep = min(1 + bought_skills, len(real_goalkeepers))
+    kicker_skills = [str(s) for s in rng.choice(real_kickers, size=n_kick, replace=False)]
+    goalkeeper_skills = [str(s) for s in rng.choice(real_goalkeepers, size=n_keep, replace=False)]
+
+    for lvl in range(2, min(level, 99) + 1):
+        if lvl % 2 == 0:
+            kicker_skills.append(f"kicker_skill_level_{lvl}")
+        else:
+            goalkeeper_skills.append(f"goalkeeper_skill_level_{lvl}")
+
+    return {
+        "level": level,
+        "bought_skills": bought_skills,
+        "kicker_skills": kicker_skills,
+        "goalkeeper_skills": goalkeeper_skills
+    }
@@ -0,0 +1,199 @@
+"""
+Sổ mint Victory NFT local (collection victory_mint_ledger), nguồn quyết định một
+milestone đã / đang được mint hay chưa
+
+- Unique index (player_key, milestone, chain_id): mỗi milestone trên mỗi chain chỉ
+  có một entry, hai lần mint đồng thời không thể cùng claim
+- Mint được claim nguyên tử (insert entry "pending") trước khi gửi transaction, rồi
+  chuyển "submitted" (đã có tx hash) và "confirmed" (đã mine)
+- Mint lỗi khi chưa gửi transaction thì nhả claim (xóa entry "pending"); entry
+  "submitted" được giữ lại vì transaction có thể vẫn được mine, chỉ claim cũ (cùng
+  claim_id, vd: job mint chạy lại) được claim lại. Entry "submitted" lưu hash và
+  nonce của transaction để lần chạy lại xác định transaction cũ trước khi gửi mới
+- Indexer Victory NFT ghi entry "confirmed" cho mọi NFT thấy trên chain, nên
+  milestone mint trước khi có sổ (hoặc ghi sổ lỗi) vẫn có trong sổ
+
+Eligibility chỉ cần một lookup theo unique index: `await mint_ledger.get_entry(...)`.
+"""
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from database.database import get_database
+from utils.chain_metrics import MINT_LEDGER_CLAIMS
+from utils.logger import api_logger
+
+VICTORY_MINT_LEDGER_COLLECTION = "victory_mint_ledger"
+
+LEDGER_PENDING = "pending"
+LEDGER_SUBMITTED = "submitted"
+LEDGER_CONFIRMED = "confirmed"
+LEDGER_STATUSES = (LEDGER_PENDING, LEDGER_SUBMITTED, LEDGER_CONFIRMED)
+
+
+async def ensure_mint_ledger_indexes(db):
+    await db[VICTORY_MINT_LEDGER_COLLECTION].create_index(
+        [("player_key", ASCENDING), ("milestone", ASCENDING), ("chain_id", ASCENDING)], unique=True
+    )
+    await db[VICTORY_MINT_LEDGER_COLLECTION].create_index([("status", ASCENDING), ("updated_at", ASCENDING)])
+
+
+def _key(player_address: str, milestone: int, chain_id: int) -> dict:
+    return {"player_key": player_address.lower(), "milestone": milestone, "chain_id": chain_id}
+
+
+class MintLedger:
+    def __init__(self):
+        self._indexes_ready = False
+
+    async def _collection(self):
+        db = await get_database()
+        if not self._indexes_ready:
+            await ensure_mint_ledger_indexes(db)
+            self._indexes_ready = True
+        return db[VICTORY_MINT_LEDGER_COLLECTION]
+
+    async def claim(self, player_address: str, milestone: int, chain_id: int, claim_id: str) -> Tuple[dict, bool]:
+        """
+        Claim milestone trước khi mint.
+        Returns: (entry, claimed), claimed = False nếu milestone đã được claim bởi
+        claim_id khác hoặc đã confirmed (entry trả về là entry hiện có).
+        Claim lại entry "submitted" của chính claim_id: transaction đã gửi (hash, nonce
+        trong entry) có thể vẫn được mine, caller phải xác định nó trước khi gửi mới.
+        """
+        collection = await self._collection()
+        now = datetime.utcnow()
+        entry = {
+            **_key(player_address, milestone, chain_id),
+            "player_address": player_address,
+            "status": LEDGER_PENDING,
+            "claim_id": claim_id,
+            "transaction_hash": None,
+            "nonce": None,
+            "token_id": None,
+            "claimed_at": now,
+            "updated_at": now
+        }
+        try:
+            result = await collection.insert_one(entry)
+            entry["_id"] = result.inserted_id
+            MINT_LEDGER_CLAIMS.labels(result="claimed").inc()
+            return entry, True
+        except DuplicateKeyError:
+            pass
+
+        existing = await collection.find_one(_key(player_address, milestone, chain_id))
+        if existing is None:
+            # Entry vừa bị nhả giữa insert và find: thử lại một lần
+            return await self.claim(player_address, milestone, chain_id, claim_id)
+        if existing["status"] != LEDGER_CONFIRMED and existing.get("claim_id") == claim_id:
+            MINT_LEDGER_CLAIMS.labels(result="reclaimed").inc()
+            return existing, True
+        MINT_LEDGER_CLAIMS.labels(result=existing["status"]).inc()
+        return existing, False
+
+    async def mark_submitted(self, player_address: str, milestone: int, chain_id: int, claim_id: str,
+                             transaction_hash: str, nonce: Optional[int] = None):
+        collection = await self._collection()
+        await collection.update_one(
+            {**_key(player_address, milestone, chain_id), "claim_id": claim_id, "status": {"$ne": LEDGER_CONFIRMED}},
+            {"$set": {
+                "status": LEDGER_SUBMITTED,
+                "transaction_hash": transaction_hash,
+                "nonce": nonce,
+                "updated_at": datetime.utcnow()
+            }}
+        )
+
+    async def mark_confirmed(
+        self,
+        player_address: str,
+        milestone: int,
+        chain_id: int,
+        transaction_hash: Optional[str] = None,
+        token_id: Optional[int] = None
+    ) -> dict:
+        """Milestone đã có NFT trên chain (upsert: mint ngoài sổ cũng được ghi nhận)"""
+        collection = await self._collection()
+        now = datetime.utcnow()
+        update = {"status": LEDGER_CONFIRMED, "confirmed_at": now, "updated_at": now}
+        if transaction_hash is not None:
+            update["transaction_hash"] = transaction_hash
+        if token_id is not None:
+            update["token_id"] = token_id
+        try:
+            return await collection.find_one_and_update(
+                _key(player_address, milestone, chain_id),
+                {"$set": update, "$setOnInsert": {"player_address": player_address, "claim_id": None, "claimed_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Upsert đồng thời với claim: entry đã tồn tại, cập nhật lại
+            return await collection.find_one_and_update(
+                _key(player_address, milestone, chain_id), {"$set": update}, return_document=ReturnDocument.AFTER
+            )
+
+    async def record_minted(self, chain_id: int, tokens: List[dict]):
+        """
+        Ghi hàng loạt NFT thấy trên chain (indexer) là confirmed.
+        tokens: [{"player", "milestone", "token_id", "transaction_hash"}]
+        """
+        if not tokens:
+            return
+        collection = await self._collection()
+        now = datetime.utcnow()
+        operations = [UpdateOne(
+            _key(token["player"], token["milestone"], chain_id),
+            {
+                "$set": {
+                    "status": LEDGER_CONFIRMED,
+                    "transaction_hash": token["transaction_hash"],
+                    "token_id": token["token_id"],
+                    "confirmed_at": now,
+                    "updated_at": now
+                },
+                "$setOnInsert": {"player_address": token["player"], "claim_id": None, "claimed_at": now}
+            },
+            upsert=True
+        ) for token in tokens]
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Upsert trùng với claim đồng thời: lần quét sau / mark_confirmed của mint sẽ ghi lại
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+
+    async def release(self, player_address: str, milestone: int, chain_id: int, claim_id: str) -> bool:
+        """Nhả claim của mint lỗi khi transaction chưa được gửi"""
+        collection = await self._collection()
+        result = await collection.delete_one(
+            {**_key(player_address, milestone, chain_id), "claim_id": claim_id, "status": LEDGER_PENDING}
+        )
+        if result.deleted_count:
+            api_logger.info(f"[MintLedger] Released claim on {player_address} milestone {milestone} (chain {chain_id})")
+        return bool(result.deleted_count)
+
+    async def get_entry(self, player_address: str, milestone: int, chain_id: int) -> Optional[dict]:
+        collection = await self._collection()
+        return await collection.find_one(_key(player_address, milestone, chain_id))
+
+    async def get_player_entries(self, player_address: str) -> List[dict]:
+        collection = await self._collection()
+        return await collection.find(
+            {"player_key": player_address.lower()}
+        ).sort("milestone", ASCENDING).to_list(length=None)
+
+    async def get_stats(self) -> dict:
+        collection = await self._collection()
+        counts = {status: 0 for status in LEDGER_STATUSES}
+        async for row in collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+
+# Singleton instance
+mint_ledger = MintLedger()
@@ -0,0 +1,665 @@
+"""
+Hàng đợi mint Victory NFT lưu trong MongoDB (collection mint_jobs)
+
+- Idempotent theo (player, milestone, chain đích): unique index cùng khóa với sổ mint,
+  enqueue lần 2 trả về job cũ
+- Số mint chạy đồng thời bị giới hạn bởi số worker mỗi process
+- Job được claim nguyên tử (find_one_and_update) kèm lease, worker crash / restart
+  thì job được worker khác chạy lại khi lease hết hạn
+- Lỗi tạm thời được retry với exponential backoff, quá max_attempts hoặc lỗi không
+  thể retry thì job vào dead letter (status "dead") và có thể chạy lại qua API
+- Trước khi gửi transaction, milestone được claim trong sổ mint (services.mint_ledger,
+  unique theo player + milestone + chain đích): đã có NFT thì job thành công không mint,
+  đang được mint bởi claim khác thì retry sau
+- Job chạy lại (vd: chờ receipt quá timeout) mà sổ đã có transaction của chính nó thì
+  transaction cũ được xác định trước: đã mine thì job thành công, còn pending thì
+  requeue không gửi lại, chỉ gửi transaction mới khi transaction cũ bị revert / drop
+
+Job "ccip" mint cross-chain qua ccip_service, job "direct" mint trực tiếp qua
+victory_nft_service. Khi MINT_BATCH_SIZE > 1, job "direct" mới được gom mỗi
+batch_window thành một transaction batchMintVictoryNFT, job lỗi trong batch được
+retry riêng lẻ bởi worker. MINT_BACKEND=simulated thay chain bằng backend giả lập
+(latency / tỉ lệ lỗi trong MINT_SIMULATION_CONFIG) để chạy không cần testnet.
+"""
+
+import asyncio
+import os
+import random
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from web3.exceptions import TransactionNotFound
+
+from config.chain_config import MINT_QUEUE_CONFIG, MINT_SIMULATION_CONFIG
+from database.database import get_database
+from services.mint_ledger import LEDGER_CONFIRMED, LEDGER_SUBMITTED, mint_ledger
+from utils.chain_metrics import MINT_BATCH_JOBS, MINT_JOB_LATENCY, MINT_JOBS, MINT_QUEUE_DEPTH
+from utils.logger import api_logger
+from utils.receipt_tracker import is_tracked
+
+MINT_JOBS_COLLECTION = "mint_jobs"
+
+MINT_KIND_CCIP = "ccip"
+MINT_KIND_DIRECT = "direct"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_DEAD = "dead"
+JOB_STATUSES = (STATUS_QUEUED, STATUS_RUNNING, STATUS_SUCCEEDED, STATUS_DEAD)
+
+MINT_BACKEND_CHAIN = "chain"
+MINT_BACKEND_SIMULATED = "simulated"
+
+# Lỗi không thể tự hết khi retry -> dead letter ngay
+PERMANENT_ERRORS = ("Invalid", "can only be minted", "must be a positive multiple", "not configured", "Unresolved transaction")
+# Milestone đã được mint on-chain -> coi như thành công
+ALREADY_MINTED_ERRORS = ("already has NFT",)
+# Transaction của lần chạy trước còn chờ mine -> requeue, không tính vào max_attempts
+IN_FLIGHT_ERRORS = ("still pending",)
+
+
+async def ensure_mint_queue_indexes(db):
+    # Index cũ (player_key, milestone) chặn job cùng milestone trên chain khác
+    if "player_key_1_milestone_1" in await db[MINT_JOBS_COLLECTION].index_information():
+        await db[MINT_JOBS_COLLECTION].drop_index("player_key_1_milestone_1")
+    await db[MINT_JOBS_COLLECTION].create_index(
+        [("player_key", ASCENDING), ("milestone", ASCENDING), ("destination_chain_id", ASCENDING)], unique=True
+    )
+    await db[MINT_JOBS_COLLECTION].create_index([("status", ASCENDING), ("next_attempt_at", ASCENDING)])
+
+
+def serialize_job(job: Optional[dict]) -> Optional[dict]:
+    if job is None:
+        return None
+    return {
+        key: str(value) if isinstance(value, ObjectId) else value.isoformat() if isinstance(value, datetime) else value
+        for key, value in job.items()
+    }
+
+
+class MintQueue:
+    def __init__(self, config: Optional[Dict] = None, backend: Optional[str] = None):
+        config = {**MINT_QUEUE_CONFIG, **(config or {})}
+        self.workers = config["workers"]
+        self.max_attempts = config["max_attempts"]
+        self.retry_backoff = config["retry_backoff"]
+        self.max_retry_backoff = config["max_retry_backoff"]
+        self.lease_seconds = config["lease_seconds"]
+        self.poll_interval = config["poll_interval"]
+        self.drain_timeout = config["drain_timeout"]
+        self.max_batch_size = int(os.getenv("MINT_BATCH_SIZE", config["max_batch_size"]))
+        self.batch_window = config["batch_window"]
+        self.backend = backend or os.getenv("MINT_BACKEND", MINT_BACKEND_CHAIN)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.running = 0
+        self.batches = 0
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._indexes_ready = False
+
+    async def _collection(self):
+        db = await get_database()
+        if not self._indexes_ready:
+            await ensure_mint_queue_indexes(db)
+            self._indexes_ready = True
+        return db[MINT_JOBS_COLLECTION]
+
+    async def enqueue(
+        self,
+        player_address: str,
+        total_wins: int,
+        player_name: str = "Anonymous Player",
+        user_id: Optional[str] = None,
+        kind: str = MINT_KIND_CCIP,
+        source_chain_id: int = 84532,
+        destination_chain_id: int = 43113,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[dict, bool]:
+        """
+        Thêm job mint cho milestone total_wins // 10.
+        Returns: (job, created), created = False nếu milestone này đã có job trên chain đích.
+        """
+        collection = await self._collection()
+        milestone = total_wins // 10
+        player_key = player_address.lower()
+        now = datetime.utcnow()
+        job = {
+            "player_key": player_key,
+            "player_address": player_address,
+            "player_name": player_name,
+            "user_id": user_id,
+            "total_wins": total_wins,
+            "milestone": milestone,
+            "kind": kind,
+            "source_chain_id": source_chain_id,
+            "destination_chain_id": destination_chain_id,
+            "metadata": metadata,
+            "status": STATUS_QUEUED,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "locked_by": None,
+            "locked_until": None,
+            "last_error": None,
+            "result": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        try:
+            result = await collection.insert_one(job)
+        except DuplicateKeyError:
+            MINT_JOBS.labels(kind=kind, event="duplicate").inc()
+            existing = await collection.find_one(
+                {"player_key": player_key, "milestone": milestone, "destination_chain_id": destination_chain_id}
+            )
+            return existing, False
+
+        job["_id"] = result.inserted_id
+        MINT_JOBS.labels(kind=kind, event="enqueued").inc()
+        api_logger.info(f"[MintQueue] Queued {kind} mint for {player_address} milestone {milestone} ({job['_id']})")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job, True
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        collection = await self._collection()
+        return await collection.find_one({"_id": ObjectId(job_id)})
+
+    async def list_jobs(self, player_address: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[dict]:
+        collection = await self._collection()
+        query = {}
+        if player_address:
+            query["player_key"] = player_address.lower()
+        if status:
+            query["status"] = status
+        return await collection.find(query).sort("created_at", -1).limit(limit).to_list(length=limit)
+
+    async def retry_job(self, job_id: str) -> Optional[dict]:
+        """Đưa job trong dead letter trở lại hàng đợi (reset số lần thử)"""
+        collection = await self._collection()
+        job = await collection.find_one_and_update(
+            {"_id": ObjectId(job_id), "status": STATUS_DEAD},
+            {"$set": {
+                "status": STATUS_QUEUED,
+                "attempts": 0,
+                "next_attempt_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+        if job is not None and self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get_stats(self) -> dict:
+        collection = await self._collection()
+        counts = {status: 0 for status in JOB_STATUSES}
+        async for row in collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        for status, count in counts.items():
+            MINT_QUEUE_DEPTH.labels(status=status).set(count)
+        return {
+            "counts": counts,
+            "backend": self.backend,
+            "workers": len(self._tasks),
+            "running_here": self.running,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "ledger": await mint_ledger.get_stats()
+        }
+
+    def start(self):
+        """Chạy worker trên event loop hiện tại (gọi lại nhiều lần không tạo thêm worker)"""
+        if self._tasks:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        if self.max_batch_size > 1:
+            self._tasks.append(asyncio.create_task(self._batcher()))
+        api_logger.info(f"[MintQueue] Started {self.workers} workers ({self.backend} backend, batch size {self.max_batch_size})")
+
+    async def stop(self):
+        """Chờ job đang chạy xong (tối đa drain_timeout), job chưa xong được chạy lại khi lease hết hạn"""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=self.drain_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, index: int):
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                api_logger.error(f"[MintQueue] Claim failed: {str(e)}")
+                job = None
+            if job is None:
+                if index == 0:
+                    try:
+                        await self.get_stats()
+                    except Exception:
+                        pass
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self._process(job)
+
+    async def _claim(self) -> Optional[dict]:
+        """Lấy job tới hạn, hoặc job "running" có lease đã hết hạn (worker cũ đã chết)"""
+        collection = await self._collection()
+        now = datetime.utcnow()
+        queued = {"status": STATUS_QUEUED, "next_attempt_at": {"$lte": now}}
+        if self.max_batch_size > 1:
+            # Lần chạy đầu của job direct thuộc về batcher, retry thì chạy riêng lẻ
+            queued["$or"] = [{"kind": {"$ne": MINT_KIND_DIRECT}}, {"attempts": {"$gt": 0}}]
+        return await collection.find_one_and_update(
+            {"$or": [
+                queued,
+                {"status": STATUS_RUNNING, "locked_until": {"$lte": now}}
+            ]},
+            {
+                "$set": {
+                    "status": STATUS_RUNNING,
+                    "locked_by": self.worker_id,
+                    "locked_until": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _batcher(self):
+        """Mỗi batch_window gom các job direct mới thành một batch (batch đầy thì gom tiếp ngay)"""
+        full = False
+        while not self._stopping:
+            if not full:
+                await asyncio.sleep(self.batch_window)
+                if self._stopping:
+                    break
+            try:
+                jobs = await self._claim_batch()
+            except Exception as e:
+                api_logger.error(f"[MintQueue] Batch claim failed: {str(e)}")
+                jobs = []
+            full = len(jobs) >= self.max_batch_size
+            if jobs:
+                await self._process_batch(jobs)
+
+    async def _claim_batch(self) -> List[dict]:
+        """Claim tối đa max_batch_size job direct chưa chạy lần nào (mỗi job claim nguyên tử)"""
+        collection = await self._collection()
+        jobs = []
+        while len(jobs) < self.max_batch_size:
+            now = datetime.utcnow()
+            job = await collection.find_one_and_update(
+                {"status": STATUS_QUEUED, "kind": MINT_KIND_DIRECT, "attempts": 0, "next_attempt_at": {"$lte": now}},
+                {
+                    "$set": {
+                        "status": STATUS_RUNNING,
+                        "locked_by": self.worker_id,
+                        "locked_until": now + timedelta(seconds=self.lease_seconds),
+                        "updated_at": now
+                    },
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("next_attempt_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None:
+                break
+            jobs.append(job)
+        return jobs
+
+    async def _process(self, job: dict):
+        self.running += 1
+        try:
+            try:
+                result = await self._claim_mint(job) or await self._execute(job, self._on_submitted(job))
+                error = None if result.get("success") else result.get("error", "Unknown error")
+            except Exception as e:
+                result, error = None, str(e) or type(e).__name__
+            await self._record(job, result, error)
+        except Exception as e:
+            # Lỗi ghi DB: job giữ status running và được chạy lại khi lease hết hạn
+            api_logger.error(f"[MintQueue] Failed to record result of job {job['_id']}: {str(e)}")
+        finally:
+            self.running -= 1
+
+    async def _process_batch(self, jobs: List[dict]):
+        if len(jobs) == 1:
+            await self._process(jobs[0])
+            return
+        self.running += len(jobs)
+        try:
+            results: List[Optional[dict]] = [None] * len(jobs)
+            try:
+                for index, job in enumerate(jobs):
+                    results[index] = await self._claim_mint(job)
+                claimed = [job for job, result in zip(jobs, results) if result is None]
+                if claimed:
+                    batch_results = iter(await self._execute_batch(claimed, self._on_batch_submitted(claimed)))
+                    results = [result or next(batch_results) for result in results]
+            except Exception as e:
+                results = [result or {"success": False, "error": str(e) or type(e).__name__} for result in results]
+            self.batches += 1
+            MINT_BATCH_JOBS.observe(len(jobs))
+            succeeded = sum(1 for result in results if result.get("success"))
+            api_logger.info(f"[MintQueue] Batch of {len(jobs)} direct mints: {succeeded} succeeded")
+
+            for job, result in zip(jobs, results):
+                error = None if result.get("success") else result.get("error", "Unknown error")
+                try:
+                    await self._record(job, result, error)
+                except Exception as e:
+                    api_logger.error(f"[MintQueue] Failed to record result of job {job['_id']}: {str(e)}")
+        finally:
+            self.running -= len(jobs)
+
+    async def _record(self, job: dict, result: Optional[dict], error: Optional[str]):
+        if error and any(marker in error for marker in ALREADY_MINTED_ERRORS):
+            result, error = {**(result or {}), "already_minted": True}, None
+        await self._settle_mint(job, result, error)
+        if error is None:
+            await self._succeed(job, result)
+        else:
+            await self._fail(job, error)
+
+    async def _claim_mint(self, job: dict) -> Optional[dict]:
+        """Claim milestone trong sổ mint. Returns: None nếu được mint, ngược lại là kết quả của job"""
+        entry, claimed = await mint_ledger.claim(
+            job["player_address"], job["milestone"], job["destination_chain_id"], str(job["_id"])
+        )
+        if claimed:
+            if entry["status"] == LEDGER_SUBMITTED and entry.get("transaction_hash"):
+                return await self._resolve_submitted(job, entry)
+            return None
+        if entry["status"] == LEDGER_CONFIRMED:
+            return {
+                "success": True,
+                "already_minted": True,
+                "transaction_hash": entry.get("transaction_hash"),
+                "token_id": entry.get("token_id"),
+                "milestone": job["milestone"]
+            }
+        return {"success": False, "error": f"Milestone {job['milestone']} is being minted by another claim ({entry['status']})"}
+
+    async def _resolve_submitted(self, job: dict, entry: dict) -> Optional[dict]:
+        """
+        Transaction lần chạy trước của job (entry "submitted" trong sổ mint).
+        Returns: None nếu được gửi transaction mới (transaction cũ bị revert / drop),
+        ngược lại là kết quả của job (đã mine, hoặc còn pending -> requeue)
+        """
+        tx_hash = entry["transaction_hash"]
+        mined = {"success": True, "recovered": True, "transaction_hash": tx_hash, "milestone": job["milestone"]}
+        if job["kind"] != MINT_KIND_DIRECT:
+            from services.ccip_service import CCIP_CONFIG
+            # Hash là transaction ccipSend ở chain nguồn, không phải message id của CCIP
+            mined.update(
+                source_chain=CCIP_CONFIG[job["source_chain_id"]]["name"],
+                destination_chain=CCIP_CONFIG[job["destination_chain_id"]]["name"]
+            )
+        in_flight = {"success": False, "error": f"Transaction {tx_hash} of a previous attempt is still pending"}
+
+        if self.backend == MINT_BACKEND_SIMULATED:
+            # Transaction giả lập đã gửi luôn được mine
+            return mined
+        if is_tracked(tx_hash):
+            return in_flight
+
+        if job["kind"] == MINT_KIND_DIRECT:
+            from services.victory_nft_service import victory_nft_service
+            w3, sender = victory_nft_service.w3, victory_nft_service.deployer_address
+        else:
+            from services.ccip_service import ccip_service
+            from services.chain_providers import chain_providers
+            w3, sender = chain_providers.get_w3_for_chain_id(job["source_chain_id"]), ccip_service.account.address
+
+        try:
+            receipt = await w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            receipt = None
+        if receipt is not None:
+            if receipt["status"] == 1:
+                api_logger.info(f"[MintQueue] Job {job['_id']}: transaction {tx_hash} of a previous attempt was mined")
+                return mined
+            api_logger.warning(f"[MintQueue] Job {job['_id']}: transaction {tx_hash} reverted, sending a new one")
+            return None
+        try:
+            await w3.eth.get_transaction(tx_hash)
+            return in_flight
+        except TransactionNotFound:
+            pass
+
+        # Hash cũ không còn trong mempool: xem nonce của nó (có thể đã bị thay thế bằng gas cao hơn)
+        nonce = entry.get("nonce")
+        if nonce is None:
+            api_logger.warning(f"[MintQueue] Job {job['_id']}: transaction {tx_hash} dropped, sending a new one")
+            return None
+        if nonce >= await w3.eth.get_transaction_count(sender, "latest"):
+            if nonce < await w3.eth.get_transaction_count(sender, "pending"):
+                # Bản thay thế (hash khác, cùng nonce) còn trong mempool
+                return in_flight
+            api_logger.warning(f"[MintQueue] Job {job['_id']}: transaction {tx_hash} dropped, sending a new one")
+            return None
+        # Nonce đã được dùng bởi transaction không có receipt của hash cũ (bản thay thế hoặc transaction khác)
+        if job["kind"] == MINT_KIND_DIRECT:
+            from services.victory_nft_service import victory_nft_service
+            if await victory_nft_service.has_milestone_nft(job["player_address"], job["milestone"], confirm_onchain=True):
+                return mined
+            return None
+        return {
+            "success": False,
+            "error": f"Unresolved transaction {tx_hash}: its nonce was used by another transaction, check the destination chain before retrying"
+        }
+
+    def _on_submitted(self, job: dict):
+        async def on_submitted(tx_hash: str, nonce: Optional[int] = None):
+            # Lỗi ghi sổ không được làm hỏng mint đã gửi: entry giữ "pending" của chính job này
+            try:
+                await mint_ledger.mark_submitted(
+                    job["player_address"], job["milestone"], job["destination_chain_id"], str(job["_id"]), tx_hash, nonce
+                )
+            except Exception as e:
+                api_logger.error(f"[MintQueue] Failed to mark job {job['_id']} submitted ({tx_hash}): {str(e)}")
+        return on_submitted
+
+    def _on_batch_submitted(self, jobs: List[dict]):
+        async def on_submitted(indexes: List[int], tx_hash: str, nonce: Optional[int] = None):
+            await asyncio.gather(*(self._on_submitted(jobs[index])(tx_hash, nonce) for index in indexes))
+        return on_submitted
+
+    async def _settle_mint(self, job: dict, result: Optional[dict], error: Optional[str]):
+        """Sổ mint theo kết quả: confirmed, hoặc nhả claim nếu transaction chưa được gửi"""
+        key = (job["player_address"], job["milestone"], job["destination_chain_id"])
+        try:
+            if error is None:
+                await mint_ledger.mark_confirmed(
+                    *key, result.get("message_id") or result.get("transaction_hash"), result.get("token_id")
+                )
+            else:
+                await mint_ledger.release(*key, str(job["_id"]))
+        except Exception as e:
+            # Claim "pending" còn lại thuộc về job này (lần chạy lại claim được), NFT đã mint thì indexer ghi bù
+            api_logger.error(f"[MintQueue] Failed to update mint ledger for job {job['_id']}: {str(e)}")
+
+    async def _execute(self, job: dict, on_submitted) -> dict:
+        if self.backend == MINT_BACKEND_SIMULATED:
+            return await self._simulate(job, on_submitted)
+        if job["kind"] == MINT_KIND_DIRECT:
+            from services.victory_nft_service import victory_nft_service
+            return await victory_nft_service.mint_victory_nft(
+                job["player_address"], job["total_wins"], job["metadata"] or {}, on_submitted
+            )
+        from services.ccip_service import ccip_service
+        return await ccip_service.mint_victory_nft(
+            job["player_address"],
+            job["total_wins"],
+            job["player_name"],
+            job["source_chain_id"],
+            job["destination_chain_id"],
+            on_submitted
+        )
+
+    async def _execute_batch(self, jobs: List[dict], on_submitted) -> List[dict]:
+        if self.backend == MINT_BACKEND_SIMULATED:
+            return await self._simulate_batch(jobs, on_submitted)
+        from services.victory_nft_service import victory_nft_service
+        return await victory_nft_service.batch_mint_victory_nft([
+            (job["player_address"], job["total_wins"], job["metadata"] or {}) for job in jobs
+        ], on_submitted)
+
+    async def _simulate_batch(self, jobs: List[dict], on_submitted) -> List[dict]:
+        """Một transaction cho cả batch: cùng latency, cùng hash"""
+        config = MINT_SIMULATION_CONFIG
+        if random.random() < config["failure_rate"]:
+            await asyncio.sleep(max(0.0, random.gauss(config["latency"], config["latency_jitter"])))
+            raise RuntimeError("Simulated batch mint failure")
+        tx_hash = os.urandom(32).hex()
+        await on_submitted(list(range(len(jobs))), tx_hash)
+        await asyncio.sleep(max(0.0, random.gauss(config["latency"], config["latency_jitter"])))
+        return [{
+            "success": True,
+            "simulated": True,
+            "transaction_hash": tx_hash,
+            "batch_size": len(jobs),
+            "milestone": job["milestone"]
+        } for job in jobs]
+
+    async def _simulate(self, job: dict, on_submitted) -> dict:
+        """Lỗi giả lập xảy ra trước khi gửi transaction (claim được nhả)"""
+        config = MINT_SIMULATION_CONFIG
+        if random.random() < config["failure_rate"]:
+            await asyncio.sleep(max(0.0, random.gauss(config["latency"], config["latency_jitter"])))
+            raise RuntimeError("Simulated mint failure")
+        tx_hash = os.urandom(32).hex()
+        await on_submitted(tx_hash)
+        await asyncio.sleep(max(0.0, random.gauss(config["latency"], config["latency_jitter"])))
+        return {
+            "success": True,
+            "simulated": True,
+            "transaction_hash": tx_hash,
+            "milestone": job["milestone"]
+        }
+
+    async def _succeed(self, job: dict, result: dict):
+        collection = await self._collection()
+        now = datetime.utcnow()
+        await collection.update_one(
+            {"_id": job["_id"]},
+            {"$set": {
+                "status": STATUS_SUCCEEDED,
+                "result": {k: v for k, v in result.items() if k != "metadata"},
+                "last_error": None,
+                "locked_by": None,
+                "locked_until": None,
+                "completed_at": now,
+                "updated_at": now
+            }}
+        )
+        MINT_JOBS.labels(kind=job["kind"], event="succeeded").inc()
+        MINT_JOB_LATENCY.labels(kind=job["kind"]).observe((now - job["created_at"]).total_seconds())
+        api_logger.info(f"[MintQueue] Job {job['_id']} succeeded after {job['attempts']} attempt(s)")
+        if not result.get("already_minted") and (job["kind"] == MINT_KIND_DIRECT or result.get("recovered")):
+            await self._record_mint(job, result)
+        await self._notify(job, result)
+
+    async def _fail(self, job: dict, error: str):
+        collection = await self._collection()
+        now = datetime.utcnow()
+        permanent = any(marker in error for marker in PERMANENT_ERRORS)
+        in_flight = any(marker in error for marker in IN_FLIGHT_ERRORS)
+        if permanent or (job["attempts"] >= self.max_attempts and not in_flight):
+            update = {"status": STATUS_DEAD, "dead_at": now}
+            MINT_JOBS.labels(kind=job["kind"], event="dead").inc()
+            api_logger.error(f"[MintQueue] Job {job['_id']} dead after {job['attempts']} attempt(s): {error}")
+        else:
+            delay = min(self.retry_backoff * 2 ** (job["attempts"] - 1), self.max_retry_backoff)
+            # Jitter để các job lỗi cùng lúc (vd: RPC down) không retry cùng lúc
+            delay *= random.uniform(0.8, 1.2)
+            update = {"status": STATUS_QUEUED, "next_attempt_at": now + timedelta(seconds=delay)}
+            MINT_JOBS.labels(kind=job["kind"], event="retried").inc()
+            api_logger.warning(f"[MintQueue] Job {job['_id']} attempt {job['attempts']} failed, retry in {delay:.0f}s: {error}")
+        change = {"$set": {**update, "last_error": error, "locked_by": None, "locked_until": None, "updated_at": now}}
+        if in_flight and not permanent:
+            # Lần chờ transaction cũ không phải một lần thử: hoàn lại $inc của _claim
+            change["$inc"] = {"attempts": -1}
+        await collection.update_one({"_id": job["_id"]}, change)
+
+    async def _record_mint(self, job: dict, result: dict):
+        """
+        Job ccip được ccip_service tự ghi vào victory_nfts, job direct (và job ccip có
+        transaction của lần chạy trước được mine) ghi ở đây
+        """
+        try:
+            from config.settings import settings
+            from services.victory_nft_stats import build_victory_mint, victory_nft_stats
+            if job["kind"] == MINT_KIND_DIRECT:
+                destination_chain, contract_address = "Avalanche Fuji", settings.AVALANCHE_FUJI_NFT_CONTRACT
+            else:
+                from services.ccip_service import CCIP_CONFIG
+                destination = CCIP_CONFIG[job["destination_chain_id"]]
+                destination_chain, contract_address = destination["name"], destination["nft_contract"]
+            await victory_nft_stats.log_mint(build_victory_mint(
+                job["player_address"],
+                job["total_wins"],
+                self._message_id(job, result),
+                destination_chain,
+                contract_address,
+                job["player_name"],
+                job.get("user_id"),
+                transaction_hash=result.get("transaction_hash"),
+                token_id=result.get("token_id")
+            ))
+        except Exception as e:
+            api_logger.error(f"Failed to log Victory NFT mint: {str(e)}")
+
+    @staticmethod
+    def _message_id(job: dict, result: dict) -> Optional[str]:
+        """Job ccip được khôi phục (recovered) chỉ có hash ccipSend, không có message id"""
+        if result.get("recovered") and job["kind"] != MINT_KIND_DIRECT:
+            return None
+        return result.get("message_id") or result.get("transaction_hash")
+
+    async def _notify(self, job: dict, result: dict):
+        if not job.get("user_id") or result.get("already_minted"):
+            return
+        try:
+            from ws_handlers.waiting_room import manager
+            destination_chain = result.get("destination_chain", "Avalanche Fuji")
+            tx_hash = result.get("message_id") or result.get("transaction_hash")
+            # Không có message id: hash là transaction ở chain nguồn
+            explorer_chain = destination_chain if self._message_id(job, result) else result.get("source_chain")
+            await manager.send_personal_message({
+                "type": "victory_nft_minted",
+                "message": f"🎉 Congratulations! Your Victory NFT has been minted on {destination_chain}!",
+                "job_id": str(job["_id"]),
+                "total_wins": job["total_wins"],
+                "milestone": job["milestone"],
+                "message_id": self._message_id(job, result),
+                "transaction_hash": result.get("transaction_hash"),
+                "source_chain": result.get("source_chain"),
+                "destination_chain": destination_chain,
+                "explorer_url": f"https://testnet.snowtrace.io/tx/{tx_hash}" if explorer_chain == "Avalanche Fuji" else f"https://sepolia.basescan.org/tx/{tx_hash}"
+            }, job["user_id"])
+        except Exception as e:
+            api_logger.error(f"Failed to send Victory NFT notification to user {job['user_id']}: {str(e)}")
+
+
+# Singleton instance
+mint_queue = MintQueue()
@@ -0,0 +1,251 @@
+"""
+Gom các lời gọi view contract đồng thời thành ít RPC nhất
+
+- Các call tới trong cùng một cửa sổ ngắn (window) được gửi chung trong một
+  Multicall3.aggregate3 (eth_call duy nhất), hoặc một JSON-RPC batch request nếu
+  chain không có Multicall3
+- Call giống hệt nhau (cùng contract + calldata) đang chờ chỉ được gửi một lần,
+  mọi caller nhận cùng kết quả
+- Một call lỗi (revert) chỉ làm lỗi caller của nó, các call khác trong batch vẫn
+  nhận kết quả (aggregate3 với allowFailure)
+
+Dùng: `await get_read_aggregator(chain).call(contract.functions.totalSupply())`
+thay cho `.call()`, kết quả giải mã giống web3.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from eth_utils.abi import get_abi_output_types
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from web3.exceptions import ContractLogicError
+
+from config.chain_config import READ_AGGREGATOR_CONFIG
+from services.chain_providers import CHAIN_IDS, chain_providers
+from utils.chain_metrics import READ_AGGREGATOR_CALLS, READ_AGGREGATOR_ROUNDTRIPS
+from utils.logger import api_logger
+
+MODE_MULTICALL = "multicall"
+MODE_BATCH = "batch"
+MODE_DIRECT = "direct"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [{"internalType": "address", "name": "addr", "type": "address"}],
+        "name": "getEthBalance",
+        "outputs": [{"internalType": "uint256", "name": "balance", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+# (contract address, calldata)
+_ReadKey = Tuple[str, bytes]
+
+
+def _normalize(output_types: List[str], values) -> list:
+    """Địa chỉ trả về dạng checksum như contract.functions.x().call()"""
+    normalized = []
+    for output_type, value in zip(output_types, values):
+        if output_type == "address":
+            value = AsyncWeb3.to_checksum_address(value)
+        elif output_type == "address[]":
+            value = [AsyncWeb3.to_checksum_address(item) for item in value]
+        normalized.append(value)
+    return normalized
+
+
+class ReadAggregator:
+    def __init__(self, chain: str, config: Optional[Dict] = None):
+        config = {**READ_AGGREGATOR_CONFIG, **(config or {})}
+        self.chain = chain
+        self.window = config["window"]
+        self.max_calls = config["max_calls"]
+        self.multicall_address = AsyncWeb3.to_checksum_address(config["multicall_address"])
+
+        self._pending: Dict[_ReadKey, asyncio.Future] = {}
+        self._in_flight: Dict[_ReadKey, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._multicall_available: Optional[bool] = None
+        self._multicall = None
+        self.calls = 0
+        self.deduplicated = 0
+        self.roundtrips = 0
+
+    @property
+    def w3(self):
+        return chain_providers.get_w3(self.chain)
+
+    @property
+    def multicall(self):
+        if self._multicall is None:
+            self._multicall = self.w3.eth.contract(address=self.multicall_address, abi=MULTICALL3_ABI)
+        return self._multicall
+
+    async def call(self, contract_function):
+        """Tương đương `await contract_function.call()` nhưng được gom với các call đồng thời khác"""
+        output_types = get_abi_output_types(contract_function.abi)
+        raw = await self.call_raw(contract_function.address, contract_function._encode_transaction_data())
+        values = _normalize(output_types, self.w3.codec.decode(output_types, raw))
+        return values[0] if len(values) == 1 else values
+
+    async def call_raw(self, target: str, calldata) -> bytes:
+        key = (AsyncWeb3.to_checksum_address(target), bytes(HexBytes(calldata)))
+        self.calls += 1
+        future = self._pending.get(key) or self._in_flight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            READ_AGGREGATOR_CALLS.labels(self.chain, "deduplicated").inc()
+        else:
+            READ_AGGREGATOR_CALLS.labels(self.chain, "sent").inc()
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_calls:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+        # shield: caller bị hủy không làm hủy kết quả của caller khác cùng key
+        return await asyncio.shield(future)
+
+    async def get_balance(self, address: str) -> int:
+        """Số dư native token, gom qua Multicall3.getEthBalance nếu có"""
+        if await self._use_multicall():
+            return await self.call(self.multicall.functions.getEthBalance(address))
+        return await self.w3.eth.get_balance(address)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._in_flight.update(batch)
+            asyncio.ensure_future(self._execute(batch))
+
+    async def _execute(self, batch: Dict[_ReadKey, asyncio.Future]):
+        keys = list(batch)
+        try:
+            if len(keys) == 1:
+                results = await self._direct(keys[0])
+            elif await self._use_multicall():
+                results = await self._aggregate3(keys)
+            else:
+                results = await self._rpc_batch(keys)
+            for key, result in zip(keys, results):
+                future = batch[key]
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            api_logger.warning(f"[ReadAggregator] {self.chain} batch of {len(keys)} reads failed: {str(e)}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for key in keys:
+                self._in_flight.pop(key, None)
+            # Không ai chờ (caller đã bị hủy) thì exception cũng không bị log "never retrieved"
+            for future in batch.values():
+                if future.done() and not future.cancelled():
+                    future.exception()
+
+    async def _use_multicall(self) -> bool:
+        if self._multicall_available is None:
+            try:
+                self._multicall_available = bool(await self.w3.eth.get_code(self.multicall_address))
+            except Exception as e:
+                # Không cache: lần sau thử lại
+                api_logger.warning(f"[ReadAggregator] Multicall3 check on {self.chain} failed: {str(e)}")
+                return False
+            if not self._multicall_available:
+                api_logger.info(f"[ReadAggregator] No Multicall3 on {self.chain}, using JSON-RPC batches")
+        return self._multicall_available
+
+    def _count_roundtrip(self, mode: str):
+        self.roundtrips += 1
+        READ_AGGREGATOR_ROUNDTRIPS.labels(self.chain, mode).inc()
+
+    async def _direct(self, key: _ReadKey) -> list:
+        target, calldata = key
+        self._count_roundtrip(MODE_DIRECT)
+        try:
+            return [bytes(await self.w3.eth.call({"to": target, "data": calldata}))]
+        except ContractLogicError as e:
+            return [e]
+
+    async def _aggregate3(self, keys: List[_ReadKey]) -> list:
+        self._count_roundtrip(MODE_MULTICALL)
+        results = await self.multicall.functions.aggregate3(
+            [(target, True, calldata) for target, calldata in keys]
+        ).call()
+        return [
+            bytes(return_data) if success else ContractLogicError("execution reverted", data=return_data.hex())
+            for success, return_data in results
+        ]
+
+    async def _rpc_batch(self, keys: List[_ReadKey]) -> list:
+        self._count_roundtrip(MODE_BATCH)
+        try:
+            async with self.w3.batch_requests() as batch:
+                for target, calldata in keys:
+                    batch.add(self.w3.eth.call({"to": target, "data": calldata}))
+                return [bytes(result) for result in await batch.async_execute()]
+        except Exception as e:
+            # Một call lỗi làm lỗi cả batch response: gửi lại riêng lẻ để chỉ caller đó nhận lỗi
+            api_logger.debug(f"[ReadAggregator] JSON-RPC batch on {self.chain} failed, retrying calls one by one: {str(e)}")
+            outcomes = await asyncio.gather(*(self._direct(key) for key in keys), return_exceptions=True)
+            return [outcome if isinstance(outcome, Exception) else outcome[0] for outcome in outcomes]
+
+    def get_status(self) -> dict:
+        return {
+            "chain": self.chain,
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+            "roundtrips": self.roundtrips,
+            "multicall": self._multicall_available,
+            "pending": len(self._pending),
+            "in_flight": len(self._in_flight)
+        }
+
+
+_aggregators: Dict[str, ReadAggregator] = {}
+
+
+def get_read_aggregator(chain) -> ReadAggregator:
+    """ReadAggregator dùng chung của chain (tên chain trong services.chain_providers hoặc chain ID)"""
+    chain = CHAIN_IDS.get(chain, chain)
+    if chain not in _aggregators:
+        _aggregators[chain] = ReadAggregator(chain)
+    return _aggregators[chain]
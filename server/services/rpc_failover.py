@@ -0,0 +1,334 @@
+"""
+Provider web3 chuyển đổi giữa nhiều RPC endpoint của cùng một chain
+
+- Mỗi endpoint có weight (cấu hình) và điểm sức khỏe:
+  score = weight * (1 - error_rate) / latency, latency và error_rate là EWMA
+- Circuit breaker: lỗi liên tiếp breaker_failures lần thì endpoint bị ngắt trong
+  breaker_cooldown giây, sau đó một request thăm dò (half-open) quyết định đóng lại
+- Read idempotent (READ_METHODS) được hedge: chưa có kết quả sau p95 latency của
+  endpoint đầu tiên thì gửi bản sao tới endpoint thứ hai, lấy kết quả về trước.
+  Lỗi thì thử lần lượt các endpoint còn lại
+- eth_sendRawTransaction chỉ chuyển endpoint khi an toàn: transaction đã ký gửi lại
+  vẫn cùng hash nên không thể bị mine hai lần; nếu lần gửi trước có thể đã tới node
+  ("already known" / "nonce too low" ở endpoint sau) thì trả về hash của transaction.
+  Các write khác chỉ gửi tới endpoint tốt nhất
+
+Lỗi JSON-RPC bình thường (revert, nonce...) là phản hồi hợp lệ của endpoint, chỉ lỗi
+kết nối / timeout / HTTP 5xx / rate limit mới bị tính là endpoint lỗi.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from aiohttp import ClientConnectorError, ClientResponseError
+from eth_utils import keccak
+from hexbytes import HexBytes
+from web3.providers.async_base import AsyncBaseProvider
+
+from config.chain_config import RPC_FAILOVER_CONFIG
+from utils.chain_metrics import RPC_BREAKER_OPEN, RPC_ENDPOINT_REQUESTS, RPC_FAILOVERS, RPC_HEDGES
+from utils.logger import api_logger
+
+READ_METHODS = frozenset({
+    "eth_chainId", "net_version", "eth_blockNumber", "eth_call", "eth_estimateGas",
+    "eth_gasPrice", "eth_maxPriorityFeePerGas", "eth_feeHistory", "eth_getBalance",
+    "eth_getCode", "eth_getStorageAt", "eth_getTransactionCount", "eth_getLogs",
+    "eth_getBlockByNumber", "eth_getBlockByHash", "eth_getTransactionByHash",
+    "eth_getTransactionReceipt"
+})
+
+# Lỗi của endpoint sau khi lần gửi trước có thể đã tới node: transaction đã được nhận
+ALREADY_SENT_ERRORS = ("already known", "known transaction", "alreadyknown", "nonce too low")
+RATE_LIMIT_CODES = (-32005, 429)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class EndpointRateLimited(Exception):
+    def __init__(self, response: dict):
+        super().__init__(f"Rate limited: {response.get('error')}")
+        self.response = response
+
+
+def _is_rate_limited(response) -> bool:
+    error = response.get("error") if isinstance(response, dict) else None
+    if not isinstance(error, dict):
+        return False
+    return error.get("code") in RATE_LIMIT_CODES or "rate limit" in str(error.get("message", "")).lower()
+
+
+def _not_delivered(error: Exception) -> bool:
+    """Request chắc chắn chưa được node xử lý (không kết nối được / bị từ chối trước khi xử lý)"""
+    if isinstance(error, (ClientConnectorError, EndpointRateLimited)):
+        return True
+    return isinstance(error, ClientResponseError) and error.status in (429, 502, 503)
+
+
+class EndpointHealth:
+    def __init__(self, provider, weight: float, config: Dict):
+        self.provider = provider
+        self.weight = weight
+        # Chỉ host: URL có thể chứa API key
+        self.name = urlparse(str(provider.endpoint_uri)).netloc or str(provider.endpoint_uri)
+        self.config = config
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.samples = deque(maxlen=config["latency_samples"])
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.requests = 0
+        self.errors = 0
+
+    def state(self, now: float) -> str:
+        if self.opened_at is None:
+            return STATE_CLOSED
+        if now - self.opened_at >= self.config["breaker_cooldown"]:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    @property
+    def score(self) -> float:
+        latency = self.latency_ewma if self.latency_ewma is not None else self.config["initial_latency"]
+        return self.weight * max(1.0 - self.error_ewma, 0.01) / max(latency, 0.001)
+
+    def latency_quantile(self) -> Optional[float]:
+        if len(self.samples) < self.config["hedge_min_samples"]:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * self.config["hedge_quantile"]), len(ordered) - 1)]
+
+    def record_success(self, latency: float):
+        alpha = self.config["ewma_alpha"]
+        self.requests += 1
+        self.samples.append(latency)
+        self.latency_ewma = latency if self.latency_ewma is None else alpha * latency + (1 - alpha) * self.latency_ewma
+        self.error_ewma *= 1 - alpha
+        self.consecutive_failures = 0
+        self.probing = False
+        if self.opened_at is not None:
+            self.opened_at = None
+            api_logger.info(f"[RPC] Endpoint {self.name} recovered, circuit closed")
+
+    def record_failure(self, chain: str, error: Exception):
+        alpha = self.config["ewma_alpha"]
+        self.requests += 1
+        self.errors += 1
+        self.error_ewma = alpha + (1 - alpha) * self.error_ewma
+        self.consecutive_failures += 1
+        was_probing, self.probing = self.probing, False
+        if was_probing or self.consecutive_failures >= self.config["breaker_failures"]:
+            if self.opened_at is None or was_probing:
+                api_logger.warning(f"[RPC] Circuit opened for {chain} endpoint {self.name}: {type(error).__name__} {error}")
+            self.opened_at = time.monotonic()
+
+    def get_status(self, now: float) -> dict:
+        quantile = self.latency_quantile()
+        status = {
+            "endpoint": self.name,
+            "weight": self.weight,
+            "state": self.state(now),
+            "score": round(self.score, 2),
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "latency_p95_ms": round(quantile * 1000, 1) if quantile is not None else None,
+            "error_rate": round(self.error_ewma, 3),
+            "requests": self.requests,
+            "errors": self.errors
+        }
+        if hasattr(self.provider, "get_status"):
+            status["pool"] = self.provider.get_status()
+        return status
+
+
+class FailoverAsyncProvider(AsyncBaseProvider):
+    def __init__(self, chain: str, endpoints: List[Tuple[object, float]], config: Optional[Dict] = None):
+        super().__init__()
+        self.chain = chain
+        self.config = {**RPC_FAILOVER_CONFIG, **(config or {})}
+        self.endpoints = [EndpointHealth(provider, weight, self.config) for provider, weight in endpoints]
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    @property
+    def endpoint_uri(self):
+        """Endpoint đầu tiên (cấu hình chính), dùng làm khóa ổn định cho cache theo endpoint"""
+        return self.endpoints[0].provider.endpoint_uri
+
+    def _ranked(self, probe: bool) -> List[EndpointHealth]:
+        """Endpoint theo thứ tự nên thử: closed theo score, half-open (probe) đầu tiên nếu được phép"""
+        now = time.monotonic()
+        closed = sorted(
+            (e for e in self.endpoints if e.state(now) == STATE_CLOSED),
+            key=lambda e: e.score, reverse=True
+        )
+        half_open = [e for e in self.endpoints if e.state(now) == STATE_HALF_OPEN and not e.probing]
+        if probe and half_open:
+            half_open[0].probing = True
+            return [half_open[0]] + closed
+        if closed:
+            return closed
+        # Mọi endpoint đều bị ngắt: vẫn thử, endpoint bị ngắt lâu nhất trước
+        return sorted(self.endpoints, key=lambda e: e.opened_at or 0)
+
+    async def _call(self, endpoint: EndpointHealth, method, params):
+        started = time.monotonic()
+        try:
+            response = await endpoint.provider.make_request(method, params)
+        except asyncio.CancelledError:
+            # Bản hedge còn lại bị hủy: không phải lỗi của endpoint
+            endpoint.probing = False
+            raise
+        except Exception as e:
+            endpoint.record_failure(self.chain, e)
+            self._record(endpoint, "error")
+            raise
+        if _is_rate_limited(response):
+            error = EndpointRateLimited(response)
+            endpoint.record_failure(self.chain, error)
+            self._record(endpoint, "rate_limited")
+            raise error
+        endpoint.record_success(time.monotonic() - started)
+        self._record(endpoint, "success")
+        return response
+
+    def _record(self, endpoint: EndpointHealth, result: str):
+        RPC_ENDPOINT_REQUESTS.labels(self.chain, endpoint.name, result).inc()
+        RPC_BREAKER_OPEN.labels(self.chain, endpoint.name).set(0 if endpoint.opened_at is None else 1)
+
+    def _hedge_delay(self, endpoint: EndpointHealth) -> float:
+        quantile = endpoint.latency_quantile()
+        delay = self.config["hedge_default_delay"] if quantile is None else quantile
+        return min(max(delay, self.config["hedge_min_delay"]), self.config["hedge_max_delay"])
+
+    async def make_request(self, method, params):
+        if method in READ_METHODS:
+            return await self._read(method, params)
+        if method == "eth_sendRawTransaction":
+            return await self._send_raw_transaction(method, params)
+        return await self._call(self._ranked(probe=False)[0], method, params)
+
+    async def _read(self, method, params):
+        """Hedge một lần sau p95 latency, lỗi thì chuyển sang endpoint tiếp theo"""
+        candidates = self._ranked(probe=True)
+        tasks: Dict[asyncio.Task, bool] = {}  # task -> là bản hedge
+        last_error: Optional[Exception] = None
+
+        def launch(hedge: bool):
+            endpoint = candidates.pop(0)
+            tasks[asyncio.ensure_future(self._call(endpoint, method, params))] = hedge
+            return endpoint
+
+        first = launch(hedge=False)
+        hedge_timer = self._hedge_delay(first) if self.config["hedging"] else None
+        try:
+            while tasks:
+                timeout = hedge_timer if candidates else None
+                done, _ = await asyncio.wait(set(tasks), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_timer = None
+                    launch(hedge=True)
+                    self.hedges += 1
+                    RPC_HEDGES.labels(self.chain, "sent").inc()
+                    continue
+                winner = None
+                for task in done:
+                    hedge = tasks.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                    elif winner is None:
+                        winner = task
+                        if hedge:
+                            self.hedge_wins += 1
+                            RPC_HEDGES.labels(self.chain, "won").inc()
+                if winner is not None:
+                    return winner.result()
+                if not tasks and candidates:
+                    hedge_timer = None
+                    launch(hedge=False)
+                    self.failovers += 1
+                    RPC_FAILOVERS.labels(self.chain, "read").inc()
+        finally:
+            for task in tasks:
+                task.cancel()
+        if isinstance(last_error, EndpointRateLimited):
+            return last_error.response
+        raise last_error
+
+    async def _send_raw_transaction(self, method, params):
+        last_error: Optional[Exception] = None
+        maybe_delivered = False
+        for attempt, endpoint in enumerate(self._ranked(probe=False)):
+            if attempt:
+                self.failovers += 1
+                RPC_FAILOVERS.labels(self.chain, "write").inc()
+            try:
+                response = await self._call(endpoint, method, params)
+            except Exception as e:
+                maybe_delivered = maybe_delivered or not _not_delivered(e)
+                last_error = e
+                continue
+            error = response.get("error") if isinstance(response, dict) else None
+            if maybe_delivered and error and any(
+                marker in str(error.get("message", "")).lower() for marker in ALREADY_SENT_ERRORS
+            ):
+                # Lần gửi trước đã tới node: transaction này (cùng hash) đang chờ / đã mine
+                tx_hash = HexBytes(keccak(HexBytes(params[0]))).to_0x_hex()
+                api_logger.info(f"[RPC] {self.chain} transaction {tx_hash} already delivered before failover")
+                return {"jsonrpc": "2.0", "id": response.get("id"), "result": tx_hash}
+            return response
+        if isinstance(last_error, EndpointRateLimited):
+            return last_error.response
+        raise last_error
+
+    async def make_batch_request(self, requests):
+        """Batch chỉ gồm read thì chuyển endpoint khi lỗi (không hedge), có write thì gửi một endpoint"""
+        if not all(method in READ_METHODS for method, _ in requests):
+            return await self._batch_call(self._ranked(probe=False)[0], requests)
+        last_error: Optional[Exception] = None
+        for attempt, endpoint in enumerate(self._ranked(probe=True)):
+            if attempt:
+                self.failovers += 1
+                RPC_FAILOVERS.labels(self.chain, "read").inc()
+            try:
+                return await self._batch_call(endpoint, requests)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    async def _batch_call(self, endpoint: EndpointHealth, requests):
+        try:
+            response = await endpoint.provider.make_batch_request(requests)
+        except Exception as e:
+            endpoint.record_failure(self.chain, e)
+            self._record(endpoint, "error")
+            raise
+        # Batch chậm hơn một request đơn: không đưa vào mẫu latency
+        endpoint.probing = False
+        self._record(endpoint, "success")
+        return response
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        for endpoint in self.endpoints:
+            if await endpoint.provider.is_connected(show_traceback):
+                return True
+        return False
+
+    async def disconnect(self):
+        for endpoint in self.endpoints:
+            await endpoint.provider.disconnect()
+
+    def get_status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "chain": self.chain,
+            "endpoints": [endpoint.get_status(now) for endpoint in self.endpoints],
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers
+        }
@@ -0,0 +1,370 @@
+"""
+Tournament: giải quyết cả một vòng đấu (bracket loại trực tiếp) trong một lần
+
+Khác với trận PvP qua WebSocket (challenge_handler + match_pipeline):
+- Mỗi vòng chỉ rút MỘT random word (VRF nếu có, trong deadline "tournament"),
+  seed của từng trận được suy ra từ word đó theo chỉ số trận
+- Toàn bộ trận trong vòng được tính trong memory bằng services.match_outcome
+- Kết quả, stats và level của cả vòng được ghi bằng một bulk_write
+
+Trận tournament không trừ remaining_matches của người chơi.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+
+from database.database import get_database
+from services.bot_roster import bot_roster
+from services.match_outcome import assign_roles, pick_skill, resolve_match
+from services.match_pipeline import apply_match_to_user, match_stat_inc, project_level
+from utils.entropy import MatchEntropy, expand_word
+from utils.logger import api_logger
+from utils.time_utils import get_vietnam_time
+from utils.vrf_deadline import random_word_within_deadline
+
+TOURNAMENT_DOMAIN = "kickin/tournament/v1"
+
+# Các trường user cần để tính một trận và level
+PLAYER_PROJECTION = {
+    "name": 1, "is_vip": 1, "level": 1, "total_point": 1, "week_history": 1,
+    "kicker_skills": 1, "goalkeeper_skills": 1, "kicked_win": 1, "keep_win": 1,
+    "total_kicked": 1, "total_keep": 1, "available_skill_points": 1,
+    "wallet": 1, "evm_address": 1
+}
+
+
+def pair_bracket(player_ids: List[str]) -> Tuple[List[Tuple[str, str]], Optional[str]]:
+    """
+    Ghép cặp theo thứ tự bracket: (0, 1), (2, 3)...
+
+    Returns:
+        (danh sách cặp, người được bye nếu số người lẻ)
+    """
+    pairs = [(player_ids[i], player_ids[i + 1]) for i in range(0, len(player_ids) - 1, 2)]
+    bye = player_ids[-1] if len(player_ids) % 2 else None
+    return pairs, bye
+
+
+def match_entropy_for(round_seed: int, round_no: int, match_index: int, source: str) -> MatchEntropy:
+    """Entropy của trận thứ match_index trong vòng, suy ra từ word của vòng"""
+    seed = expand_word(round_seed, TOURNAMENT_DOMAIN, f"round:{round_no}", match_index)
+    entropy = MatchEntropy(seed, source=source)
+    entropy.draws["match_index"] = match_index
+    return entropy
+
+
+def resolve_round(
+    tournament_id: str,
+    round_no: int,
+    player_ids: List[str],
+    players: Dict[str, dict],
+    kicker_counters: Dict[str, Optional[str]],
+    round_seed: int,
+    source: str
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Tính toàn bộ trận của một vòng trong memory (không I/O).
+
+    Args:
+        player_ids: Người chơi còn lại theo thứ tự bracket
+        players: user_id -> user doc (ít nhất các trường trong PLAYER_PROJECTION)
+        kicker_counters: tên skill kicker -> counter (xem BotRoster.kicker_counters)
+
+    Returns:
+        (danh sách match record, danh sách người đi tiếp theo thứ tự bracket)
+    """
+    pairs, bye = pair_bracket(player_ids)
+    timestamp = get_vietnam_time().isoformat()
+    matches = []
+    advancing = []
+
+    for index, (a_id, b_id) in enumerate(pairs):
+        entropy = match_entropy_for(round_seed, round_no, index, source)
+        kicker_id, goalkeeper_id = assign_roles(a_id, b_id, entropy.randbelow("role", 2))
+        kicker_skills = players[kicker_id].get("kicker_skills", [])
+        goalkeeper_skills = players[goalkeeper_id].get("goalkeeper_skills", [])
+
+        if not kicker_skills or not goalkeeper_skills:
+            # Bên thiếu skill bị xử thua
+            winner_id = goalkeeper_id if not kicker_skills else kicker_id
+            advancing.append(winner_id)
+            matches.append({
+                "match_id": f"{tournament_id}:{round_no}:{index}",
+                "tournament_id": tournament_id,
+                "round": round_no,
+                "timestamp": timestamp,
+                "kicker_id": kicker_id,
+                "goalkeeper_id": goalkeeper_id,
+                "winner_id": winner_id,
+                "loser_id": kicker_id if winner_id == goalkeeper_id else goalkeeper_id,
+                "walkover": True
+            })
+            continue
+
+        kicker_skill = pick_skill(kicker_skills, entropy.randbelow("kicker_skill", len(kicker_skills)))
+        goalkeeper_skill = pick_skill(goalkeeper_skills, entropy.randbelow("goalkeeper_skill", len(goalkeeper_skills)))
+        outcome = resolve_match(
+            kicker_id, goalkeeper_id, kicker_skill, goalkeeper_skill, kicker_counters.get(kicker_skill)
+        )
+        advancing.append(outcome["winner_id"])
+        matches.append({
+            "match_id": f"{tournament_id}:{round_no}:{index}",
+            "tournament_id": tournament_id,
+            "round": round_no,
+            "timestamp": timestamp,
+            "kicker_id": kicker_id,
+            "goalkeeper_id": goalkeeper_id,
+            **outcome,
+            "entropy": entropy.to_record()
+        })
+
+    if bye is not None:
+        advancing.append(bye)
+    return matches, advancing
+
+
+def build_round_writes(matches: List[Dict], players: Dict[str, dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Tính stats + level sau trận của một vòng. Mỗi người chơi chỉ đấu tối đa
+    một trận mỗi vòng nên mỗi người có đúng một write.
+    Kết quả chỉ gồm dict thuần để lưu nguyên vào pending_round (xem round_write_ops).
+
+    Returns:
+        (writes [{"user_id", "match_id", "inc", "set", "add_to_set"}],
+         milestones [{"user_id", "total_win", "user"}] cần mint)
+    """
+    writes = []
+    milestones = []
+    for match in matches:
+        if match.get("walkover"):
+            continue
+        for user_id, won in ((match["winner_id"], True), (match["loser_id"], False)):
+            role = match["winner_role"] if won else match["loser_role"]
+            user = players[user_id]
+            write = {
+                "user_id": user_id,
+                "match_id": match["match_id"],
+                "inc": match_stat_inc(user, won, role, consume_match=False),
+                "set": None,
+                "add_to_set": None
+            }
+            projected = apply_match_to_user(user, won, role, consume_match=False)
+            if won:
+                levels = project_level(projected)
+                projected.update(level=levels["level"], is_pro=levels["is_pro"], legend_level=levels["legend_level"])
+                write["set"] = {
+                    "level": levels["level"],
+                    "is_pro": levels["is_pro"],
+                    "legend_level": levels["legend_level"]
+                }
+                if levels["level"] > user.get("level", 1) and not levels["is_pro"]:
+                    write["add_to_set"] = {
+                        f"{role}_skills": f"{role}_skill_level_{levels['level']}"
+                    }
+                total_win = projected.get("kicked_win", 0) + projected.get("keep_win", 0)
+                if total_win % 10 == 0:
+                    milestones.append({
+                        "user_id": user_id,
+                        "total_win": total_win,
+                        "user": {field: projected.get(field) for field in ("name", "wallet", "evm_address")}
+                    })
+            writes.append(write)
+            players[user_id] = projected
+    return writes, milestones
+
+
+def round_write_ops(writes: List[Dict], matches: List[Dict]) -> List[UpdateOne]:
+    """
+    Bulk ops từ writes của build_round_writes.
+    Filter theo match_id để chạy lại vòng không cộng điểm 2 lần.
+    """
+    matches_by_id = {match["match_id"]: match for match in matches}
+    ops = []
+    for write in writes:
+        update = {
+            "$push": {"match_history": matches_by_id[write["match_id"]]},
+            "$inc": write["inc"]
+        }
+        if write["set"]:
+            update["$set"] = write["set"]
+        if write["add_to_set"]:
+            update["$addToSet"] = write["add_to_set"]
+        ops.append(UpdateOne(
+            {"_id": ObjectId(write["user_id"]), "match_history.match_id": {"$ne": write["match_id"]}},
+            update
+        ))
+    return ops
+
+
+async def draw_round_seed() -> Tuple[int, str]:
+    """Một random word cho cả vòng (VRF trong deadline "tournament", quá hạn dùng local)"""
+    async def get_word():
+        from utils.vrf_initializer import vrf_initializer
+        chainlink_vrf = await vrf_initializer.get_vrf_instance_async()
+        return await chainlink_vrf.batch_manager.get_random_word_with_source()
+    return await random_word_within_deadline(get_word, "tournament")
+
+
+async def create_tournament(name: str, player_ids: List[str], db=None) -> Dict:
+    """Tạo tournament mới với bracket theo thứ tự player_ids"""
+    if len(player_ids) < 2:
+        raise ValueError("A tournament needs at least 2 players")
+    if len(set(player_ids)) != len(player_ids):
+        raise ValueError("Duplicate players in bracket")
+    db = db if db is not None else await get_database()
+    tournament = {
+        "name": name,
+        "player_ids": player_ids,
+        "remaining_ids": player_ids,
+        "rounds": [],
+        "status": "open",
+        "winner_id": None,
+        "created_at": get_vietnam_time().isoformat()
+    }
+    result = await db.tournaments.insert_one(tournament)
+    tournament["_id"] = result.inserted_id
+    return tournament
+
+
+async def resolve_next_round(
+    tournament_id: str,
+    db=None,
+    round_seed: Optional[Tuple[int, str]] = None,
+    mint_milestones: bool = True,
+    kicker_counters: Optional[Dict[str, Optional[str]]] = None
+) -> Dict:
+    """
+    Giải quyết vòng tiếp theo của tournament: 1 lần đọc người chơi, 1 random word,
+    tính trong memory, 1 bulk_write cho users và 1 update cho tournament.
+
+    Vòng được tính xong (trận, người đi tiếp, writes, milestone) và lưu vào
+    pending_round trước khi ghi kết quả, lưu có điều kiện nên hai lần gọi đồng thời
+    không thể lưu hai kết quả khác nhau. Lỗi giữa chừng thì lần chạy sau ghi lại
+    đúng snapshot đó (không đọc lại người chơi đã được cộng skill / stats), filter
+    theo match_id nên không cộng điểm 2 lần. Mint milestone được enqueue (idempotent)
+    trước khi snapshot bị xoá.
+
+    Args:
+        round_seed: (word, source) rút sẵn, mặc định rút qua draw_round_seed()
+        mint_milestones: Mint Victory NFT cho người chơi đạt milestone
+        kicker_counters: Bảng counter của skill, mặc định lấy từ bot_roster
+
+    Returns:
+        Tóm tắt vòng vừa đấu
+    """
+    if not ObjectId.is_valid(tournament_id):
+        raise ValueError("Invalid tournament ID")
+    db = db if db is not None else await get_database()
+    tournament = await db.tournaments.find_one({"_id": ObjectId(tournament_id)})
+    if not tournament:
+        raise ValueError("Tournament not found")
+    if tournament["status"] == "finished":
+        raise ValueError("Tournament already finished")
+
+    remaining_ids = tournament["remaining_ids"]
+    round_no = len(tournament["rounds"]) + 1
+
+    pending_round = tournament.get("pending_round") or {}
+    if pending_round.get("round") != round_no:
+        pending_round = {}
+
+    if "matches" not in pending_round:
+        players = {
+            str(u["_id"]): u
+            for u in await db.users.find(
+                {"_id": {"$in": [ObjectId(pid) for pid in remaining_ids]}}, PLAYER_PROJECTION
+            ).to_list(length=None)
+        }
+        missing = [pid for pid in remaining_ids if pid not in players]
+        if missing:
+            raise ValueError(f"Players not found: {missing[:5]}")
+
+        if "seed" in pending_round:
+            word, source = int(pending_round["seed"], 16), pending_round["source"]
+        else:
+            word, source = round_seed if round_seed is not None else await draw_round_seed()
+        if kicker_counters is None:
+            await bot_roster.ensure_loaded()
+            kicker_counters = bot_roster.kicker_counters
+
+        matches, advancing = resolve_round(
+            str(tournament["_id"]), round_no, remaining_ids, players,
+            kicker_counters, word, source
+        )
+        writes, milestones = build_round_writes(matches, players)
+        snapshot = {
+            "round": round_no,
+            "seed": f"{word:064x}",
+            "source": source,
+            "matches": matches,
+            "advancing": advancing,
+            "writes": writes,
+            "milestones": milestones
+        }
+        # Claim vòng nguyên tử: chỉ một lần gọi lưu được snapshot, lần gọi đồng thời replay snapshot đó
+        claimed = await db.tournaments.update_one(
+            {
+                "_id": tournament["_id"],
+                "rounds.round": {"$ne": round_no},
+                "pending_round.matches": {"$exists": False}
+            },
+            {"$set": {"pending_round": snapshot}}
+        )
+        if claimed.matched_count:
+            pending_round = snapshot
+        else:
+            tournament = await db.tournaments.find_one({"_id": tournament["_id"]})
+            pending_round = tournament.get("pending_round") or {}
+            if pending_round.get("round") != round_no or "matches" not in pending_round:
+                raise ValueError(f"Round {round_no} already resolved")
+            api_logger.warning(f"[Tournament] {tournament_id} round {round_no}: claimed by a concurrent call, replaying its snapshot")
+    else:
+        # Vòng đã tính nhưng ghi dở: replay snapshot
+        api_logger.warning(f"[Tournament] {tournament_id} round {round_no}: replaying saved round snapshot")
+
+    word, source = int(pending_round["seed"], 16), pending_round["source"]
+    matches = pending_round["matches"]
+    advancing = pending_round["advancing"]
+    writes = pending_round["writes"]
+    milestones = pending_round["milestones"]
+
+    ops = round_write_ops(writes, matches)
+    if ops:
+        await db.users.bulk_write(ops, ordered=False)
+    if matches:
+        await db.tournament_matches.bulk_write(
+            [ReplaceOne({"_id": m["match_id"]}, dict(m), upsert=True) for m in matches],
+            ordered=False
+        )
+
+    if milestones and mint_milestones:
+        from services.match_pipeline import match_pipeline
+        for milestone in milestones:
+            await match_pipeline.enqueue_milestone_mint(milestone["user"], milestone["user_id"], milestone["total_win"])
+
+    finished = len(advancing) == 1
+    round_summary = {
+        "round": round_no,
+        "seed": f"{word:064x}",
+        "source": source,
+        "matches": len(matches),
+        "advancing": len(advancing),
+        "resolved_at": get_vietnam_time().isoformat()
+    }
+    await db.tournaments.update_one(
+        {"_id": tournament["_id"], "rounds.round": {"$ne": round_no}},
+        {
+            "$push": {"rounds": round_summary},
+            "$set": {
+                "remaining_ids": advancing,
+                "status": "finished" if finished else "running",
+                "winner_id": advancing[0] if finished else None
+            },
+            "$unset": {"pending_round": ""}
+        }
+    )
+
+    api_logger.info(f"[Tournament] {tournament_id} round {round_no}: {len(matches)} matches, {len(advancing)} advancing ({source})")
+    return {**round_summary, "finished": finished, "winner_id": advancing[0] if finished else None}
@@ -0,0 +1,340 @@
+"""
+Index event của Victory NFT contract (Avalanche Fuji) vào MongoDB
+
+- Đọc log VictoryNFTMinted + Transfer bằng một get_logs cho mỗi khoảng block,
+  tiếp tục từ checkpoint lưu trong chain_indexer_checkpoints
+- Chỉ index block cách head ít nhất `confirmations` block nên không cần rollback
+  khi có reorg ngắn hơn độ sâu này
+- Ghi idempotent (upsert theo token id, owner chỉ cập nhật bởi Transfer mới hơn)
+  nên quét lại một khoảng block sau khi crash không làm sai dữ liệu
+
+Khi đã theo kịp head, lịch sử mint, owner và eligibility được đọc từ collection
+victory_nft_tokens thay vì gọi RPC (xem services.victory_nft_service).
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from hexbytes import HexBytes
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from config.chain_config import VICTORY_NFT_INDEXER_CONFIG
+from config.settings import settings
+from database.database import get_database
+from services.chain_providers import AVALANCHE_FUJI, AVALANCHE_FUJI_CHAIN_ID, chain_providers
+from services.mint_ledger import mint_ledger
+from utils.chain_metrics import INDEXER_BLOCK, INDEXER_EVENTS, INDEXER_LAG
+from utils.logger import api_logger
+
+VICTORY_NFT_TOKENS_COLLECTION = "victory_nft_tokens"
+CHECKPOINTS_COLLECTION = "chain_indexer_checkpoints"
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+VICTORY_NFT_EVENTS_ABI = [
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "internalType": "address", "name": "player", "type": "address"},
+            {"indexed": True, "internalType": "uint256", "name": "tokenId", "type": "uint256"},
+            {"indexed": False, "internalType": "uint256", "name": "wins", "type": "uint256"},
+            {"indexed": False, "internalType": "uint256", "name": "milestone", "type": "uint256"},
+            {"indexed": False, "internalType": "string", "name": "metadata", "type": "string"}
+        ],
+        "name": "VictoryNFTMinted",
+        "type": "event"
+    },
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "internalType": "address", "name": "from", "type": "address"},
+            {"indexed": True, "internalType": "address", "name": "to", "type": "address"},
+            {"indexed": True, "internalType": "uint256", "name": "tokenId", "type": "uint256"}
+        ],
+        "name": "Transfer",
+        "type": "event"
+    }
+]
+
+
+async def ensure_victory_nft_indexes(db):
+    await db[VICTORY_NFT_TOKENS_COLLECTION].create_index(
+        [("contract_key", ASCENDING), ("token_id", ASCENDING)], unique=True
+    )
+    await db[VICTORY_NFT_TOKENS_COLLECTION].create_index(
+        [("contract_key", ASCENDING), ("player_key", ASCENDING), ("milestone", ASCENDING)]
+    )
+    await db[VICTORY_NFT_TOKENS_COLLECTION].create_index([("contract_key", ASCENDING), ("owner_key", ASCENDING)])
+    await db[VICTORY_NFT_TOKENS_COLLECTION].create_index([("contract_key", ASCENDING), ("milestone", ASCENDING)])
+
+
+def _log_position(log) -> int:
+    """Thứ tự toàn cục của log: Transfer cũ hơn không được ghi đè owner mới hơn"""
+    return log["blockNumber"] * 1_000_000 + log["logIndex"]
+
+
+class VictoryNFTIndexer:
+    def __init__(self, contract_address: str, config: Optional[Dict] = None, start_block: int = 0):
+        config = {**VICTORY_NFT_INDEXER_CONFIG, **(config or {})}
+        self.confirmations = config["confirmations"]
+        self.poll_interval = config["poll_interval"]
+        self.max_log_range = config["max_log_range"]
+        self.start_block = start_block
+
+        self.w3 = chain_providers.get_w3(AVALANCHE_FUJI)
+        self.contract = self.w3.eth.contract(address=contract_address, abi=VICTORY_NFT_EVENTS_ABI)
+        self.contract_key = contract_address.lower()
+        self.checkpoint_id = f"{AVALANCHE_FUJI}:{self.contract_key}"
+        # Topic trong log RPC trả về là HexBytes
+        self._minted_topic = HexBytes(self.contract.events.VictoryNFTMinted().topic)
+        self._transfer_topic = HexBytes(self.contract.events.Transfer().topic)
+
+        self.next_block: Optional[int] = None
+        self.head: Optional[int] = None
+        self.synced = False
+        # Bắt đầu từ head vì không tìm được block deploy: thiếu lịch sử cũ, không dùng để trả lời query
+        self.partial = False
+        self.events = 0
+        self._task: Optional[asyncio.Task] = None
+        self._indexes_ready = False
+
+    async def _db(self):
+        db = await get_database()
+        if not self._indexes_ready:
+            await ensure_victory_nft_indexes(db)
+            self._indexes_ready = True
+        return db
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            behind = False
+            try:
+                behind = await self.sync_once()
+            except Exception as e:
+                api_logger.warning(f"[NFT Indexer] Sync failed at block {self.next_block}: {str(e)}")
+            if not behind:
+                await asyncio.sleep(self.poll_interval)
+
+    async def sync_once(self) -> bool:
+        """Index một khoảng block. Returns: True nếu vẫn còn block đã đủ confirmations chưa index."""
+        self.head = await self.w3.eth.block_number
+        safe_block = self.head - self.confirmations
+        if self.next_block is None:
+            self.next_block = await self._load_checkpoint(safe_block)
+
+        INDEXER_LAG.labels(indexer="victory_nft").set(max(self.head - self.next_block + 1, 0))
+        if self.next_block > safe_block:
+            self.synced = True
+            return False
+
+        to_block = min(safe_block, self.next_block + self.max_log_range - 1)
+        logs = await self.w3.eth.get_logs({
+            "address": self.contract.address,
+            "fromBlock": self.next_block,
+            "toBlock": to_block,
+            "topics": [[self._minted_topic, self._transfer_topic]]
+        })
+        await self._apply(logs)
+
+        db = await self._db()
+        await db[CHECKPOINTS_COLLECTION].update_one(
+            {"_id": self.checkpoint_id},
+            {"$set": {"next_block": to_block + 1, "partial": self.partial, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        self.next_block = to_block + 1
+        self.synced = to_block >= safe_block
+        INDEXER_BLOCK.labels(indexer="victory_nft").set(to_block)
+        if logs:
+            api_logger.info(f"[NFT Indexer] Indexed {len(logs)} events up to block {to_block}")
+        return not self.synced
+
+    async def _load_checkpoint(self, safe_block: int) -> int:
+        db = await self._db()
+        checkpoint = await db[CHECKPOINTS_COLLECTION].find_one({"_id": self.checkpoint_id})
+        if checkpoint:
+            self.partial = checkpoint.get("partial", False)
+            return checkpoint["next_block"]
+        if self.start_block:
+            return self.start_block
+        try:
+            return await self._find_deployment_block(safe_block)
+        except Exception as e:
+            # RPC không phải archive node: chỉ index event mới, đặt VICTORY_NFT_INDEXER_START_BLOCK để backfill
+            api_logger.warning(f"[NFT Indexer] Cannot find deployment block ({str(e)}), starting at {safe_block}")
+            self.partial = True
+            return max(safe_block, 0)
+
+    async def _find_deployment_block(self, latest: int) -> int:
+        """Block đầu tiên có code của contract (tìm nhị phân, ~log2(latest) lần eth_getCode)"""
+        if not await self.w3.eth.get_code(self.contract.address, latest):
+            raise RuntimeError(f"No contract code at {self.contract.address}")
+        low, high = 0, latest
+        while low < high:
+            middle = (low + high) // 2
+            if await self.w3.eth.get_code(self.contract.address, middle):
+                high = middle
+            else:
+                low = middle + 1
+        api_logger.info(f"[NFT Indexer] Victory NFT contract deployed at block {low}")
+        return low
+
+    async def _apply(self, logs: List[dict]):
+        minted, transfers = [], []
+        for log in logs:
+            topic = log["topics"][0]
+            if topic == self._minted_topic:
+                minted.append(self.contract.events.VictoryNFTMinted().process_log(log))
+            elif topic == self._transfer_topic:
+                transfers.append(self.contract.events.Transfer().process_log(log))
+
+        # minted_at giống getMintInfo: timestamp của block mint
+        block_numbers = sorted({event["blockNumber"] for event in minted})
+        blocks = await asyncio.gather(*(self.w3.eth.get_block(number) for number in block_numbers))
+        timestamps = {number: block["timestamp"] for number, block in zip(block_numbers, blocks)}
+
+        now = datetime.utcnow()
+        mint_operations = []
+        for event in minted:
+            args = event["args"]
+            mint_operations.append(UpdateOne(
+                {"contract_key": self.contract_key, "token_id": args["tokenId"]},
+                {"$set": {
+                    "player": args["player"],
+                    "player_key": args["player"].lower(),
+                    "wins": args["wins"],
+                    "milestone": args["milestone"],
+                    "metadata": args["metadata"],
+                    "minted_at": timestamps[event["blockNumber"]],
+                    "mint_block": event["blockNumber"],
+                    "mint_transaction_hash": event["transactionHash"].hex(),
+                    "updated_at": now
+                }},
+                upsert=True
+            ))
+        # Mỗi token chỉ giữ Transfer cuối cùng trong khoảng block, để không có 2 upsert cùng token
+        latest_transfers = {}
+        for event in sorted(transfers, key=_log_position):
+            latest_transfers[event["args"]["tokenId"]] = event
+        transfer_operations = []
+        for event in latest_transfers.values():
+            args = event["args"]
+            position = _log_position(event)
+            # Filter không khớp khi đã có Transfer mới hơn -> upsert trùng unique index, bỏ qua
+            transfer_operations.append(UpdateOne(
+                {
+                    "contract_key": self.contract_key,
+                    "token_id": args["tokenId"],
+                    "$or": [{"transfer_position": {"$lt": position}}, {"transfer_position": None}]
+                },
+                {"$set": {
+                    "owner": None if args["to"] == ZERO_ADDRESS else args["to"],
+                    "owner_key": None if args["to"] == ZERO_ADDRESS else args["to"].lower(),
+                    "transfer_position": position,
+                    "updated_at": now
+                }},
+                upsert=True
+            ))
+        db = await self._db()
+        for operations in (mint_operations, transfer_operations):
+            if not operations:
+                continue
+            try:
+                await db[VICTORY_NFT_TOKENS_COLLECTION].bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+        # Sổ mint biết cả NFT mint ngoài mint queue (hoặc trước khi có sổ)
+        await mint_ledger.record_minted(AVALANCHE_FUJI_CHAIN_ID, [{
+            "player": event["args"]["player"],
+            "milestone": event["args"]["milestone"],
+            "token_id": event["args"]["tokenId"],
+            "transaction_hash": event["transactionHash"].hex()
+        } for event in minted])
+        self.events += len(minted) + len(transfers)
+        INDEXER_EVENTS.labels(indexer="victory_nft", event="VictoryNFTMinted").inc(len(minted))
+        INDEXER_EVENTS.labels(indexer="victory_nft", event="Transfer").inc(len(transfers))
+
+    @property
+    def serving(self) -> bool:
+        """Index đầy đủ và đã theo kịp head (trễ tối đa confirmations block)"""
+        return self.synced and not self.partial
+
+    # --- Query (không RPC) ---
+
+    async def _tokens(self):
+        return (await self._db())[VICTORY_NFT_TOKENS_COLLECTION]
+
+    async def get_player_tokens(self, player_address: str) -> List[int]:
+        """Token đã mint cho player (giống getPlayerTokens của contract)"""
+        collection = await self._tokens()
+        cursor = collection.find(
+            {"contract_key": self.contract_key, "player_key": player_address.lower()},
+            {"token_id": 1}
+        ).sort("token_id", ASCENDING)
+        return [doc["token_id"] async for doc in cursor]
+
+    async def get_owned_tokens(self, owner_address: str) -> List[int]:
+        """Token player đang sở hữu (theo Transfer)"""
+        collection = await self._tokens()
+        cursor = collection.find(
+            {"contract_key": self.contract_key, "owner_key": owner_address.lower()},
+            {"token_id": 1}
+        ).sort("token_id", ASCENDING)
+        return [doc["token_id"] async for doc in cursor]
+
+    async def get_token(self, token_id: int) -> Optional[dict]:
+        collection = await self._tokens()
+        return await collection.find_one({"contract_key": self.contract_key, "token_id": token_id})
+
+    async def get_player_history(self, player_address: str) -> List[dict]:
+        collection = await self._tokens()
+        cursor = collection.find(
+            {"contract_key": self.contract_key, "player_key": player_address.lower()}
+        ).sort("minted_at", ASCENDING)
+        return [doc async for doc in cursor]
+
+    async def has_milestone(self, player_address: str, milestone: int) -> bool:
+        collection = await self._tokens()
+        return await collection.find_one(
+            {"contract_key": self.contract_key, "player_key": player_address.lower(), "milestone": milestone},
+            {"_id": 1}
+        ) is not None
+
+    async def get_milestone_players(self, milestone: int, limit: int = 100) -> List[dict]:
+        collection = await self._tokens()
+        cursor = collection.find(
+            {"contract_key": self.contract_key, "milestone": milestone},
+            {"_id": 0, "token_id": 1, "player": 1, "owner": 1, "minted_at": 1}
+        ).sort("token_id", ASCENDING).limit(limit)
+        return [doc async for doc in cursor]
+
+    def get_status(self) -> dict:
+        return {
+            "contract_address": self.contract.address,
+            "synced": self.synced,
+            "serving": self.serving,
+            "next_block": self.next_block,
+            "head": self.head,
+            "confirmations": self.confirmations,
+            "events_indexed": self.events
+        }
+
+
+# Singleton instance
+victory_nft_indexer = VictoryNFTIndexer(
+    settings.AVALANCHE_FUJI_NFT_CONTRACT,
+    start_block=settings.VICTORY_NFT_INDEXER_START_BLOCK
+)
@@ -1,16 +1,26 @@
 import json
 import asyncio
-from typing import Optional, Dict, Any
-from web3 import Web3
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
 from web3.exceptions import ContractLogicError, TransactionNotFound
+from web3.logs import DISCARD
 import logging
 from config.settings import settings
+from services.chain_providers import AVALANCHE_FUJI, AVALANCHE_FUJI_CHAIN_ID, chain_providers
+from services.fee_oracle import get_fee_oracle
+from services.mint_ledger import LEDGER_CONFIRMED, mint_ledger
+from services.read_aggregator import get_read_aggregator
+from services.victory_nft_indexer import victory_nft_indexer
+from utils.receipt_tracker import get_receipt_tracker
 
 logger = logging.getLogger(__name__)
 
 class VictoryNFTService:
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(settings.AVALANCHE_FUJI_RPC_URL))
+        # AsyncWeb3 dùng chung (keep-alive, giới hạn RPC đồng thời)
+        self.w3 = chain_providers.get_w3(AVALANCHE_FUJI)
+        self.fee_oracle = get_fee_oracle(AVALANCHE_FUJI)
+        # View call đồng thời được gom vào Multicall3
+        self.reads = get_read_aggregator(AVALANCHE_FUJI)
         self.contract_address = settings.AVALANCHE_FUJI_NFT_CONTRACT
         self.private_key = settings.CCIP_PRIVATE_KEY or settings.PRIVATE_KEY
         
@@ -27,6 +37,17 @@ class VictoryNFTService:
                 "stateMutability": "nonpayable",
                 "type": "function"
             },
+            {
+                "inputs": [
+                    {"internalType": "address[]", "name": "players", "type": "address[]"},
+                    {"internalType": "uint256[]", "name": "wins", "type": "uint256[]"},
+                    {"internalType": "string[]", "name": "metadata", "type": "string[]"}
+                ],
+                "name": "batchMintVictoryNFT",
+                "outputs": [{"internalType": "uint256[]", "name": "tokenIds", "type": "uint256[]"}],
+                "stateMutability": "nonpayable",
+                "type": "function"
+            },
             {
                 "inputs": [{"internalType": "address", "name": "player", "type": "address"}],
                 "name": "getPlayerTokens",
@@ -46,6 +67,18 @@ class VictoryNFTService:
                 "stateMutability": "view",
                 "type": "function"
             },
+            {
+                "anonymous": False,
+                "inputs": [
+                    {"indexed": True, "internalType": "address", "name": "player", "type": "address"},
+                    {"indexed": True, "internalType": "uint256", "name": "tokenId", "type": "uint256"},
+                    {"indexed": False, "internalType": "uint256", "name": "wins", "type": "uint256"},
+                    {"indexed": False, "internalType": "uint256", "name": "milestone", "type": "uint256"},
+                    {"indexed": False, "internalType": "string", "name": "metadata", "type": "string"}
+                ],
+                "name": "VictoryNFTMinted",
+                "type": "event"
+            },
             {
                 "inputs": [],
                 "name": "totalSupply",
@@ -79,16 +112,22 @@ class VictoryNFTService:
             self.deployer_address = None
             logger.warning("No private key provided for Victory NFT service")
 
-    async def mint_victory_nft(self, player_address: str, wins: int, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    async def mint_victory_nft(
+        self,
+        player_address: str,
+        wins: int,
+        metadata: Dict[str, Any],
+        on_submitted: Optional[Callable[[str, int], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
         """
         Mint Victory NFT for a player
+        on_submitted(tx_hash, nonce) được gọi ngay sau khi transaction được gửi (trước khi chờ receipt)
         """
         try:
             # Log chain info
             logger.info(f"Minting on chain: {self.w3.provider.endpoint_uri}")
             logger.info(f"Contract address: {self.contract_address}")
-            chain_id = self.w3.eth.chain_id
-            logger.info(f"Current chainId: {chain_id}")
+            logger.info(f"Chain: {AVALANCHE_FUJI}")
             logger.info(f"Deployer address: {self.deployer_address}")
 
             # Validate inputs
@@ -100,7 +139,7 @@ class VictoryNFTService:
             
             # Check if player already has NFT for this milestone
             milestone = wins // 10
-            has_nft = await self.has_milestone_nft(player_address, milestone)
+            has_nft = await self.has_milestone_nft(player_address, milestone, confirm_onchain=True)
             if has_nft:
                 return {
                     "success": False,
@@ -111,49 +150,38 @@ class VictoryNFTService:
             # Prepare metadata
             metadata_json = json.dumps(metadata)
             
-            # Build transaction
-            nonce = self.w3.eth.get_transaction_count(self.deployer_address)
-            
-            # Estimate gas
-            gas_estimate = self.contract.functions.mintVictoryNFT(
-                player_address,
-                wins,
-                metadata_json
-            ).estimate_gas({'from': self.deployer_address})
+            # Estimate gas (cache theo số slot 32 byte của metadata, buffer 20% bù chênh lệch giữa các player)
+            mint_call = self.contract.functions.mintVictoryNFT(player_address, wins, metadata_json)
+            gas_estimate = await self.fee_oracle.estimate_gas(
+                ("mintVictoryNFT", (len(metadata_json.encode()) + 31) // 32),
+                mint_call,
+                {'from': self.deployer_address}
+            )
             
-            # Build transaction
-            transaction = self.contract.functions.mintVictoryNFT(
-                player_address,
-                wins,
-                metadata_json
-            ).build_transaction({
-                'from': self.deployer_address,
-                'nonce': nonce,
+            # Sign and send transaction: nonce cấp local, nhiều mint có thể cùng chờ receipt
+            logger.info(f"Sending mint transaction for player {player_address}, wins {wins}")
+            tracker = await get_receipt_tracker(self.w3, self.account)
+            tracked = await tracker.send(mint_call, {
                 'gas': int(gas_estimate * 1.2),  # Add 20% buffer
-                'gasPrice': self.w3.eth.gas_price
+                'gasPrice': await self.fee_oracle.get_gas_price()
             })
+            logger.info(f"Transaction sent, hash: {tracked.tx_hash}")
+            if on_submitted is not None:
+                await on_submitted(tracked.tx_hash, tracked.nonce)
             
-            # Sign and send transaction
-            logger.info(f"Signing transaction for player {player_address}, wins {wins}")
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.private_key)
-            logger.info(f"Transaction signed successfully, signed_txn type: {type(signed_txn)}")
-            logger.info(f"Signed transaction attributes: {dir(signed_txn)}")
-            
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-            logger.info(f"Transaction sent, hash: {tx_hash.hex()}")
+            # Wait for transaction receipt (poller chung của ví, tự thay thế nếu bị kẹt)
+            tx_receipt = await tracker.wait(tracked, timeout=120)
+            tx_hash = tx_receipt["transactionHash"].hex()
             
-            # Wait for transaction receipt
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-            
-            if tx_receipt.status == 1:
-                # Get the minted token ID (it's the latest token)
-                total_supply = await self.get_total_supply()
-                token_id = total_supply - 1  # Since we just minted
+            if tx_receipt["status"] == 1:
+                # Token ID lấy từ event của chính transaction (totalSupply bị race khi mint song song)
+                events = self.contract.events.VictoryNFTMinted().process_receipt(tx_receipt, errors=DISCARD)
+                token_id = events[0]["args"]["tokenId"] if events else None
                 
                 return {
                     "success": True,
                     "token_id": token_id,
-                    "transaction_hash": tx_hash.hex(),
+                    "transaction_hash": tx_hash,
                     "player_address": player_address,
                     "wins": wins,
                     "milestone": milestone,
@@ -163,7 +191,7 @@ class VictoryNFTService:
                 return {
                     "success": False,
                     "error": "Transaction failed",
-                    "transaction_hash": tx_hash.hex()
+                    "transaction_hash": tx_hash
                 }
                 
         except Exception as e:
@@ -173,12 +201,105 @@ class VictoryNFTService:
                 "error": str(e)
             }
 
+    async def batch_mint_victory_nft(
+        self,
+        mints: List[Tuple[str, int, Dict[str, Any]]],
+        on_submitted: Optional[Callable[[List[int], str, int], Awaitable[None]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Mint nhiều Victory NFT trong một transaction batchMintVictoryNFT.
+        mints: [(player_address, wins, metadata)], kết quả trả về theo đúng thứ tự.
+        Mint không hợp lệ / đã có NFT bị loại trước khi gửi, transaction lỗi thì
+        mọi mint còn lại trong batch đều nhận lỗi.
+        on_submitted(indexes, tx_hash, nonce): các mint (vị trí trong mints) vừa được gửi.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(mints)
+        try:
+            for index, (player_address, wins, _) in enumerate(mints):
+                if not self.w3.is_address(player_address):
+                    results[index] = {"success": False, "error": "Invalid player address"}
+                elif wins <= 0 or wins % 10 != 0:
+                    results[index] = {"success": False, "error": "Wins must be a positive multiple of 10"}
+
+            # Milestone đã mint (vd: job chạy lại sau khi batch trước đã được mine)
+            candidates = [i for i, result in enumerate(results) if result is None]
+            has_nfts = await asyncio.gather(*(
+                self.has_milestone_nft(mints[i][0], mints[i][1] // 10, confirm_onchain=True) for i in candidates
+            ))
+            for index, has_nft in zip(candidates, has_nfts):
+                if has_nft:
+                    milestone = mints[index][1] // 10
+                    results[index] = {
+                        "success": False,
+                        "error": f"Player already has NFT for milestone {milestone}",
+                        "milestone": milestone
+                    }
+
+            batch = [i for i, result in enumerate(results) if result is None]
+            if not batch:
+                return results
+
+            players = [mints[i][0] for i in batch]
+            wins_list = [mints[i][1] for i in batch]
+            metadata_jsons = [json.dumps(mints[i][2]) for i in batch]
+            batch_call = self.contract.functions.batchMintVictoryNFT(players, wins_list, metadata_jsons)
+            gas_estimate = await self.fee_oracle.estimate_gas(
+                ("batchMintVictoryNFT", len(batch), sum((len(m.encode()) + 31) // 32 for m in metadata_jsons)),
+                batch_call,
+                {'from': self.deployer_address}
+            )
+
+            logger.info(f"Sending batch mint transaction for {len(batch)} players")
+            tracker = await get_receipt_tracker(self.w3, self.account)
+            tracked = await tracker.send(batch_call, {
+                'gas': int(gas_estimate * 1.2),  # Add 20% buffer
+                'gasPrice': await self.fee_oracle.get_gas_price()
+            })
+            logger.info(f"Batch transaction sent, hash: {tracked.tx_hash}")
+            if on_submitted is not None:
+                await on_submitted(batch, tracked.tx_hash, tracked.nonce)
+
+            tx_receipt = await tracker.wait(tracked, timeout=120)
+            tx_hash = tx_receipt["transactionHash"].hex()
+            if tx_receipt["status"] != 1:
+                for index in batch:
+                    results[index] = {"success": False, "error": "Batch transaction failed", "transaction_hash": tx_hash}
+                return results
+
+            # Token ID theo (player, milestone) từ event của chính transaction
+            token_ids = {}
+            for event in self.contract.events.VictoryNFTMinted().process_receipt(tx_receipt, errors=DISCARD):
+                token_ids[(event["args"]["player"].lower(), event["args"]["milestone"])] = event["args"]["tokenId"]
+            for index in batch:
+                player_address, wins, metadata = mints[index]
+                milestone = wins // 10
+                results[index] = {
+                    "success": True,
+                    "token_id": token_ids.get((player_address.lower(), milestone)),
+                    "transaction_hash": tx_hash,
+                    "batch_size": len(batch),
+                    "player_address": player_address,
+                    "wins": wins,
+                    "milestone": milestone,
+                    "metadata": metadata
+                }
+            return results
+
+        except Exception as e:
+            logger.error(f"Error batch minting Victory NFTs: {str(e)}")
+            return [result or {"success": False, "error": str(e)} for result in results]
+
     async def get_player_tokens(self, player_address: str) -> list:
         """
         Get all tokens owned by a player
         """
+        if victory_nft_indexer.serving:
+            try:
+                return await victory_nft_indexer.get_player_tokens(player_address)
+            except Exception as e:
+                logger.warning(f"Victory NFT index unavailable, reading chain: {str(e)}")
         try:
-            tokens = self.contract.functions.getPlayerTokens(player_address).call()
+            tokens = await self.reads.call(self.contract.functions.getPlayerTokens(player_address))
             return [token for token in tokens]
         except Exception as e:
             logger.error(f"Error getting player tokens: {str(e)}")
@@ -188,8 +309,22 @@ class VictoryNFTService:
         """
         Get mint info for a specific token
         """
+        if victory_nft_indexer.serving:
+            try:
+                token = await victory_nft_indexer.get_token(token_id)
+                if token is None or token.get("milestone") is None:
+                    return None
+                return {
+                    "player": token["player"],
+                    "wins": token["wins"],
+                    "milestone": token["milestone"],
+                    "minted_at": token["minted_at"],
+                    "owner": token.get("owner")
+                }
+            except Exception as e:
+                logger.warning(f"Victory NFT index unavailable, reading chain: {str(e)}")
         try:
-            info = self.contract.functions.getMintInfo(token_id).call()
+            info = await self.reads.call(self.contract.functions.getMintInfo(token_id))
             return {
                 "player": info[0],
                 "wins": info[1],
@@ -205,17 +340,34 @@ class VictoryNFTService:
         Get total number of tokens minted
         """
         try:
-            return self.contract.functions.totalSupply().call()
+            return await self.reads.call(self.contract.functions.totalSupply())
         except Exception as e:
             logger.error(f"Error getting total supply: {str(e)}")
             return 0
 
-    async def has_milestone_nft(self, player_address: str, milestone: int) -> bool:
+    async def has_milestone_nft(self, player_address: str, milestone: int, confirm_onchain: bool = False) -> bool:
         """
         Check if player has NFT for specific milestone
+        Index trễ vài block so với chain: confirm_onchain=True (trước khi mint) đọc lại
+        contract khi index chưa thấy NFT, tránh mint trùng
         """
+        if not confirm_onchain:
+            try:
+                entry = await mint_ledger.get_entry(player_address, milestone, AVALANCHE_FUJI_CHAIN_ID)
+                if entry is not None and entry["status"] == LEDGER_CONFIRMED:
+                    return True
+            except Exception as e:
+                logger.warning(f"Mint ledger unavailable: {str(e)}")
+        if victory_nft_indexer.serving:
+            try:
+                if await victory_nft_indexer.has_milestone(player_address, milestone):
+                    return True
+                if not confirm_onchain:
+                    return False
+            except Exception as e:
+                logger.warning(f"Victory NFT index unavailable, reading chain: {str(e)}")
         try:
-            return self.contract.functions.hasMilestoneNFT(player_address, milestone).call()
+            return await self.reads.call(self.contract.functions.hasMilestoneNFT(player_address, milestone))
         except Exception as e:
             logger.error(f"Error checking milestone NFT: {str(e)}")
             return False
@@ -224,12 +376,25 @@ class VictoryNFTService:
         """
         Get complete NFT history for a player
         """
+        if victory_nft_indexer.serving:
+            try:
+                return [{
+                    "token_id": token["token_id"],
+                    "player": token["player"],
+                    "wins": token["wins"],
+                    "milestone": token["milestone"],
+                    "minted_at": token["minted_at"],
+                    "owner": token.get("owner")
+                } for token in await victory_nft_indexer.get_player_history(player_address)]
+            except Exception as e:
+                logger.warning(f"Victory NFT index unavailable, reading chain: {str(e)}")
         try:
             tokens = await self.get_player_tokens(player_address)
             history = []
             
-            for token_id in tokens:
-                mint_info = await self.get_mint_info(token_id)
+            # Đọc song song, số RPC đồng thời do provider pool giới hạn
+            mint_infos = await asyncio.gather(*(self.get_mint_info(token_id) for token_id in tokens))
+            for token_id, mint_info in zip(tokens, mint_infos):
                 if mint_info:
                     history.append({
                         "token_id": token_id,
@@ -253,6 +418,17 @@ class VictoryNFTService:
                 }
             
             milestone = total_wins // 10
+            # Sổ mint có mọi milestone đã claim / đã mint (indexer ghi bù NFT mint ngoài sổ)
+            entry = await mint_ledger.get_entry(player_address, milestone, AVALANCHE_FUJI_CHAIN_ID)
+            if entry is not None:
+                return {
+                    "eligible": False,
+                    "milestone": milestone,
+                    "total_wins": total_wins,
+                    "has_nft": entry["status"] == LEDGER_CONFIRMED,
+                    "mint_status": entry["status"]
+                }
+            # NFT mint trước khi có sổ mà indexer chưa quét tới: hỏi thêm index / chain
             has_nft = await self.has_milestone_nft(player_address, milestone)
             
             return {
@@ -0,0 +1,183 @@
+"""
+Thống kê và leaderboard Victory NFT (collection victory_nfts) được tính sẵn
+
+- Mỗi mint ghi vào victory_nfts kèm field denormalized: player_key (địa chỉ
+  lowercase), player_name, user_id và minted_at_utc (datetime, minted_at cũ là chuỗi
+  giờ Việt Nam nên không so sánh khoảng thời gian được)
+- Sau mỗi mint, một aggregation ($facet) tính lại tổng số NFT, số player, số mint
+  24h, top milestone và leaderboard, ghi vào một document của victory_nft_stats.
+  Route /stats và /leaderboard chỉ đọc document này
+- Player cũ chưa có player_name được lấy tên qua $lookup users theo wallet /
+  evm_address (có index), chỉ cho các dòng của leaderboard
+- Mint dồn dập chỉ gây một lần tính lại sau lần đang chạy; document cũ hơn max_age
+  (số mint 24h giảm dần theo thời gian) được tính lại nền khi có người đọc
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo import ASCENDING
+
+from config.chain_config import VICTORY_NFT_STATS_CONFIG
+from database.database import get_database
+from utils.logger import api_logger
+from utils.time_utils import get_vietnam_time
+
+VICTORY_NFTS_COLLECTION = "victory_nfts"
+VICTORY_NFT_STATS_COLLECTION = "victory_nft_stats"
+STATS_DOCUMENT_ID = "global"
+
+# Document cũ chưa có player_key
+_PLAYER_KEY = {"$ifNull": ["$player_key", {"$toLower": "$player_address"}]}
+
+
+async def ensure_victory_nft_stats_indexes(db):
+    await db[VICTORY_NFTS_COLLECTION].create_index([("player_key", ASCENDING), ("milestone", ASCENDING)])
+    await db[VICTORY_NFTS_COLLECTION].create_index("minted_at_utc")
+
+
+def build_victory_mint(
+    player_address: str,
+    total_wins: int,
+    message_id: Optional[str],
+    destination_chain: str,
+    contract_address: str,
+    player_name: Optional[str] = None,
+    user_id: Optional[str] = None,
+    **fields: Any
+) -> dict:
+    """Document victory_nfts của một mint"""
+    return {
+        "player_address": player_address,
+        "player_key": player_address.lower(),
+        "player_name": player_name,
+        "user_id": user_id,
+        "total_wins": total_wins,
+        "milestone": total_wins // 10,
+        "message_id": message_id,
+        "destination_chain": destination_chain,
+        "contract_address": contract_address,
+        "minted_at": get_vietnam_time().isoformat(),
+        "minted_at_utc": datetime.utcnow(),
+        "status": "minted",
+        **fields
+    }
+
+
+class VictoryNFTStats:
+    def __init__(self, config: Optional[Dict] = None):
+        config = {**VICTORY_NFT_STATS_CONFIG, **(config or {})}
+        self.max_age = config["max_age"]
+        self.recent_window = config["recent_window"]
+        self.leaderboard_size = config["leaderboard_size"]
+        self.top_milestones = config["top_milestones"]
+
+        self._refreshing: Optional[asyncio.Future] = None
+        self._dirty = False
+        self._indexes_ready = False
+
+    async def _db(self):
+        db = await get_database()
+        if not self._indexes_ready:
+            await ensure_victory_nft_stats_indexes(db)
+            self._indexes_ready = True
+        return db
+
+    async def log_mint(self, mint: dict):
+        """Ghi một mint (document từ build_victory_mint) và tính lại thống kê nền"""
+        db = await self._db()
+        await db[VICTORY_NFTS_COLLECTION].insert_one(mint)
+        self.refresh_soon()
+
+    def refresh_soon(self):
+        """Tính lại nền; đang tính thì tính thêm một lần sau khi xong (gộp các mint dồn dập)"""
+        if self._refreshing is not None and not self._refreshing.done():
+            self._dirty = True
+            return
+        self._refreshing = asyncio.ensure_future(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            self._dirty = False
+            try:
+                await self.refresh()
+            except Exception as e:
+                api_logger.warning(f"[NFTStats] Refresh failed: {str(e)}")
+            if not self._dirty:
+                return
+
+    async def refresh(self) -> dict:
+        """Một aggregation trên victory_nfts, ghi kết quả vào document thống kê"""
+        db = await self._db()
+        since = datetime.utcnow() - timedelta(seconds=self.recent_window)
+        pipeline = [
+            {"$facet": {
+                "minted": [{"$count": "count"}],
+                "players": [{"$group": {"_id": _PLAYER_KEY}}, {"$count": "count"}],
+                "recent": [{"$match": {"minted_at_utc": {"$gte": since}}}, {"$count": "count"}],
+                "top_milestones": [
+                    {"$group": {"_id": "$milestone", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1, "_id": 1}},
+                    {"$limit": self.top_milestones}
+                ],
+                "leaderboard": [
+                    {"$group": {
+                        "_id": _PLAYER_KEY,
+                        "player_address": {"$first": "$player_address"},
+                        "player_name": {"$max": "$player_name"},
+                        "nft_count": {"$sum": 1},
+                        "total_wins": {"$max": "$total_wins"},
+                        "last_mint": {"$max": "$minted_at"}
+                    }},
+                    {"$sort": {"nft_count": -1, "total_wins": -1, "_id": 1}},
+                    {"$limit": self.leaderboard_size},
+                    # Chỉ mint cũ thiếu player_name mới cần tên từ users
+                    {"$lookup": {"from": "users", "localField": "player_address", "foreignField": "wallet", "as": "wallet_users"}},
+                    {"$lookup": {"from": "users", "localField": "player_address", "foreignField": "evm_address", "as": "evm_users"}},
+                    {"$project": {
+                        "_id": 0,
+                        "player_address": 1,
+                        "nft_count": 1,
+                        "total_wins": 1,
+                        "last_mint": 1,
+                        "player_name": {"$ifNull": [
+                            "$player_name",
+                            {"$ifNull": [
+                                {"$arrayElemAt": ["$wallet_users.name", 0]},
+                                {"$ifNull": [{"$arrayElemAt": ["$evm_users.name", 0]}, "Unknown"]}
+                            ]}
+                        ]}
+                    }}
+                ]
+            }}
+        ]
+        facets = (await db[VICTORY_NFTS_COLLECTION].aggregate(pipeline).to_list(length=1))[0]
+
+        def count(name: str) -> int:
+            return facets[name][0]["count"] if facets[name] else 0
+
+        stats = {
+            "total_minted": count("minted"),
+            "unique_players": count("players"),
+            "recent_mints_24h": count("recent"),
+            "top_milestones": [{"milestone": item["_id"], "count": item["count"]} for item in facets["top_milestones"]],
+            "leaderboard": facets["leaderboard"],
+            "refreshed_at": datetime.utcnow()
+        }
+        await db[VICTORY_NFT_STATS_COLLECTION].replace_one({"_id": STATS_DOCUMENT_ID}, stats, upsert=True)
+        return stats
+
+    async def get(self) -> dict:
+        """Document thống kê (chưa có thì tính ngay, cũ hơn max_age thì trả bản cũ và tính lại nền)"""
+        db = await self._db()
+        stats = await db[VICTORY_NFT_STATS_COLLECTION].find_one({"_id": STATS_DOCUMENT_ID})
+        if stats is None:
+            return await self.refresh()
+        if datetime.utcnow() - stats["refreshed_at"] > timedelta(seconds=self.max_age):
+            self.refresh_soon()
+        return stats
+
+
+# Singleton instance
+victory_nft_stats = VictoryNFTStats()
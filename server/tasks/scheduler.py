@@ -1,6 +1,9 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from .cleanup import cleanup_inactive_guest_accounts
+from services.bot_roster import bot_roster
+from config.settings import settings
 from utils.logger import api_logger
 
 def setup_scheduler():
@@ -16,6 +19,15 @@ def setup_scheduler():
         replace_existing=True
     )
     
+    # daily_reset chạy ở process riêng nên reload bot roster cache định kỳ
+    scheduler.add_job(
+        bot_roster.reload,
+        trigger=IntervalTrigger(minutes=settings.BOT_ROSTER_REFRESH_MINUTES),
+        id='refresh_bot_roster',
+        name='Reload bot roster and skill counters',
+        replace_existing=True
+    )
+    
     try:
         scheduler.start()
     except Exception as e:
@@ -0,0 +1,136 @@
+"""
+Prometheus metrics cho các service gọi chain (mint Victory NFT, CCIP)
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Hit rate = hit / (hit + miss), theo chain và loại giá trị (gas_price, ccip_fee...)
+FEE_ORACLE_LOOKUPS = Counter(
+    'fee_oracle_lookups_total',
+    'Fee oracle cache lookups by chain, value kind and result (hit / miss)',
+    ['chain', 'kind', 'result']
+)
+
+FEE_ORACLE_REFRESHES = Counter(
+    'fee_oracle_refreshes_total',
+    'Fee oracle RPC loads by chain, value kind, mode (miss / background) and result',
+    ['chain', 'kind', 'mode', 'result']
+)
+
+TX_PENDING = Gauge(
+    'chain_tx_pending',
+    'Transactions sent by a server wallet and awaiting a receipt',
+    ['chain_id']
+)
+
+# result: success / reverted / replaced (nonce bị transaction khác dùng) / timeout
+TX_RECEIPTS = Counter(
+    'chain_tx_receipts_total',
+    'Tracked transactions by final result',
+    ['chain_id', 'result']
+)
+
+TX_BUMPS = Counter(
+    'chain_tx_gas_bumps_total',
+    'Stuck transactions re-sent with the same nonce and a higher gas price',
+    ['chain_id']
+)
+
+TX_CONFIRMATION_LATENCY = Histogram(
+    'chain_tx_confirmation_seconds',
+    'Time from first broadcast to receipt',
+    ['chain_id'],
+    buckets=(1, 2, 5, 10, 20, 30, 60, 120, 300, 600)
+)
+
+# event: enqueued / duplicate / succeeded / retried / dead
+MINT_JOBS = Counter(
+    'mint_jobs_total',
+    'Mint queue job events by kind',
+    ['kind', 'event']
+)
+
+MINT_QUEUE_DEPTH = Gauge(
+    'mint_queue_depth',
+    'Mint jobs by status in the shared queue (sampled)',
+    ['status']
+)
+
+MINT_JOB_LATENCY = Histogram(
+    'mint_job_latency_seconds',
+    'Time from enqueue to successful mint',
+    ['kind'],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+)
+
+MINT_BATCH_JOBS = Histogram(
+    'mint_batch_jobs',
+    'Mint jobs sent in one batchMintVictoryNFT transaction',
+    buckets=(1, 2, 5, 10, 20, 50)
+)
+
+INDEXER_BLOCK = Gauge(
+    'chain_indexer_block',
+    'Last block indexed by a contract event indexer',
+    ['indexer']
+)
+
+INDEXER_LAG = Gauge(
+    'chain_indexer_lag_blocks',
+    'Blocks between the chain head and the last indexed block',
+    ['indexer']
+)
+
+INDEXER_EVENTS = Counter(
+    'chain_indexer_events_total',
+    'Contract events applied by an indexer',
+    ['indexer', 'event']
+)
+
+# result: sent (vào batch) / deduplicated (dùng chung kết quả của call giống hệt đang chờ)
+READ_AGGREGATOR_CALLS = Counter(
+    'chain_read_calls_total',
+    'Contract view calls through the read aggregator',
+    ['chain', 'result']
+)
+
+# mode: multicall / batch (JSON-RPC batch) / direct (batch chỉ có 1 call)
+READ_AGGREGATOR_ROUNDTRIPS = Counter(
+    'chain_read_roundtrips_total',
+    'RPC round trips made by the read aggregator',
+    ['chain', 'mode']
+)
+
+# result: success / error (kết nối, timeout, HTTP 5xx) / rate_limited
+RPC_ENDPOINT_REQUESTS = Counter(
+    'chain_rpc_endpoint_requests_total',
+    'RPC requests per endpoint of a chain',
+    ['chain', 'endpoint', 'result']
+)
+
+RPC_BREAKER_OPEN = Gauge(
+    'chain_rpc_breaker_open',
+    'Whether the circuit breaker of an RPC endpoint is open',
+    ['chain', 'endpoint']
+)
+
+# result: sent (gửi bản sao tới endpoint thứ hai) / won (bản sao trả về trước)
+RPC_HEDGES = Counter(
+    'chain_rpc_hedges_total',
+    'Hedged read requests',
+    ['chain', 'result']
+)
+
+# kind: read / write
+RPC_FAILOVERS = Counter(
+    'chain_rpc_failovers_total',
+    'Requests retried on another endpoint after an endpoint failure',
+    ['chain', 'kind']
+)
+
+# result: claimed / reclaimed (cùng job chạy lại) / pending / submitted / confirmed (đã có entry)
+MINT_LEDGER_CLAIMS = Counter(
+    'mint_ledger_claims_total',
+    'Milestone claims in the local Victory NFT mint ledger',
+    ['result']
+)
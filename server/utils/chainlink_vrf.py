@@ -1,15 +1,20 @@
-from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3 import AsyncWeb3
 from eth_account import Account
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import os
 import json
 import random
 import string
 from datetime import datetime
-import asyncio
-from collections import deque
-import threading
-import time
+from config.vrf_config import VRF_BATCH_CONFIG
+from services.chain_providers import VRF_CHAIN, chain_providers
+from utils.entropy import CODE_DOMAIN, INT_DOMAIN, EntropyStream, sample_below
+from utils.vrf_deadline import random_word_within_deadline, vrf_source
+from utils.vrf_metrics import VRF_DIRECT_REQUESTS, record_vrf_consumption
+from utils.vrf_pool import VRFWordPool
+from utils.vrf_persistent_pool import PersistentVRFWordPool
+from utils.vrf_pipeline import VRFRequestPipeline
+from utils.vrf_backends import BACKEND_CHAINLINK, create_vrf_backend
 
 # Thay thế bằng ABI của hợp đồng SubscriptionConsumer của bạn
 # Bạn có thể lấy nó từ Remix sau khi biên dịch hợp đồng
@@ -403,237 +408,104 @@ VRF_CONSUMER_ABI = [
 
 class VRFBatchManager:
     """
-    Quản lý batch VRF requests để tối ưu hiệu suất và giảm chi phí gas
+    Cung cấp random word VRF cho game từ VRFWordPool.
+    Refill engine chạy trên event loop của app, không dùng thread riêng.
     """
-    def __init__(self, vrf_instance: 'ChainlinkVRF', batch_size: int = 50, cache_size: int = 200):
+    def __init__(self, vrf_instance: 'ChainlinkVRF', config: Optional[Dict] = None):
+        config = {**VRF_BATCH_CONFIG, **(config or {})}
         self.vrf_instance = vrf_instance
-        self.batch_size = batch_size
-        self.cache_size = cache_size
-        self.cached_numbers = deque(maxlen=cache_size)
-        self.pending_requests = []
-        self.is_processing = False
-        self.lock = threading.Lock()
-        self.last_request_time = 0
-        self.min_interval = 2  # Tối thiểu 2 giây giữa các batch requests
-        self.is_prewarmed = False  # Flag để kiểm tra đã pre-warm chưa
-        self.prewarm_task = None  # Task pre-warming
-        
+        self.prewarm_timeout = config["timeout"]
+        pool_options = dict(
+            capacity=config["cache_size"],
+            low_watermark=config["low_watermark"],
+            high_watermark=config["high_watermark"],
+            max_in_flight=config["max_in_flight"],
+            backoff=config["refill_backoff"],
+            max_backoff=config["max_refill_backoff"]
+        )
+        if config["persistent"]:
+            # Pool lưu trong MongoDB: còn nguyên sau restart, dùng chung giữa các worker
+            self.pool = PersistentVRFWordPool(
+                self._fetch_words,
+                slot_lease_seconds=config["slot_lease_seconds"],
+                poll_interval=config["sync_interval"],
+                **pool_options
+            )
+        else:
+            self.pool = VRFWordPool(self._fetch_words, **pool_options)
+        self.is_prewarmed = False
+
+    @property
+    def cache_size(self) -> int:
+        return self.pool.capacity
+
+    async def _fetch_words(self) -> List[int]:
+        return await self.vrf_instance.request_random_words()
+
+    def start(self):
+        """Khởi động refill engine trên event loop hiện tại"""
+        self.pool.start()
+
     async def prewarm_cache(self, initial_size: int = 100):
         """
-        Pre-warm cache với số lượng số ngẫu nhiên ban đầu
+        Chờ pool có initial_size word (tối đa prewarm_timeout giây).
+        Hết thời gian thì vẫn tiếp tục, refill engine sẽ lấp pool ở background.
         """
-        if self.is_prewarmed:
-            print("[VRF Pre-warm] Cache already pre-warmed")
-            return
-        self.is_prewarmed = True  # Đặt flag NGAY LẬP TỨC để tránh lặp
-        print(f"[VRF Pre-warm] Starting pre-warm with {initial_size} numbers...")
-        try:
-            # Thêm timeout cho batch VRF
-            import asyncio
-            try:
-                initial_numbers = await asyncio.wait_for(self._get_batch_vrf_numbers(initial_size), timeout=30)
-            except asyncio.TimeoutError:
-                print("[VRF Pre-warm] Timeout when pre-warming VRF, fallback to local random")
-                initial_numbers = [random.randint(0, 2**32 - 1) for _ in range(initial_size)]
-            with self.lock:
-                for num in initial_numbers:
-                    if len(self.cached_numbers) < self.cache_size:
-                        self.cached_numbers.append(num)
-            print(f"[VRF Pre-warm] Successfully pre-warmed cache with {len(initial_numbers)} numbers")
-        except Exception as e:
-            print(f"[VRF Pre-warm] Error during pre-warm: {e}")
-            # Fallback: fill cache với local random
-            with self.lock:
-                for _ in range(min(initial_size, self.cache_size)):
-                    if len(self.cached_numbers) < self.cache_size:
-                        self.cached_numbers.append(random.randint(0, 2**32 - 1))
-            print(f"[VRF Pre-warm] Fallback: filled cache with {len(self.cached_numbers)} local random numbers")
-    
-    async def start_background_prewarm(self):
-        """
-        Bắt đầu pre-warming trong background
-        """
-        if self.prewarm_task is None:
-            self.prewarm_task = asyncio.create_task(self._background_prewarm())
-            print("[VRF Pre-warm] Background pre-warming started")
-    
-    async def _background_prewarm(self):
-        """
-        Background task để pre-warm cache
-        """
-        try:
-            # Pre-warm ban đầu
-            await self.prewarm_cache(100)
-            
-            # Tiếp tục pre-warm định kỳ
-            while True:
-                await asyncio.sleep(60)  # Pre-warm mỗi phút
-                
-                # Kiểm tra cache level
-                with self.lock:
-                    cache_level = len(self.cached_numbers) / self.cache_size
-                
-                if cache_level < 0.3:  # Nếu cache dưới 30%
-                    print(f"[VRF Pre-warm] Cache low ({cache_level:.1%}), refilling...")
-                    await self._refill_cache(50)
-                    
-        except Exception as e:
-            print(f"[VRF Pre-warm] Background pre-warm error: {e}")
-    
-    async def _refill_cache(self, count: int):
-        """
-        Refill cache với số lượng mới
-        """
-        try:
-            new_numbers = await self._get_batch_vrf_numbers(count)
-            
-            with self.lock:
-                for num in new_numbers:
-                    if len(self.cached_numbers) < self.cache_size:
-                        self.cached_numbers.append(num)
-            
-            print(f"[VRF Pre-warm] Refilled cache with {len(new_numbers)} numbers")
-            
-        except Exception as e:
-            print(f"[VRF Pre-warm] Error refilling cache: {e}")
-    
+        print(f"[VRF Pre-warm] Waiting for {initial_size} words (timeout {self.prewarm_timeout}s)...")
+        reached = await self.pool.wait_for_level(initial_size, self.prewarm_timeout)
+        self.is_prewarmed = True
+        if reached:
+            print(f"[VRF Pre-warm] Pool ready with {self.pool.level} words")
+        else:
+            print(f"[VRF Pre-warm] Timeout with {self.pool.level} words, refill continues in background")
+
     async def get_random_int(self, max_value: int) -> int:
         """
-        Lấy số ngẫu nhiên từ cache hoặc tạo batch request mới
-        """
-        # Kiểm tra cache trước
-        if self.cached_numbers:
-            with self.lock:
-                if self.cached_numbers:
-                    number = self.cached_numbers.popleft()
-                    return number % max_value if max_value > 0 else 0
-        
-        # Nếu cache hết và chưa pre-warm, thực hiện pre-warm nhanh
-        if not self.is_prewarmed:
-            print("[VRF] Cache empty and not pre-warmed, performing quick pre-warm...")
-            await self.prewarm_cache(20)  # Quick pre-warm với 20 số
-            
-            # Thử lấy từ cache sau khi pre-warm
-            with self.lock:
-                if self.cached_numbers:
-                    number = self.cached_numbers.popleft()
-                    return number % max_value if max_value > 0 else 0
-        
-        # Nếu cache vẫn hết, thêm vào pending requests
-        future = asyncio.Future()
-        with self.lock:
-            self.pending_requests.append({
-                'max_value': max_value,
-                'future': future
-            })
-        
-        # Trigger batch processing nếu cần
-        await self._trigger_batch_processing()
-        
-        # Chờ kết quả
-        result = await future
-        return result
-    
-    async def _trigger_batch_processing(self):
-        """
-        Trigger batch processing nếu đủ điều kiện
-        """
-        current_time = time.time()
-        
-        with self.lock:
-            # Kiểm tra điều kiện để tạo batch mới
-            should_process = (
-                len(self.pending_requests) >= self.batch_size or
-                (len(self.pending_requests) > 0 and 
-                 current_time - self.last_request_time >= self.min_interval and
-                 not self.is_processing)
-            )
-            
-            if should_process and not self.is_processing:
-                self.is_processing = True
-                requests_to_process = self.pending_requests.copy()
-                self.pending_requests.clear()
-        
-        if should_process:
-            # Xử lý batch trong background
-            asyncio.create_task(self._process_batch(requests_to_process))
-    
-    async def _process_batch(self, requests: List[Dict]):
+        Lấy số ngẫu nhiên đều trong [0, max_value) từ pool (rejection sampling, không lệch modulo)
         """
-        Xử lý batch VRF requests
-        """
-        try:
-            print(f"[VRF Batch] Processing {len(requests)} requests...")
-            
-            # Tạo batch request với số lượng lớn hơn để có đủ cho cache
-            total_needed = len(requests) + self.batch_size
-            batch_numbers = await self._get_batch_vrf_numbers(total_needed)
-            
-            # Phân phối kết quả cho các requests
-            for i, request in enumerate(requests):
-                if i < len(batch_numbers):
-                    result = batch_numbers[i] % request['max_value'] if request['max_value'] > 0 else 0
-                    request['future'].set_result(result)
-                else:
-                    # Fallback nếu không đủ số
-                    result = random.randint(0, request['max_value'] - 1) if request['max_value'] > 0 else 0
-                    request['future'].set_result(result)
-            
-            # Thêm số còn lại vào cache
-            remaining_numbers = batch_numbers[len(requests):]
-            with self.lock:
-                for num in remaining_numbers:
-                    if len(self.cached_numbers) < self.cache_size:
-                        self.cached_numbers.append(num)
-            
-            print(f"[VRF Batch] Completed. Added {len(remaining_numbers)} numbers to cache")
-            
-        except Exception as e:
-            print(f"[VRF Batch] Error processing batch: {e}")
-            # Fallback cho tất cả requests
-            for request in requests:
-                try:
-                    result = random.randint(0, request['max_value'] - 1) if request['max_value'] > 0 else 0
-                    request['future'].set_result(result)
-                except:
-                    request['future'].set_exception(Exception("VRF batch processing failed"))
-        finally:
-            with self.lock:
-                self.is_processing = False
-                self.last_request_time = time.time()
-    
-    async def _get_batch_vrf_numbers(self, count: int) -> List[int]:
+        word = await self.get_random_word()
+        return sample_below(word, INT_DOMAIN, "int", max_value)[0]
+
+    async def get_random_word(self) -> int:
         """
-        Lấy batch VRF numbers từ smart contract
+        Lấy nguyên một random word 256-bit (không modulo) từ pool, chờ refill nếu pool trống.
+        Dùng làm seed cho utils.entropy.MatchEntropy.
         """
-        try:
-            # Sử dụng VRF để lấy nhiều số ngẫu nhiên
-            # Có thể cần điều chỉnh smart contract để hỗ trợ batch
-            numbers = []
-            for _ in range(min(count, 10)):  # Giới hạn 10 requests mỗi lần để tránh timeout
-                number = await self.vrf_instance.get_direct_vrf(2**32 - 1)
-                numbers.append(number)
-            
-            # Nếu cần nhiều hơn, tạo thêm bằng cách hash
-            while len(numbers) < count:
-                if numbers:
-                    # Sử dụng hash của số trước để tạo số mới
-                    new_number = hash(str(numbers[-1]) + str(time.time())) % (2**32 - 1)
-                    numbers.append(new_number)
-                else:
-                    numbers.append(random.randint(0, 2**32 - 1))
-            
-            return numbers[:count]
-            
-        except Exception as e:
-            print(f"[VRF Batch] Error getting batch numbers: {e}")
-            # Fallback to local random
-            return [random.randint(0, 2**32 - 1) for _ in range(count)]
+        return await self.pool.get()
+
+    @property
+    def source(self) -> str:
+        """Source ghi cho word của pool (theo backend sinh ra word)"""
+        return vrf_source(self.vrf_instance.backend.backend_name)
+
+    async def get_random_word_with_source(self) -> Tuple[int, str]:
+        """get_random_word() kèm source, dùng với random_word_within_deadline"""
+        return await self.get_random_word(), self.source
+
+    async def stop(self):
+        await self.pool.stop()
+
+    def get_status(self) -> dict:
+        return self.pool.get_status()
 
 class ChainlinkVRF:
-    def __init__(self):
-        # Thay đổi 2: Sử dụng AsyncHTTPProvider
-        self.w3 = AsyncWeb3(AsyncHTTPProvider(os.getenv('AVALANCHE_FUJI_RPC_URL', 'https://avalanche-fuji-c-chain-rpc.publicnode.com')))
+    def __init__(self, backend=None):
+        """
+        Args:
+            backend: VRF backend (xem utils.vrf_backends). Mặc định chọn theo env
+                VRF_BACKEND, "chainlink" gửi request thật lên consumer contract.
+        """
+        backend_name = os.getenv('VRF_BACKEND', BACKEND_CHAINLINK)
+        if backend is None and backend_name != BACKEND_CHAINLINK:
+            backend = create_vrf_backend(backend_name)
+        if backend is not None:
+            # Word giả lập không được lẫn vào pool chung
+            self.backend = backend
+            self.batch_manager = VRFBatchManager(self, {"persistent": False})
+            return
+        
+        # AsyncWeb3 dùng chung của chain VRF (keep-alive, giới hạn RPC đồng thời)
+        self.w3 = chain_providers.get_w3(VRF_CHAIN)
         
         consumer_contract_address = os.getenv('VRF_CONSUMER_CONTRACT_ADDRESS')
         if not consumer_contract_address:
@@ -652,67 +524,30 @@ class ChainlinkVRF:
         else:
             raise ValueError("PRIVATE_KEY environment variable is required")
         
-        # Khởi tạo batch manager
-        self.batch_manager = VRFBatchManager(self)
-        
-        # Tự động start pre-warming trong background
-        self._start_prewarm_async()
-    
-    def _start_prewarm_async(self):
-        """
-        Start pre-warming trong background thread
-        """
-        def start_prewarm():
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(self.batch_manager.start_background_prewarm())
-            except Exception as e:
-                print(f"[VRF] Error starting pre-warm: {e}")
+        # Gửi request nối tiếp với nonce local, theo dõi fulfillment bằng một poller chung
+        self.backend = VRFRequestPipeline(self.w3, self.consumer_contract, self.account)
         
-        # Start trong background thread
-        import threading
-        prewarm_thread = threading.Thread(target=start_prewarm, daemon=True)
-        prewarm_thread.start()
-        print("[VRF] Pre-warming started in background thread")
+        # Khởi tạo batch manager, refill engine được start trên event loop của app
+        self.batch_manager = VRFBatchManager(self)
 
     async def generate_random_code(self, prefix: str, count: int) -> List[str]:
-        try:
-            # Sử dụng batch manager để tối ưu hiệu suất
-            random_numbers = []
-            for _ in range(count):
-                number = await self.batch_manager.get_random_int(2**32 - 1)
-                random_numbers.append(number)
+        return [code for code, _ in await self.generate_random_code_records(prefix, count)]
 
-            if random_numbers:
-                return [
-                    f"{prefix}-{datetime.utcnow().strftime('%Y%m%d')}-{self._number_to_code(num)}"
-                    for num in random_numbers
-                ]
-            else:
-                return self._generate_fallback_codes(prefix, count)
-            
-        except Exception as e:
-            print(f"Lỗi khi yêu cầu VRF: {e}")
-            return self._generate_fallback_codes(prefix, count)
-
-    async def _wait_for_random_words(self, request_id: int, timeout: int = 300) -> List[int]:
-        start_time = datetime.now()
-        while (datetime.now() - start_time).total_seconds() < timeout:
-            try:
-                # Thay đổi 4: Thêm 'await' cho lời gọi contract
-                fulfilled, random_words = await self.consumer_contract.functions.getRequestStatus(request_id).call()
-                if fulfilled:
-                    print(f"Đã nhận được số ngẫu nhiên cho Request ID {request_id}: {random_words}")
-                    return random_words
-                else:
-                    print(f"Chờ số ngẫu nhiên cho Request ID {request_id}...")
-                    await asyncio.sleep(5)
-            except Exception as e:
-                print(f"Lỗi khi kiểm tra trạng thái yêu cầu {request_id}: {e}")
-                await asyncio.sleep(5)
-        print(f"Hết thời gian chờ nhận số ngẫu nhiên cho Request ID {request_id}.")
-        return []
+    async def generate_random_code_records(self, prefix: str, count: int) -> List[Tuple[str, Dict]]:
+        """
+        Tạo count code từ MỘT random word (VRF trong deadline "code_generation",
+        quá hạn dùng CSPRNG local). Mỗi code kèm provenance (seed, source, index)
+        để truy ngược về word đã sinh ra nó.
+        """
+        word, source = await random_word_within_deadline(self.batch_manager.get_random_word_with_source, "code_generation")
+        stream = EntropyStream(word, source=source, domain=CODE_DOMAIN)
+        record_vrf_consumption("code_generation", source, count)
+        date_part = datetime.utcnow().strftime('%Y%m%d')
+        records = []
+        for _ in range(count):
+            number, index = stream.randbelow(2**32 - 1)
+            records.append((f"{prefix}-{date_part}-{self._number_to_code(number)}", stream.provenance(index)))
+        return records
 
     def _number_to_code(self, number: int) -> str:
         chars = string.ascii_uppercase + string.digits
@@ -726,45 +561,24 @@ class ChainlinkVRF:
             number //= base
         return code.rjust(6, '0')
 
-    def _generate_fallback_codes(self, prefix: str, count: int) -> List[str]:
-        print("Sử dụng fallback tạo mã ngẫu nhiên local.")
-        codes = []
-        for i in range(count):
-            random_num = random.randint(100000, 999999)
-            code = f"{prefix}-{datetime.utcnow().strftime('%Y%m%d')}-{random_num}"
-            codes.append(code)
-        return codes
+    async def request_random_words(self) -> List[int]:
+        """
+        Gửi một requestRandomWords và chờ fulfillment, trả về toàn bộ numWords word.
+        Raise nếu gửi lỗi hoặc hết thời gian chờ (không fallback local).
+        """
+        return await self.backend.request_random_words()
 
     async def get_direct_vrf(self, max_value: int) -> int:
         """
         Gọi VRF trực tiếp (cho các trường hợp đặc biệt như generate codes)
         """
         try:
-            enable_native_payment = False
-            
-            nonce = await self.w3.eth.get_transaction_count(self.account.address)
-            chain_id = await self.w3.eth.chain_id
-            
-            tx = await self.consumer_contract.functions.requestRandomWords(
-                enable_native_payment
-            ).build_transaction({
-                'from': self.account.address,
-                'nonce': nonce,
-                'chainId': chain_id
-            })
-            signed_tx = self.account.sign_transaction(tx)
-            tx_hash = await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            receipt = await self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            request_id = await self.consumer_contract.functions.lastRequestId().call()
-            random_numbers = await self._wait_for_random_words(request_id)
-            
-            if random_numbers and max_value > 0:
-                return random_numbers[0] % max_value
-            else:
-                return random.randint(0, max_value - 1)
+            random_numbers = await self.request_random_words()
+            VRF_DIRECT_REQUESTS.labels(result="vrf").inc()
+            return sample_below(random_numbers[0], INT_DOMAIN, "direct", max_value)[0]
         except Exception as e:
             print(f"Lỗi khi yêu cầu VRF trực tiếp: {e}")
+            VRF_DIRECT_REQUESTS.labels(result="local_fallback").inc()
             return random.randint(0, max_value - 1)
 
     async def get_random_int(self, max_value: int) -> int:
@@ -776,4 +590,15 @@ class ChainlinkVRF:
             return await self.batch_manager.get_random_int(max_value)
         except Exception as e:
             print(f"Lỗi khi yêu cầu số nguyên ngẫu nhiên từ VRF: {e}")
-            return random.randint(0, max_value - 1)
\ No newline at end of file
+            return random.randint(0, max_value - 1)
+
+    async def get_random_word(self) -> int:
+        """
+        Lấy một random word 256-bit đầy đủ qua batch VRF manager.
+        Mỗi trận đấu chỉ cần một word (xem utils.entropy.MatchEntropy).
+        """
+        try:
+            return await self.batch_manager.get_random_word()
+        except Exception as e:
+            print(f"Lỗi khi yêu cầu random word từ VRF: {e}")
+            return random.getrandbits(256)
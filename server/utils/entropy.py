@@ -0,0 +1,171 @@
+"""
+Mở rộng một random word (VRF hoặc local) thành nhiều giá trị random có thể kiểm chứng
+
+Mỗi trận đấu chỉ cần rút MỘT word 256-bit. Mọi quyết định random trong trận
+(vai trò, skill kicker, skill goalkeeper...) được suy ra deterministically từ
+word đó bằng SHA-256 có phân tách domain theo nhãn, nên:
+- Pool VRF chỉ tiêu tốn 1 word mỗi trận
+- Lưu seed vào match record là đủ để audit / replay lại toàn bộ trận
+
+EntropyStream dùng cho các trường hợp cần rất nhiều giá trị từ một word
+(vd: tạo hàng nghìn invite code): mỗi giá trị gắn với một derivation index
+nên luôn truy ngược được về word on-chain đã sinh ra nó.
+"""
+
+import hashlib
+import secrets
+from typing import Dict, Optional, Tuple
+
+WORD_BITS = 256
+WORD_SPACE = 2 ** WORD_BITS
+
+MATCH_DOMAIN = "kickin/match/v1"
+CODE_DOMAIN = "kickin/invite_code/v1"
+INT_DOMAIN = "kickin/int/v1"
+
+
+def expand_word(seed: int, domain: str, label: str, counter: int = 0) -> int:
+    """
+    Suy ra một số 256-bit từ seed cho (domain, label, counter).
+    Các nhãn khác nhau cho ra các giá trị độc lập.
+    """
+    h = hashlib.sha256()
+    h.update(domain.encode())
+    h.update(b"\x00")
+    h.update((seed % WORD_SPACE).to_bytes(32, "big"))
+    h.update(label.encode())
+    h.update(b"\x00")
+    h.update(counter.to_bytes(8, "big"))
+    return int.from_bytes(h.digest(), "big")
+
+
+def sample_below(seed: int, domain: str, label: str, n: int, counter: int = 0) -> Tuple[int, int]:
+    """
+    Số nguyên đều trong [0, n) suy ra từ seed, bắt đầu từ counter.
+    Dùng rejection sampling nên không bị lệch như phép modulo trực tiếp.
+
+    Returns:
+        (giá trị, counter của lần derive được chấp nhận)
+    """
+    if n <= 0:
+        return 0, counter
+    limit = WORD_SPACE - (WORD_SPACE % n)
+    while True:
+        value = expand_word(seed, domain, label, counter)
+        if value < limit:
+            return value % n, counter
+        counter += 1
+
+
+class MatchEntropy:
+    """
+    Entropy bundle cho một trận đấu.
+
+    Example:
+        entropy = MatchEntropy(vrf_word, source="vrf")
+        role = entropy.randbelow("role", 2)
+        kicker_skill_idx = entropy.randbelow("kicker_skill", len(kicker_skills))
+    """
+
+    def __init__(self, seed: int, source: str = "vrf", domain: str = MATCH_DOMAIN, request_id: Optional[int] = None):
+        self.seed = seed % WORD_SPACE
+        self.source = source
+        self.domain = domain
+        self.request_id = request_id
+        self.draws: Dict[str, int] = {}
+
+    @classmethod
+    def local(cls) -> "MatchEntropy":
+        """Bundle dùng seed local (CSPRNG) cho các trận không dùng VRF"""
+        return cls(secrets.randbits(WORD_BITS), source="local")
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "MatchEntropy":
+        """Khôi phục bundle từ match record để replay / audit"""
+        return cls(
+            int(record["seed"], 16),
+            source=record.get("source", "vrf"),
+            domain=record.get("domain", MATCH_DOMAIN),
+            request_id=record.get("request_id")
+        )
+
+    @property
+    def seed_hex(self) -> str:
+        return f"{self.seed:064x}"
+
+    def derive(self, label: str, counter: int = 0) -> int:
+        return expand_word(self.seed, self.domain, label, counter)
+
+    def randbelow(self, label: str, n: int) -> int:
+        """
+        Số nguyên đều trong [0, n) cho nhãn label.
+        Dùng rejection sampling nên không bị lệch như phép modulo trực tiếp.
+        """
+        if n <= 0:
+            return 0
+        result, _ = sample_below(self.seed, self.domain, label, n)
+        self.draws[label] = result
+        return result
+
+    def to_record(self) -> Dict:
+        """Dữ liệu lưu kèm match record"""
+        record = {
+            "seed": self.seed_hex,
+            "source": self.source,
+            "domain": self.domain,
+            "draws": dict(self.draws)
+        }
+        if self.request_id is not None:
+            record["request_id"] = str(self.request_id)
+        return record
+
+
+class EntropyStream:
+    """
+    Chuỗi giá trị random không giới hạn suy ra từ một word.
+    Giá trị thứ k dùng derivation index bắt đầu từ next_index, rejection sampling
+    bỏ qua index bị loại nên mọi index đã dùng đều có thể kiểm chứng lại.
+
+    Example:
+        stream = EntropyStream(vrf_word, source="vrf", domain=CODE_DOMAIN)
+        value, index = stream.randbelow(2**32 - 1)
+        stream.provenance(index)  # {"seed": ..., "domain": ..., "index": index}
+    """
+
+    LABEL = "stream"
+
+    def __init__(self, seed: int, source: str = "vrf", domain: str = INT_DOMAIN, request_id: Optional[int] = None):
+        self.seed = seed % WORD_SPACE
+        self.source = source
+        self.domain = domain
+        self.request_id = request_id
+        self.next_index = 0
+
+    @property
+    def seed_hex(self) -> str:
+        return f"{self.seed:064x}"
+
+    def randbelow(self, n: int) -> Tuple[int, int]:
+        """
+        Returns:
+            (số nguyên đều trong [0, n), derivation index của giá trị đó)
+        """
+        value, index = sample_below(self.seed, self.domain, self.LABEL, n, self.next_index)
+        self.next_index = index + 1
+        return value, index
+
+    def value_at(self, index: int, n: int) -> Optional[int]:
+        """Kiểm chứng lại giá trị tại index (None nếu index đó bị rejection sampling loại)"""
+        value, accepted = sample_below(self.seed, self.domain, self.LABEL, n, index)
+        return value if accepted == index else None
+
+    def provenance(self, index: int) -> Dict:
+        record = {
+            "seed": self.seed_hex,
+            "source": self.source,
+            "domain": self.domain,
+            "index": index
+        }
+        if self.request_id is not None:
+            record["request_id"] = str(self.request_id)
+        return record
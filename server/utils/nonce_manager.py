@@ -0,0 +1,71 @@
+"""
+Quản lý nonce local cho các ví gửi transaction liên tục
+
+Thay vì đọc get_transaction_count trước mỗi transaction (và phải chờ receipt
+trước khi gửi tiếp), nonce được cấp phát local theo thứ tự nên có thể gửi
+nhiều transaction nối tiếp nhau mà không chờ.
+
+Mỗi (chain_id, address) có đúng một NonceManager trong process.
+"""
+
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from web3 import AsyncWeb3
+
+from utils.logger import api_logger
+
+
+class NonceManager:
+    def __init__(self, w3: AsyncWeb3, address: str):
+        self.w3 = w3
+        self.address = address
+        self._next_nonce: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def _sync(self):
+        self._next_nonce = await self.w3.eth.get_transaction_count(self.address, "pending")
+
+    async def allocate(self) -> int:
+        """Cấp nonce tiếp theo (đọc từ chain ở lần đầu hoặc sau resync)"""
+        async with self._lock:
+            if self._next_nonce is None:
+                await self._sync()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    async def resync(self):
+        """
+        Đọc lại nonce từ chain (pending). Gọi khi gửi transaction lỗi để nonce
+        đã cấp nhưng không được dùng không làm kẹt các transaction sau.
+        """
+        async with self._lock:
+            previous = self._next_nonce
+            await self._sync()
+            if previous != self._next_nonce:
+                api_logger.warning(f"[Nonce] {self.address} resynced {previous} -> {self._next_nonce}")
+
+    def get_status(self) -> dict:
+        return {"address": self.address, "next_nonce": self._next_nonce}
+
+
+_managers: Dict[Tuple[int, str], NonceManager] = {}
+_chain_ids: Dict[str, int] = {}
+
+
+async def get_chain_id(w3: AsyncWeb3) -> int:
+    """chain_id của provider, chỉ đọc từ chain một lần cho mỗi endpoint"""
+    endpoint = str(getattr(w3.provider, "endpoint_uri", id(w3.provider)))
+    if endpoint not in _chain_ids:
+        _chain_ids[endpoint] = await w3.eth.chain_id
+    return _chain_ids[endpoint]
+
+
+async def get_nonce_manager(w3: AsyncWeb3, address: str) -> NonceManager:
+    """NonceManager dùng chung cho (chain_id, address)"""
+    chain_id = await get_chain_id(w3)
+    key = (chain_id, AsyncWeb3.to_checksum_address(address))
+    if key not in _managers:
+        _managers[key] = NonceManager(w3, key[1])
+    return _managers[key]
@@ -0,0 +1,113 @@
+"""
+Theo dõi trạng thái khởi động của app
+
+Startup chia làm 2 phần:
+- Critical path (kết nối DB...): chạy trong lifespan, app chỉ ready khi xong
+- Warm-up (index, VRF pre-warm, cache...): chạy nền, request path phải tự
+  fallback khi warm-up chưa xong (vd: VRF quá deadline thì dùng CSPRNG local)
+
+/health/live chỉ báo process còn sống, /health/ready báo critical path đã xong
+và kèm tiến độ của các warm-up.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from utils.logger import api_logger
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+class ReadinessTracker:
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.components: Dict[str, dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def register(self, name: str, critical: bool = False):
+        self.components[name] = {
+            "status": STATUS_PENDING,
+            "critical": critical,
+            "started_at": None,
+            "duration": None,
+            "error": None
+        }
+
+    def start(self, name: str):
+        self.components[name].update(status=STATUS_RUNNING, started_at=time.monotonic(), duration=None, error=None)
+
+    def finish(self, name: str, error: Optional[Exception] = None):
+        component = self.components[name]
+        component["duration"] = time.monotonic() - (component["started_at"] or self.started_at)
+        if error is None:
+            component["status"] = STATUS_READY
+            api_logger.info(f"[Startup] {name} ready in {component['duration']:.2f}s")
+        else:
+            component["status"] = STATUS_FAILED
+            component["error"] = str(error)
+            api_logger.error(f"[Startup] {name} failed after {component['duration']:.2f}s: {error}")
+
+    async def run(self, name: str, step: Callable[[], Awaitable], critical: bool = False):
+        """Chạy một bước và ghi nhận kết quả. Bước critical lỗi thì raise."""
+        if name not in self.components:
+            self.register(name, critical)
+        self.start(name)
+        try:
+            result = await step()
+        except Exception as e:
+            self.finish(name, e)
+            if critical:
+                raise
+            return None
+        self.finish(name)
+        return result
+
+    def run_in_background(self, name: str, step: Callable[[], Awaitable]):
+        """Warm-up chạy nền (không chặn startup)"""
+        self.register(name, critical=False)
+        self._tasks[name] = asyncio.create_task(self.run(name, step))
+
+    def is_ready(self, name: str) -> bool:
+        return self.components.get(name, {}).get("status") == STATUS_READY
+
+    @property
+    def ready(self) -> bool:
+        critical = [c for c in self.components.values() if c["critical"]]
+        return bool(critical) and all(c["status"] == STATUS_READY for c in critical)
+
+    async def wait(self, timeout: Optional[float] = None):
+        """Chờ mọi warm-up chạy xong (dùng cho benchmark / test)"""
+        if self._tasks:
+            await asyncio.wait(list(self._tasks.values()), timeout=timeout)
+
+    async def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
+        for task in self._tasks.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def get_status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "uptime": round(time.monotonic() - self.started_at, 2),
+            "components": {
+                name: {
+                    "status": c["status"],
+                    "critical": c["critical"],
+                    "duration": round(c["duration"], 3) if c["duration"] is not None else None,
+                    "error": c["error"]
+                }
+                for name, c in self.components.items()
+            }
+        }
+
+
+# Singleton instance
+readiness = ReadinessTracker()
@@ -0,0 +1,239 @@
+"""
+Gửi transaction từ ví server và theo dõi receipt ở nền
+
+- Nonce cấp phát local (utils.nonce_manager) nên nhiều transaction (vd: mint)
+  được gửi liên tiếp mà không chờ receipt của nhau
+- Một poller cho mỗi ví đọc receipt của mọi transaction đang chờ trong cùng
+  một tick, thay vì mỗi request tự gọi wait_for_transaction_receipt
+- Transaction không có receipt sau stuck_after được ký lại cùng nonce với gas
+  price cao hơn (tối đa max_bumps lần), mọi hash đã gửi đều được theo dõi
+- Nonce đã được dùng nhưng không có receipt của hash nào -> transaction bị thay
+  thế bởi transaction khác của ví, future nhận TransactionReplacedError
+
+Kết quả trả qua future của TrackedTransaction và callback on_receipt (vd: cập
+nhật job trong DB), nên caller có thể chờ hoặc không.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from web3 import AsyncWeb3
+
+from config.chain_config import RECEIPT_TRACKER_CONFIG
+from utils.chain_metrics import TX_BUMPS, TX_CONFIRMATION_LATENCY, TX_PENDING, TX_RECEIPTS
+from utils.logger import api_logger
+from utils.nonce_manager import get_chain_id, get_nonce_manager
+
+
+class TransactionReplacedError(Exception):
+    """Nonce của transaction đã được một transaction khác (không do tracker gửi) sử dụng"""
+
+
+class TrackedTransaction:
+    def __init__(self, nonce: int, tx: dict, tx_hash, future: asyncio.Future,
+                 on_receipt: Optional[Callable[["TrackedTransaction", Optional[dict], Optional[Exception]], Awaitable]] = None):
+        self.nonce = nonce
+        self.tx = tx
+        self.hashes = [tx_hash]
+        self.future = future
+        self.on_receipt = on_receipt
+        self.sent_at = time.monotonic()
+        self.last_sent_at = self.sent_at
+        self.bumps = 0
+        self.nonce_used_polls = 0
+
+    @property
+    def tx_hash(self) -> str:
+        """Hash của lần gửi gần nhất"""
+        return self.hashes[-1].hex()
+
+
+class ReceiptTracker:
+    def __init__(self, w3: AsyncWeb3, account, chain_id: int, config: Optional[Dict] = None):
+        config = {**RECEIPT_TRACKER_CONFIG, **(config or {})}
+        self.w3 = w3
+        self.account = account
+        self.chain_id = chain_id
+        self.poll_interval = config["poll_interval"]
+        self.stuck_after = config["stuck_after"]
+        self.gas_bump = config["gas_bump"]
+        self.max_bumps = config["max_bumps"]
+        self.receipt_timeout = config["receipt_timeout"]
+
+        self.pending: Dict[int, TrackedTransaction] = {}
+        self.sent = 0
+        self._poller: Optional[asyncio.Task] = None
+        self._labels = {"chain_id": str(chain_id)}
+
+    async def send(self, contract_call, tx_params: dict, on_receipt=None) -> TrackedTransaction:
+        """
+        Build (không RPC nếu tx_params có gas + gasPrice/maxFeePerGas), ký và gửi
+        transaction với nonce local, rồi đăng ký vào poller. Không chờ receipt.
+        """
+        nonce_manager = await get_nonce_manager(self.w3, self.account.address)
+        nonce = await nonce_manager.allocate()
+        try:
+            tx = await contract_call.build_transaction({
+                **tx_params,
+                'from': self.account.address,
+                'nonce': nonce,
+                'chainId': self.chain_id
+            })
+            tx_hash = await self._broadcast(tx)
+        except Exception:
+            await nonce_manager.resync()
+            raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Không ai chờ future thì exception cũng không bị log "never retrieved"
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        tracked = TrackedTransaction(nonce, tx, tx_hash, future, on_receipt)
+        self.pending[nonce] = tracked
+        self.sent += 1
+        TX_PENDING.labels(**self._labels).set(len(self.pending))
+        self._ensure_poller()
+        api_logger.info(f"[Tx] {tracked.tx_hash} sent (nonce {nonce}, {len(self.pending)} pending)")
+        return tracked
+
+    async def wait(self, tracked: TrackedTransaction, timeout: Optional[float] = None) -> dict:
+        """Chờ receipt (status có thể là 0). Hết timeout thì transaction vẫn tiếp tục được theo dõi."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(tracked.future), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Transaction {tracked.tx_hash} not mined after {timeout}s")
+
+    async def send_and_wait(self, contract_call, tx_params: dict, timeout: Optional[float] = None) -> dict:
+        return await self.wait(await self.send(contract_call, tx_params), timeout)
+
+    async def _broadcast(self, tx: dict):
+        signed_tx = self.account.sign_transaction(tx)
+        return await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+
+    def _ensure_poller(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    async def _poll_loop(self):
+        while self.pending:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self._poll()
+            except Exception as e:
+                api_logger.warning(f"[Tx] Receipt polling failed: {e}")
+
+    async def _poll(self):
+        hashes: List[Tuple[TrackedTransaction, object]] = [
+            (tracked, tx_hash) for tracked in list(self.pending.values()) for tx_hash in tracked.hashes
+        ]
+        receipts = await asyncio.gather(
+            *(self.w3.eth.get_transaction_receipt(tx_hash) for _, tx_hash in hashes),
+            return_exceptions=True
+        )
+        for (tracked, _), receipt in zip(hashes, receipts):
+            # TransactionNotFound = chưa được mine
+            if not isinstance(receipt, Exception) and tracked.nonce in self.pending:
+                self._finish(tracked, receipt=receipt)
+
+        now = time.monotonic()
+        stuck = [t for t in self.pending.values() if now - t.last_sent_at >= self.stuck_after]
+        if not stuck:
+            return
+        confirmed_nonce = await self.w3.eth.get_transaction_count(self.account.address, "latest")
+        for tracked in stuck:
+            if now - tracked.sent_at >= self.receipt_timeout:
+                self._finish(tracked, error=TimeoutError(
+                    f"Transaction {tracked.tx_hash} not mined after {self.receipt_timeout}s"
+                ), result="timeout")
+            elif tracked.nonce < confirmed_nonce:
+                # Receipt có thể trễ hơn nonce một chút: chỉ kết luận ở lần thứ 2
+                tracked.nonce_used_polls += 1
+                if tracked.nonce_used_polls >= 2:
+                    self._finish(tracked, error=TransactionReplacedError(
+                        f"Nonce {tracked.nonce} used by another transaction (sent {tracked.tx_hash})"
+                    ), result="replaced")
+            elif tracked.bumps < self.max_bumps:
+                await self._bump(tracked)
+
+    async def _bump(self, tracked: TrackedTransaction):
+        """Ký lại cùng nonce với gas price cao hơn để thay thế transaction bị kẹt"""
+        tx = dict(tracked.tx)
+        if 'gasPrice' in tx:
+            tx['gasPrice'] = int(tx['gasPrice'] * self.gas_bump)
+        else:
+            tx['maxFeePerGas'] = int(tx['maxFeePerGas'] * self.gas_bump)
+            tx['maxPriorityFeePerGas'] = int(tx['maxPriorityFeePerGas'] * self.gas_bump)
+        tracked.last_sent_at = time.monotonic()
+        try:
+            tx_hash = await self._broadcast(tx)
+        except Exception as e:
+            # vd: transaction cũ vừa được mine ("nonce too low"), tick sau sẽ thấy receipt
+            api_logger.warning(f"[Tx] Replacement of nonce {tracked.nonce} failed: {e}")
+            return
+        tracked.tx = tx
+        tracked.hashes.append(tx_hash)
+        tracked.bumps += 1
+        TX_BUMPS.labels(**self._labels).inc()
+        api_logger.warning(f"[Tx] Nonce {tracked.nonce} stuck, replaced by {tracked.tx_hash} (bump {tracked.bumps})")
+
+    def _finish(self, tracked: TrackedTransaction, receipt: Optional[dict] = None,
+                error: Optional[Exception] = None, result: Optional[str] = None):
+        self.pending.pop(tracked.nonce, None)
+        TX_PENDING.labels(**self._labels).set(len(self.pending))
+        if error is None:
+            result = "success" if receipt["status"] == 1 else "reverted"
+            TX_CONFIRMATION_LATENCY.labels(**self._labels).observe(time.monotonic() - tracked.sent_at)
+        TX_RECEIPTS.labels(result=result, **self._labels).inc()
+
+        if not tracked.future.done():
+            if error is None:
+                tracked.future.set_result(receipt)
+            else:
+                tracked.future.set_exception(error)
+        if tracked.on_receipt is not None:
+            asyncio.create_task(self._run_callback(tracked, receipt, error))
+
+    async def _run_callback(self, tracked: TrackedTransaction, receipt, error):
+        try:
+            await tracked.on_receipt(tracked, receipt, error)
+        except Exception as e:
+            api_logger.error(f"[Tx] on_receipt callback for {tracked.tx_hash} failed: {e}")
+
+    def get_status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "address": self.account.address,
+            "chain_id": self.chain_id,
+            "sent": self.sent,
+            "pending": len(self.pending),
+            "oldest_pending_seconds": round(max((now - t.sent_at for t in self.pending.values()), default=0), 1),
+            "bumped": sum(1 for t in self.pending.values() if t.bumps)
+        }
+
+
+_trackers: Dict[Tuple[int, str], ReceiptTracker] = {}
+
+
+async def get_receipt_tracker(w3: AsyncWeb3, account) -> ReceiptTracker:
+    """ReceiptTracker dùng chung cho (chain_id, ví ký)"""
+    chain_id = await get_chain_id(w3)
+    key = (chain_id, account.address)
+    if key not in _trackers:
+        _trackers[key] = ReceiptTracker(w3, account, chain_id)
+    return _trackers[key]
+
+
+def _hash_key(tx_hash) -> str:
+    value = tx_hash.hex() if isinstance(tx_hash, (bytes, bytearray)) else str(tx_hash)
+    return value.lower().removeprefix("0x")
+
+
+def is_tracked(tx_hash) -> bool:
+    """Transaction (hash của bất kỳ lần gửi / thay thế nào) còn được tracker trong process chờ receipt"""
+    key = _hash_key(tx_hash)
+    return any(
+        _hash_key(sent) == key
+        for tracker in _trackers.values()
+        for tracked in tracker.pending.values()
+        for sent in tracked.hashes
+    )
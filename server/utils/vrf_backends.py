@@ -0,0 +1,193 @@
+"""
+VRF backends cho VRFBatchManager
+
+Backend là bất kỳ object nào có:
+    async request_random_words() -> List[int]   # một request, trả về mọi word đã fulfill
+    get_status() -> dict
+    backend_name: str                           # ghi vào source của random word
+
+- chainlink: VRFRequestPipeline gửi request thật lên consumer contract (mặc định)
+- simulated: SimulatedVRFCoordinator chạy trong process, không cần chain,
+  latency / tỉ lệ lỗi / gas cấu hình được (dùng cho benchmark và dev offline)
+- local: VRFRequestPipeline trỏ tới MockVRFConsumer trên hardhat node / anvil,
+  request được tự fulfill bởi LocalVRFFulfiller
+
+Chọn backend bằng env VRF_BACKEND (chainlink | simulated | local).
+"""
+
+import asyncio
+import os
+import random
+import secrets
+from typing import Dict, List, Optional
+
+from eth_account import Account
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+from config.vrf_config import VRF_SIMULATION_CONFIG
+from utils.logger import api_logger
+from utils.nonce_manager import get_nonce_manager
+from utils.vrf_metrics import VRF_FULFILLMENT_LATENCY, VRF_GAS_PER_WORD, VRF_WORDS_FULFILLED
+from utils.vrf_pool import FulfilledWords
+
+BACKEND_CHAINLINK = "chainlink"
+BACKEND_SIMULATED = "simulated"
+BACKEND_LOCAL = "local"
+
+# Hàm fulfill chỉ có trên MockVRFConsumer (victory-nft-deployment/contracts/MockVRFConsumer.sol)
+MOCK_VRF_FULFILL_ABI = [
+    {
+        "inputs": [{"internalType": "uint256", "name": "_requestId", "type": "uint256"}],
+        "name": "fulfillRequest",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    }
+]
+
+
+class SimulatedVRFCoordinator:
+    """
+    Coordinator VRF giả lập trong process.
+
+    Mỗi request: chờ submit_latency (gửi tx + receipt), có thể lỗi với failure_rate;
+    sau đó chờ fulfillment_latency ± latency_jitter. Với fulfillment_failure_rate hoặc khi
+    gas callback vượt callback_gas_limit thì request không bao giờ được fulfill
+    (giống VRF thật) và raise TimeoutError sau fulfillment_timeout.
+    """
+
+    backend_name = BACKEND_SIMULATED
+
+    def __init__(self, config: Optional[Dict] = None, seed: Optional[int] = None):
+        config = {**VRF_SIMULATION_CONFIG, **(config or {})}
+        self.submit_latency = config["submit_latency"]
+        self.fulfillment_latency = config["fulfillment_latency"]
+        self.latency_jitter = config["latency_jitter"]
+        self.failure_rate = config["failure_rate"]
+        self.fulfillment_failure_rate = config["fulfillment_failure_rate"]
+        self.fulfillment_timeout = config["fulfillment_timeout"]
+        self.num_words = config["num_words"]
+        self.gas_per_request = config["gas_per_request"]
+        self.gas_per_word = config["gas_per_word"]
+        self.callback_gas_limit = config["callback_gas_limit"]
+        self.gas_price_gwei = config["gas_price_gwei"]
+        self._rng = random.Random(seed)
+
+        self.requests = 0
+        self.fulfilled = 0
+        self.submit_failures = 0
+        self.fulfillment_failures = 0
+        self.in_flight = 0
+        self.gas_used = 0
+
+    @property
+    def callback_gas(self) -> int:
+        return self.gas_per_word * self.num_words
+
+    async def request_random_words(self) -> List[int]:
+        self.requests += 1
+        request_id = self.requests
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.submit_latency)
+            if self._rng.random() < self.failure_rate:
+                self.submit_failures += 1
+                raise RuntimeError("Simulated requestRandomWords submission failure")
+            self.gas_used += self.gas_per_request
+            VRF_GAS_PER_WORD.labels(backend=BACKEND_SIMULATED).observe(self.gas_per_request / self.num_words)
+
+            if self.callback_gas > self.callback_gas_limit or self._rng.random() < self.fulfillment_failure_rate:
+                self.fulfillment_failures += 1
+                await asyncio.sleep(self.fulfillment_timeout)
+                raise TimeoutError("Simulated VRF request not fulfilled")
+
+            jitter = self._rng.uniform(-self.latency_jitter, self.latency_jitter)
+            latency = max(0.0, self.fulfillment_latency + jitter)
+            await asyncio.sleep(latency)
+            self.gas_used += self.callback_gas
+            self.fulfilled += 1
+            VRF_FULFILLMENT_LATENCY.labels(backend=BACKEND_SIMULATED).observe(self.submit_latency + latency)
+            VRF_WORDS_FULFILLED.labels(backend=BACKEND_SIMULATED).inc(self.num_words)
+            return FulfilledWords([secrets.randbits(256) for _ in range(self.num_words)], request_id)
+        finally:
+            self.in_flight -= 1
+
+    def get_status(self) -> dict:
+        return {
+            "backend": BACKEND_SIMULATED,
+            "requests": self.requests,
+            "fulfilled": self.fulfilled,
+            "submit_failures": self.submit_failures,
+            "fulfillment_failures": self.fulfillment_failures,
+            "in_flight": self.in_flight,
+            "gas_used": self.gas_used,
+            "fee_native": self.gas_used * self.gas_price_gwei / 1e9
+        }
+
+
+class LocalVRFFulfiller:
+    """
+    Tự gọi MockVRFConsumer.fulfillRequest() cho mỗi request của pipeline
+    sau fulfillment_latency giây, thay cho Chainlink node trên chain local.
+    """
+
+    def __init__(self, pipeline, fulfillment_latency: float):
+        self.pipeline = pipeline
+        self.fulfillment_latency = fulfillment_latency
+        self.contract = pipeline.w3.eth.contract(
+            address=pipeline.contract.address, abi=MOCK_VRF_FULFILL_ABI
+        )
+        self._tasks = set()
+        pipeline.on_request_sent = self.schedule
+
+    def schedule(self, request):
+        task = asyncio.create_task(self._fulfill(request.request_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fulfill(self, request_id: int):
+        await asyncio.sleep(self.fulfillment_latency)
+        w3, account = self.pipeline.w3, self.pipeline.account
+        nonce_manager = await get_nonce_manager(w3, account.address)
+        nonce = await nonce_manager.allocate()
+        try:
+            tx = await self.contract.functions.fulfillRequest(request_id).build_transaction({
+                'from': account.address,
+                'nonce': nonce,
+                'chainId': await w3.eth.chain_id
+            })
+            signed_tx = account.sign_transaction(tx)
+            await w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception as e:
+            await nonce_manager.resync()
+            api_logger.error(f"[VRF Local] Failed to fulfill request {request_id}: {e}")
+
+
+def create_local_backend(config: Optional[Dict] = None):
+    """VRFRequestPipeline trỏ tới MockVRFConsumer trên hardhat node / anvil"""
+    from utils.chainlink_vrf import VRF_CONSUMER_ABI
+    from utils.vrf_pipeline import VRFRequestPipeline
+
+    config = {**VRF_SIMULATION_CONFIG, **(config or {})}
+    consumer_address = os.getenv('VRF_LOCAL_CONSUMER_ADDRESS')
+    private_key = os.getenv('VRF_LOCAL_PRIVATE_KEY') or os.getenv('PRIVATE_KEY')
+    if not consumer_address or not private_key:
+        raise ValueError("VRF_LOCAL_CONSUMER_ADDRESS and VRF_LOCAL_PRIVATE_KEY (or PRIVATE_KEY) are required for the local VRF backend")
+
+    w3 = AsyncWeb3(AsyncHTTPProvider(os.getenv('VRF_LOCAL_RPC_URL', 'http://127.0.0.1:8545')))
+    contract = w3.eth.contract(address=AsyncWeb3.to_checksum_address(consumer_address), abi=VRF_CONSUMER_ABI)
+    pipeline = VRFRequestPipeline(w3, contract, Account.from_key(private_key), {"poll_interval": 0.5})
+    pipeline.backend_name = BACKEND_LOCAL
+    LocalVRFFulfiller(pipeline, config["fulfillment_latency"])
+    return pipeline
+
+
+def create_vrf_backend(name: str, config: Optional[Dict] = None):
+    """Backend không cần Chainlink thật (simulated / local)"""
+    if name == BACKEND_SIMULATED:
+        api_logger.warning("[VRF] Using in-process simulated VRF coordinator - NOT for production")
+        return SimulatedVRFCoordinator(config)
+    if name == BACKEND_LOCAL:
+        api_logger.warning("[VRF] Using local MockVRFConsumer backend - NOT for production")
+        return create_local_backend(config)
+    raise ValueError(f"Unknown VRF backend: {name}")
@@ -0,0 +1,78 @@
+"""
+Lấy random word VRF trong giới hạn latency của từng call site
+
+Nếu pool VRF trống, batch manager có thể phải gọi get_direct_vrf và chờ
+fulfillment tới vài phút. Với các call site có người chơi đang chờ (trận đấu),
+ta chỉ chờ trong budget cấu hình ở VRF_DEADLINE_CONFIG; quá hạn thì dùng
+CSPRNG local, ghi lại source và tăng metrics để audit.
+
+Source của word VRF theo backend đã sinh ra nó: "vrf" cho Chainlink VRF thật,
+"vrf:simulated" / "vrf:local" cho backend giả lập (utils.vrf_backends).
+"""
+
+import asyncio
+import secrets
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+from config.vrf_config import VRF_DEADLINE_CONFIG
+from utils.vrf_backends import BACKEND_CHAINLINK
+from utils.logger import api_logger
+from utils.vrf_metrics import VRF_RANDOMNESS_REQUESTS, VRF_LOCAL_FALLBACKS, VRF_RANDOMNESS_LATENCY
+
+SOURCE_VRF = "vrf"
+SOURCE_LOCAL_FALLBACK = "local_fallback"
+
+
+def vrf_source(backend_name: str) -> str:
+    """Source của word do backend sinh ra (chỉ Chainlink VRF thật là SOURCE_VRF)"""
+    return SOURCE_VRF if backend_name == BACKEND_CHAINLINK else f"{SOURCE_VRF}:{backend_name}"
+
+
+def is_vrf_source(source: str) -> bool:
+    """Word lấy từ pool VRF (backend bất kỳ), không phải CSPRNG local"""
+    return source == SOURCE_VRF or source.startswith(f"{SOURCE_VRF}:")
+
+
+def get_randomness_deadline(call_site: str) -> float:
+    """Latency budget (giây) cho call site"""
+    return VRF_DEADLINE_CONFIG.get(call_site, VRF_DEADLINE_CONFIG["default"])
+
+
+async def random_word_within_deadline(
+    get_word: Callable[[], Awaitable[Tuple[int, str]]],
+    call_site: str,
+    deadline: Optional[float] = None
+) -> Tuple[int, str]:
+    """
+    Chạy get_word() trong latency budget của call site.
+
+    Args:
+        get_word: Coroutine factory trả về (random word 256-bit, source) từ VRF,
+            vd: VRFBatchManager.get_random_word_with_source
+        call_site: Tên call site trong VRF_DEADLINE_CONFIG (vd: "match")
+        deadline: Ghi đè budget mặc định (giây)
+
+    Returns:
+        (word, source) với source của backend VRF (xem vrf_source) hoặc "local_fallback"
+    """
+    budget = deadline if deadline is not None else get_randomness_deadline(call_site)
+    start_time = time.monotonic()
+    reason = None
+    try:
+        word, source = await asyncio.wait_for(get_word(), timeout=budget)
+    except asyncio.TimeoutError:
+        reason = "deadline"
+    except Exception as e:
+        api_logger.error(f"[VRF] Error drawing randomness for {call_site}: {e}")
+        reason = "error"
+
+    if reason is not None:
+        word = secrets.randbits(256)
+        source = SOURCE_LOCAL_FALLBACK
+        VRF_LOCAL_FALLBACKS.labels(call_site=call_site, reason=reason).inc()
+        api_logger.warning(f"[VRF] {call_site}: VRF unavailable within {budget}s ({reason}), using local CSPRNG")
+
+    VRF_RANDOMNESS_REQUESTS.labels(call_site=call_site, source=source).inc()
+    VRF_RANDOMNESS_LATENCY.labels(call_site=call_site).observe(time.monotonic() - start_time)
+    return word, source
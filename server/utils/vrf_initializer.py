@@ -30,11 +30,22 @@ class VRFInitializer:
             self.prewarm_completed = False
             self.init_start_time = None
             self.init_duration = None
+            self._init_lock = asyncio.Lock()
+    
+    def _ensure_instance(self) -> ChainlinkVRF:
+        """Tạo ChainlinkVRF (không I/O) nếu chưa có"""
+        if self.vrf_instance is None:
+            self.vrf_instance = ChainlinkVRF()
+        return self.vrf_instance
     
     async def initialize_vrf(self, prewarm_size: int = 10) -> ChainlinkVRF:
         """
         Khởi tạo VRF system và pre-warm cache
         """
+        async with self._init_lock:
+            return await self._initialize_vrf(prewarm_size)
+    
+    async def _initialize_vrf(self, prewarm_size: int) -> ChainlinkVRF:
         if self.initialized and self.vrf_instance:
             api_logger.info("[VRF Init] VRF already initialized, returning existing instance")
             return self.vrf_instance
@@ -44,7 +55,7 @@ class VRFInitializer:
         
         try:
             # Khởi tạo VRF instance
-            self.vrf_instance = ChainlinkVRF()
+            self._ensure_instance()
             api_logger.info("[VRF Init] VRF instance created successfully")
             
             # Pre-warm cache
@@ -62,8 +73,7 @@ class VRFInitializer:
         except Exception as e:
             api_logger.error(f"[VRF Init] Error initializing VRF: {e}")
             # Fallback: tạo instance mà không pre-warm
-            if not self.vrf_instance:
-                self.vrf_instance = ChainlinkVRF()
+            self._ensure_instance()
             self.initialized = True
             return self.vrf_instance
     
@@ -75,11 +85,13 @@ class VRFInitializer:
     
     async def get_vrf_instance_async(self) -> ChainlinkVRF:
         """
-        Lấy VRF instance (asynchronous)
+        Lấy VRF instance (asynchronous).
+        Không chờ pre-warm: pool tự refill ở background, caller tự áp deadline
+        (utils.vrf_deadline) nên request trong lúc warm-up dùng fallback local.
         """
-        if not self.initialized:
-            return await self.initialize_vrf()
-        return self.vrf_instance
+        instance = self._ensure_instance()
+        instance.batch_manager.start()
+        return instance
     
     def get_status(self) -> dict:
         """
@@ -93,8 +105,9 @@ class VRFInitializer:
                 "init_duration": None
             }
         
-        cache_size = len(self.vrf_instance.batch_manager.cached_numbers)
-        cache_level = cache_size / self.vrf_instance.batch_manager.cache_size
+        pool_status = self.vrf_instance.batch_manager.get_status()
+        cache_size = pool_status["level"]
+        cache_level = cache_size / pool_status["capacity"]
         
         return {
             "initialized": self.initialized,
@@ -102,12 +115,8 @@ class VRFInitializer:
             "cache_size": cache_size,
             "cache_level": f"{cache_level:.1%}",
             "init_duration": f"{self.init_duration:.2f}s" if self.init_duration else None,
-            "batch_manager": {
-                "batch_size": self.vrf_instance.batch_manager.batch_size,
-                "cache_size": self.vrf_instance.batch_manager.cache_size,
-                "pending_requests": len(self.vrf_instance.batch_manager.pending_requests),
-                "is_processing": self.vrf_instance.batch_manager.is_processing
-            }
+            "batch_manager": pool_status,
+            "backend": self.vrf_instance.backend.get_status()
         }
 
 # Global instance
@@ -0,0 +1,81 @@
+"""
+Prometheus metrics cho hệ thống VRF
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Số lần lấy random theo call site và nguồn thực tế ("vrf" / "vrf:simulated" / "vrf:local" / "local_fallback")
+VRF_RANDOMNESS_REQUESTS = Counter(
+    'vrf_randomness_requests_total',
+    'Randomness draws by call site and source used',
+    ['call_site', 'source']
+)
+
+# Số lần phải fallback sang CSPRNG local, theo lý do ("deadline" / "error")
+VRF_LOCAL_FALLBACKS = Counter(
+    'vrf_local_fallback_total',
+    'Randomness draws that fell back to the local CSPRNG',
+    ['call_site', 'reason']
+)
+
+VRF_RANDOMNESS_LATENCY = Histogram(
+    'vrf_randomness_latency_seconds',
+    'Time spent obtaining randomness, including fallback',
+    ['call_site'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1, 5, 30)
+)
+
+VRF_POOL_WORDS = Gauge(
+    'vrf_pool_words',
+    'Unconsumed VRF words in the in-process pool'
+)
+
+VRF_REFILL_IN_FLIGHT = Gauge(
+    'vrf_refill_in_flight',
+    'VRF refill requests currently awaiting fulfilment'
+)
+
+VRF_POOL_WAITERS = Gauge(
+    'vrf_pool_waiters',
+    'Callers blocked waiting for a VRF word because the pool is empty'
+)
+
+VRF_FULFILLMENT_LATENCY = Histogram(
+    'vrf_fulfillment_latency_seconds',
+    'Time from requestRandomWords submission to fulfilment',
+    ['backend'],
+    buckets=(1, 2, 5, 10, 20, 30, 60, 120, 300)
+)
+
+VRF_WORDS_FULFILLED = Counter(
+    'vrf_words_fulfilled_total',
+    'VRF words received from fulfilled requests',
+    ['backend']
+)
+
+# Gas của transaction requestRandomWords chia cho số word nhận được
+# (gas callback trả bằng subscription, không nằm trong receipt)
+VRF_GAS_PER_WORD = Histogram(
+    'vrf_request_gas_per_word',
+    'requestRandomWords gas used divided by words requested',
+    ['backend'],
+    buckets=(1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+)
+
+# Lời gọi get_direct_vrf (bỏ qua pool), result: "vrf" / "local_fallback"
+VRF_DIRECT_REQUESTS = Counter(
+    'vrf_direct_requests_total',
+    'Unpooled direct VRF requests',
+    ['result']
+)
+
+# Số giá trị random đã dùng theo loại trong RANDOM_TYPE_CONFIG và nguồn thực tế
+VRF_CONSUMPTION = Counter(
+    'vrf_consumption_total',
+    'Random values consumed by random type and source',
+    ['random_type', 'source']
+)
+
+
+def record_vrf_consumption(random_type: str, source: str, count: int = 1):
+    VRF_CONSUMPTION.labels(random_type=random_type, source=source).inc(count)
@@ -0,0 +1,201 @@
+"""
+VRF word pool lưu trong MongoDB, dùng chung cho mọi worker
+
+- Word chưa dùng nằm trong collection vrf_words (kèm request_id on-chain),
+  nên restart / deploy không làm mất randomness đã trả phí
+- Mỗi word được claim nguyên tử bằng find_one_and_update nên không bao giờ
+  bị dùng 2 lần, kể cả giữa nhiều worker
+- Số request VRF đang chờ được giới hạn trên toàn cụm bằng các slot lease trong
+  vrf_refill_slots (slot hết hạn khi worker giữ slot bị crash)
+- Word đã claim được giữ lại để audit và tự xóa bởi TTL index trên claimed_at
+"""
+
+import asyncio
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from database.database import get_database
+from utils.vrf_metrics import VRF_POOL_WAITERS
+from utils.vrf_pool import VRFWordPool
+
+VRF_WORDS_COLLECTION = "vrf_words"
+VRF_REFILL_SLOTS_COLLECTION = "vrf_refill_slots"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def ensure_vrf_pool_indexes(db):
+    await db[VRF_WORDS_COLLECTION].create_index([("claimed", ASCENDING), ("_id", ASCENDING)])
+    await db[VRF_WORDS_COLLECTION].create_index("claimed_at", expireAfterSeconds=7 * 24 * 3600)
+
+
+class PersistentVRFWordPool(VRFWordPool):
+    def __init__(
+        self,
+        fetch_words,
+        slot_lease_seconds: float = 420,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            slot_lease_seconds: Thời hạn một slot refill (nên > receipt + fulfillment timeout)
+            poll_interval: Chu kỳ đồng bộ level chung / phục vụ caller đang chờ bằng
+                word do worker khác nạp vào
+            Các tham số còn lại giống VRFWordPool
+        """
+        super().__init__(fetch_words, **kwargs)
+        self.slot_lease_seconds = slot_lease_seconds
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or default_worker_id()
+        self._level = 0
+        self._global_in_flight = 0
+        self._indexes_ready = False
+        self._synced_at = 0.0
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    @property
+    def supply_in_flight(self) -> int:
+        return max(self._global_in_flight, self.in_flight)
+
+    async def _collections(self):
+        db = await get_database()
+        if not self._indexes_ready:
+            await ensure_vrf_pool_indexes(db)
+            self._indexes_ready = True
+        return db[VRF_WORDS_COLLECTION], db[VRF_REFILL_SLOTS_COLLECTION]
+
+    async def _claim(self) -> Optional[int]:
+        words, _ = await self._collections()
+        doc = await words.find_one_and_update(
+            {"claimed": False},
+            {"$set": {"claimed": True, "claimed_at": datetime.utcnow(), "claimed_by": self.worker_id}},
+            sort=[("_id", ASCENDING)],
+            projection={"word": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is None:
+            self._level = 0
+            return None
+        self._level = max(0, self._level - 1)
+        self._update_gauges()
+        self._notify()
+        return int(doc["word"], 16)
+
+    async def get(self) -> int:
+        self.start()
+        word = await self._claim()
+        if word is not None:
+            return word
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._update_gauges()
+        self._notify()
+        try:
+            return await future
+        finally:
+            VRF_POOL_WAITERS.set(self.waiters)
+
+    async def _refresh(self):
+        """Đọc level / số request đang chờ của cả cụm và phục vụ caller đang chờ từ pool chung"""
+        words, slots = await self._collections()
+        while self._waiters:
+            waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            word = await self._claim()
+            if word is None:
+                break
+            if waiter.done():
+                # Caller đã hủy trong lúc claim: word đã đánh dấu claimed, bỏ qua
+                continue
+            self._waiters.popleft().set_result(word)
+
+        # Engine được đánh thức sau mỗi lần tiêu thụ, chỉ đếm lại tối đa mỗi poll_interval
+        if time.monotonic() - self._synced_at < self.poll_interval:
+            return
+        self._level = await words.count_documents({"claimed": False})
+        self._global_in_flight = await slots.count_documents(
+            {"holder": {"$ne": None}, "expires_at": {"$gt": datetime.utcnow()}}
+        )
+        self._synced_at = time.monotonic()
+        self._update_gauges()
+
+    async def _acquire_refill_slot(self):
+        _, slots = await self._collections()
+        now = datetime.utcnow()
+        for i in range(self.max_in_flight):
+            slot_id = f"slot-{i}"
+            try:
+                result = await slots.update_one(
+                    {"_id": slot_id, "$or": [{"holder": None}, {"expires_at": {"$lte": now}}]},
+                    {"$set": {
+                        "holder": self.worker_id,
+                        "acquired_at": now,
+                        "expires_at": now + timedelta(seconds=self.slot_lease_seconds)
+                    }},
+                    upsert=True
+                )
+            except DuplicateKeyError:
+                # Slot đang được giữ (upsert đụng _id đã tồn tại)
+                continue
+            if result.matched_count or result.upserted_id is not None:
+                self._global_in_flight += 1
+                return slot_id
+        return None
+
+    async def _release_refill_slot(self, slot):
+        _, slots = await self._collections()
+        await slots.update_one(
+            {"_id": slot, "holder": self.worker_id},
+            {"$set": {"holder": None, "expires_at": None}}
+        )
+        self._global_in_flight = max(0, self._global_in_flight - 1)
+
+    async def _store(self, words: List[int]):
+        """Trả word cho caller đang chờ ở worker này, phần còn lại lưu vào pool chung"""
+        remaining = list(words)
+        while remaining and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(remaining.pop())
+
+        if remaining:
+            collection, _ = await self._collections()
+            request_id = getattr(words, "request_id", None)
+            now = datetime.utcnow()
+            await collection.insert_many([
+                {
+                    "word": f"{word:064x}",
+                    "request_id": str(request_id) if request_id is not None else None,
+                    "claimed": False,
+                    "created_at": now
+                }
+                for word in remaining
+            ])
+            self._level += len(remaining)
+        self._update_gauges()
+        if self._filled is not None:
+            self._filled.set()
+
+    def get_status(self) -> dict:
+        return {
+            **super().get_status(),
+            "persistent": True,
+            "worker_id": self.worker_id,
+            "cluster_in_flight": self._global_in_flight
+        }
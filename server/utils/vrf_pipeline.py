@@ -0,0 +1,172 @@
+"""
+Pipeline gửi requestRandomWords song song
+
+- Nonce cấp phát local (utils.nonce_manager) nên các transaction được gửi nối tiếp
+  nhau, không chờ receipt của transaction trước
+- Request id lấy từ event RequestSent trong receipt của chính transaction đó
+  (không đọc lastRequestId() vì bị race khi có nhiều request đồng thời)
+- Một vòng lặp duy nhất theo dõi fulfillment của mọi request đang chờ qua
+  log RequestFulfilled (1 lần get_logs mỗi tick cho tất cả request),
+  lỗi get_logs thì fallback sang getRequestStatus
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+from web3.logs import DISCARD
+
+from config.vrf_config import VRF_PIPELINE_CONFIG
+from utils.logger import api_logger
+from utils.nonce_manager import get_nonce_manager
+from utils.vrf_metrics import VRF_FULFILLMENT_LATENCY, VRF_GAS_PER_WORD, VRF_WORDS_FULFILLED
+from utils.vrf_pool import FulfilledWords
+
+
+class PendingVRFRequest:
+    def __init__(self, request_id: int, num_words: int, block_number: int, future: asyncio.Future):
+        self.request_id = request_id
+        self.num_words = num_words
+        self.block_number = block_number
+        self.future = future
+        self.submitted_at = time.monotonic()
+
+
+class VRFRequestPipeline:
+    """VRF backend mặc định (xem utils.vrf_backends): gửi request thật lên consumer contract"""
+
+    def __init__(self, w3, consumer_contract, account, config: Optional[Dict] = None):
+        config = {**VRF_PIPELINE_CONFIG, **(config or {})}
+        self.w3 = w3
+        self.contract = consumer_contract
+        self.account = account
+        self.poll_interval = config["poll_interval"]
+        self.receipt_timeout = config["receipt_timeout"]
+        self.fulfillment_timeout = config["fulfillment_timeout"]
+        self.max_log_range = config["max_log_range"]
+
+        self.pending: Dict[int, PendingVRFRequest] = {}
+        self.backend_name = "chainlink"
+        self.requests = 0
+        self.num_words: Optional[int] = None
+        self._next_block: Optional[int] = None
+        self._poller: Optional[asyncio.Task] = None
+        # Hook gọi sau khi request được ghi nhận on-chain (backend local dùng để tự fulfill)
+        self.on_request_sent: Optional[Callable[[PendingVRFRequest], None]] = None
+
+    async def _submit(self) -> PendingVRFRequest:
+        """Gửi một requestRandomWords, chờ receipt và đăng ký request vào danh sách chờ"""
+        nonce_manager = await get_nonce_manager(self.w3, self.account.address)
+        nonce = await nonce_manager.allocate()
+        try:
+            tx = await self.contract.functions.requestRandomWords(False).build_transaction({
+                'from': self.account.address,
+                'nonce': nonce,
+                'chainId': await self.w3.eth.chain_id
+            })
+            signed_tx = self.account.sign_transaction(tx)
+            tx_hash = await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception:
+            await nonce_manager.resync()
+            raise
+
+        receipt = await self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.receipt_timeout)
+        if receipt["status"] != 1:
+            raise RuntimeError(f"requestRandomWords reverted: {tx_hash.hex()}")
+        events = self.contract.events.RequestSent().process_receipt(receipt, errors=DISCARD)
+        if not events:
+            raise RuntimeError(f"RequestSent event not found in {tx_hash.hex()}")
+
+        self.requests += 1
+        request_id = events[0]["args"]["requestId"]
+        num_words = events[0]["args"]["numWords"]
+        self.num_words = num_words
+        if num_words:
+            VRF_GAS_PER_WORD.labels(backend=self.backend_name).observe(receipt["gasUsed"] / num_words)
+        request = PendingVRFRequest(
+            request_id, num_words, receipt["blockNumber"],
+            asyncio.get_running_loop().create_future()
+        )
+        self.pending[request_id] = request
+        if self._next_block is None or request.block_number < self._next_block:
+            self._next_block = request.block_number
+        self._ensure_poller()
+        if self.on_request_sent is not None:
+            self.on_request_sent(request)
+        api_logger.info(f"[VRF Pipeline] Request {request_id} sent (nonce {nonce}, {num_words} words, {len(self.pending)} pending)")
+        return request
+
+    async def request_random_words(self) -> List[int]:
+        """
+        Gửi một request và chờ fulfillment. Nhiều lời gọi đồng thời được gửi
+        nối tiếp với nonce liên tiếp và cùng được theo dõi bởi một poller.
+        """
+        request = await self._submit()
+        try:
+            return await asyncio.wait_for(asyncio.shield(request.future), timeout=self.fulfillment_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"VRF request {request.request_id} not fulfilled after {self.fulfillment_timeout}s")
+        finally:
+            self.pending.pop(request.request_id, None)
+
+    def _ensure_poller(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    async def _poll_loop(self):
+        while self.pending:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self._poll_logs()
+            except Exception as e:
+                api_logger.warning(f"[VRF Pipeline] get_logs failed, polling request status: {e}")
+                await self._poll_status()
+        # Không còn request chờ: lần sau quét từ block của request mới
+        self._next_block = None
+
+    def _resolve(self, request_id: int, random_words: List[int]):
+        request = self.pending.get(request_id)
+        if request and not request.future.done():
+            request.future.set_result(FulfilledWords(random_words, request_id))
+            elapsed = time.monotonic() - request.submitted_at
+            VRF_FULFILLMENT_LATENCY.labels(backend=self.backend_name).observe(elapsed)
+            VRF_WORDS_FULFILLED.labels(backend=self.backend_name).inc(len(random_words))
+            api_logger.info(f"[VRF Pipeline] Request {request_id} fulfilled in {elapsed:.1f}s")
+
+    async def _poll_logs(self):
+        latest = await self.w3.eth.block_number
+        scanned_from = self._next_block
+        from_block = scanned_from if scanned_from is not None else latest
+        if from_block > latest:
+            return
+        to_block = min(latest, from_block + self.max_log_range - 1)
+        logs = await self.contract.events.RequestFulfilled().get_logs(from_block=from_block, to_block=to_block)
+        for log in logs:
+            self._resolve(log["args"]["requestId"], log["args"]["randomWords"])
+        # Request gửi trong lúc chờ get_logs có thể đã hạ _next_block về block của nó
+        if self._next_block is not None and self._next_block != scanned_from:
+            self._next_block = min(self._next_block, to_block + 1)
+        else:
+            self._next_block = to_block + 1
+
+    async def _poll_status(self):
+        request_ids = [rid for rid, r in self.pending.items() if not r.future.done()]
+        results = await asyncio.gather(
+            *[self.contract.functions.getRequestStatus(rid).call() for rid in request_ids],
+            return_exceptions=True
+        )
+        for request_id, result in zip(request_ids, results):
+            if isinstance(result, Exception):
+                continue
+            fulfilled, random_words = result
+            if fulfilled:
+                self._resolve(request_id, random_words)
+
+    def get_status(self) -> dict:
+        return {
+            "backend": self.backend_name,
+            "requests": self.requests,
+            "pending_requests": len(self.pending),
+            "num_words": self.num_words,
+            "next_block": self._next_block
+        }
@@ -0,0 +1,277 @@
+"""
+Pool random word VRF với refill engine chạy trên event loop của app
+
+- Không dùng thread / threading.Lock: mọi thao tác chạy trên cùng một event loop
+- Watermark: khi lượng word (kể cả đang về) xuống dưới low_watermark thì refill
+  liên tục tới high_watermark, giữa hai mức thì không làm gì (tránh refill lắt nhắt)
+- Phản ứng ngay với mỗi lần tiêu thụ thay vì kiểm tra định kỳ
+- Tối đa max_in_flight request VRF cùng lúc, lỗi thì backoff theo cấp số nhân
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional, Set
+
+from utils.logger import api_logger
+from utils.vrf_metrics import VRF_POOL_WAITERS, VRF_POOL_WORDS, VRF_REFILL_IN_FLIGHT
+
+
+class FulfilledWords(list):
+    """Các word của một VRF request, kèm request_id để truy ngược on-chain"""
+
+    def __init__(self, words, request_id: Optional[int] = None):
+        super().__init__(words)
+        self.request_id = request_id
+
+
+class VRFWordPool:
+    # Chu kỳ tự đánh thức refill engine (None: chỉ chạy khi có sự kiện)
+    poll_interval: Optional[float] = None
+
+    def __init__(
+        self,
+        fetch_words: Callable[[], Awaitable[List[int]]],
+        capacity: int = 200,
+        low_watermark: int = 60,
+        high_watermark: int = 160,
+        max_in_flight: int = 3,
+        backoff: float = 5.0,
+        max_backoff: float = 60.0
+    ):
+        """
+        Args:
+            fetch_words: Coroutine factory gửi một request VRF và trả về các word nhận được
+            capacity: Số word tối đa giữ trong pool
+            low_watermark / high_watermark: Ngưỡng bắt đầu / dừng refill
+            max_in_flight: Số request VRF tối đa đang chờ cùng lúc
+        """
+        if not 0 <= low_watermark < high_watermark <= capacity:
+            raise ValueError("Watermarks must satisfy 0 <= low < high <= capacity")
+        self.fetch_words = fetch_words
+        self.capacity = capacity
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.max_in_flight = max_in_flight
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.words = deque()
+        self.in_flight = 0
+        # Ước lượng số word mỗi request trả về (cập nhật theo request gần nhất)
+        self.words_per_request = 1
+        self._waiters = deque()
+        self._refilling = False
+        self._failures = 0
+        self._backoff_until = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._filled: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._fetch_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def level(self) -> int:
+        return len(self.words)
+
+    @property
+    def supply_in_flight(self) -> int:
+        """Số request đang chờ được tính vào supply khi xét watermark"""
+        return self.in_flight
+
+    @property
+    def waiters(self) -> int:
+        return sum(1 for w in self._waiters if not w.done())
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Khởi động refill engine trên event loop hiện tại (gọi nhiều lần không sao)"""
+        if self.is_running:
+            return
+        self._wakeup = asyncio.Event()
+        self._filled = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    async def stop(self):
+        tasks = list(self._fetch_tasks) + ([self._task] if self._task else [])
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._fetch_tasks.clear()
+
+    def _notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _update_gauges(self):
+        VRF_POOL_WORDS.set(self.level)
+        VRF_REFILL_IN_FLIGHT.set(self.in_flight)
+        VRF_POOL_WAITERS.set(self.waiters)
+
+    def try_get(self) -> Optional[int]:
+        """Lấy word nếu pool còn, không chờ"""
+        if not self.words:
+            return None
+        word = self.words.popleft()
+        self._update_gauges()
+        self._notify()
+        return word
+
+    async def get(self) -> int:
+        """Lấy một word; nếu pool trống thì chờ request đang về"""
+        self.start()
+        word = self.try_get()
+        if word is not None:
+            return word
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._update_gauges()
+        self._notify()
+        try:
+            return await future
+        finally:
+            VRF_POOL_WAITERS.set(self.waiters)
+
+    def put_many(self, words: List[int]):
+        """Đưa word mới vào: ưu tiên trả cho caller đang chờ, còn lại vào pool"""
+        for word in words:
+            while self._waiters and self._waiters[0].done():
+                self._waiters.popleft()
+            if self._waiters:
+                self._waiters.popleft().set_result(word)
+            elif len(self.words) < self.capacity:
+                self.words.append(word)
+            else:
+                api_logger.warning("[VRF Pool] Pool full, dropping fulfilled word")
+        self._update_gauges()
+        if self._filled is not None:
+            self._filled.set()
+
+    def _needs_refill(self) -> bool:
+        supply = self.level + self.supply_in_flight * self.words_per_request
+        if self.waiters > self.in_flight * self.words_per_request:
+            return True
+        if supply <= self.low_watermark:
+            self._refilling = True
+        elif supply >= self.high_watermark:
+            self._refilling = False
+        return self._refilling
+
+    # Các hook cho pool dùng storage chia sẻ (xem utils.vrf_persistent_pool)
+    async def _refresh(self):
+        """Đồng bộ trạng thái trước mỗi lượt refill (pool in-memory: không cần)"""
+
+    async def _acquire_refill_slot(self):
+        """Trả về token của slot refill, None nếu không được phép gửi thêm request"""
+        return True
+
+    async def _release_refill_slot(self, slot):
+        pass
+
+    async def _store(self, words: List[int]):
+        self.put_many(words)
+
+    async def _wait_wakeup(self):
+        if self.poll_interval is None:
+            await self._wakeup.wait()
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        while True:
+            try:
+                await self._wait_wakeup()
+                self._wakeup.clear()
+
+                delay = self._backoff_until - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                await self._refresh()
+                while self.in_flight < self.max_in_flight and self._needs_refill():
+                    slot = await self._acquire_refill_slot()
+                    if slot is None:
+                        break
+                    self.in_flight += 1
+                    self._update_gauges()
+                    task = asyncio.create_task(self._fetch(slot))
+                    self._fetch_tasks.add(task)
+                    task.add_done_callback(self._fetch_tasks.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                api_logger.error(f"[VRF Pool] Refill engine error: {e}")
+                await asyncio.sleep(1)
+
+    async def _fetch(self, slot):
+        try:
+            words = await self.fetch_words()
+            if not words:
+                raise RuntimeError("VRF request returned no words")
+            self._failures = 0
+            self.words_per_request = len(words)
+            await self._store(words)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._failures += 1
+            wait = min(self.backoff * (2 ** (self._failures - 1)), self.max_backoff)
+            self._backoff_until = time.monotonic() + wait
+            api_logger.error(f"[VRF Pool] Refill request failed ({self._failures} in a row), backing off {wait:.0f}s: {e}")
+        finally:
+            self.in_flight -= 1
+            await self._release_refill_slot(slot)
+            self._update_gauges()
+            self._notify()
+
+    async def wait_for_level(self, target: int, timeout: float) -> bool:
+        """
+        Chờ pool có ít nhất target word (dùng khi pre-warm lúc khởi động).
+
+        Returns:
+            True nếu đạt target trước timeout
+        """
+        self.start()
+        await self._refresh()
+        target = min(target, self.high_watermark)
+        if self.level < target:
+            # Ép refill ngay cả khi đang ở giữa 2 watermark
+            self._refilling = True
+            self._notify()
+        deadline = time.monotonic() + timeout
+        while self.level < target:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._filled.clear()
+            try:
+                await asyncio.wait_for(self._filled.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def get_status(self) -> dict:
+        return {
+            "level": self.level,
+            "capacity": self.capacity,
+            "low_watermark": self.low_watermark,
+            "high_watermark": self.high_watermark,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "waiters": self.waiters,
+            "refilling": self._refilling,
+            "consecutive_failures": self._failures,
+            "running": self.is_running
+        }
@@ -3,22 +3,30 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import WebSocket, WebSocketDisconnect, APIRouter, Depends
-from typing import Dict
+from typing import Dict, Tuple
 import json
 from datetime import datetime
 from database.database import get_database
 from bson import ObjectId
 from utils.logger import api_logger
 import random
-from database.database import get_skills_collection
 from utils.time_utils import get_vietnam_time, to_vietnam_time, VIETNAM_TZ
 from fastapi.responses import JSONResponse
 from utils.level_utils import get_total_point_for_level, get_basic_level, get_legend_level, get_vip_level, update_user_levels
 import asyncio
+import time
 from utils.chainlink_vrf import ChainlinkVRF
-from config.vrf_config import VRF_BATCH_CONFIG, USER_VRF_CONFIG, RANDOM_TYPE_CONFIG
+from config.vrf_config import USER_VRF_CONFIG, RANDOM_TYPE_CONFIG
 from utils.vrf_utils import should_use_vrf_for_user, log_vrf_decision, get_user_type
+from utils.vrf_metrics import record_vrf_consumption
 from utils.vrf_initializer import vrf_initializer, get_vrf_status
+from config.settings import settings
+from ws_handlers.challenge_store import PendingChallengeStore
+from services.match_outcome import assign_roles, pick_skill, resolve_match
+from utils.entropy import MatchEntropy
+from utils.vrf_deadline import is_vrf_source, random_word_within_deadline
+from services.match_pipeline import match_pipeline, MatchCommitJob, project_match_stats
+from services.bot_roster import bot_roster
 
 _vrf_instance = None
 
@@ -31,15 +39,21 @@ async def get_vrf_instance():
     if _vrf_instance is None:
         api_logger.info("Getting VRF instance from initializer...")
         _vrf_instance = await vrf_initializer.get_vrf_instance_async()
-        
-        # Cấu hình batch manager với settings từ config
-        _vrf_instance.batch_manager.batch_size = VRF_BATCH_CONFIG["batch_size"]
-        _vrf_instance.batch_manager.cache_size = VRF_BATCH_CONFIG["cache_size"]
-        _vrf_instance.batch_manager.min_interval = VRF_BATCH_CONFIG["min_interval"]
-        
         api_logger.info("VRF instance configured successfully")
     return _vrf_instance
-from services.ccip_service import ccip_service
+
+async def _get_vrf_word() -> Tuple[int, str]:
+    # shield: nếu hết deadline khi VRF đang khởi tạo thì vẫn để nó khởi tạo xong
+    chainlink_vrf = await asyncio.shield(get_vrf_instance())
+    return await chainlink_vrf.batch_manager.get_random_word_with_source()
+
+async def draw_vrf_match_entropy() -> MatchEntropy:
+    """
+    Entropy VRF cho trận đấu, giới hạn trong latency budget "match".
+    Quá hạn thì dùng seed CSPRNG local, source được ghi vào match record.
+    """
+    word, source = await random_word_within_deadline(_get_vrf_word, "match")
+    return MatchEntropy(word, source=source)
 
 # Level-related constants
 LEVEL_MILESTONES_BASIC = [0, 100, 300, 600, 1000, 1500, 2100, 2800, 3600, 4500, 5500, 6600, 7800, 9100, 10500, 12000, 13600, 15300, 17100, 19000, 21000, 23100, 25300, 27600, 30000, 32500, 35100, 37800, 40600, 43500, 46500, 49600, 52800, 56100, 59500, 63000, 66600, 70300, 74100, 78000, 82000, 86100, 90300, 94600, 99000, 103500, 108100, 112800, 117600, 122500, 127500, 132600, 137800, 143100, 148500, 154000, 159600, 165300, 171100, 177000, 183000, 189100, 195300, 201600, 208000, 214500, 221100, 227800, 234600, 241500, 248500, 255600, 262800, 270100, 277500, 285000, 292600, 300300, 308100, 316000, 324000, 332100, 340300, 348600, 357000, 365500, 374100, 382800, 391600, 400500, 409500, 418600, 427800, 437100, 446500, 456000, 465600, 475300, 485100, 495000]
@@ -124,7 +138,14 @@ async def update_user_levels(user_id: str, db):
 
 class ChallengeManager:
     def __init__(self):
-        self.pending_challenges: Dict[str, Dict] = {}  # Store pending challenges
+        # Store pending challenges, indexed by challenger and by target
+        self.pending_challenges = PendingChallengeStore(
+            ttl_seconds=settings.CHALLENGE_TTL_SECONDS,
+            max_outgoing_per_user=settings.MAX_PENDING_CHALLENGES_PER_USER
+        )
+        self._active_connections: Dict[str, WebSocket] = {}
+        self._expiry_task = None
+        self._expiry_wakeup = asyncio.Event()
 
     async def handle_challenge_request(self, websocket: WebSocket, from_id: str, to_id: str, active_connections: Dict[str, WebSocket]):
         """Handle a challenge request from one user to another"""
@@ -136,11 +157,11 @@ class ChallengeManager:
         
         # Check if this is a bot challenge
         if to_id == "bot":
-            await self.handle_bot_challenge(websocket, from_id, active_connections)
+            await self.handle_bot_challenge(websocket, from_id, active_connections, from_user=from_user)
             return
             
         to_user = await db.users.find_one({"_id": ObjectId(to_id)})
-        if from_user.get("remaining_matches", 0) <= 0 or to_user.get("remaining_matches", 0) <= 0:
+        if not self._has_remaining_matches(from_user) or not self._has_remaining_matches(to_user):
             await websocket.send_json({
                 "type": "error",
                 "message": "One of the users has no remaining matches."
@@ -154,21 +175,28 @@ class ChallengeManager:
             return
 
         # Check for mutual challenge
-        reverse_challenge_id = f"{to_id}_{from_id}"
-        if reverse_challenge_id in self.pending_challenges:
+        if (to_id, from_id) in self.pending_challenges:
             # If there's a mutual challenge, automatically accept it
             await self.handle_challenge_response(websocket, from_id, to_id, True, active_connections)
             return
 
+        # Limit outstanding challenges per user (re-sending to the same target just refreshes it)
+        if (from_id, to_id) not in self.pending_challenges and not self.pending_challenges.can_challenge(from_id):
+            await websocket.send_json({
+                "type": "error",
+                "message": f"You already have {self.pending_challenges.max_outgoing_per_user} pending challenges."
+            })
+            return
+
         # Store the challenge request with Vietnam timezone
-        challenge_id = f"{from_id}_{to_id}"
         vietnam_time = get_vietnam_time().astimezone(VIETNAM_TZ)
-        self.pending_challenges[challenge_id] = {
+        self.pending_challenges.add(from_id, to_id, {
             "from_id": from_id,
             "to_id": to_id,
             "timestamp": vietnam_time.isoformat(),
             "timezone": "Asia/Ho_Chi_Minh"
-        }
+        })
+        self._ensure_expiry_task(active_connections)
 
         # Get user details for the notification
         print(f"[Challenge] Sending challenge_invite from {from_id} ({from_user.get('name', 'Anonymous')}) to {to_id}")
@@ -177,30 +205,24 @@ class ChallengeManager:
             "from": from_id,
             "from_name": from_user.get("name", "Anonymous"),
             "timestamp": vietnam_time.isoformat(),
-            "timezone": "Asia/Ho_Chi_Minh"
+            "timezone": "Asia/Ho_Chi_Minh",
+            "expires_in": self.pending_challenges.ttl_seconds
         })
 
     async def handle_challenge_response(self, websocket: WebSocket, from_id: str, to_id: str, accepted: bool, active_connections: Dict[str, WebSocket]):
         """Handle challenge response (accept/decline)"""
         # Check both possible challenge keys
-        challenge_key1 = f"{from_id}_{to_id}"
-        challenge_key2 = f"{to_id}_{from_id}"
-        challenge_key = None
-        if challenge_key1 in self.pending_challenges:
-            challenge_key = challenge_key1
-        elif challenge_key2 in self.pending_challenges:
-            challenge_key = challenge_key2
-        else:
+        challenge = self.pending_challenges.get(from_id, to_id) or self.pending_challenges.get(to_id, from_id)
+        if challenge is None:
             return
 
-        challenge = self.pending_challenges[challenge_key]
         if challenge["to_id"] != from_id:
             return
 
         db = await get_database()
         from_user = await db.users.find_one({"_id": ObjectId(from_id)})
         to_user = await db.users.find_one({"_id": ObjectId(to_id)})
-        if from_user.get("remaining_matches", 0) <= 0 or to_user.get("remaining_matches", 0) <= 0:
+        if not self._has_remaining_matches(from_user) or not self._has_remaining_matches(to_user):
             await websocket.send_json({
                 "type": "error",
                 "message": "One of the users has no remaining matches."
@@ -217,32 +239,28 @@ class ChallengeManager:
             # Kiểm tra xem có VIP nào tham gia không
             has_vip_participant = from_user_is_vip or to_user_is_vip
             
+            # Một random word cho cả trận: VIP match dùng VRF, còn lại dùng seed local
             if has_vip_participant:
-                # Có VIP tham gia - sử dụng VRF cho role assignment
-                chainlink_vrf = await get_vrf_instance()
-                vrf_random_role = await chainlink_vrf.get_random_int(2)
-                kicker_id = from_id if vrf_random_role == 0 else to_id
-                goalkeeper_id = to_id if vrf_random_role == 0 else from_id
-                
-                # Log quyết định VRF
-                from_user_type = get_user_type(from_user)
-                to_user_type = get_user_type(to_user)
+                entropy = await draw_vrf_match_entropy()
+            else:
+                entropy = MatchEntropy.local()
+
+            role_roll = entropy.randbelow("role", 2)
+            kicker_id, goalkeeper_id = assign_roles(from_id, to_id, role_roll)
+            record_vrf_consumption("role_assignment", entropy.source)
+
+            from_user_type = get_user_type(from_user)
+            to_user_type = get_user_type(to_user)
+            if is_vrf_source(entropy.source):
+                vrf_random_role = role_roll
                 print(f"[Challenge] VRF role assignment for VIP match: {vrf_random_role}")
-                print(f"[Challenge] From user: {from_user.get('name', 'Anonymous')} ({from_user_type})")
-                print(f"[Challenge] To user: {to_user.get('name', 'Anonymous')} ({to_user_type})")
+            elif has_vip_participant:
+                print("[Challenge] VRF deadline exceeded, local fallback role assignment for VIP match")
             else:
-                # Không có VIP - Basic/PRO Player dùng random thường
-                roles = ["kicker", "goalkeeper"]
-                random.shuffle(roles)
-                kicker_id = from_id if roles[0] == "kicker" else to_id
-                goalkeeper_id = to_id if roles[0] == "kicker" else from_id
-                
-                # Log quyết định local random
-                from_user_type = get_user_type(from_user)
-                to_user_type = get_user_type(to_user)
-                print(f"[Challenge] Local random role assignment for Basic/PRO match")
-                print(f"[Challenge] From user: {from_user.get('name', 'Anonymous')} ({from_user_type})")
-                print(f"[Challenge] To user: {to_user.get('name', 'Anonymous')} ({to_user_type})")
+                print("[Challenge] Local random role assignment for Basic/PRO match")
+            print(f"[Challenge] From user: {from_user.get('name', 'Anonymous')} ({from_user_type})")
+            print(f"[Challenge] To user: {to_user.get('name', 'Anonymous')} ({to_user_type})")
+            print(f"[Challenge] Match entropy seed ({entropy.source}): {entropy.seed_hex}")
 
             # Lấy thông tin người chơi sau khi đã gán vai trò
             kicker = await db.users.find_one({"_id": ObjectId(kicker_id)})
@@ -273,55 +291,43 @@ class ChallengeManager:
             selected_kicker_skill = ""
             selected_goalkeeper_skill = ""
 
-            # Logic cho Kicker - CHỈ VIP MỚI DÙNG VRF
+            # Skill của cả hai bên được suy ra từ cùng entropy của trận
+            kicker_skill_idx = entropy.randbelow("kicker_skill", len(kicker_skills))
+            selected_kicker_skill = pick_skill(kicker_skills, kicker_skill_idx)
             kicker_should_use_vrf = should_use_vrf_for_user(kicker, "skill_selection")
-            if kicker_should_use_vrf:
-                # VIP Kicker sử dụng VRF
-                chainlink_vrf = await get_vrf_instance()
-                kicker_skill_idx = await chainlink_vrf.get_random_int(len(kicker_skills))
-                selected_kicker_skill = kicker_skills[kicker_skill_idx]
+            if kicker_should_use_vrf and is_vrf_source(entropy.source):
                 vrf_random_kicker_skill = kicker_skill_idx
-                
-                # Log quyết định VRF
                 log_vrf_decision(kicker, "skill_selection", True, f"Selected skill index: {kicker_skill_idx}")
             else:
-                # Basic/PRO Kicker dùng random thường
-                selected_kicker_skill = random.choice(kicker_skills)
-                log_vrf_decision(kicker, "skill_selection", False, "Basic/PRO user - using local random")
+                log_vrf_decision(kicker, "skill_selection", False, f"Basic/PRO user - using match entropy ({entropy.source})")
 
-            # Logic cho Goalkeeper - CHỈ VIP MỚI DÙNG VRF
+            goalkeeper_skill_idx = entropy.randbelow("goalkeeper_skill", len(goalkeeper_skills))
+            selected_goalkeeper_skill = pick_skill(goalkeeper_skills, goalkeeper_skill_idx)
             goalkeeper_should_use_vrf = should_use_vrf_for_user(goalkeeper, "skill_selection")
-            if goalkeeper_should_use_vrf:
-                # VIP Goalkeeper sử dụng VRF
-                chainlink_vrf = await get_vrf_instance()
-                goalkeeper_skill_idx = await chainlink_vrf.get_random_int(len(goalkeeper_skills))
-                selected_goalkeeper_skill = goalkeeper_skills[goalkeeper_skill_idx]
+            if goalkeeper_should_use_vrf and is_vrf_source(entropy.source):
                 vrf_random_goalkeeper_skill = goalkeeper_skill_idx
-                
-                # Log quyết định VRF
                 log_vrf_decision(goalkeeper, "skill_selection", True, f"Selected skill index: {goalkeeper_skill_idx}")
             else:
-                # Basic/PRO Goalkeeper dùng random thường
-                selected_goalkeeper_skill = random.choice(goalkeeper_skills)
-                log_vrf_decision(goalkeeper, "skill_selection", False, "Basic/PRO user - using local random")
+                log_vrf_decision(goalkeeper, "skill_selection", False, f"Basic/PRO user - using match entropy ({entropy.source})")
+
+            record_vrf_consumption("skill_selection", entropy.source, 2)
 
             # --- PHẦN CÒN LẠI CỦA HÀM GIỮ NGUYÊN ---
-            # Get kicker skill details from skills collection to check counter
-            skills_collection = await get_skills_collection()
-            kicker_skill_details = await skills_collection.find_one({"name": selected_kicker_skill})
-            
+            # Counter của skill kicker lấy từ skill cache của bot_roster
             # Determine winner based on skill counter
-            winner_id = None
-            if kicker_skill_details and kicker_skill_details.get("counter") == selected_goalkeeper_skill:
-                winner_id = goalkeeper_id
-            else:
-                winner_id = kicker_id
+            outcome = resolve_match(
+                kicker_id,
+                goalkeeper_id,
+                selected_kicker_skill,
+                selected_goalkeeper_skill,
+                await bot_roster.get_kicker_counter(selected_kicker_skill)
+            )
+            winner_id = outcome["winner_id"]
 
-            # (Toàn bộ phần xử lý kết quả, cập nhật DB, gửi message... giữ nguyên như cũ)
-            # ...
-            winner = await db.users.find_one({"_id": ObjectId(winner_id)})
-            loser_id = goalkeeper_id if winner_id == kicker_id else kicker_id
-            loser = await db.users.find_one({"_id": ObjectId(loser_id)})
+            players = {kicker_id: kicker, goalkeeper_id: goalkeeper}
+            loser_id = outcome["loser_id"]
+            winner = players[winner_id]
+            loser = players[loser_id]
 
             match_history = {
                 "match_id": str(ObjectId()),
@@ -331,182 +337,34 @@ class ChallengeManager:
                 "kicker_skill": selected_kicker_skill,
                 "goalkeeper_skill": selected_goalkeeper_skill,
                 "winner_id": winner_id,
-                "winner_role": "kicker" if winner_id == kicker_id else "goalkeeper",
+                "winner_role": outcome["winner_role"],
                 "loser_id": loser_id,
-                "loser_role": "goalkeeper" if winner_id == kicker_id else "kicker",
+                "loser_role": outcome["loser_role"],
                 "vrf_random_role": vrf_random_role,
                 "vrf_random_kicker_skill": vrf_random_kicker_skill,
-                "vrf_random_goalkeeper_skill": vrf_random_goalkeeper_skill
+                "vrf_random_goalkeeper_skill": vrf_random_goalkeeper_skill,
+                "entropy": entropy.to_record()
             }
 
+            # Ghi DB, level, milestone NFT và leaderboard được xử lý bởi match_pipeline.
+            # Người chơi nhận kết quả ngay với chỉ số dự kiến, sau đó nhận match_committed.
+            await match_pipeline.submit(MatchCommitJob(match_history, winner, loser))
 
-            # Update winner's stats and check for level up
-            update_fields = {
-                "$push": {"match_history": match_history}
-            }
-            if winner_id == kicker_id:
-                update_fields["$inc"] = {
-                    "kicked_win": 1, 
-                    "total_kicked": 1, 
-                    "total_point": 1, 
-                    "available_skill_points": 1  # Add 1 skill point for winning
-                }
-                if not winner.get("is_vip", False):
-                    update_fields["$inc"]["remaining_matches"] = -1
-            else:
-                update_fields["$inc"] = {
-                    "keep_win": 1, 
-                    "total_keep": 1, 
-                    "total_point": 1, 
-                    "available_skill_points": 1  # Add 1 skill point for winning
-                }
-                if not winner.get("is_vip", False):
-                    update_fields["$inc"]["remaining_matches"] = -1
-            await db.users.update_one({"_id": ObjectId(winner_id)}, update_fields)
-
-            # Get updated user data
-            updated_winner = await db.users.find_one({"_id": ObjectId(winner_id)})
-            updated_loser = await db.users.find_one({"_id": ObjectId(loser_id)})
-
-            # --- SỬA LOGIC MINT NFT ---
-            # Tính milestone trước và sau khi update
-            previous_total_win = winner.get("kicked_win", 0) + winner.get("keep_win", 0)
-            previous_milestone = previous_total_win // 10
-            total_win = updated_winner.get("kicked_win", 0) + updated_winner.get("keep_win", 0)
-            current_milestone = total_win // 10
-
-            if current_milestone > previous_milestone and current_milestone > 0:
-                try:
-                    player_address = updated_winner.get("wallet") or updated_winner.get("evm_address")
-                    player_name = updated_winner.get("name", "Anonymous Player")
-                    if player_address:
-                        milestone_wins = current_milestone * 10
-                        api_logger.info(f"Player {player_name} reached milestone {current_milestone} ({milestone_wins} wins), triggering Victory NFT mint")
-                        asyncio.create_task(
-                            self._mint_victory_nft_async(player_address, milestone_wins, player_name, winner_id)
-                        )
-                    else:
-                        api_logger.warning(f"Player {winner_id} has no wallet address for Victory NFT minting")
-                except Exception as e:
-                    api_logger.error(f"Failed to initiate Victory NFT mint for player {winner_id}: {str(e)}")
-            # --- END SỬA LOGIC MINT NFT ---
-
-            # Update loser's stats
-            loser_update_fields = {"$push": {"match_history": match_history}}
-            if winner_id == kicker_id:
-                loser_update_fields["$inc"] = {"total_keep": 1}
-                # Only decrease remaining_matches if not VIP
-                if not loser.get("is_vip", False):
-                    loser_update_fields["$inc"]["remaining_matches"] = -1
-            else:
-                loser_update_fields["$inc"] = {"total_kicked": 1}
-                # Only decrease remaining_matches if not VIP
-                if not loser.get("is_vip", False):
-                    loser_update_fields["$inc"]["remaining_matches"] = -1
-            await db.users.update_one({"_id": ObjectId(loser_id)}, loser_update_fields)
-
-            # Update levels for winner
-            new_levels = await update_user_levels(winner_id, db)
-            if new_levels:
-                level_up = new_levels["level"] > winner.get("level", 1)
-                new_skills = []
-                if level_up and not new_levels["is_pro"]:
-                    # Add new skills based on role
-                    if winner_id == kicker_id:
-                        new_skills = [f"kicker_skill_level_{new_levels['level']}"]
-                    else:
-                        new_skills = [f"goalkeeper_skill_level_{new_levels['level']}"]
-                    await db.users.update_one(
-                        {"_id": ObjectId(winner_id)},
-                        {"$push": {
-                            "kicker_skills" if winner_id == kicker_id else "goalkeeper_skills": {
-                                "$each": new_skills
-                            }
-                        }}
-                    )
-
-            # Get updated user data
-            updated_winner = await db.users.find_one({"_id": ObjectId(winner_id)})
-            updated_loser = await db.users.find_one({"_id": ObjectId(loser_id)})
-
-            # Check if users still exist after update
-            if not updated_winner or not updated_loser:
-                api_logger.error(f"User not found after update: winner_id={winner_id}, loser_id={loser_id}")
-                await websocket.send_json({
-                    "type": "error",
-                    "message": "Error updating user data."
-                })
-                return
-
-            # Prepare match result message
             result_message = {
                 "type": "challenge_result",
+                "match_id": match_history["match_id"],
+                "commit_status": "pending",
                 "kicker_id": kicker_id,
                 "goalkeeper_id": goalkeeper_id,
                 "kicker_skill": selected_kicker_skill,
                 "goalkeeper_skill": selected_goalkeeper_skill,
                 "winner_id": winner_id,
-                "match_stats": {
-                    "winner": {
-                        "id": str(updated_winner["_id"]),
-                        "name": updated_winner.get("name", "Anonymous"),
-                        "role": "kicker" if winner_id == kicker_id else "goalkeeper",
-                        "total_point": updated_winner.get("total_point", 0),
-                        "remaining_matches": updated_winner.get("remaining_matches", 0),
-                        "is_pro": updated_winner.get("is_pro", False),
-                        "legend_level": updated_winner.get("legend_level", 0),
-                        "level": updated_winner.get("level", 1),
-                        "level_up": level_up,
-                        "new_skills": new_skills if level_up and not new_levels["is_pro"] else [],
-                        "can_level_up": new_levels.get("can_level_up", False),
-                        "total_point_for_level": new_levels.get("total_point_for_level", 0),
-                        "available_skill_points": updated_winner.get("available_skill_points", 0)  # Add available skill points
-                    },
-                    "loser": {
-                        "id": str(updated_loser["_id"]),
-                        "name": updated_loser.get("name", "Anonymous"),
-                        "role": "goalkeeper" if winner_id == kicker_id else "kicker",
-                        "total_point": updated_loser.get("total_point", 0),
-                        "remaining_matches": updated_loser.get("remaining_matches", 0),
-                        "is_pro": updated_loser.get("is_pro", False),
-                        "legend_level": updated_loser.get("legend_level", 0),
-                        "level": updated_loser.get("level", 1),
-                        "available_skill_points": updated_loser.get("available_skill_points", 0)  # Add available skill points
-                    }
-                }
+                "match_stats": project_match_stats(winner, loser, outcome["winner_role"], outcome["loser_role"])
             }
 
             # Send result to both players
             await self.send_message(active_connections, kicker_id, result_message)
             await self.send_message(active_connections, goalkeeper_id, result_message)
-
-            # Now fetch fresh data for leaderboard
-            from ws_handlers.waiting_room import manager
-            leaderboard_users = await db.users.find().sort("total_point", -1).limit(5).to_list(length=5)
-            leaderboard_data = [
-                {
-                    "id": str(u["_id"]),
-                    "name": u.get("name", "Anonymous"),
-                    "avatar": u.get("avatar", ""),
-                    "level": u.get("level", 1),
-                    "total_kicked": u.get("total_kicked", 0),
-                    "kicked_win": u.get("kicked_win", 0),
-                    "total_keep": u.get("total_keep", 0),
-                    "keep_win": u.get("keep_win", 0),
-                    "total_point": u.get("total_point", 0),
-                    "bonus_point": u.get("bonus_point", 0.0),
-                    "is_pro": u.get("is_pro", False),
-                    "is_vip": u.get("is_vip", False),
-                    "extra_point": u.get("extra_point", 0),
-                }
-                for u in leaderboard_users
-            ]
-            await manager.broadcast({
-                "type": "leaderboard_update",
-                "leaderboard": leaderboard_data
-            })
-
-            await manager.broadcast_user_list()
         
         else:
             # Notify the challenger that the challenge was declined
@@ -518,14 +376,67 @@ class ChallengeManager:
             await self.send_message(active_connections, to_id, decline_message)
 
         # Clean up the challenge
-        del self.pending_challenges[challenge_key]
+        self.pending_challenges.remove(challenge["from_id"], challenge["to_id"])
+
+    def _has_remaining_matches(self, user: dict) -> bool:
+        """remaining_matches trừ đi các trận đã có kết quả nhưng match_pipeline chưa commit"""
+        remaining = user.get("remaining_matches", 0)
+        if not user.get("is_vip", False):
+            remaining -= match_pipeline.pending_for(str(user["_id"]))
+        return remaining > 0
 
     def cleanup_user_challenges(self, user_id: str):
         """Remove any pending challenges involving a user"""
-        self.pending_challenges = {
-            k: v for k, v in self.pending_challenges.items()
-            if v['from_id'] != user_id and v['to_id'] != user_id
-        }
+        self.pending_challenges.remove_user(user_id)
+
+    def get_user_challenges(self, user_id: str):
+        """Get pending challenges sent or received by a user"""
+        return self.pending_challenges.involving(user_id)
+
+    def _ensure_expiry_task(self, active_connections: Dict[str, WebSocket]):
+        """Start the challenge expiry loop if not running and wake it for the new deadline"""
+        self._active_connections = active_connections
+        if self._expiry_task is None or self._expiry_task.done():
+            self._expiry_task = asyncio.create_task(self._expiry_loop())
+        self._expiry_wakeup.set()
+
+    async def _expiry_loop(self):
+        """Expire unanswered challenges and notify both players"""
+        while True:
+            try:
+                next_expiry = self.pending_challenges.next_expiry()
+                self._expiry_wakeup.clear()
+                timeout = None if next_expiry is None else max(next_expiry - time.monotonic(), 0)
+                try:
+                    await asyncio.wait_for(self._expiry_wakeup.wait(), timeout=timeout)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+                for challenge in self.pending_challenges.pop_expired():
+                    expired_message = {
+                        "type": "challenge_expired",
+                        "from_id": challenge["from_id"],
+                        "to_id": challenge["to_id"],
+                        "timestamp": challenge["timestamp"]
+                    }
+                    await self.send_message(self._active_connections, challenge["from_id"], expired_message)
+                    await self.send_message(self._active_connections, challenge["to_id"], expired_message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                api_logger.error(f"Error in challenge expiry loop: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def cleanup(self):
+        """Stop the challenge expiry loop"""
+        if self._expiry_task:
+            self._expiry_task.cancel()
+            try:
+                await self._expiry_task
+            except asyncio.CancelledError:
+                pass
+            self._expiry_task = None
 
     async def send_message(self, active_connections: Dict[str, WebSocket], user_id: str, message: dict):
         """Send a message to a user via their WebSocket connection"""
@@ -535,70 +446,6 @@ class ChallengeManager:
             except Exception as e:
                 api_logger.error(f"Error sending message to {user_id}: {str(e)}")
 
-    async def _mint_victory_nft_async(self, player_address: str, total_wins: int, player_name: str, user_id: str, source_chain_id: int = 84532, destination_chain_id: int = 43113):
-        """Mint Victory NFT asynchronously when player reaches milestone (cross-chain via CCIP)"""
-        try:
-            # Import ccip_service
-            from services.ccip_service import ccip_service
-            
-            # Check if player is eligible for NFT (reuse logic from victory_nft_service if needed)
-            # For now, check milestone logic here
-            if total_wins < 10 or total_wins % 10 != 0:
-                api_logger.info(f"Player {player_name} not eligible for Victory NFT: Wins must be a multiple of 10")
-                return
-            
-            # Mint the Victory NFT cross-chain
-            result = await ccip_service.mint_victory_nft(
-                player_address, 
-                total_wins, 
-                player_name,
-                source_chain_id,
-                destination_chain_id
-            )
-            
-            if result["success"]:
-                api_logger.info(f"Victory NFT cross-chain mint SUCCESS: {result['source_chain']} → {result['destination_chain']} for {player_name} ({player_address}) with {total_wins} wins. Message ID: {result['message_id']}")
-                
-                # Log to database
-                try:
-                    from database.database import get_database
-                    from utils.time_utils import get_vietnam_time
-                    db = await get_database()
-                    victory_mint = {
-                        "player_address": player_address,
-                        "total_wins": total_wins,
-                        "milestone": result.get("milestone", total_wins // 10),
-                        "message_id": result["message_id"],
-                        "destination_chain": result["destination_chain"],
-                        "contract_address": result["destination_contract"],
-                        "minted_at": get_vietnam_time().isoformat(),
-                        "status": "minted"
-                    }
-                    await db.victory_nfts.insert_one(victory_mint)
-                    api_logger.info(f"Victory NFT logged to database for player {player_name}")
-                except Exception as e:
-                    api_logger.error(f"Failed to log Victory NFT to database: {str(e)}")
-                
-                # Send notification to player about NFT mint
-                try:
-                    from ws_handlers.waiting_room import manager
-                    await manager.send_personal_message({
-                        "type": "victory_nft_minted",
-                        "message": f"🎉 Congratulations! Your Victory NFT has been minted cross-chain on {result['destination_chain']}!",
-                        "total_wins": total_wins,
-                        "milestone": result.get("milestone", total_wins // 10),
-                        "message_id": result["message_id"],
-                        "source_chain": result["source_chain"],
-                        "destination_chain": result["destination_chain"],
-                        "explorer_url": f"https://testnet.snowtrace.io/tx/{result['message_id']}" if result['destination_chain'] == "Avalanche Fuji" else f"https://sepolia.basescan.org/tx/{result['message_id']}"
-                    }, user_id)
-                except Exception as e:
-                    api_logger.error(f"Failed to send Victory NFT notification to user {user_id}: {str(e)}")
-            else:
-                api_logger.error(f"Failed to mint Victory NFT cross-chain for {player_name} ({player_address}): {result.get('error', 'Unknown error')}")
-        except Exception as e:
-            api_logger.error(f"Error in _mint_victory_nft_async for user {user_id}: {str(e)}")
-
     def calculate_reward(self, user):
         total_point = user.get('total_point', 0)
         if user.get('is_vip'):
@@ -608,12 +455,14 @@ class ChallengeManager:
         else:
             return (total_point // 10) * 1
 
-    async def handle_bot_challenge(self, websocket: WebSocket, from_id: str, active_connections: Dict[str, WebSocket]):
+    async def handle_bot_challenge(self, websocket: WebSocket, from_id: str, active_connections: Dict[str, WebSocket], from_user: dict = None):
         """Handle a challenge against the bot"""
         try:
-            db = await get_database()
-            from_user = await db.users.find_one({"_id": ObjectId(from_id)})
-            bot = await db.bots.find_one({"username": "bot"})
+            if from_user is None:
+                db = await get_database()
+                from_user = await db.users.find_one({"_id": ObjectId(from_id)})
+            # Bot và counter của skill lấy từ cache, không đọc DB
+            bot = await bot_roster.get_bot()
             
             if not bot:
                 await websocket.send_json({
@@ -623,9 +472,8 @@ class ChallengeManager:
                 return
 
             # Randomly assign roles
-            roles = ["kicker", "goalkeeper"]
-            random.shuffle(roles)
-            is_player_kicker = roles[0] == "kicker"
+            kicker_id, goalkeeper_id = assign_roles(from_id, "bot", random.randrange(2))
+            is_player_kicker = kicker_id == from_id
             
             # Get player's skills based on role
             player_skills = from_user.get("kicker_skills" if is_player_kicker else "goalkeeper_skills", [])
@@ -639,28 +487,21 @@ class ChallengeManager:
                 return
 
             # Randomly select one skill from each
-            player_skill = random.choice(player_skills)
-            bot_skill = random.choice(bot_skills)
+            player_skill = pick_skill(player_skills, random.randrange(len(player_skills)))
+            bot_skill = pick_skill(bot_skills, random.randrange(len(bot_skills)))
+
+            kicker_skill = player_skill if is_player_kicker else bot_skill
+            goalkeeper_skill = bot_skill if is_player_kicker else player_skill
 
-            # Get skill details from skills collection to check counter
-            skills_collection = await get_skills_collection()
-            
             # Determine winner based on skill counter
-            winner_id = None
-            if is_player_kicker:
-                # If player is kicker, check if bot's skill counters player's skill
-                player_skill_details = await skills_collection.find_one({"name": player_skill})
-                if player_skill_details and player_skill_details.get("counter") == bot_skill:
-                    winner_id = "bot"  # Bot wins if it has the counter skill
-                else:
-                    winner_id = from_id  # Player wins if bot doesn't have counter
-            else:
-                # If player is goalkeeper, check if player's skill counters bot's skill
-                bot_skill_details = await skills_collection.find_one({"name": bot_skill})
-                if bot_skill_details and bot_skill_details.get("counter") == player_skill:
-                    winner_id = from_id  # Player wins if they have the counter skill
-                else:
-                    winner_id = "bot"  # Bot wins if player doesn't have counter
+            outcome = resolve_match(
+                kicker_id,
+                goalkeeper_id,
+                kicker_skill,
+                goalkeeper_skill,
+                await bot_roster.get_kicker_counter(kicker_skill)
+            )
+            winner_id = outcome["winner_id"]
             
             # Prepare match result message (without match history)
             result_message = {
@@ -0,0 +1,118 @@
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class PendingChallengeStore:
+    """
+    Lưu các lời mời thách đấu đang chờ, đánh index theo người thách đấu và người nhận.
+
+    - Tra cứu / thêm / xoá một challenge: O(1)
+    - Hết hạn challenge cũ: O(log n) mỗi challenge (heap theo expires_at)
+    - Dọn dẹp khi user disconnect: O(số challenge của user đó)
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_outgoing_per_user: int = 5):
+        self.ttl_seconds = ttl_seconds
+        self.max_outgoing_per_user = max_outgoing_per_user
+        self._by_challenger: Dict[str, Dict[str, Dict]] = {}
+        self._by_target: Dict[str, Dict[str, Dict]] = {}
+        # Heap entries: (expires_at, seq, from_id, to_id). Entry bị huỷ được bỏ qua khi pop (lazy delete)
+        self._expiry_heap: List[Tuple[float, int, str, str]] = []
+        self._seq = itertools.count()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        from_id, to_id = key
+        return to_id in self._by_challenger.get(from_id, {})
+
+    def get(self, from_id: str, to_id: str) -> Optional[Dict]:
+        return self._by_challenger.get(from_id, {}).get(to_id)
+
+    def outgoing_count(self, user_id: str) -> int:
+        return len(self._by_challenger.get(user_id, {}))
+
+    def can_challenge(self, user_id: str) -> bool:
+        return self.outgoing_count(user_id) < self.max_outgoing_per_user
+
+    def add(self, from_id: str, to_id: str, challenge: Dict, now: Optional[float] = None) -> Dict:
+        """Thêm (hoặc làm mới) challenge from_id -> to_id"""
+        now = time.monotonic() if now is None else now
+        if (from_id, to_id) in self:
+            self.remove(from_id, to_id)
+
+        seq = next(self._seq)
+        expires_at = now + self.ttl_seconds
+        challenge["_seq"] = seq
+        challenge["_expires_at"] = expires_at
+
+        self._by_challenger.setdefault(from_id, {})[to_id] = challenge
+        self._by_target.setdefault(to_id, {})[from_id] = challenge
+        heapq.heappush(self._expiry_heap, (expires_at, seq, from_id, to_id))
+        self._size += 1
+        return challenge
+
+    def remove(self, from_id: str, to_id: str) -> Optional[Dict]:
+        outgoing = self._by_challenger.get(from_id)
+        if not outgoing or to_id not in outgoing:
+            return None
+        challenge = outgoing.pop(to_id)
+        if not outgoing:
+            del self._by_challenger[from_id]
+
+        incoming = self._by_target.get(to_id)
+        if incoming is not None:
+            incoming.pop(from_id, None)
+            if not incoming:
+                del self._by_target[to_id]
+
+        self._size -= 1
+        self._maybe_compact()
+        return challenge
+
+    def involving(self, user_id: str) -> List[Dict]:
+        """Tất cả challenge mà user là người gửi hoặc người nhận"""
+        return list(self._by_challenger.get(user_id, {}).values()) + \
+            list(self._by_target.get(user_id, {}).values())
+
+    def remove_user(self, user_id: str) -> List[Dict]:
+        """Xoá mọi challenge liên quan đến user, trả về danh sách đã xoá"""
+        removed = []
+        for to_id in list(self._by_challenger.get(user_id, {})):
+            removed.append(self.remove(user_id, to_id))
+        for from_id in list(self._by_target.get(user_id, {})):
+            removed.append(self.remove(from_id, user_id))
+        return removed
+
+    def next_expiry(self) -> Optional[float]:
+        """Thời điểm (monotonic) challenge sớm nhất hết hạn, bỏ qua các entry đã bị xoá"""
+        while self._expiry_heap and self._is_stale(self._expiry_heap[0]):
+            heapq.heappop(self._expiry_heap)
+        return self._expiry_heap[0][0] if self._expiry_heap else None
+
+    def pop_expired(self, now: Optional[float] = None) -> List[Dict]:
+        """Lấy ra và xoá các challenge đã hết hạn"""
+        now = time.monotonic() if now is None else now
+        expired = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            entry = heapq.heappop(self._expiry_heap)
+            if self._is_stale(entry):
+                continue
+            _, _, from_id, to_id = entry
+            expired.append(self.remove(from_id, to_id))
+        return expired
+
+    def _is_stale(self, entry: Tuple[float, int, str, str]) -> bool:
+        _, seq, from_id, to_id = entry
+        challenge = self.get(from_id, to_id)
+        return challenge is None or challenge["_seq"] != seq
+
+    def _maybe_compact(self):
+        # Tránh heap phình to vì các entry đã bị xoá (disconnect, accept, decline)
+        if len(self._expiry_heap) > 64 and len(self._expiry_heap) > 2 * self._size:
+            self._expiry_heap = [e for e in self._expiry_heap if not self._is_stale(e)]
+            heapq.heapify(self._expiry_heap)
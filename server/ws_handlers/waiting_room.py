@@ -11,6 +11,7 @@ from bson import ObjectId
 from jose import jwt, JWTError
 import os
 from .challenge_handler import challenge_manager
+from services.match_pipeline import match_pipeline
 from utils.time_utils import get_vietnam_time, to_vietnam_time, VIETNAM_TZ
 import pytz
 import time
@@ -315,6 +316,9 @@ class WaitingRoomManager:
                 await self._leaderboard_task
             except asyncio.CancelledError:
                 pass
+
+        await challenge_manager.cleanup()
+        await match_pipeline.cleanup()
         
         # Close all connections
         for user_id in list(self.active_connections.keys()):
@@ -0,0 +1,104 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.19;
+
+import "@chainlink/contracts-ccip/contracts/libraries/Client.sol";
+
+interface IVictoryNFTCCIPReceiver {
+    function ccipReceive(Client.Any2EVMMessage calldata message) external;
+}
+
+/**
+ * @title MockCCIPRouter
+ * @dev Local-only stand-in for the CCIP router used by the backend (services/ccip_service.py).
+ * Exposes the same getFee / ccipSend ABI. ccipSend only commits to the message (one storage slot
+ * per receiver, payload in the MessageSent event) so the source transaction costs about what a real
+ * router send does; delivery to VictoryNFTCCIP.ccipReceive is triggered by calling deliver()
+ * (the mint throughput benchmark runs a relayer that does this automatically).
+ * Source and destination are the same hardhat/anvil chain - for load testing only.
+ */
+contract MockCCIPRouter {
+    struct Receiver {
+        address receiver;
+        bytes data;
+    }
+
+    struct ExtraArgs {
+        address feeToken;
+        uint256 feeAmount;
+    }
+
+    event MessageSent(
+        bytes32 indexed messageId,
+        uint64 indexed destinationChainSelector,
+        uint256 index,
+        address sender,
+        address receiver,
+        bytes data
+    );
+    event MessageDelivered(bytes32 indexed messageId, uint256 index, bool success, bytes reason);
+
+    uint64 public immutable sourceChainSelector;
+    uint256 public fee;
+
+    // keccak256(sender, receiver, data) của từng receiver, xóa khi đã deliver
+    mapping(bytes32 => mapping(uint256 => bytes32)) public commitments;
+
+    uint256 private _nonce;
+
+    constructor(uint64 _sourceChainSelector, uint256 _fee) {
+        sourceChainSelector = _sourceChainSelector;
+        fee = _fee;
+    }
+
+    function getFee(uint64, Receiver[] calldata, bytes calldata, ExtraArgs calldata) external view returns (uint256) {
+        return fee;
+    }
+
+    function ccipSend(
+        uint64 destinationChainSelector,
+        Receiver[] calldata receivers,
+        bytes calldata,
+        ExtraArgs calldata
+    ) external payable returns (bytes32 messageId) {
+        require(msg.value >= fee, "Insufficient fee");
+        require(receivers.length > 0, "No receivers");
+
+        _nonce++;
+        messageId = keccak256(abi.encode(address(this), msg.sender, _nonce));
+        for (uint256 i = 0; i < receivers.length; i++) {
+            commitments[messageId][i] = keccak256(abi.encode(msg.sender, receivers[i].receiver, receivers[i].data));
+            emit MessageSent(messageId, destinationChainSelector, i, msg.sender, receivers[i].receiver, receivers[i].data);
+        }
+    }
+
+    function deliver(
+        bytes32 messageId,
+        uint256 index,
+        address sender,
+        address receiver,
+        bytes calldata data
+    ) external returns (bool success) {
+        bytes32 commitment = commitments[messageId][index];
+        require(commitment != bytes32(0), "Unknown or delivered message");
+        require(commitment == keccak256(abi.encode(sender, receiver, data)), "Message mismatch");
+        delete commitments[messageId][index];
+
+        Client.Any2EVMMessage memory message = Client.Any2EVMMessage({
+            messageId: messageId,
+            sourceChainSelector: sourceChainSelector,
+            sender: abi.encode(sender),
+            data: data,
+            destTokenAmounts: new Client.EVMTokenAmount[](0)
+        });
+        try IVictoryNFTCCIPReceiver(receiver).ccipReceive(message) {
+            success = true;
+            emit MessageDelivered(messageId, index, true, "");
+        } catch (bytes memory reason) {
+            emit MessageDelivered(messageId, index, false, reason);
+        }
+    }
+
+    function withdraw(address payable to) external {
+        to.transfer(address(this).balance);
+    }
+}
@@ -0,0 +1,60 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.19;
+
+/**
+ * @title MockVRFConsumer
+ * @dev Local-only stand-in for the Chainlink VRF v2.5 SubscriptionConsumer used by the backend.
+ * Exposes the same requestRandomWords / getRequestStatus / events, but fulfilment is triggered
+ * by calling fulfillRequest() (the backend's local VRF backend does this automatically).
+ * NOT random in any secure sense - for hardhat/anvil load testing only.
+ */
+contract MockVRFConsumer {
+    struct RequestStatus {
+        bool fulfilled;
+        bool exists;
+        uint256[] randomWords;
+    }
+
+    event RequestSent(uint256 requestId, uint32 numWords);
+    event RequestFulfilled(uint256 requestId, uint256[] randomWords);
+
+    mapping(uint256 => RequestStatus) public s_requests;
+    uint256[] public requestIds;
+    uint256 public lastRequestId;
+    uint32 public numWords;
+
+    uint256 private _nonce;
+
+    constructor(uint32 _numWords) {
+        numWords = _numWords;
+    }
+
+    function requestRandomWords(bool) external returns (uint256 requestId) {
+        _nonce++;
+        requestId = uint256(keccak256(abi.encode(address(this), block.number, _nonce)));
+        s_requests[requestId].exists = true;
+        requestIds.push(requestId);
+        lastRequestId = requestId;
+        emit RequestSent(requestId, numWords);
+    }
+
+    function fulfillRequest(uint256 _requestId) external {
+        RequestStatus storage request = s_requests[_requestId];
+        require(request.exists, "request not found");
+        require(!request.fulfilled, "already fulfilled");
+
+        uint256[] memory words = new uint256[](numWords);
+        for (uint256 i = 0; i < numWords; i++) {
+            words[i] = uint256(keccak256(abi.encode(_requestId, blockhash(block.number - 1), i)));
+        }
+        request.fulfilled = true;
+        request.randomWords = words;
+        emit RequestFulfilled(_requestId, words);
+    }
+
+    function getRequestStatus(uint256 _requestId) external view returns (bool fulfilled, uint256[] memory randomWords) {
+        require(s_requests[_requestId].exists, "request not found");
+        RequestStatus memory request = s_requests[_requestId];
+        return (request.fulfilled, request.randomWords);
+    }
+}
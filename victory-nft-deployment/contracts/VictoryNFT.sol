@@ -60,6 +60,39 @@ contract VictoryNFT is ERC721, Ownable {
         uint256 wins,
         string memory metadata
     ) external onlyOwner returns (uint256) {
+        return _mintVictoryNFT(player, wins, metadata);
+    }
+
+    /**
+     * @dev Mint Victory NFTs for many players in one transaction
+     * Same checks as mintVictoryNFT for every item, one invalid item reverts the whole batch
+     * @param players The players' addresses
+     * @param wins Total wins achieved by each player
+     * @param metadata JSON metadata for each NFT
+     * @return tokenIds The minted token IDs, in input order
+     */
+    function batchMintVictoryNFT(
+        address[] calldata players,
+        uint256[] calldata wins,
+        string[] calldata metadata
+    ) external onlyOwner returns (uint256[] memory tokenIds) {
+        require(players.length > 0, "Empty batch");
+        require(
+            players.length == wins.length && players.length == metadata.length,
+            "Array length mismatch"
+        );
+
+        tokenIds = new uint256[](players.length);
+        for (uint256 i = 0; i < players.length; i++) {
+            tokenIds[i] = _mintVictoryNFT(players[i], wins[i], metadata[i]);
+        }
+    }
+
+    function _mintVictoryNFT(
+        address player,
+        uint256 wins,
+        string memory metadata
+    ) internal returns (uint256) {
         require(player != address(0), "Invalid player address");
         require(wins > 0, "Wins must be greater than 0");
         require(wins % 10 == 0, "Wins must be a multiple of 10");
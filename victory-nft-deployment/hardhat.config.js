@@ -13,6 +13,11 @@ module.exports = {
     }
   },
   networks: {
+    // Hardhat node local (benchmark mint): CCIPService gửi gas price = 90% eth_gasPrice,
+    // base fee 0 để transaction không bị từ chối
+    hardhat: {
+      initialBaseFeePerGas: 0
+    },
     // Avalanche Fuji Testnet
     fuji: {
       url: process.env.AVALANCHE_FUJI_RPC_URL || "https://api.avax-test.network/ext/bc/C/rpc",
@@ -0,0 +1,82 @@
+const hre = require("hardhat");
+
+// So sánh gas và thời gian / NFT giữa mintVictoryNFT từng cái và batchMintVictoryNFT
+// Chạy trên hardhat network local: npm run benchmark:batch-mint
+const BATCH_SIZES = (process.env.BATCH_SIZES || "1,5,10,20,50").split(",").map(Number);
+
+function buildMetadata(wins) {
+  return JSON.stringify({
+    name: `Victory NFT - ${wins} Wins`,
+    description: `Player achieved ${wins} victories in Kickin!`,
+    image: `https://api.kickin.com/nft/victory/${wins}.png`,
+    attributes: [
+      { trait_type: "Total Wins", value: wins },
+      { trait_type: "Milestone", value: wins / 10 },
+      { trait_type: "Game", value: "Kickin" },
+      { trait_type: "Chain", value: "Avalanche Fuji" },
+      { trait_type: "Rarity", value: "Common" }
+    ]
+  });
+}
+
+function randomPlayers(count) {
+  return Array.from({ length: count }, () => hre.ethers.Wallet.createRandom().address);
+}
+
+async function mintOneByOne(victoryNFT, players, wins, metadata) {
+  const started = Date.now();
+  let gasUsed = 0n;
+  for (let i = 0; i < players.length; i++) {
+    const tx = await victoryNFT.mintVictoryNFT(players[i], wins[i], metadata[i]);
+    const receipt = await tx.wait();
+    gasUsed += receipt.gasUsed;
+  }
+  return { gasUsed, elapsedMs: Date.now() - started, transactions: players.length };
+}
+
+async function mintBatch(victoryNFT, players, wins, metadata) {
+  const started = Date.now();
+  const tx = await victoryNFT.batchMintVictoryNFT(players, wins, metadata);
+  const receipt = await tx.wait();
+  return { gasUsed: receipt.gasUsed, elapsedMs: Date.now() - started, transactions: 1 };
+}
+
+async function main() {
+  console.log(`⛽ Victory NFT batch mint benchmark on ${hre.network.name}`);
+
+  const VictoryNFT = await hre.ethers.getContractFactory("VictoryNFT");
+  const victoryNFT = await VictoryNFT.deploy();
+  await victoryNFT.waitForDeployment();
+
+  const rows = [];
+  for (const size of BATCH_SIZES) {
+    const wins = Array.from({ length: size }, (_, i) => ((i % 5) + 1) * 10);
+    const metadata = wins.map(buildMetadata);
+
+    const single = await mintOneByOne(victoryNFT, randomPlayers(size), wins, metadata);
+    const batch = await mintBatch(victoryNFT, randomPlayers(size), wins, metadata);
+
+    const singleGas = Number(single.gasUsed) / size;
+    const batchGas = Number(batch.gasUsed) / size;
+    rows.push({
+      "batch size": size,
+      "gas/NFT (single)": Math.round(singleGas),
+      "gas/NFT (batch)": Math.round(batchGas),
+      "gas saved": `${((1 - batchGas / singleGas) * 100).toFixed(1)}%`,
+      "ms/NFT (single)": (single.elapsedMs / size).toFixed(1),
+      "ms/NFT (batch)": (batch.elapsedMs / size).toFixed(1),
+      "batch tx gas": Number(batch.gasUsed)
+    });
+  }
+
+  console.table(rows);
+  console.log("ℹ️  Wall time on the in-process hardhat network only reflects RPC + execution cost;");
+  console.log("   on Fuji each transaction also waits ~2s for a block, so batching saves (size - 1) block waits.");
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error(error);
+    process.exit(1);
+  });
@@ -0,0 +1,47 @@
+const hre = require("hardhat");
+
+// Deploy VictoryNFT + MockCCIPRouter + VictoryNFTCCIP lên hardhat node / anvil để
+// chạy server/scripts/benchmark_mint_throughput.py (mint trực tiếp và qua CCIP)
+// npx hardhat node   (hoặc: anvil --block-time 2 --block-base-fee-per-gas 0)
+// npx hardhat run scripts/deploy-mint-benchmark.js --network localhost
+const BASE_SEPOLIA_CHAIN_SELECTOR = 103824977864868n;
+
+async function main() {
+  const fee = hre.ethers.parseEther(process.env.MOCK_CCIP_FEE || "0.0001");
+  const [deployer] = await hre.ethers.getSigners();
+  console.log("📝 Deploying mint benchmark contracts with account:", deployer.address);
+
+  // Owner của VictoryNFT là ví server (CCIP_PRIVATE_KEY / PRIVATE_KEY của backend)
+  const VictoryNFT = await hre.ethers.getContractFactory("VictoryNFT");
+  const victoryNFT = await VictoryNFT.deploy();
+  await victoryNFT.waitForDeployment();
+  const victoryNFTAddress = victoryNFT.target || victoryNFT.address;
+  console.log("✅ VictoryNFT deployed to:", victoryNFTAddress);
+
+  // Router giả lập: message "đến" từ Base Sepolia (source chain mặc định được VictoryNFTCCIP cho phép)
+  const MockCCIPRouter = await hre.ethers.getContractFactory("MockCCIPRouter");
+  const router = await MockCCIPRouter.deploy(BASE_SEPOLIA_CHAIN_SELECTOR, fee);
+  await router.waitForDeployment();
+  const routerAddress = router.target || router.address;
+  console.log("✅ MockCCIPRouter deployed to:", routerAddress);
+  console.log(`   fee: ${hre.ethers.formatEther(fee)} ETH`);
+
+  const VictoryNFTCCIP = await hre.ethers.getContractFactory("VictoryNFTCCIP");
+  const victoryNFTCCIP = await VictoryNFTCCIP.deploy(routerAddress);
+  await victoryNFTCCIP.waitForDeployment();
+  const victoryNFTCCIPAddress = victoryNFTCCIP.target || victoryNFTCCIP.address;
+  console.log("✅ VictoryNFTCCIP deployed to:", victoryNFTCCIPAddress);
+
+  console.log("\nBenchmark env (server/):");
+  console.log(`MINT_BENCH_RPC_URL=${hre.network.config.url || "http://127.0.0.1:8545"}`);
+  console.log(`MINT_BENCH_VICTORY_NFT=${victoryNFTAddress}`);
+  console.log(`MINT_BENCH_CCIP_ROUTER=${routerAddress}`);
+  console.log(`MINT_BENCH_VICTORY_NFT_CCIP=${victoryNFTCCIPAddress}`);
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error("❌ Deployment failed:", error);
+    process.exit(1);
+  });
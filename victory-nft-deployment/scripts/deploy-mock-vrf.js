@@ -0,0 +1,29 @@
+const hre = require("hardhat");
+
+// Deploy MockVRFConsumer lên hardhat node / anvil để chạy VRF backend "local"
+// npx hardhat node   (hoặc: anvil)
+// npx hardhat run scripts/deploy-mock-vrf.js --network localhost
+async function main() {
+  const numWords = parseInt(process.env.MOCK_VRF_NUM_WORDS || "10", 10);
+  const [deployer] = await hre.ethers.getSigners();
+  console.log("📝 Deploying MockVRFConsumer with account:", deployer.address);
+
+  const MockVRFConsumer = await hre.ethers.getContractFactory("MockVRFConsumer");
+  const consumer = await MockVRFConsumer.deploy(numWords);
+  await consumer.waitForDeployment();
+  const address = consumer.target || consumer.address;
+
+  console.log("✅ MockVRFConsumer deployed to:", address);
+  console.log(`   numWords: ${numWords}`);
+  console.log("\nBackend env:");
+  console.log("VRF_BACKEND=local");
+  console.log(`VRF_LOCAL_RPC_URL=${hre.network.config.url || "http://127.0.0.1:8545"}`);
+  console.log(`VRF_LOCAL_CONSUMER_ADDRESS=${address}`);
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error("❌ Deployment failed:", error);
+    process.exit(1);
+  });